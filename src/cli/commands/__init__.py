@@ -3,9 +3,41 @@ from .firebase import register_commands as register_firebase_commands
 from .jazz import register_commands as register_jazz_commands
 from .partimento import register_commands as register_partimento_commands
 
+# Each command group is served by the handler module of the same name in
+# cli.handlers, which is only imported when one of its commands runs.
+COMMAND_GROUPS = (
+    ("core", register_core_commands),
+    ("partimento", register_partimento_commands),
+    ("jazz", register_jazz_commands),
+    ("firebase", register_firebase_commands),
+)
+
+
+def add_profile_arguments(parser):
+    group = parser.add_argument_group("profiling")
+    group.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record a per-stage timing tree (JSON report + collapsed stacks)",
+    )
+    group.add_argument(
+        "--profile-output",
+        help="Report path (default generated/profiles/<command>_<timestamp>.json)",
+    )
+    group.add_argument(
+        "--profile-cpu", action="store_true", help="Also run cProfile per stage"
+    )
+    group.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Also record tracemalloc peak memory per stage",
+    )
+
 
 def register_commands(subparsers):
-    register_core_commands(subparsers)
-    register_partimento_commands(subparsers)
-    register_jazz_commands(subparsers)
-    register_firebase_commands(subparsers)
+    for group, register in COMMAND_GROUPS:
+        before = set(subparsers.choices)
+        register(subparsers)
+        for name in set(subparsers.choices) - before:
+            subparsers.choices[name].set_defaults(handler_group=group)
+            add_profile_arguments(subparsers.choices[name])
@@ -1,28 +1,494 @@
+import argparse
+import os
+
+
+def add_slice_arguments(parser):
+    parser.add_argument(
+        "--measures", help="Only this measure range, e.g. 17-24 (1-based, inclusive)"
+    )
+    parser.add_argument(
+        "--voices", help="Only these voices, e.g. s,b (soprano, alto, tenor, bass)"
+    )
+
+
 def register_write_audio(subparsers):
     parser = subparsers.add_parser(
-        "export-audio", help="Conver MIDI file to ogg using timidity"
+        "export-audio", help="Render a MIDI file or chain JSON to WAV/FLAC/OGG"
+    )
+    parser.add_argument(
+        "input", help="Path to the .mid file, or a partimento/realization JSON file"
+    )
+    parser.add_argument(
+        "--output", "-o", help="Audio path (default: input with the audio extension)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["wav", "flac", "ogg"],
+        help="Audio format (default: ogg when an encoder is installed, else wav)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["builtin", "timidity"],
+        help="Renderer for MIDI input (default YANTRA_AUDIO_BACKEND or builtin)",
     )
-    parser.add_argument("input", help="Path to the .mid file")
+    add_slice_arguments(parser)
 
 
 def register_inspect_musicxml(subparsers):
     parser = subparsers.add_parser(
-        "inspect-musicxml", help="Print summary of a MusicXML file"
+        "inspect-musicxml", help="Print summary of MusicXML files"
+    )
+    parser.add_argument(
+        "input",
+        nargs="+",
+        help="MusicXML files, directories or globs to inspect, "
+        "or chain.ygchain[:member]",
+    )
+    parser.add_argument(
+        "--deep",
+        action="store_true",
+        help="Parse with music21 instead of the fast streaming scan",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print the summaries as JSON"
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="Files inspected in parallel (default: CPU count)",
+    )
+
+
+def register_import_score(subparsers):
+    parser = subparsers.add_parser(
+        "import-score",
+        help="Convert MusicXML/MIDI files into partimento or SATB JSON",
+    )
+    parser.add_argument(
+        "input", nargs="+", help="MusicXML or MIDI files, directories or globs"
+    )
+    parser.add_argument(
+        "--kind",
+        choices=["auto", "partimento", "satb"],
+        default="auto",
+        help="Target schema (default auto: SATB for four parts, else partimento)",
+    )
+    parser.add_argument(
+        "--output-dir",
+        "-o",
+        default="generated/imports",
+        help="Where to write the JSON files (default generated/imports)",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="Files imported in parallel (default: CPU count)",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print the per-file results as JSON"
     )
-    parser.add_argument("input", help="Path to .musicxml file to inspect")
 
 
 def register_describe_chain(subparsers):
     parser = subparsers.add_parser(
         "describe-chain", help="Describe the chain of operations for a partimento"
     )
-    parser.add_argument("input", help="Path to the partimento JSON file")
+    parser.add_argument("input", help="Path to the chain directory or .ygchain archive")
     parser.add_argument(
         "--output", "-o", help="Path to save the description (optional)"
     )
 
 
+def add_catalog_filter_arguments(parser):
+    parser.add_argument("--key", help="Only chains in this key, e.g. 'D minor'")
+    parser.add_argument("--style", help="Only chains in this style, e.g. Furno")
+    parser.add_argument("--mode", help="Only chains written by this mode")
+    parser.add_argument(
+        "--since", help="Only chains created at or after this ISO date/time"
+    )
+    parser.add_argument(
+        "--max-issues",
+        type=int,
+        help="Only chains whose final realization has at most N lint issues",
+    )
+    parser.add_argument("--file", help="Only chains containing this file name")
+    parser.add_argument(
+        "--limit", type=int, default=20, help="Maximum rows to show (default 20)"
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print matching rows as JSON"
+    )
+    parser.add_argument(
+        "--catalog",
+        help="Catalog database (default generated/chains/.catalog.sqlite)",
+    )
+
+
+def register_list_chains(subparsers):
+    parser = subparsers.add_parser(
+        "list-chains", help="List cataloged chains, newest first"
+    )
+    add_catalog_filter_arguments(parser)
+
+
+def register_search_chains(subparsers):
+    parser = subparsers.add_parser(
+        "search-chains", help="Full-text search cataloged chains by prompt and title"
+    )
+    parser.add_argument("query", help="FTS query, e.g. 'furno AND minor'")
+    add_catalog_filter_arguments(parser)
+
+
+def register_rescan_chains(subparsers):
+    parser = subparsers.add_parser(
+        "rescan-chains",
+        help="Update the chain catalog from chain directories whose mtime changed",
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="generated/chains",
+        help="Root directory of chains (default generated/chains)",
+    )
+    parser.add_argument(
+        "--full", action="store_true", help="Reindex every chain, changed or not"
+    )
+    parser.add_argument(
+        "--catalog",
+        help="Catalog database (default .catalog.sqlite inside the chains root)",
+    )
+
+
+def register_gc_blobs(subparsers):
+    parser = subparsers.add_parser(
+        "gc-blobs", help="Remove stored export blobs no chain links to any more"
+    )
+    parser.add_argument(
+        "input",
+        nargs="*",
+        default=["generated/chains"],
+        help="Chains roots whose .blobs stores to clean, together with the "
+        "stores of every chain in their catalogs (default generated/chains)",
+    )
+    parser.add_argument(
+        "--catalog", help="Find chains in this catalog instead of the roots' ones"
+    )
+    parser.add_argument(
+        "--min-age",
+        type=float,
+        default=60.0,
+        help="Keep blobs younger than this many seconds (default 60)",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report what would be removed"
+    )
+
+
+def register_reexport(subparsers):
+    parser = subparsers.add_parser(
+        "reexport",
+        help="Regenerate MusicXML, MIDI and audio for many chains in parallel",
+    )
+    parser.add_argument(
+        "input",
+        nargs="*",
+        help="Chain directories, roots or globs (default: every cataloged chain)",
+    )
+    parser.add_argument(
+        "--formats",
+        default="musicxml,midi,audio",
+        help="Comma-separated artifacts to rebuild (default musicxml,midi,audio)",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="Chains exported in parallel (default: CPU count)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild every artifact, even when its input and exporter are unchanged",
+    )
+    parser.add_argument(
+        "--journal",
+        default="generated/.reexport_journal.jsonl",
+        help="Progress journal used to skip finished artifacts and resume",
+    )
+    parser.add_argument("--key", help="Only cataloged chains in this key")
+    parser.add_argument("--style", help="Only cataloged chains in this style")
+    parser.add_argument("--mode", help="Only cataloged chains written by this mode")
+    parser.add_argument(
+        "--since", help="Only cataloged chains created at or after this ISO date/time"
+    )
+    parser.add_argument(
+        "--catalog",
+        help="Catalog database (default generated/chains/.catalog.sqlite)",
+    )
+
+
+def register_score_cache(subparsers):
+    parser = subparsers.add_parser(
+        "score-cache", help="Show or clear the parsed-score cache used by loaders"
+    )
+    parser.add_argument(
+        "--clear", action="store_true", help="Remove every cached score"
+    )
+    parser.add_argument(
+        "--max-mb",
+        type=float,
+        help="Evict least recently used scores until the cache fits this size",
+    )
+
+
+def register_pack_chain(subparsers):
+    parser = subparsers.add_parser(
+        "pack-chain", help="Pack a chain directory into a single .ygchain archive"
+    )
+    parser.add_argument("input", help="Path to the chain directory")
+    parser.add_argument(
+        "--output", "-o", help="Archive path (default <chain dir>.ygchain)"
+    )
+    parser.add_argument(
+        "--remove",
+        action="store_true",
+        help="Delete the chain directory after packing",
+    )
+
+
+def register_unpack_chain(subparsers):
+    parser = subparsers.add_parser(
+        "unpack-chain", help="Restore a chain directory from a .ygchain archive"
+    )
+    parser.add_argument("input", help="Path to the .ygchain archive")
+    parser.add_argument(
+        "--output", "-o", help="Directory to restore into (default archive name)"
+    )
+
+
+def register_diff_versions(subparsers):
+    parser = subparsers.add_parser(
+        "diff-versions",
+        help="Show the measures that differ between two partimento/realization versions",
+    )
+    parser.add_argument("input", help="Original version JSON, e.g. realized_01.json")
+    parser.add_argument("other", help="Version to compare, e.g. realized_03.json")
+    parser.add_argument("--json", action="store_true", help="Print the changes as JSON")
+
+
+def register_serve(subparsers):
+    parser = subparsers.add_parser(
+        "serve",
+        help="Run a warm daemon that other CLI invocations are forwarded to",
+    )
+    parser.add_argument(
+        "--socket", help="Unix socket path (default $XDG_RUNTIME_DIR/yantra-UID.sock)"
+    )
+    parser.add_argument(
+        "--status", action="store_true", help="Report on a running daemon and exit"
+    )
+    parser.add_argument(
+        "--stop", action="store_true", help="Stop a running daemon and exit"
+    )
+    parser.add_argument(
+        "--no-warm",
+        action="store_true",
+        help="Skip preloading handlers (and music21) before listening",
+    )
+
+
+def register_queue(subparsers):
+    parser = subparsers.add_parser(
+        "queue", help="Durable job queue for generate/realize/export batches"
+    )
+    parser.add_argument(
+        "--queue", help="Queue database (default generated/queue.sqlite)"
+    )
+    actions = parser.add_subparsers(dest="queue_command")
+
+    submit = actions.add_parser(
+        "submit", help="Queue a CLI command, e.g. queue submit chain-realization '...'"
+    )
+    submit.add_argument(
+        "--priority", type=int, default=0, help="Higher runs first (default 0)"
+    )
+    submit.add_argument(
+        "--max-attempts",
+        type=int,
+        default=3,
+        help="Attempts before the job is dead-lettered (default 3)",
+    )
+    submit.add_argument(
+        "--retry-delay",
+        type=float,
+        default=30.0,
+        help="Seconds before the first retry; doubles per attempt (default 30)",
+    )
+    submit.add_argument(
+        "argv", nargs=argparse.REMAINDER, help="Command and arguments to run"
+    )
+
+    status = actions.add_parser("status", help="Show job counts, jobs and workers")
+    status.add_argument("--state", help="Only list jobs in this state")
+    status.add_argument(
+        "--limit", type=int, default=20, help="Maximum jobs to list (default 20)"
+    )
+    status.add_argument("--json", action="store_true", help="Print status as JSON")
+
+    workers = actions.add_parser("workers", help="Run worker processes")
+    workers.add_argument(
+        "--processes",
+        "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes (default: all cores)",
+    )
+    workers.add_argument(
+        "--kinds", help="Comma-separated job kinds to take: generate,realize,export"
+    )
+    workers.add_argument(
+        "--lease",
+        type=float,
+        default=120.0,
+        help="Lease seconds; renewed by heartbeats while a job runs (default 120)",
+    )
+    workers.add_argument(
+        "--drain",
+        action="store_true",
+        help="Exit once no runnable job is left instead of polling",
+    )
+
+    retry = actions.add_parser("retry", help="Requeue dead-lettered jobs")
+    retry.add_argument("job", nargs="?", type=int, help="Job id (default: all dead)")
+
+
+def add_threshold_argument(parser):
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.20,
+        help="Relative slowdown that counts as a regression (default 0.20)",
+    )
+
+
+def register_benchmark(subparsers):
+    parser = subparsers.add_parser(
+        "benchmark",
+        help="Time export, lint and conversion hot paths on synthetic scores",
+    )
+    parser.add_argument(
+        "--sizes",
+        default="8,64,512,4096",
+        help="Comma-separated score lengths in measures (default 8,64,512,4096)",
+    )
+    parser.add_argument(
+        "--cases", help="Comma-separated benchmark cases to run (default: all)"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Timed runs per case (default 3)"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Synthetic score seed (default 0)"
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="Results path (default generated/benchmarks/benchmark_<timestamp>.json)",
+    )
+    parser.add_argument(
+        "--compare", help="Baseline results to compare against after the run"
+    )
+    add_threshold_argument(parser)
+
+
+def register_compare_benchmarks(subparsers):
+    parser = subparsers.add_parser(
+        "compare-benchmarks",
+        help="Compare benchmark results with a baseline and flag slowdowns",
+    )
+    parser.add_argument("baseline", help="Baseline results JSON")
+    parser.add_argument("current", help="Results JSON to check")
+    add_threshold_argument(parser)
+    parser.add_argument(
+        "--json", action="store_true", help="Print the comparison as JSON"
+    )
+
+
+def register_load_test(subparsers):
+    parser = subparsers.add_parser(
+        "load-test",
+        help="Run many chains at once against a stub LLM and sweep concurrency",
+    )
+    parser.add_argument(
+        "--concurrency",
+        default="1,8,50",
+        help="Comma-separated chains in flight per level (default 1,8,50)",
+    )
+    parser.add_argument(
+        "--chains",
+        type=int,
+        help="Chains to run per level (default: twice the concurrency)",
+    )
+    parser.add_argument(
+        "--modes",
+        default="chain-realization,chain-partimento-only",
+        help="Chain commands to alternate between",
+    )
+    parser.add_argument(
+        "--latency",
+        default="lognormal:1.0,0.5",
+        help="Stub LLM latency: constant:S, uniform:A,B, normal:MU,SD, "
+        "lognormal:MEDIAN,SIGMA or exponential:MEAN (default lognormal:1.0,0.5)",
+    )
+    parser.add_argument(
+        "--measures", type=int, default=16, help="Length of the canned scores"
+    )
+    parser.add_argument(
+        "--patch-rate",
+        type=float,
+        default=0.0,
+        help="Probability that a stub review suggests a patch (default 0); "
+        "implies --always-review",
+    )
+    parser.add_argument(
+        "--always-review",
+        action="store_true",
+        help="Pass --always-review so every chain makes its review calls",
+    )
+    parser.add_argument(
+        "--root",
+        default="generated/loadtest",
+        help="Directory the chains are written to (default generated/loadtest)",
+    )
+    parser.add_argument(
+        "--keep", action="store_true", help="Keep the chain directories afterwards"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Stub LLM seed")
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="Report path (default <root>/loadtest_<timestamp>.json)",
+    )
+
+
 def register_commands(subparsers):
     register_describe_chain(subparsers)
+    register_pack_chain(subparsers)
+    register_unpack_chain(subparsers)
+    register_list_chains(subparsers)
+    register_search_chains(subparsers)
+    register_rescan_chains(subparsers)
+    register_gc_blobs(subparsers)
+    register_reexport(subparsers)
+    register_score_cache(subparsers)
+    register_diff_versions(subparsers)
     register_inspect_musicxml(subparsers)
+    register_import_score(subparsers)
     register_write_audio(subparsers)
+    register_serve(subparsers)
+    register_queue(subparsers)
+    register_benchmark(subparsers)
+    register_compare_benchmarks(subparsers)
+    register_load_test(subparsers)
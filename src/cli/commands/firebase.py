@@ -6,9 +6,26 @@ def register_list_realizations(subparsers):
 
 def register_push_chain(subparsers):
     parser = subparsers.add_parser(
-        "push-chain", help="Upload a realization chain folder to Firebase"
+        "push-chain", help="Upload realization chain folders to Firebase"
+    )
+    parser.add_argument(
+        "input",
+        nargs="+",
+        help="Chain folders containing metadata.json, or directories and globs "
+        "to search for them",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=8,
+        help="Concurrent uploads (default: 8)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Upload every file, even when the remote copy has the same MD5",
     )
-    parser.add_argument("input", help="Path to a chain folder containing metadata.json")
 
 
 def register_commands(subparsers):
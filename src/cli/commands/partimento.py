@@ -1,3 +1,6 @@
+from .core import add_slice_arguments
+
+
 def register_chain_partimento_realization(subparsers):
     parser = subparsers.add_parser(
         "chain-realization", help="Generate → Realize → Export a partimento"
@@ -11,6 +14,47 @@ def register_chain_partimento_realization(subparsers):
     parser.add_argument(
         "--iterations", type=int, default=1, help="Number of realization review loops"
     )
+    parser.add_argument(
+        "--always-review",
+        action="store_true",
+        help="Run the LLM partimento and realization reviews even when the "
+        "local checkers are clean",
+    )
+    add_lint_rule_arguments(parser)
+    add_engine_argument(parser)
+    parser.add_argument(
+        "--no-repair",
+        action="store_true",
+        help="Skip the local voice-leading repair before LLM review",
+    )
+    parser.add_argument(
+        "--no-play",
+        action="store_true",
+        help="Do not play the result with timidity when the chain finishes",
+    )
+
+
+def add_lint_rule_arguments(parser):
+    parser.add_argument(
+        "--rules",
+        help=(
+            "Comma-separated lint rules or scopes to run, or 'full' for all "
+            "(default: range, parallels, doubled-leading-tone)"
+        ),
+    )
+    parser.add_argument(
+        "--skip-rules",
+        help="Comma-separated lint rules or scopes to skip",
+    )
+
+
+def add_engine_argument(parser):
+    parser.add_argument(
+        "--engine",
+        choices=["llm", "local"],
+        default="llm",
+        help="Realize with the LLM or the local voice-leading search",
+    )
 
 
 def register_chain_partimento_only(subparsers):
@@ -27,6 +71,11 @@ def register_chain_partimento_only(subparsers):
     parser.add_argument(
         "--iterations", type=int, default=1, help="Number of realization review loops"
     )
+    parser.add_argument(
+        "--always-review",
+        action="store_true",
+        help="Run the LLM partimento review even when the local checker is clean",
+    )
 
 
 def register_generate_partimento(subparsers):
@@ -49,6 +98,7 @@ def register_realize_partimento(subparsers):
     parser.add_argument(
         "--output", "-o", help="Path to save the realized SATB JSON (optional)"
     )
+    add_engine_argument(parser)
 
 
 def register_review_partimento(subparsers):
@@ -80,6 +130,12 @@ def register_revise_partimento(subparsers):
         "patch", help="Path to the JSON review file with suggested_patch"
     )
     parser.add_argument("--output", "-o", help="Path to save the revised JSON")
+    parser.add_argument(
+        "--musicxml",
+        metavar="PREVIOUS",
+        help="MusicXML export of the input; writes an updated copy next to the "
+        "revised JSON, re-exporting only the patched measures",
+    )
 
 
 def register_revise_realization(subparsers):
@@ -91,6 +147,79 @@ def register_revise_realization(subparsers):
         "patch", help="Path to the JSON review file with suggested_patch"
     )
     parser.add_argument("--output", "-o", help="Path to save the revised JSON")
+    parser.add_argument(
+        "--musicxml",
+        metavar="PREVIOUS",
+        help="MusicXML export of the input; writes an updated copy next to the "
+        "revised JSON, re-exporting only the patched measures",
+    )
+
+
+def register_lint_partimento(subparsers):
+    parser = subparsers.add_parser(
+        "lint-partimento", help="Run deterministic checks on a partimento bass line"
+    )
+    parser.add_argument("input", help="Path to the partimento JSON file")
+    parser.add_argument(
+        "--output", "-o", help="Path to save the lint report JSON (optional)"
+    )
+
+
+def register_lint_realization(subparsers):
+    parser = subparsers.add_parser(
+        "lint-realization", help="Run the voice-leading linter on a realized SATB"
+    )
+    parser.add_argument("input", nargs="?", help="Path to the realized SATB JSON file")
+    add_lint_rule_arguments(parser)
+    parser.add_argument("--key", help="Key to lint against, e.g. 'C major'")
+    parser.add_argument(
+        "--stats", action="store_true", help="Print per-rule timing and hit counts"
+    )
+    parser.add_argument(
+        "--list-rules", action="store_true", help="List available lint rules and exit"
+    )
+    parser.add_argument(
+        "--output", "-o", help="Path to save the lint report JSON (optional)"
+    )
+
+
+def register_repair_realization(subparsers):
+    parser = subparsers.add_parser(
+        "repair-realization",
+        help="Fix voice-leading lint issues locally and save the patch as a review",
+    )
+    parser.add_argument("input", help="Path to the realized SATB JSON file")
+    add_lint_rule_arguments(parser)
+    parser.add_argument("--key", help="Key to lint against, e.g. 'C major'")
+    parser.add_argument(
+        "--output", "-o", help="Path to save the review JSON with suggested_patch"
+    )
+
+
+def register_lint_corpus(subparsers):
+    parser = subparsers.add_parser(
+        "lint-corpus",
+        help="Lint every realized SATB JSON under a directory tree in parallel",
+    )
+    parser.add_argument(
+        "input", nargs="?", default="generated/chains", help="Root directory to scan"
+    )
+    add_lint_rule_arguments(parser)
+    parser.add_argument(
+        "--latest", action="store_true", help="Only lint the latest version per chain"
+    )
+    parser.add_argument(
+        "--workers", "-j", type=int, help="Worker processes (default: all cores)"
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=16, help="Files handed to a worker at once"
+    )
+    parser.add_argument(
+        "--format", choices=["jsonl", "csv"], default="jsonl", help="Report format"
+    )
+    parser.add_argument(
+        "--output", "-o", help="Path to save the per-file report (optional)"
+    )
 
 
 def register_export_partimento_to_musicxml(subparsers):
@@ -99,6 +228,7 @@ def register_export_partimento_to_musicxml(subparsers):
     parser.add_argument(
         "output", nargs="?", help="Path to output MusicXML file (optional)"
     )
+    add_slice_arguments(parser)
 
 
 def register_export_realized_partimento_to_musicxml(subparsers):
@@ -110,6 +240,7 @@ def register_export_realized_partimento_to_musicxml(subparsers):
     parser.add_argument(
         "output", nargs="?", help="Path to output MusicXML file (optional)"
     )
+    add_slice_arguments(parser)
 
 
 def register_commands(subparsers):
@@ -124,8 +255,12 @@ def register_commands(subparsers):
     # review
     register_review_partimento(subparsers)
     register_review_realization(subparsers)
+    register_lint_partimento(subparsers)
+    register_lint_realization(subparsers)
+    register_lint_corpus(subparsers)
 
     # revise
+    register_repair_realization(subparsers)
     register_revise_partimento(subparsers)
     register_revise_realization(subparsers)
 
@@ -0,0 +1,301 @@
+"""
+Warm CLI daemon (`yantra serve`).
+
+The daemon imports every handler module (and with them music21, rich and the
+openai package) once, then listens on a Unix socket. Each forwarded invocation is
+run in a fork of the warm process, so commands start with everything already
+imported and cannot leak state into one another.
+
+A client sends its argv, working directory and environment as one JSON line,
+together with its stdin/stdout/stderr file descriptors (SCM_RIGHTS). The
+forked child adopts those descriptors, runs the command exactly as
+`cli.main` would and reports the exit code:
+
+    client → {"op": "run", "argv": [...], "cwd": ..., "env": {...}}  + fds 0,1,2
+    daemon → {"pid": 4242}
+    daemon → {"exit": 0}
+
+`{"op": "status"}` and `{"op": "stop"}` query and shut down the daemon.
+
+This module is imported by every CLI start, so it only uses the standard
+library and nothing heavy at import time.
+"""
+
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["default_socket_path", "forward", "request", "serve"]
+
+# Commands that must never be forwarded
+LOCAL_COMMANDS = {"serve"}
+ACCEPT_TIMEOUT = 1.0
+MAX_MESSAGE = 1 << 20
+
+
+def default_socket_path() -> str:
+    """Socket location, overridable with YANTRA_SOCKET."""
+    if os.environ.get("YANTRA_SOCKET"):
+        return os.environ["YANTRA_SOCKET"]
+    runtime = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR", "/tmp")
+    return os.path.join(runtime, f"yantra-{os.getuid()}.sock")
+
+
+def _send(conn, message: dict, fds=None) -> None:
+    data = (json.dumps(message) + "\n").encode()
+    if fds:
+        socket.send_fds(conn, [data], fds)
+    else:
+        conn.sendall(data)
+
+
+class _Reader:
+    """Newline-delimited JSON reader over a socket."""
+
+    def __init__(self, conn, buffer: bytes = b""):
+        self.conn = conn
+        self.buffer = buffer
+
+    def read(self) -> dict | None:
+        while b"\n" not in self.buffer:
+            chunk = self.conn.recv(65536)
+            if not chunk:
+                return None
+            self.buffer += chunk
+            if len(self.buffer) > MAX_MESSAGE:
+                raise ValueError("Daemon message too large")
+        line, _, self.buffer = self.buffer.partition(b"\n")
+        return json.loads(line)
+
+
+def _connect(path: str):
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(path)
+    except OSError:
+        conn.close()
+        return None
+    return conn
+
+
+# ----------------------------------------------------------------------
+# Client side
+# ----------------------------------------------------------------------
+
+
+def request(op: str, socket_path: str | None = None) -> dict | None:
+    """Send a control request ("status", "stop"); None if no daemon answers."""
+    conn = _connect(socket_path or default_socket_path())
+    if conn is None:
+        return None
+    with conn:
+        _send(conn, {"op": op})
+        return _Reader(conn).read()
+
+
+def forward(argv: list[str], socket_path: str | None = None) -> int | None:
+    """
+    Run a CLI invocation in the daemon and return its exit code, or None when
+    it should run in-process instead: no daemon is listening, YANTRA_DAEMON is
+    off, the command is daemon-local, or shell completion is active.
+    """
+    setting = os.environ.get("YANTRA_DAEMON", "")
+    if setting.lower() in ("0", "off", "false") or "_ARGCOMPLETE" in os.environ:
+        return None
+    if not argv or argv[0] in LOCAL_COMMANDS:
+        return None
+    path = socket_path or default_socket_path()
+    if not os.path.exists(path):
+        return None
+    conn = _connect(path)
+    if conn is None:
+        return None
+
+    with conn:
+        _send(
+            conn,
+            {"op": "run", "argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)},
+            fds=[0, 1, 2],
+        )
+        reader = _Reader(conn)
+        pid = None
+        while True:
+            try:
+                message = reader.read()
+            except KeyboardInterrupt:
+                if pid:
+                    os.kill(pid, signal.SIGINT)
+                continue
+            if message is None:
+                return 1  # the command died without reporting
+            if "pid" in message:
+                pid = message["pid"]
+            elif "exit" in message:
+                return message["exit"]
+
+
+# ----------------------------------------------------------------------
+# Server side
+# ----------------------------------------------------------------------
+
+
+def warm() -> None:
+    """
+    Import every handler module, the openai package and build the parser.
+    The LLM client itself is not created: it holds the API key, and each
+    forwarded command brings its own environment.
+    """
+    import importlib
+
+    from .commands import COMMAND_GROUPS
+    from .main import build_parser
+
+    for group, _ in COMMAND_GROUPS:
+        importlib.import_module(f"cli.handlers.{group}")
+    build_parser()
+    importlib.import_module("openai")
+
+
+def _exit_code(code) -> int:
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _run_child(conn, fds: list[int], message: dict) -> None:
+    """Body of the forked child: adopt the client's stdio and run argv."""
+    from .main import run
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    code = 1
+    try:
+        for target, fd in enumerate(fds[:3]):
+            os.dup2(fd, target)
+            os.close(fd)
+        os.chdir(message.get("cwd") or "/")
+        os.environ.clear()
+        os.environ.update(message.get("env") or {})
+        llm_utils = sys.modules.get("lib.utils.llm_utils")
+        if llm_utils is not None:
+            # A cached client would keep the daemon's API key, not the caller's
+            llm_utils.get_client.cache_clear()
+        sys.argv = ["yantra", *message["argv"]]
+        _send(conn, {"pid": os.getpid()})
+        try:
+            run(message["argv"])
+            code = 0
+        except SystemExit as e:
+            code = _exit_code(e.code)
+        except KeyboardInterrupt:
+            code = 130
+        except BaseException:
+            import traceback
+
+            traceback.print_exc()
+            code = 1
+        sys.stdout.flush()
+        sys.stderr.flush()
+        _send(conn, {"exit": code})
+    finally:
+        os._exit(code)
+
+
+def _bind(path: str):
+    if os.path.exists(path):
+        probe = _connect(path)
+        if probe is not None:
+            probe.close()
+            raise RuntimeError(f"A daemon is already listening on {path}")
+        os.unlink(path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        listener.bind(path)
+    finally:
+        os.umask(old_umask)
+    listener.listen(64)
+    listener.settimeout(ACCEPT_TIMEOUT)
+    return listener
+
+
+def _reap(children: set) -> None:
+    for pid in list(children):
+        try:
+            done, _ = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            done = pid
+        if done:
+            children.discard(pid)
+
+
+def serve(socket_path: str | None = None, warm_up: bool = True) -> None:
+    """Listen on socket_path until stopped, running each request in a fork."""
+    path = socket_path or default_socket_path()
+    if warm_up:
+        started = time.perf_counter()
+        warm()
+        logger.info(f"Warmed up in {time.perf_counter() - started:.2f}s")
+
+    listener = _bind(path)
+    stats = {"pid": os.getpid(), "socket": path, "started_at": time.time()}
+    stats["served"] = 0
+    children = set()
+    stopping = False
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    logger.info(f"Listening on {path} (pid {os.getpid()})")
+    try:
+        while not stopping:
+            _reap(children)
+            try:
+                conn, _ = listener.accept()
+            except socket.timeout:
+                continue
+            conn.settimeout(5.0)
+            fds = []
+            try:
+                data, fds, _, _ = socket.recv_fds(conn, 65536, 3)
+                message = _Reader(conn, data).read()
+                if message is None:
+                    continue
+                op = message.get("op")
+                if op == "status":
+                    _send(conn, dict(stats, children=len(children)))
+                elif op == "stop":
+                    _send(conn, {"stopping": True})
+                    stopping = True
+                elif op == "run" and len(fds) == 3:
+                    conn.settimeout(None)
+                    pid = os.fork()
+                    if pid == 0:
+                        listener.close()
+                        _run_child(conn, fds, message)
+                    children.add(pid)
+                    stats["served"] += 1
+                else:
+                    _send(conn, {"error": f"Bad request: {op}", "exit": 2})
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️  Dropped daemon request: {e}")
+            finally:
+                for fd in fds:
+                    os.close(fd)
+                conn.close()
+    finally:
+        listener.close()
+        if os.path.exists(path):
+            os.unlink(path)
+        logger.info("Daemon stopped")
@@ -1,11 +1,54 @@
-from .core import handler_map as core_handler_map
-from .firebase import handler_map as firebase_handler_map
-from .jazz import handler_map as jazz_handlers
-from .partimento import handler_map as partimento_handlers
-
-handler_map = {
-    **partimento_handlers,
-    **jazz_handlers,
-    **firebase_handler_map,
-    **core_handler_map,
-}
+"""
+Lazy dispatch from command name to handler function.
+
+Handler modules pull in music21, openai and Firebase, so none of them is
+imported until one of its commands is dispatched. The command → module
+mapping comes from the (import-light) command registration in cli.commands.
+"""
+
+import argparse
+import importlib
+from collections.abc import Mapping
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def command_groups() -> dict[str, str]:
+    """Return {command name: handler module name} without importing handlers."""
+    from ..commands import register_commands
+
+    parser = argparse.ArgumentParser(add_help=False)
+    subparsers = parser.add_subparsers(dest="command")
+    register_commands(subparsers)
+    return {
+        name: sub.get_default("handler_group")
+        for name, sub in subparsers.choices.items()
+    }
+
+
+def load_handler(command: str, group: str | None = None):
+    """Import the handler module for a command and return its handler."""
+    group = group or command_groups()[command]
+    module = importlib.import_module(f"{__name__}.{group}")
+    return module.handler_map[command]
+
+
+class LazyHandlerMap(Mapping):
+    """Read-only {command: handler} map that imports handlers on lookup."""
+
+    def __getitem__(self, command):
+        if command not in command_groups():
+            raise KeyError(command)
+        return load_handler(command)
+
+    def __iter__(self):
+        return iter(command_groups())
+
+    def __len__(self):
+        return len(command_groups())
+
+    def __contains__(self, command):
+        return command in command_groups()
+
+
+handler_map = LazyHandlerMap()
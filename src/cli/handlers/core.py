@@ -1,25 +1,41 @@
 import json
 import logging
 import os
-import subprocess
-import sys
+from time import perf_counter
 
 from colorama import Fore
 
 logger = logging.getLogger(__name__)
 
-from lib.utils.musicxml_utils import load_musicxml
+
+def _describe_archive(path):
+    from lib.utils.chain_archive import ChainArchive
+
+    with ChainArchive(path) as archive:
+        metadata = archive.metadata
+        members = archive.members()
+    logger.info(Fore.GREEN + f"\n🗜️  Archive: {len(members)} members")
+    for member in members:
+        logger.info(Fore.YELLOW + f"  {member['name']} ({member['size']} bytes)")
+    return metadata
 
 
 def handle_describe_chain(args):
+    from lib.utils.chain_archive import is_chain_archive
+
     logger.info(Fore.CYAN + f"\n📦 Describing chain: {args.input}")
-    meta_path = os.path.join(args.input, "metadata.json")
-    if not os.path.exists(meta_path):
-        logger.error(Fore.RED + "❌ No metadata.json found in the specified directory.")
-        return
+    if is_chain_archive(args.input):
+        metadata = _describe_archive(args.input)
+    else:
+        meta_path = os.path.join(args.input, "metadata.json")
+        if not os.path.exists(meta_path):
+            logger.error(
+                Fore.RED + "❌ No metadata.json found in the specified directory."
+            )
+            return False
 
-    with open(meta_path, "r") as f:
-        metadata = json.load(f)
+        with open(meta_path, "r") as f:
+            metadata = json.load(f)
 
     logger.info(Fore.GREEN + "\n📄 Metadata:")
     for key in ["id", "created_at", "mode", "prompt", "version"]:
@@ -36,61 +52,787 @@ def handle_describe_chain(args):
             logger.info(Fore.YELLOW + f"  {k}: {status}")
 
 
-def handle_inspect_musicxml(args):
-    from lib.utils.musicxml_utils import print_score_summary
+def handle_pack_chain(args):
+    from lib.utils.chain_archive import pack_chain
+
+    logger.info(Fore.CYAN + f"\n🗜️  Packing chain: {args.input}")
+    try:
+        archive = pack_chain(args.input, args.output, remove=args.remove)
+    except FileNotFoundError as e:
+        logger.error(Fore.RED + f"❌ {e}")
+        return False
+    logger.info(
+        Fore.GREEN + f"✅ Archive saved to {archive} ({os.path.getsize(archive)} bytes)"
+    )
+
+
+def handle_unpack_chain(args):
+    from lib.utils.chain_archive import is_chain_archive, unpack_chain
+
+    if not is_chain_archive(args.input):
+        logger.error(Fore.RED + f"❌ Not a chain archive: {args.input}")
+        return False
+    try:
+        directory = unpack_chain(args.input, args.output)
+    except ValueError as e:
+        logger.error(Fore.RED + f"❌ {e}")
+        return False
+    logger.info(Fore.GREEN + f"✅ Chain restored to {directory}")
+
+
+def _log_chain_rows(rows, as_json=False):
+    if as_json:
+        print(json.dumps(rows, indent=2))
+        return
+    if not rows:
+        logger.info(Fore.YELLOW + "No matching chains.")
+        return
+    for row in rows:
+        issues = row.get("realization_issues")
+        issues = "—" if issues is None else issues
+        logger.info(
+            Fore.YELLOW
+            + f"- {row.get('created_at')} | {row.get('key') or '?'} | "
+            + f"{row.get('style') or '?'} | issues: {issues} | "
+            + f"{row.get('prompt') or 'No prompt'}\n    {row['dir']}"
+        )
+
+
+def _query_catalog(args, text=None):
+    from lib.utils.chain_catalog import ChainCatalog
+
+    start = perf_counter()
+    with ChainCatalog(args.catalog) as catalog:
+        rows = catalog.query(
+            text=text,
+            key=args.key,
+            style=args.style,
+            mode=args.mode,
+            since=args.since,
+            max_issues=args.max_issues,
+            file=args.file,
+            limit=args.limit,
+        )
+    _log_chain_rows(rows, args.json)
+    if not args.json:
+        logger.info(
+            Fore.CYAN
+            + f"{len(rows)} chains in {(perf_counter() - start) * 1000:.1f} ms"
+        )
+
+
+def handle_list_chains(args):
+    _query_catalog(args)
+
+
+def handle_search_chains(args):
+    import sqlite3
+
+    try:
+        _query_catalog(args, text=args.query)
+    except sqlite3.OperationalError as e:
+        logger.error(Fore.RED + f"❌ Invalid search query '{args.query}': {e}")
+
+
+def handle_rescan_chains(args):
+    from lib.utils.chain_catalog import ChainCatalog, default_catalog_path
+
+    if not os.path.isdir(args.input):
+        logger.error(Fore.RED + f"❌ Directory not found: {args.input}")
+        return False
+    logger.info(Fore.CYAN + f"\n🗂️  Rescanning chains under {args.input}...")
+    start = perf_counter()
+    with ChainCatalog(args.catalog or default_catalog_path(args.input)) as catalog:
+        stats = catalog.rescan(args.input, full=args.full)
+        total = catalog.count()
+    logger.info(
+        Fore.GREEN
+        + f"✅ {stats['indexed']} indexed, {stats['unchanged']} unchanged, "
+        + f"{stats['removed']} removed in {perf_counter() - start:.2f}s "
+        + f"({total} chains cataloged)"
+    )
+
+
+def handle_reexport(args):
+    from lib.utils.reexport import FORMATS, ReexportJournal, find_chains, reexport
+
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        logger.error(Fore.RED + f"❌ Unknown formats: {', '.join(sorted(unknown))}")
+        return False
+    chains = find_chains(
+        args.input,
+        catalog=args.catalog,
+        key=args.key,
+        style=args.style,
+        mode=args.mode,
+        since=args.since,
+    )
+    if not chains:
+        logger.error(Fore.RED + "❌ No chains matched.")
+        return False
+    logger.info(
+        Fore.CYAN
+        + f"\n♻️  Re-exporting {', '.join(formats)} for {len(chains)} chain(s)..."
+    )
+
+    def progress(result):
+        for artifact in result["artifacts"]:
+            if artifact["status"] == "failed":
+                logger.error(
+                    Fore.RED + f"❌ {artifact['output']}: {artifact.get('error')}"
+                )
+        exported = sum(a["status"] == "exported" for a in result["artifacts"])
+        if exported:
+            logger.info(
+                Fore.GREEN
+                + f"✅ {result['chain']}: {exported}/{len(result['artifacts'])} exported"
+            )
+
+    try:
+        stats = reexport(
+            chains,
+            formats,
+            jobs=args.jobs,
+            journal=ReexportJournal(args.journal),
+            force=args.force,
+            progress=progress,
+        )
+    except KeyboardInterrupt:
+        logger.warning(
+            Fore.YELLOW + "⚠️  Interrupted. Run the same command again to resume."
+        )
+        return
+    logger.info(
+        (Fore.YELLOW if stats["failed"] else Fore.GREEN)
+        + f"📦 {stats['exported']} exported, {stats['skipped']} unchanged, "
+        + f"{stats['failed']} failed across {stats['chains']} chains in "
+        + f"{stats['seconds']:.1f}s ({stats['files_per_second']:.1f} files/s)"
+    )
+
+
+def handle_gc_blobs(args):
+    from lib.utils.blob_store import stores_under
+
+    stores = stores_under(args.input, catalog=args.catalog)
+    if not stores:
+        logger.warning(Fore.YELLOW + "⚠️  No blob stores found.")
+        return
+    verb = "Would remove" if args.dry_run else "Removed"
+    for store in stores:
+        logger.info(
+            Fore.CYAN + f"\n🧹 Collecting unreferenced blobs in {store.root}..."
+        )
+        stats = store.gc(min_age=args.min_age, dry_run=args.dry_run)
+        logger.info(
+            Fore.GREEN
+            + f"✅ {verb} {stats['removed']} of {stats['blobs']} blobs "
+            + f"({stats['freed_bytes'] / 1e6:.1f} MB)"
+        )
+
+
+def handle_score_cache(args):
+    from lib.utils.score_cache import default_cache
+
+    cache = default_cache()
+    if cache is None:
+        logger.warning(Fore.YELLOW + "⚠️  Score cache disabled (YANTRA_SCORE_CACHE).")
+        return
+    if args.clear:
+        removed = cache.clear()
+        logger.info(
+            Fore.GREEN + f"✅ Removed {removed} cached scores from {cache.root}"
+        )
+        return
+    if args.max_mb is not None:
+        removed = cache.evict(max_bytes=int(args.max_mb * 1024 * 1024))
+        logger.info(Fore.GREEN + f"✅ Evicted {removed} cached scores")
+
+    stats = cache.stats()
+    logger.info(Fore.CYAN + f"\n🗄️  Score cache {cache.root}")
+    logger.info(
+        Fore.YELLOW
+        + f"  {stats['entries']} scores, {stats['bytes'] / 1e6:.1f} of "
+        + f"{stats['max_bytes'] / 1e6:.0f} MB"
+    )
+    logger.info(
+        Fore.YELLOW
+        + f"  {stats['hits']} hits, {stats['misses']} misses "
+        + f"({stats['hit_rate']:.0%} hit rate), {stats['writes']} writes, "
+        + f"{stats['evictions']} evictions"
+    )
+
+
+def handle_diff_versions(args):
+    from lib.utils.chain_versions import diff_versions
+
+    changes = diff_versions(args.input, args.other)
+    if args.json:
+        print(json.dumps(changes, indent=2))
+        return
+    logger.info(
+        Fore.CYAN
+        + f"\n🔀 {os.path.basename(args.input)} → {os.path.basename(args.other)}: "
+        + f"{len(changes)} changed measures"
+    )
+    for change in changes:
+        logger.info(
+            Fore.YELLOW
+            + f"  {change['part']} m{change['measure']}: "
+            + f"{change['before']} → {change['after']}"
+        )
+
+
+def _inspect_archive_member(path, member, deep):
+    from lib.utils.chain_archive import ChainArchive
+
+    with ChainArchive(path) as archive:
+        member = member or archive.metadata.get("files", {}).get("musicxml")
+        if member not in archive.names():
+            return {"path": path, "error": f"No MusicXML member '{member}' in archive"}
+        data = archive.read(member)
+    try:
+        if deep:
+            from lib.utils.musicxml_utils import load_musicxml_data, score_summary
 
-    logger.info(Fore.CYAN + f"\n🔍 Inspecting MusicXML file: {args.input}...")
+            summary = dict(score_summary(load_musicxml_data(data)), parser="music21")
+        else:
+            from lib.utils.musicxml_scan import scan_musicxml
 
-    # load the MusicXML file
+            summary = dict(scan_musicxml(data), parser="stream")
+    except Exception as e:
+        return {"path": f"{path}:{member}", "error": f"{type(e).__name__}: {e}"}
+    return {"path": f"{path}:{member}", **summary}
+
+
+def handle_inspect_musicxml(args):
+    from lib.utils.chain_archive import is_chain_archive
+    from lib.utils.musicxml_scan import expand_inputs, inspect_files, print_summary
+
+    # Accept "chain.ygchain" or "chain.ygchain:member.musicxml"
+    path, _, member = args.input[0].partition(":")
+    if len(args.input) == 1 and is_chain_archive(path):
+        results = [_inspect_archive_member(path, member, args.deep)]
+    else:
+        paths = expand_inputs(args.input)
+        if not paths:
+            logger.error(Fore.RED + "❌ No MusicXML files matched.")
+            return False
+        if not args.json:
+            logger.info(Fore.CYAN + f"\n🔍 Inspecting {len(paths)} MusicXML file(s)...")
+        results = inspect_files(paths, deep=args.deep, jobs=args.jobs)
 
-    score = load_musicxml(args.input)
-    if not score:
-        logger.error(Fore.RED + "❌ Failed to load MusicXML file.")
+    if args.json:
+        print(json.dumps(results if len(results) > 1 else results[0], indent=2))
         return
-    logger.info(Fore.GREEN + "✅ Successfully loaded MusicXML file.")
-    print_score_summary(score)
+    for result in results:
+        if "error" in result:
+            logger.error(Fore.RED + f"❌ {result['path']}: {result['error']}")
+            continue
+        if len(results) > 1:
+            print(f"\n== {result['path']} ==")
+        print_summary(result)
+
+
+def handle_import_score(args):
+    from lib.utils.musicxml_scan import expand_inputs
+    from lib.utils.score_import import IMPORT_EXTENSIONS, import_files
+
+    paths = expand_inputs(args.input, IMPORT_EXTENSIONS)
+    if not paths:
+        logger.error(Fore.RED + "❌ No MusicXML or MIDI files matched.")
+        return False
+    logger.info(
+        Fore.CYAN + f"\n📥 Importing {len(paths)} file(s) into {args.output_dir}..."
+    )
+
+    def progress(result):
+        if "error" in result:
+            logger.error(Fore.RED + f"❌ {result['path']}: {result['error']}")
+        elif not args.json:
+            logger.info(
+                Fore.GREEN
+                + f"✅ {result['path']} → {result['output']} "
+                + f"({result['kind']}, {result['measures']} measures)"
+            )
+
+    start = perf_counter()
+    results = import_files(
+        paths, args.output_dir, kind=args.kind, jobs=args.jobs, progress=progress
+    )
+    elapsed = perf_counter() - start
+    if args.json:
+        print(json.dumps(results, indent=2))
+    failed = sum(1 for r in results if "error" in r)
+    logger.info(
+        (Fore.YELLOW if failed else Fore.GREEN)
+        + f"📦 {len(results) - failed} imported, {failed} failed in {elapsed:.1f}s "
+        + f"({len(results) / max(elapsed, 1e-9):.1f} files/s)"
+    )
 
 
 def handle_write_audio(args):
-    import os
-    import shutil
-
-    from colorama import Fore
-
-    # If args.output is a directory, copy input file there for playback
-    midi_path = args.input
-    output_playback_path = None
-    if hasattr(args, "output") and args.output and os.path.isdir(args.output):
-        # Place the MIDI file in the shared output directory under a canonical name
-        output_playback_path = os.path.join(args.output, os.path.basename(args.input))
-        if os.path.abspath(midi_path) != os.path.abspath(output_playback_path):
-            shutil.copy2(midi_path, output_playback_path)
-        midi_path = output_playback_path
-
-    logger.info(Fore.CYAN + f"\n🎧 Writing OGG file: {midi_path}")
-    if not os.path.exists(midi_path):
-        logger.error(Fore.RED + "❌ MIDI file not found.")
+    from lib.utils.audio_render import (
+        audio_suffix,
+        events_from_json,
+        read_midi_events,
+        render,
+        write_audio,
+    )
+    from lib.utils.music_utils import export_audio_from_midi
+    from lib.utils.score_slice import parse_slice, slice_suffix
+
+    if not os.path.exists(args.input):
+        logger.error(Fore.RED + f"❌ File not found: {args.input}")
+        return False
+    try:
+        measures, voices = parse_slice(
+            getattr(args, "measures", None), getattr(args, "voices", None)
+        )
+    except ValueError as e:
+        logger.error(Fore.RED + f"❌ {e}")
+        return False
+    sliced = measures is not None or voices is not None
+    suffix = f".{args.format}" if args.format else audio_suffix()
+    output = args.output or (
+        os.path.splitext(args.input)[0] + slice_suffix(measures, voices) + suffix
+    )
+    logger.info(Fore.CYAN + f"\n🎧 Rendering {args.input} → {output}")
+
+    if not args.input.endswith(".json"):
+        if sliced:
+            logger.error(
+                Fore.RED + "❌ --measures/--voices need a partimento or SATB JSON input"
+            )
+            return False
+        export_audio_from_midi(args.input, output, backend=args.backend)
         return
 
-    # Try Timidity first
+    # Chain JSON: synthesize the SATB or partimento note arrays directly
+    from lib.utils.chain_versions import load_chain_json
+
+    start = perf_counter()
     try:
-        subprocess.run(["timidity", midi_path], check=True)
+        events = events_from_json(
+            load_chain_json(args.input), measures=measures, voices=voices
+        )
+        samples = render(events)
+        write_audio(output, samples)
+    except ValueError as e:
+        logger.error(Fore.RED + f"❌ {e}")
+        return False
+    logger.info(
+        Fore.GREEN + f"✅ Audio saved to {output} in {perf_counter() - start:.2f}s"
+    )
+
+
+def handle_serve(args):
+    from cli.daemon import default_socket_path, request, serve
+
+    socket_path = args.socket or default_socket_path()
+    if args.status or args.stop:
+        reply = request("stop" if args.stop else "status", socket_path)
+        if reply is None:
+            logger.warning(Fore.YELLOW + f"⚠️  No daemon listening on {socket_path}")
+        elif args.stop:
+            logger.info(Fore.GREEN + f"🛑 Stopped daemon on {socket_path}")
+        else:
+            import time
+
+            uptime = time.time() - reply["started_at"]
+            logger.info(
+                Fore.GREEN
+                + f"🟢 Daemon pid {reply['pid']} on {reply['socket']}: "
+                + f"up {uptime:.0f}s, {reply['served']} served, "
+                + f"{reply['children']} running"
+            )
         return
-    except FileNotFoundError:
-        logger.warning(
+
+    logger.info(Fore.CYAN + f"\n🔥 Starting daemon on {socket_path}")
+    try:
+        serve(socket_path, warm_up=not args.no_warm)
+    except RuntimeError as e:
+        logger.error(Fore.RED + f"❌ {e}")
+    except KeyboardInterrupt:
+        pass
+
+
+# Commands the job queue accepts, by the kind of worker that runs them
+QUEUE_JOB_KINDS = {
+    "generate": {
+        "chain-realization",
+        "chain-partimento-only",
+        "generate-partimento",
+        "lead-sheet",
+    },
+    "realize": {
+        "realize-partimento",
+        "review-partimento",
+        "review-realization",
+        "revise-partimento",
+        "revise-realization",
+        "repair-realization",
+    },
+    "export": {"export-partimento", "export-realization", "export-audio"},
+}
+# Chain commands get a fixed --output at submit time so retries reuse the dir
+_PINNED_OUTPUT_COMMANDS = {"chain-realization", "chain-partimento-only"}
+
+
+def _queue_job_kind(command: str) -> str | None:
+    for kind, commands in QUEUE_JOB_KINDS.items():
+        if command in commands:
+            return kind
+    return None
+
+
+def _run_queued_command(job):
+    """Queue executor: run the job's CLI argv in its submit directory."""
+    from cli.handlers import load_handler
+    from cli.main import build_parser, drain_background
+
+    os.chdir(job.payload["cwd"])
+    try:
+        args = build_parser().parse_args(job.payload["argv"])
+    except SystemExit as e:
+        raise ValueError(f"Invalid arguments: {job.payload['argv']}") from e
+    if job.attempts > 1 and args.command in _PINNED_OUTPUT_COMMANDS:
+        _set_aside_partial_output(args.output, job.attempts - 1)
+    try:
+        result = load_handler(args.command, getattr(args, "handler_group", None))(args)
+    finally:
+        # The job is not done until its background audio renders are too
+        drain_background()
+    if result is False:
+        # The handler logged the reason; fail the attempt so it is retried
+        raise RuntimeError(f"{args.command} failed")
+    return {"output": getattr(args, "output", None)}
+
+
+def _set_aside_partial_output(output, attempt):
+    """
+    Rename what a failed attempt left in a pinned chain directory to
+    `<output>.attempt<N>`, so the retry starts from an empty directory
+    instead of adding a second run to the same manifest.
+    """
+    if not output or not os.path.isdir(output):
+        return
+    output = output.rstrip("/")
+    while os.path.exists(f"{output}.attempt{attempt}"):
+        attempt += 1
+    os.rename(output, f"{output}.attempt{attempt}")
+    logger.info(
+        Fore.YELLOW + f"↪️  Moved the failed attempt to {output}.attempt{attempt}"
+    )
+
+
+def _queue_worker_process(path, kinds, lease, drain):
+    import signal
+
+    from cli.main import drain_background
+    from lib.utils.job_queue import run_worker
+
+    stopping = []
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    stats = run_worker(
+        _run_queued_command,
+        path,
+        kinds=kinds,
+        lease=lease,
+        drain=drain,
+        should_stop=lambda: bool(stopping),
+    )
+    drain_background()
+    logger.info(
+        Fore.GREEN
+        + f"👷 Worker {os.getpid()} stopped: {stats['done']} done, "
+        + f"{stats['failed']} failed"
+    )
+
+
+def _queue_submit(args, queue):
+    from datetime import datetime
+    from uuid import uuid4
+
+    from cli.main import build_parser
+
+    argv = args.argv[1:] if args.argv[:1] == ["--"] else args.argv
+    kind = _queue_job_kind(argv[0]) if argv else None
+    if kind is None:
+        allowed = sorted(set().union(*QUEUE_JOB_KINDS.values()))
+        logger.error(Fore.RED + f"❌ Queueable commands: {', '.join(allowed)}")
+        return False
+    parsed = build_parser().parse_args(argv)  # reject bad arguments now
+    if argv[0] in _PINNED_OUTPUT_COMMANDS and not parsed.output:
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+        argv = argv + [
+            "--output",
+            f"generated/chains/partimento_{timestamp}_{uuid4().hex[:6]}",
+        ]
+    job_id = queue.submit(
+        kind,
+        {"argv": argv, "cwd": os.getcwd()},
+        priority=args.priority,
+        max_attempts=args.max_attempts,
+        retry_delay=args.retry_delay,
+    )
+    logger.info(Fore.GREEN + f"📥 Queued job {job_id} ({kind}): {' '.join(argv)}")
+
+
+def _queue_status(args, queue):
+    counts = queue.counts()
+    jobs = queue.jobs(state=args.state, limit=args.limit)
+    workers = queue.workers()
+    if args.json:
+        print(json.dumps({"counts": counts, "jobs": jobs, "workers": workers}))
+        return
+
+    logger.info(
+        Fore.CYAN
+        + "\n📊 Jobs: "
+        + ", ".join(f"{state} {n}" for state, n in counts.items())
+    )
+    for job in jobs:
+        color = {"dead": Fore.RED, "done": Fore.GREEN}.get(job["state"], Fore.YELLOW)
+        line = (
+            f"  #{job['id']} {job['state']:<7} {job['kind']:<8} "
+            f"p{job['priority']} try {job['attempts']}/{job['max_attempts']}  "
+            f"{' '.join(job['payload']['argv'])}"
+        )
+        if job["error"] and job["state"] != "done":
+            line += f"\n      {job['error'].splitlines()[0]}"
+        logger.info(color + line)
+
+    if workers:
+        logger.info(Fore.CYAN + "\n👷 Workers:")
+    for worker in workers:
+        logger.info(
             Fore.YELLOW
-            + "⚠️  Timidity not found. Falling back to system default player..."
+            + f"  {worker['id']} {worker['state']:<7} "
+            + f"{worker['jobs_done']} done, {worker['jobs_failed']} failed, "
+            + f"{worker['jobs_per_hour']:.1f} jobs/h, "
+            + f"{worker['utilization']:.0%} busy"
+            + (f", on #{worker['current_job']}" if worker["current_job"] else "")
         )
 
-    # Fallback: system-specific
-    if sys.platform.startswith("darwin"):
-        subprocess.run(["open", midi_path])
-    elif sys.platform.startswith("win"):
-        os.startfile(midi_path)
-    elif sys.platform.startswith("linux"):
-        subprocess.run(["xdg-open", midi_path])
-    else:
-        logger.error(Fore.RED + "❌ Unsupported OS for playback.")
+
+def _queue_workers(args, queue):
+    import multiprocessing
+
+    kinds = args.kinds.split(",") if args.kinds else None
+    unknown = set(kinds or []) - set(QUEUE_JOB_KINDS)
+    if unknown:
+        logger.error(Fore.RED + f"❌ Unknown job kinds: {', '.join(sorted(unknown))}")
+        return False
+    logger.info(
+        Fore.CYAN
+        + f"\n👷 Starting {args.processes} worker(s) on {queue.path}"
+        + (f" for {', '.join(kinds)}" if kinds else "")
+    )
+    processes = [
+        multiprocessing.Process(
+            target=_queue_worker_process,
+            args=(queue.path, kinds, args.lease, args.drain),
+        )
+        for _ in range(max(args.processes, 1))
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        logger.info(
+            Fore.YELLOW
+            + "⏳ Stopping workers after their current job (^C again to kill)"
+        )
+        for process in processes:
+            process.terminate()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.kill()
+
+
+def handle_queue(args):
+    from lib.utils.job_queue import JobQueue
+
+    actions = {
+        "submit": _queue_submit,
+        "status": _queue_status,
+        "workers": _queue_workers,
+        "retry": lambda args, queue: logger.info(
+            Fore.GREEN + f"🔁 Requeued {queue.retry(args.job)} dead job(s)"
+        ),
+    }
+    if args.queue_command not in actions:
+        logger.warning(Fore.YELLOW + "Usage: queue {submit,status,workers,retry}")
+        return
+    with JobQueue(args.queue) as queue:
+        actions[args.queue_command](args, queue)
+
+
+def _log_benchmark_comparison(rows, threshold) -> bool:
+    """Log a comparison; False if any benchmark regressed."""
+    regressions = [r for r in rows if r["status"] in ("slower", "more-memory")]
+    colors = {"slower": Fore.RED, "more-memory": Fore.RED, "faster": Fore.GREEN}
+    for row in rows:
+        color = colors.get(row["status"], Fore.YELLOW)
+        if "ratio" not in row:
+            logger.info(color + f"  {row['benchmark']}: {row['status']}")
+            continue
+        logger.info(
+            color
+            + f"  {row['benchmark']}: {row['baseline'] * 1000:.1f} → "
+            + f"{row['current'] * 1000:.1f} ms (×{row['ratio']:.2f}), peak "
+            + f"×{row['memory_ratio']:.2f}  {row['status']}"
+        )
+    if regressions:
+        logger.error(
+            Fore.RED
+            + f"❌ {len(regressions)} benchmark(s) regressed by more than "
+            + f"{threshold:.0%}"
+        )
+        return False
+    logger.info(Fore.GREEN + f"✅ No regressions beyond {threshold:.0%}")
+    return True
+
+
+def handle_benchmark(args):
+    from datetime import datetime
+
+    from lib.benchmarks.suite import (
+        compare_results,
+        load_results,
+        run_benchmarks,
+        save_results,
+    )
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    cases = [c.strip() for c in args.cases.split(",")] if args.cases else None
+    logger.info(Fore.CYAN + f"\n⏱️  Benchmarking at {sizes} measures...")
+
+    def progress(case, measures, result):
+        logger.info(
+            Fore.YELLOW
+            + f"  {case}[{measures}]: median {result['median'] * 1000:.1f} ms, "
+            + f"peak {result['peak_bytes'] / 1e6:.1f} MB"
+        )
+
+    try:
+        results = run_benchmarks(sizes, cases, args.repeat, args.seed, progress)
+    except ValueError as e:
+        logger.error(Fore.RED + f"❌ {e}")
+        return False
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+    output = args.output or f"generated/benchmarks/benchmark_{timestamp}.json"
+    save_results(results, output)
+    logger.info(Fore.GREEN + f"💾 Results saved to {output}")
+
+    if args.compare:
+        logger.info(Fore.CYAN + f"\n📊 Comparing with {args.compare}")
+        rows = compare_results(load_results(args.compare), results, args.threshold)
+        if not _log_benchmark_comparison(rows, args.threshold):
+            return False
+
+
+def handle_compare_benchmarks(args):
+    from lib.benchmarks.suite import compare_results, load_results
+
+    rows = compare_results(
+        load_results(args.baseline), load_results(args.current), args.threshold
+    )
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        if any(r["status"] in ("slower", "more-memory") for r in rows):
+            return False
+        return
+    logger.info(Fore.CYAN + f"\n📊 {args.current} vs {args.baseline}")
+    if not _log_benchmark_comparison(rows, args.threshold):
+        return False
+
+
+def _log_load_level(level):
+    chain = level["chain_latency"]
+    resources = level["resources"]
+    color = Fore.RED if level["failed"] else Fore.GREEN
+    logger.info(
+        color
+        + f"\n⚙️  concurrency {level['concurrency']}: "
+        + f"{level['completed']}/{level['chains']} chains in "
+        + f"{level['wall_seconds']:.1f}s, {level['throughput_per_minute']:.1f}/min"
+    )
+    if chain:
+        logger.info(
+            Fore.YELLOW
+            + f"  chain p50 {chain['p50']:.2f}s  p90 {chain['p90']:.2f}s  "
+            + f"p99 {chain['p99']:.2f}s  max {chain['max']:.2f}s"
+        )
+    if level["llm_calls"]:
+        logger.info(
+            Fore.YELLOW
+            + "  LLM calls: "
+            + ", ".join(f"{kind} {n}" for kind, n in level["llm_calls"].items())
+        )
+    for name, stats in level["stages"].items():
+        logger.info(
+            Fore.YELLOW
+            + f"  {name:<40} p50 {stats['p50'] * 1000:8.1f} ms  "
+            + f"p99 {stats['p99'] * 1000:8.1f} ms"
+        )
+    logger.info(
+        Fore.YELLOW
+        + f"  CPU {resources['cpu_seconds']:.1f}s "
+        + f"({resources['cpu_utilization']:.0%} of all cores), "
+        + f"max RSS {resources['max_child_rss_mb']:.0f} MB, "
+        + f"peak processes {resources['peak_processes']}, "
+        + f"{resources['files_written']} files / "
+        + f"{resources['bytes_written'] / 1e6:.1f} MB written"
+    )
+    for error in level["errors"]:
+        logger.error(Fore.RED + f"  ❌ {error}")
+
+
+def handle_load_test(args):
+    from datetime import datetime
+
+    from lib.benchmarks.loadtest import run_load_test
+
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    logger.info(
+        Fore.CYAN
+        + f"\n🚦 Load testing {', '.join(modes)} at concurrency {levels} "
+        + f"with {args.latency} LLM latency..."
+    )
+    try:
+        report = run_load_test(
+            levels,
+            chains=args.chains,
+            modes=modes,
+            root=args.root,
+            latency=args.latency,
+            measures=args.measures,
+            patch_rate=args.patch_rate,
+            always_review=args.always_review,
+            keep=args.keep,
+            seed=args.seed,
+            progress=_log_load_level,
+        )
+    except ValueError as e:
+        logger.error(Fore.RED + f"❌ {e}")
+        return False
+
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+    output = args.output or os.path.join(args.root, f"loadtest_{timestamp}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(Fore.GREEN + f"\n💾 Load test report saved to {output}")
 
 
 # === HANDLER MAP ===
@@ -98,6 +840,21 @@ def handle_write_audio(args):
 
 handler_map = {
     "describe-chain": handle_describe_chain,
+    "pack-chain": handle_pack_chain,
+    "unpack-chain": handle_unpack_chain,
+    "list-chains": handle_list_chains,
+    "search-chains": handle_search_chains,
+    "rescan-chains": handle_rescan_chains,
+    "gc-blobs": handle_gc_blobs,
+    "reexport": handle_reexport,
+    "score-cache": handle_score_cache,
+    "diff-versions": handle_diff_versions,
     "inspect-musicxml": handle_inspect_musicxml,
+    "import-score": handle_import_score,
     "export-audio": handle_write_audio,
+    "serve": handle_serve,
+    "queue": handle_queue,
+    "benchmark": handle_benchmark,
+    "compare-benchmarks": handle_compare_benchmarks,
+    "load-test": handle_load_test,
 }
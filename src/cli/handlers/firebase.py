@@ -1,16 +1,13 @@
 import json
 import logging
 import os
+from time import perf_counter
 
 from colorama import Fore
 
 logger = logging.getLogger(__name__)
 
-from lib.firebase_utils import (
-    fetch_all_realizations,
-    save_realization_metadata,
-    upload_file_to_storage,
-)
+from lib.firebase_utils import fetch_all_realizations, save_realization_metadata
 
 
 # === LIST REALIZATIONS HANDLER ===
@@ -25,33 +22,74 @@ def handle_list_realizations(args):
 
 
 def handle_push_chain(args):
+    from lib.firebase_utils import get_bucket
+    from lib.utils.chain_push import push_chains
+    from lib.utils.reexport import find_chains
+
+    chains = find_chains(args.input)
+    if not chains:
+        logger.error(Fore.RED + "❌ No chain folders with metadata.json found.")
+        return False
     logger.info(
-        Fore.CYAN + f"\n☁️ Uploading realization chain at {args.input} to Firebase..."
+        Fore.CYAN + f"\n☁️ Uploading {len(chains)} chain(s) to Firebase Storage..."
     )
 
-    metadata_path = os.path.join(args.input, "metadata.json")
-    if not os.path.exists(metadata_path):
-        logger.error(Fore.RED + "❌ metadata.json not found in specified directory.")
-        return
-
-    with open(metadata_path, "r") as f:
-        metadata = json.load(f)
-
-    musicxml_path = os.path.join(args.input, metadata["files"]["musicxml"])
-    if not os.path.exists(musicxml_path):
-        logger.error(Fore.RED + f"❌ MusicXML file not found at {musicxml_path}")
-        return
-
-    # Upload MusicXML file
-    logger.info(Fore.YELLOW + f"📤 Uploading MusicXML to Firebase Storage...")
-    remote_filename = os.path.basename(musicxml_path)
-    public_url = upload_file_to_storage(musicxml_path, remote_filename)
-    logger.info(Fore.GREEN + f"✅ Uploaded: {public_url}")
-
-    # Add public_url to metadata and push Firestore doc
-    metadata["exported_musicxml_url"] = public_url
-    doc_id = save_realization_metadata(metadata)
-    logger.info(Fore.GREEN + f"✅ Metadata saved to Firestore. Document ID: {doc_id}")
+    counts = {"uploaded": 0, "skipped": 0, "failed": 0}
+    start = perf_counter()
+
+    def finished(result):
+        files = result["files"]
+        for entry in files:
+            counts[entry["status"]] += 1
+        failed = [entry for entry in files if entry["status"] == "failed"]
+        name = os.path.basename(result["chain"])
+        if failed:
+            for entry in failed:
+                logger.error(Fore.RED + f"❌ {name}/{entry['name']}: {entry['error']}")
+            return
+
+        # Every file is in the bucket: record the chain in Firestore
+        with open(os.path.join(result["chain"], "metadata.json")) as f:
+            metadata = json.load(f)
+        urls = {entry["name"]: entry["url"] for entry in files}
+        musicxml = (metadata.get("files") or {}).get("musicxml")
+        if musicxml in urls:
+            metadata["exported_musicxml_url"] = urls[musicxml]
+        metadata["exported_urls"] = urls
+        try:
+            doc_id = save_realization_metadata(metadata, doc_id=name)
+        except Exception as e:
+            # Only this chain failed; the other chains' uploads carry on
+            counts["failed"] += 1
+            logger.error(Fore.RED + f"❌ {name}: Firestore update failed: {e}")
+            return
+        uploaded = sum(1 for entry in files if entry["status"] == "uploaded")
+        logger.info(
+            Fore.GREEN
+            + f"✅ {name}: {uploaded} uploaded, {len(files) - uploaded} unchanged "
+            + f"(document {doc_id})"
+        )
+
+    try:
+        push_chains(
+            chains, get_bucket(), jobs=args.jobs, force=args.force, progress=finished
+        )
+    except ValueError as e:
+        logger.error(Fore.RED + f"❌ {e}")
+        return False
+    except KeyboardInterrupt:
+        logger.warning(
+            Fore.YELLOW + "⚠️  Interrupted; run push-chain again to upload the rest."
+        )
+        return False
+    elapsed = perf_counter() - start
+    logger.info(
+        (Fore.YELLOW if counts["failed"] else Fore.GREEN)
+        + f"☁️ {counts['uploaded']} uploaded, {counts['skipped']} unchanged, "
+        + f"{counts['failed']} failed in {elapsed:.1f}s"
+    )
+    if counts["failed"]:
+        return False
 
 
 # === HANDLER MAP ===
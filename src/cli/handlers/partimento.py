@@ -1,3 +1,4 @@
+import copy
 import json
 import logging
 import subprocess
@@ -17,9 +18,23 @@ from genres.partimento.tasks.export import (
     export_realized_partimento_to_midi,
     export_realized_partimento_to_musicxml,
 )
+from genres.partimento.tasks.patch_export import patch_musicxml
 from genres.partimento.tasks.realize import realize_partimento_satb
+from genres.partimento.tasks.realize_local import realize_partimento_local
 from genres.partimento.tasks.review import review_partimento, review_realized_score
-from lib.analysis.linting import lint_satb
+from lib.analysis.corpus import (
+    CorpusSummary,
+    ReportWriter,
+    discover_realizations,
+    lint_corpus,
+)
+from lib.analysis.linting import lint_satb, select_rules
+from lib.analysis.partimento_linting import lint_partimento
+from lib.analysis.repair import repair_satb
+from lib.analysis.rules import RULES
+from lib.utils.audio_queue import render_audio
+from lib.utils.audio_render import audio_suffix
+from lib.utils.blob_store import export_cached
 from lib.utils.chain_utils import (
     build_meta,
     get_next_versioned_filename,
@@ -30,10 +45,11 @@ from lib.utils.chain_utils import (
     write_chain_json,
     write_metadata,
 )
+from lib.utils.chain_versions import load_chain_json, write_chain_revision
 from lib.utils.json_utils import apply_patch
 from lib.utils.llm_utils import call_llm
-from lib.utils.music_utils import export_ogg_from_midi
 from lib.utils.playback_utils import open_file_if_possible
+from lib.utils.score_slice import parse_slice, slice_suffix
 
 logging.basicConfig(
     level=logging.INFO,
@@ -46,8 +62,73 @@ logger = logging.getLogger(__name__)
 # ============== Partimento Handlers ==============
 
 
+def _split_rules(value: str | None) -> list[str] | None:
+    """Split a comma-separated --rules/--skip-rules value."""
+    if not value:
+        return None
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def _lint_partimento_before_review(data: dict) -> dict:
+    """Run the local partimento checker and log its result."""
+    report = lint_partimento(data)
+    log_step("\n🧹 Partimento linter result:")
+    _log_lint_report(report)
+    return report
+
+
+def _log_lint_report(lint_report: dict, show_stats: bool = False) -> None:
+    if lint_report["issues"]:
+        logger.warning(
+            Fore.RED
+            + f"❌ {len(lint_report['issues'])} issues found:"
+            + Style.RESET_ALL
+        )
+        for issue in lint_report["issues"]:
+            logger.warning(Fore.RED + f"  - {issue}" + Style.RESET_ALL)
+    else:
+        logger.info(Fore.GREEN + "✅ No issues detected." + Style.RESET_ALL)
+
+    if show_stats:
+        stats = lint_report["stats"]
+        log_step(
+            f"\n⏱️  {stats['measures']} measures linted in "
+            f"{stats['seconds'] * 1000:.2f} ms",
+            color=Fore.YELLOW,
+        )
+        for name, rule_stats in stats["rules"].items():
+            logger.info(
+                Fore.YELLOW
+                + f"  {name:<22} {rule_stats['scope']:<10} "
+                + f"calls={rule_stats['calls']:<6} hits={rule_stats['hits']:<4} "
+                + f"{rule_stats['seconds'] * 1000:.3f} ms"
+                + Style.RESET_ALL
+            )
+
+
+def _report_audio(future, audio_path, wait: bool = False) -> bool:
+    """
+    Log a queued render's state for the chain summary, waiting for it only
+    if wait (playback needs the file). True if the audio file was written.
+    """
+    if not wait and not future.done():
+        # Finished by drain_background and recorded under "audio" in metadata
+        logger.info(f"🎧 Audio rendering in the background: {audio_path}")
+        return False
+    result = future.result()
+    if result["status"] != "done":
+        logger.warning(
+            Fore.YELLOW
+            + f"⚠️  Audio render failed: {result['audio']}"
+            + Style.RESET_ALL
+        )
+        return False
+    logger.info(f"🎧 Audio preview: {audio_path}")
+    return True
+
+
 def handle_chain_partimento_only(args: Namespace) -> None:
-    """Run the classic partimento chain: generate, review (with optional patching), export (MusicXML, MIDI, OGG), and save all results to a chain directory."""
+    """Run the classic partimento chain: generate, review (with optional patching), export (MusicXML, MIDI, audio), and save all results to a chain directory."""
     log_step(f"\n🎼 Generating and reviewing partimento...")
 
     # Create a unified output directory
@@ -61,7 +142,7 @@ def handle_chain_partimento_only(args: Namespace) -> None:
 
     # Step 1: Generate partimento
     partimento_data = generate_partimento.generate_partimento(args.prompt, call_llm)
-    base_json_path = chain_dir / "partimento_01.json"
+    base_json_path = get_next_versioned_filename(str(chain_dir), "partimento")
     write_chain_json(
         partimento_data,
         base_json_path,
@@ -71,14 +152,29 @@ def handle_chain_partimento_only(args: Namespace) -> None:
     )
     log_step(f"\n💾 Partimento saved to {base_json_path}", color=Fore.YELLOW)
 
+    # MusicXML is kept current through the review loop: exported in full
+    # once, then patched measure by measure after each revision
+    xml_path = chain_dir / "partimento.musicxml"
+    export_cached(export_partimento_to_musicxml, base_json_path, str(xml_path))
+
     # Step 2: Review partimento with iteration support, storing each version
     iterations = getattr(args, "iterations", 1)
     current_json_path = base_json_path
+    current_data = partimento_data
     partimento_versions = [Path(base_json_path).name]
     review_versions = []
     for i in range(iterations):
+        partimento_lint = _lint_partimento_before_review(current_data)
+        if not partimento_lint["issues"] and not getattr(args, "always_review", False):
+            log_step(
+                "🔍 Linter clean; skipping LLM partimento review.", color=Fore.GREEN
+            )
+            break
+
         log_step(f"\n🔍 Reviewing partimento (pass {i+1})...")
-        review_json = review_partimento(current_json_path, call_llm)
+        review_json = review_partimento(
+            current_json_path, call_llm, lint_issues=partimento_lint["issues"]
+        )
         review_data = json.loads(review_json)
 
         # Use helper for review file name
@@ -107,33 +203,34 @@ def handle_chain_partimento_only(args: Namespace) -> None:
             break
 
         # Load current version and apply patch
-        with open(current_json_path, "r") as f:
-            working_data = json.load(f)
+        working_data = load_chain_json(current_json_path)
         updated = apply_patch(working_data["data"], patch)
 
-        # Write updated file with versioned filename
+        # Write updated file with versioned filename, stored as a delta
         new_json_path = get_next_versioned_filename(str(chain_dir), "partimento")
-        working_data["data"] = updated
-        write_chain_json(
-            working_data["data"],
+        write_chain_revision(
+            updated,
+            patch,
             new_json_path,
             mode="patched-partimento",
             source_path=current_json_path,
             prompt=args.prompt,
         )
         log_step(f"\n✅ Patch applied and saved to {new_json_path}", color=Fore.YELLOW)
+        patch_musicxml("partimento", str(xml_path), new_json_path, patch, str(xml_path))
         current_json_path = new_json_path
+        current_data = updated
         partimento_versions.append(Path(new_json_path).name)
 
-    # Step 3: Export to MusicXML (use last version)
-    log_step(f"\n🎼 Exporting final partimento to MusicXML...")
-    xml_path = chain_dir / "partimento.musicxml"
-    export_partimento_to_musicxml(current_json_path, str(xml_path))
+    # Step 3: MusicXML already matches the last version
     log_step(f"\n✅ MusicXML saved to {xml_path}", color=Fore.YELLOW)
     # Export to MIDI
     midi_path = chain_dir / "partimento.mid"
-    export_partimento_to_midi(current_json_path, str(midi_path))
+    export_cached(export_partimento_to_midi, current_json_path, str(midi_path))
     log_step(f"🎧 MIDI saved to {midi_path}", color=Fore.YELLOW)
+    ogg_path = midi_path.with_suffix(audio_suffix())
+    log_step(f"\n🎧 Rendering audio in the background: {ogg_path}")
+    audio = render_audio(str(midi_path), str(ogg_path))
 
     # Write metadata
     files_dict = {
@@ -155,19 +252,14 @@ def handle_chain_partimento_only(args: Namespace) -> None:
     )
     log_step(f"\n📦 Metadata saved to {chain_dir / 'metadata.json'}", color=Fore.GREEN)
 
-    ogg_path = midi_path.with_suffix(".ogg")
-
     logger.info("\n📊 Summary:")
     logger.info(f"📄 Chain ID: {chain_dir.name}")
     logger.info(f"📁 Output dir: {chain_dir}")
     logger.info(f"🎼 Prompt style: {args.prompt}")
-    logger.info(f"🎧 Audio preview: {ogg_path}")
+    _report_audio(audio, ogg_path)
     logger.info(f"📝 Iterations: {args.iterations}")
     logger.info(f"\n🔗 Complete. Data is stored in {chain_dir}")
 
-    log_step(f"\n🎧 Writing OGG file: {ogg_path}")
-    export_ogg_from_midi(str(midi_path), str(ogg_path))
-
 
 def handle_chain_partimento_realization(args: Namespace) -> None:
     """Run the full realization chain: generate partimento, review/patch, realize SATB, review/patch realization, export, and write all artifacts to a chain directory."""
@@ -175,6 +267,15 @@ def handle_chain_partimento_realization(args: Namespace) -> None:
         "\n🔗 Generating → Reviewing → Realizing → Reviewing → Exporting partimento..."
     )
 
+    # Validate lint rule selection before spending any LLM calls
+    lint_rules = _split_rules(getattr(args, "rules", None))
+    lint_skip_rules = _split_rules(getattr(args, "skip_rules", None))
+    try:
+        select_rules(lint_rules, lint_skip_rules)
+    except ValueError as e:
+        logger.error(Fore.RED + f"❌ {e}" + Style.RESET_ALL)
+        return False
+
     # Step 1: Setup output directory
     log_step("\n🔗 1. Generating Partimento...")
     timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
@@ -204,8 +305,17 @@ def handle_chain_partimento_realization(args: Namespace) -> None:
     current_partimento_data = partimento_data
     partimento_patch = None
     for i in range(args.iterations):
+        partimento_lint = _lint_partimento_before_review(current_partimento_data)
+        if not partimento_lint["issues"] and not getattr(args, "always_review", False):
+            log_step(
+                "🔍 Linter clean; skipping LLM partimento review.", color=Fore.GREEN
+            )
+            break
+
         log_step(f"\n🔍 Reviewing partimento (pass {i+1})...")
-        review_json = review_partimento(current_partimento_path, call_llm)
+        review_json = review_partimento(
+            current_partimento_path, call_llm, lint_issues=partimento_lint["issues"]
+        )
         review_data = json.loads(review_json)
         review_json_path = get_next_versioned_filename(
             str(chain_dir), "review_partimento"
@@ -232,14 +342,14 @@ def handle_chain_partimento_realization(args: Namespace) -> None:
             break
 
         # Load and apply patch
-        with open(current_partimento_path, "r") as f:
-            current_data = json.load(f)
+        current_data = load_chain_json(current_partimento_path)
         patched = apply_patch(current_data["data"], partimento_patch)
 
-        # Write patched version (use versioned filename)
+        # Write patched version (use versioned filename), stored as a delta
         patched_json_path = get_next_versioned_filename(str(chain_dir), "partimento")
-        write_chain_json(
+        write_chain_revision(
             patched,
+            partimento_patch,
             patched_json_path,
             mode="patched-partimento",
             source_path=current_partimento_path,
@@ -257,20 +367,48 @@ def handle_chain_partimento_realization(args: Namespace) -> None:
     json_path = current_partimento_path
     partimento_data = current_partimento_data
 
-    # Export partimento to MIDI (for OGG export)
+    # Export partimento to MIDI (for audio export)
     midi_path = chain_dir / "partimento.mid"
     log_step(f"\n🎼 Exporting partimento MIDI to {midi_path} ...")
-    export_partimento_to_midi(current_partimento_path, str(midi_path))
+    export_cached(export_partimento_to_midi, current_partimento_path, str(midi_path))
     log_step(f"🎧 Partimento MIDI saved to {midi_path}", color=Fore.YELLOW)
 
-    # Export OGG for partimento
-    ogg_path = midi_path.with_suffix(".ogg")
-    log_step(f"🎧 Exporting OGG audio for partimento: {ogg_path}")
-    export_ogg_from_midi(str(midi_path), str(ogg_path))
+    # Export audio for partimento
+    ogg_path = midi_path.with_suffix(audio_suffix())
+    log_step(f"🎧 Queued audio for partimento: {ogg_path}")
+    render_audio(str(midi_path), str(ogg_path))
 
     # Step 4: Realize partimento (SATB)
     log_step(f"\n🔗 3. Realizing partimento...")
-    realization = realize_partimento_satb(partimento_data, call_llm)
+    if getattr(args, "engine", "llm") == "local":
+        try:
+            realization = realize_partimento_local(partimento_data)
+        except ValueError as e:
+            logger.error(Fore.RED + f"❌ {e}" + Style.RESET_ALL)
+            # Keep what the paid-for generate and review passes produced
+            write_metadata(
+                chain_dir,
+                {
+                    "id": str(uuid.uuid4()),
+                    "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+                    "mode": "chain-partimento",
+                    "prompt": args.prompt,
+                    "files": {
+                        "partimento_versions": partimento_versions,
+                        "review_partimento_versions": review_partimento_versions,
+                        "midi": Path(midi_path).name,
+                    },
+                    "patched": {
+                        "partimento": bool(partimento_patch),
+                        "realized": False,
+                    },
+                    "error": f"realization failed: {e}",
+                    "version": "0.1.0",
+                },
+            )
+            return False
+    else:
+        realization = realize_partimento_satb(partimento_data, call_llm)
     realized_path = get_next_versioned_filename(chain_dir, "realized")
     write_chain_json(
         realization,
@@ -281,45 +419,87 @@ def handle_chain_partimento_realization(args: Namespace) -> None:
     )
     log_step(f"\n🎶 Realization saved to {realized_path}", color=Fore.YELLOW)
 
+    # Repair and review passes patch this file rather than re-exporting it
+    xml_path = chain_dir / "realized.musicxml"
+    export_cached(export_realized_partimento_to_musicxml, realized_path, str(xml_path))
+
     # --- LINT SATB ---------------------------------------------------------
-    lint_report = lint_satb(realization)
+    lint_report = lint_satb(
+        realization,
+        rules=lint_rules,
+        skip_rules=lint_skip_rules,
+        key=partimento_data.get("key"),
+    )
     log_step("\n🧹 Voice‑leading linter result:")
-    if lint_report["issues"]:
-        logger.warning(
-            Fore.RED
-            + f"❌ {len(lint_report['issues'])} issues found:"
-            + Style.RESET_ALL
-        )
-        for issue in lint_report["issues"]:
-            logger.warning(Fore.RED + f"  - {issue}" + Style.RESET_ALL)
-    else:
-        logger.info(
-            Fore.GREEN + "✅ No voice-leading issues detected." + Style.RESET_ALL
+    _log_lint_report(lint_report)
+
+    realization_versions = []
+    last_realized_path = realized_path
+
+    # Try the local repair pass before spending LLM review calls
+    if lint_report["issues"] and not getattr(args, "no_repair", False):
+        log_step("\n🔧 Repairing voice-leading issues locally...")
+        repair = repair_satb(
+            realization,
+            lint_report=lint_report,
+            key=partimento_data.get("key"),
+            rules=lint_rules,
+            skip_rules=lint_skip_rules,
         )
+        if repair["suggested_patch"]:
+            repaired = apply_patch(
+                copy.deepcopy(realization), repair["suggested_patch"]
+            )
+            repaired_path = get_next_versioned_filename(str(chain_dir), "realized")
+            write_chain_revision(
+                repaired,
+                repair["suggested_patch"],
+                repaired_path,
+                mode="repair-realization",
+                source_path=realized_path,
+                prompt=args.prompt,
+            )
+            log_step(
+                f"✅ Repaired {len(repair['issues_before']) - len(repair['issues_after'])}"
+                f" issues in {repair['seconds'] * 1000:.1f} ms: "
+                f"{Path(repaired_path).name}",
+                color=Fore.YELLOW,
+            )
+            patch_musicxml(
+                "realized",
+                str(xml_path),
+                repaired_path,
+                repair["suggested_patch"],
+                str(xml_path),
+            )
+            realization_versions.append(Path(repaired_path).name)
+            last_realized_path = repaired_path
+            lint_report = lint_satb(
+                repaired,
+                rules=lint_rules,
+                skip_rules=lint_skip_rules,
+                key=partimento_data.get("key"),
+            )
+            _log_lint_report(lint_report)
+        else:
+            log_step("No local repair found.", color=Fore.YELLOW)
 
     # Step 5: Review realization if linter found issues, else skip
-    if not lint_report["issues"]:
+    if not lint_report["issues"] and not getattr(args, "always_review", False):
         log_step(
             "🔍 Linter clean; skipping LLM realization review passes.", color=Fore.GREEN
         )
-        realization_versions = []
         review_realization_versions = []
-        last_realized_path = realized_path
         realization_patch = None
     else:
         # === Multiple review loops for realization ===
-        realization_versions = []
         review_realization_versions = []
-        last_realized_path = realized_path
         realization_patch = None
         for i in range(args.iterations):
             input_path = last_realized_path
             review_json_path = get_next_versioned_filename(
                 str(chain_dir), "review_realization"
             )
-            realized_version_path = get_next_versioned_filename(
-                str(chain_dir), "realized"
-            )
 
             # Review
             log_step(f"\n🔍 Reviewing realization (pass {i+1})...")
@@ -349,11 +529,14 @@ def handle_chain_partimento_realization(args: Namespace) -> None:
                 break
 
             # Patch realization
-            with open(input_path, "r") as f:
-                current_data = json.load(f)["data"]
+            current_data = load_chain_json(input_path)["data"]
             updated = apply_patch(current_data, realization_patch)
-            write_chain_json(
+            realized_version_path = get_next_versioned_filename(
+                str(chain_dir), "realized"
+            )
+            write_chain_revision(
                 updated,
+                realization_patch,
                 realized_version_path,
                 mode=f"realize-partimento-pass-{i+1}",
                 source_path=input_path,
@@ -363,30 +546,37 @@ def handle_chain_partimento_realization(args: Namespace) -> None:
                 f"✅ Patch applied: {Path(realized_version_path).name}",
                 color=Fore.YELLOW,
             )
+            patch_musicxml(
+                "realized",
+                str(xml_path),
+                realized_version_path,
+                realization_patch,
+                str(xml_path),
+            )
             realization_versions.append(Path(realized_version_path).name)
             last_realized_path = realized_version_path
 
-            # Export MIDI and OGG for this realization version
+            # Export MIDI and audio for this realization version
             midi_version_path = Path(realized_version_path).with_suffix(".mid")
-            export_realized_partimento_to_midi(
-                realized_version_path, str(midi_version_path)
+            export_cached(
+                export_realized_partimento_to_midi,
+                realized_version_path,
+                str(midi_version_path),
             )
-            ogg_version_path = Path(realized_version_path).with_suffix(".ogg")
-            log_step(f"🎧 Exporting OGG audio for realization: {ogg_version_path}")
-            export_ogg_from_midi(str(midi_version_path), str(ogg_version_path))
+            ogg_version_path = Path(realized_version_path).with_suffix(audio_suffix())
+            log_step(f"🎧 Queued audio for realization: {ogg_version_path}")
+            render_audio(str(midi_version_path), str(ogg_version_path))
 
-    # Step 6: Export final realization to MusicXML and MIDI/OGG
+    # Step 6: Export final realization to MIDI/audio (MusicXML is current)
     final_realized = last_realized_path
-    xml_path = chain_dir / "realized.musicxml"
     midi_path = chain_dir / "realized.mid"
     log_step(f"\n🔗 5. Exporting realization to MusicXML and MIDI...")
-    export_realized_partimento_to_musicxml(final_realized, str(xml_path))
     log_step(f"🎼 MusicXML saved to {xml_path}", color=Fore.YELLOW)
-    export_realized_partimento_to_midi(final_realized, str(midi_path))
+    export_cached(export_realized_partimento_to_midi, final_realized, str(midi_path))
     log_step(f"🎧 MIDI saved to {midi_path}", color=Fore.YELLOW)
-    ogg_path = midi_path.with_suffix(".ogg")
-    log_step(f"🎧 Exporting OGG audio for realization: {ogg_path}")
-    export_ogg_from_midi(str(midi_path), str(ogg_path))
+    ogg_path = midi_path.with_suffix(audio_suffix())
+    log_step(f"🎧 Queued audio for realization: {ogg_path}")
+    final_audio = render_audio(str(midi_path), str(ogg_path))
 
     log_step(
         "\n✅ Partimento generation, realization, review, and export completed successfully!",
@@ -433,31 +623,34 @@ def handle_chain_partimento_realization(args: Namespace) -> None:
     log_step(f"\n📦 Metadata saved to {chain_dir / 'metadata.json'}", color=Fore.GREEN)
 
     # Final summary
-    log_step(f"\n🎧 Writing OGG file: {midi_path.with_suffix('.ogg')}")
     if not midi_path.exists():
         logger.error(Fore.RED + "❌  MIDI file not found." + Style.RESET_ALL)
-        return
+        return False
+    playing = not getattr(args, "no_play", False)
 
     logger.info("\n📊 Summary:")
     logger.info(f"📄 Chain ID: {chain_dir.name}")
     logger.info(f"📁 Output dir: {chain_dir}")
     logger.info(f"🎼 Prompt style: {args.prompt}")
-    logger.info(f"🎧 Audio preview: {ogg_path}")
+    audio_ready = _report_audio(final_audio, ogg_path, wait=playing)
     logger.info(f"📝 Iterations: {args.iterations}")
     logger.info(f"\n🔗 Complete. Data is stored in {chain_dir}")
     logger.info(f"🎶 Ready for realization: {Path(json_path).name}")
 
+    if not playing:
+        return
+
     # Try Timidity for playback
     try:
         subprocess.run(["timidity", str(midi_path)], check=True)
-        open_file_if_possible(ogg_path)
-        return
     except FileNotFoundError:
         logger.warning(
             Fore.YELLOW
             + "⚠️  Timidity not found. Falling back to system default player..."
             + Style.RESET_ALL
         )
+    if audio_ready:
+        open_file_if_possible(ogg_path)
 
 
 def handle_generate_partimento(args: Namespace) -> None:
@@ -478,9 +671,9 @@ def handle_generate_partimento(args: Namespace) -> None:
     log_step(f"\n💾 JSON saved to {out.json}", color=Fore.YELLOW)
 
     # -- exports -----------------------------------------------------------
-    export_partimento_to_musicxml(out.json, out.xml)
-    export_partimento_to_midi(out.json, out.midi)
-    export_ogg_from_midi(out.midi, out.ogg)
+    export_cached(export_partimento_to_musicxml, out.json, out.xml)
+    export_cached(export_partimento_to_midi, out.json, out.midi)
+    render_audio(out.midi, out.ogg)
 
     # -- metadata ----------------------------------------------------------
     if out.is_chain:
@@ -509,7 +702,14 @@ def handle_generate_partimento(args: Namespace) -> None:
 def handle_realize_partimento(args: Namespace) -> None:
     """Realize a partimento as SATB, save to a versioned chain file or flat file, and update metadata."""
     log_step(f"\n🎼 Realizing partimento from {args.input}...")
-    realized_data = realize.realize_partimento_satb(args.input, call_llm)
+    if getattr(args, "engine", "llm") == "local":
+        try:
+            realized_data = realize_partimento_local(load_chain_json(args.input))
+        except ValueError as e:
+            logger.error(Fore.RED + f"❌ {e}" + Style.RESET_ALL)
+            return False
+    else:
+        realized_data = realize.realize_partimento_satb(args.input, call_llm)
     log_step("\n✅ Realized partimento:", color=Fore.GREEN)
     logger.info(json.dumps(realized_data, indent=2))
 
@@ -554,8 +754,7 @@ def handle_realize_partimento(args: Namespace) -> None:
         partimento_chain_path = chain_dir / "partimento_01.json"
         if not partimento_chain_path.exists():
             if Path(args.input).exists():
-                with open(args.input, "r") as f:
-                    part_data = json.load(f)
+                part_data = load_chain_json(args.input)
                 # If input is a chain-wrapped file, extract "data" if present
                 data_to_write = part_data.get("data", part_data)
                 write_chain_json(
@@ -580,57 +779,107 @@ def handle_realize_partimento(args: Namespace) -> None:
         write_metadata(chain_dir, meta)
 
 
+def _parse_slice(args: Namespace) -> tuple | None:
+    """(measures, voices) from --measures/--voices, or None after logging a bad value."""
+    try:
+        return parse_slice(
+            getattr(args, "measures", None), getattr(args, "voices", None)
+        )
+    except ValueError as e:
+        logger.error(Fore.RED + f"❌ {e}" + Style.RESET_ALL)
+        return None
+
+
+def _export_slice(export_fn, input_path, output_path, score_slice) -> bool:
+    """
+    Export the whole score through the blob store, or only a slice of it
+    straight from the JSON (slices are quick to build and not cached).
+    """
+    measures, voices = score_slice
+    if measures is None and voices is None:
+        export_cached(export_fn, input_path, str(output_path))
+        return True
+    try:
+        export_fn(str(input_path), str(output_path), measures=measures, voices=voices)
+    except ValueError as e:
+        logger.error(Fore.RED + f"❌ {e}" + Style.RESET_ALL)
+        return False
+    return True
+
+
 def handle_export_partimento(args: Namespace) -> None:
-    """Export a partimento JSON file to MusicXML, MIDI, and OGG. Chain-aware if given a directory."""
+    """Export a partimento JSON file to MusicXML, MIDI, and audio. Chain-aware if given a directory."""
     logger.info(f"\n🎼 Exporting partimento JSON from {args.input}...")
+    score_slice = _parse_slice(args)
+    if score_slice is None:
+        return False
+    tag = slice_suffix(*score_slice)
 
     if args.output and not Path(args.output).suffix:
         Path(args.output).mkdir(parents=True, exist_ok=True)
-        musicxml_path = Path(args.output) / "partimento.musicxml"
-        midi_path = Path(args.output) / "partimento.mid"
+        musicxml_path = Path(args.output) / f"partimento{tag}.musicxml"
+        midi_path = Path(args.output) / f"partimento{tag}.mid"
     else:
         base = args.output or args.input
         stem = Path(base).with_suffix("")
         musicxml_path = stem.with_suffix(".musicxml")
         midi_path = stem.with_suffix(".mid")
+        if tag and not args.output:
+            musicxml_path = stem.with_name(f"{stem.name}{tag}.musicxml")
+            midi_path = stem.with_name(f"{stem.name}{tag}.mid")
 
     logger.info(f"  ➤ Exporting MusicXML to {musicxml_path} ...")
-    export_partimento_to_musicxml(args.input, str(musicxml_path))
+    if not _export_slice(
+        export_partimento_to_musicxml, args.input, musicxml_path, score_slice
+    ):
+        return False
     logger.info(f"🎼 MusicXML saved to {musicxml_path}")
     logger.info(f"  ➤ Exporting MIDI to {midi_path} ...")
-    export_partimento_to_midi(args.input, str(midi_path))
+    _export_slice(export_partimento_to_midi, args.input, midi_path, score_slice)
     logger.info(f"🎧 MIDI saved to {midi_path}")
 
-    # Export OGG audio
-    ogg_path = Path(midi_path).with_suffix(".ogg")
-    log_step(f"  ➤ Converting MIDI to OGG: {ogg_path}")
-    export_ogg_from_midi(str(midi_path), str(ogg_path))
+    # Export audio
+    ogg_path = Path(midi_path).with_suffix(audio_suffix())
+    log_step(f"  ➤ Queued MIDI to audio render: {ogg_path}")
+    render_audio(str(midi_path), str(ogg_path))
 
 
 def handle_export_realization(args: Namespace) -> None:
-    """Export a realized SATB JSON file to MusicXML, MIDI, and OGG. Chain-aware if given a directory."""
+    """Export a realized SATB JSON file to MusicXML, MIDI, and audio. Chain-aware if given a directory."""
     log_step(f"\n🎼 Exporting realized partimento JSON from {args.input}...")
+    score_slice = _parse_slice(args)
+    if score_slice is None:
+        return False
+    tag = slice_suffix(*score_slice)
 
     if args.output and is_likely_directory(args.output):
         Path(args.output).mkdir(parents=True, exist_ok=True)
-        musicxml_path = Path(args.output) / "realized.musicxml"
-        midi_path = Path(args.output) / "realized.mid"
+        musicxml_path = Path(args.output) / f"realized{tag}.musicxml"
+        midi_path = Path(args.output) / f"realized{tag}.mid"
     else:
         base = args.output or args.input
         stem = Path(base).with_suffix("")
         musicxml_path = stem.with_suffix(".musicxml")
         midi_path = stem.with_suffix(".mid")
+        if tag and not args.output:
+            musicxml_path = stem.with_name(f"{stem.name}{tag}.musicxml")
+            midi_path = stem.with_name(f"{stem.name}{tag}.mid")
 
     log_step(f"  ➤ Exporting MusicXML to {musicxml_path} ...")
-    export_realized_partimento_to_musicxml(args.input, str(musicxml_path))
+    if not _export_slice(
+        export_realized_partimento_to_musicxml, args.input, musicxml_path, score_slice
+    ):
+        return False
     log_step(f"🎼 MusicXML saved to {musicxml_path}", color=Fore.YELLOW)
     log_step(f"  ➤ Exporting MIDI to {midi_path} ...")
-    export_realized_partimento_to_midi(args.input, str(midi_path))
+    _export_slice(
+        export_realized_partimento_to_midi, args.input, midi_path, score_slice
+    )
     log_step(f"🎧 MIDI saved to {midi_path}", color=Fore.YELLOW)
-    # Export OGG audio
-    ogg_path = Path(midi_path).with_suffix(".ogg")
-    log_step(f"  ➤ Converting MIDI to OGG: {ogg_path}")
-    export_ogg_from_midi(str(midi_path), str(ogg_path))
+    # Export audio
+    ogg_path = Path(midi_path).with_suffix(audio_suffix())
+    log_step(f"  ➤ Queued MIDI to audio render: {ogg_path}")
+    render_audio(str(midi_path), str(ogg_path))
 
 
 # === REVIEW AND REVISE ===
@@ -691,6 +940,176 @@ def handle_review_realization(args: Namespace) -> None:
         write_metadata(chain_dir, meta)
 
 
+def handle_lint_realization(args: Namespace) -> None:
+    """Run the rule-based voice-leading linter on a realized SATB JSON file."""
+    if args.list_rules:
+        log_step("\n🧹 Available lint rules:")
+        for rule in RULES.values():
+            default = "default" if rule.default else ""
+            logger.info(
+                Fore.YELLOW
+                + f"  {rule.name:<22} {rule.scope:<10} {default:<8} {rule.description}"
+            )
+        logger.info("Run every rule with --rules full.")
+        return
+
+    if not args.input:
+        logger.error(Fore.RED + "❌ An input realization JSON file is required.")
+        return False
+
+    log_step(f"\n🧹 Linting realization from {args.input}...")
+    realization = load_chain_json(args.input)
+
+    try:
+        lint_report = lint_satb(
+            realization,
+            rules=_split_rules(args.rules),
+            skip_rules=_split_rules(args.skip_rules),
+            key=args.key,
+        )
+    except ValueError as e:
+        logger.error(Fore.RED + f"❌ {e}" + Style.RESET_ALL)
+        return False
+    _log_lint_report(lint_report, show_stats=args.stats)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(lint_report, f, indent=2)
+        log_step(f"\n💾 Lint report saved to {args.output}", color=Fore.YELLOW)
+
+
+def handle_repair_realization(args: Namespace) -> None:
+    """Search local voice-leading fixes for lint issues and save them as a review patch."""
+    log_step(f"\n🔧 Repairing realization from {args.input}...")
+    realization = load_chain_json(args.input)
+
+    try:
+        repair = repair_satb(
+            realization,
+            key=args.key,
+            rules=_split_rules(args.rules),
+            skip_rules=_split_rules(args.skip_rules),
+        )
+    except ValueError as e:
+        logger.error(Fore.RED + f"❌ {e}" + Style.RESET_ALL)
+        return False
+
+    fixed = len(repair["issues_before"]) - len(repair["issues_after"])
+    log_step(
+        f"\n✅ Fixed {fixed} of {len(repair['issues_before'])} issues "
+        f"in {repair['seconds'] * 1000:.1f} ms",
+        color=Fore.GREEN,
+    )
+    for issue in repair["issues_after"]:
+        logger.warning(Fore.RED + f"  - {issue}" + Style.RESET_ALL)
+
+    # Same shape as an LLM review so revise-realization can apply it
+    review_data = {
+        "message": f"Local repair fixed {fixed} voice-leading issues.",
+        "strengths": [],
+        "issues": repair["issues_after"],
+        "suggested_patch": repair["suggested_patch"],
+    }
+    if args.output and is_likely_directory(args.output):
+        chain_dir = Path(args.output)
+        chain_dir.mkdir(parents=True, exist_ok=True)
+        output_path = get_next_versioned_filename(str(chain_dir), "review_realization")
+    else:
+        Path("generated/review").mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+        output_path = args.output or f"generated/review/repair_{timestamp}.json"
+
+    write_chain_json(
+        review_data, output_path, mode="repair-realization", source_path=args.input
+    )
+    log_step(f"\n💾 Repair patch saved to {output_path}", color=Fore.YELLOW)
+
+
+def handle_lint_partimento(args: Namespace) -> None:
+    """Run the deterministic partimento checker on a partimento JSON file."""
+    log_step(f"\n🧹 Linting partimento from {args.input}...")
+    partimento = load_chain_json(args.input)
+
+    lint_report = lint_partimento(partimento)
+    _log_lint_report(lint_report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(lint_report, f, indent=2)
+        log_step(f"\n💾 Lint report saved to {args.output}", color=Fore.YELLOW)
+
+
+def handle_lint_corpus(args: Namespace) -> None:
+    """Lint all realized SATB files under a tree across a process pool and report statistics."""
+    log_step(f"\n🧹 Linting realizations under {args.input}...")
+    rules = _split_rules(args.rules)
+    skip_rules = _split_rules(args.skip_rules)
+    try:
+        rule_names = [r.name for r in select_rules(rules, skip_rules)]
+    except ValueError as e:
+        logger.error(Fore.RED + f"❌ {e}" + Style.RESET_ALL)
+        return False
+
+    if args.output:
+        output_path = Path(args.output)
+    else:
+        Path("generated/lint").mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+        output_path = Path(f"generated/lint/lint_corpus_{timestamp}.{args.format}")
+
+    summary = CorpusSummary()
+    last_progress = summary.elapsed
+    paths = discover_realizations(args.input, latest_only=args.latest)
+    with ReportWriter(str(output_path), args.format, rule_names) as writer:
+        for row in lint_corpus(
+            paths,
+            rules=rules,
+            skip_rules=skip_rules,
+            workers=args.workers,
+            chunksize=args.chunksize,
+        ):
+            writer.write(row)
+            summary.add(row)
+            if row["error"]:
+                logger.warning(
+                    Fore.RED + f"❌ {row['path']}: {row['error']}" + Style.RESET_ALL
+                )
+            if summary.elapsed - last_progress >= 2.0:
+                last_progress = summary.elapsed
+                logger.info(
+                    Fore.YELLOW
+                    + f"  … {summary.files} files, "
+                    + f"{summary.files_per_second:.1f} files/sec"
+                    + Style.RESET_ALL
+                )
+
+    report = summary.to_dict()
+    summary_path = output_path.with_suffix(".summary.json")
+    with open(summary_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    log_step("\n📊 Corpus lint summary:", color=Fore.GREEN)
+    logger.info(
+        Fore.YELLOW
+        + f"📁 Files: {report['files']} ({report['errors']} errors), "
+        + f"{report['files_with_issues']} with issues"
+    )
+    logger.info(Fore.YELLOW + f"❗ Issues: {report['issues']}")
+    logger.info(
+        Fore.YELLOW
+        + f"⏱️  {report['seconds']}s, {report['files_per_second']} files/sec"
+    )
+    for rule, count in report["by_rule"].items():
+        logger.info(Fore.YELLOW + f"  {rule:<22} {count}")
+    for style, counts in report["by_style"].items():
+        logger.info(
+            Fore.YELLOW
+            + f"  {style}: {counts['issues']} issues in {counts['files']} files"
+        )
+    log_step(f"\n💾 Report saved to {output_path}", color=Fore.YELLOW)
+    log_step(f"💾 Summary saved to {summary_path}", color=Fore.YELLOW)
+
+
 def handle_review_partimento(args: Namespace) -> None:
     """Run LLM review of a partimento (not yet realized), save review in chain or flat output, and update metadata if in a chain."""
     log_step(f"\n🔍 Reviewing partimento from {args.input}...")
@@ -750,8 +1169,7 @@ def handle_revise_realization(args: Namespace) -> None:
     """Apply a patch from a review file to a realization JSON, save as a new chain version or flat file."""
     log_step(f"\n🔧 Revising realization based on patch...")
 
-    with open(args.input, "r") as f:
-        original = json.load(f)
+    original = load_chain_json(args.input)
 
     with open(args.patch, "r") as f:
         review = json.load(f)
@@ -761,7 +1179,7 @@ def handle_revise_realization(args: Namespace) -> None:
         logger.error(
             Fore.RED + "❌ No suggested_patch found in review file." + Style.RESET_ALL
         )
-        return
+        return False
 
     updated_data = apply_patch(original["data"], patch)
 
@@ -777,19 +1195,25 @@ def handle_revise_realization(args: Namespace) -> None:
             args.output or f"generated/json/revised_realization_{timestamp}.json"
         )
 
-    write_chain_json(
-        updated_data, output_path, mode="revise-realization", source_path=args.input
+    write_chain_revision(
+        updated_data, patch, output_path, "revise-realization", source_path=args.input
     )
 
     log_step(f"\n✅ Revised realization saved to {output_path}", color=Fore.YELLOW)
 
+    if getattr(args, "musicxml", None):
+        xml_path = str(Path(output_path).with_suffix(".musicxml"))
+        if patch_musicxml("realized", args.musicxml, output_path, patch, xml_path):
+            log_step(f"🎼 Patched MusicXML saved to {xml_path}", color=Fore.YELLOW)
+        else:
+            log_step(f"🎼 MusicXML re-exported to {xml_path}", color=Fore.YELLOW)
+
 
 def handler_revise_partimento(args: Namespace) -> None:
     """Apply a patch from a review file to a partimento JSON, save as a new chain version or flat file."""
     log_step(f"\n🔧 Revising partimento based on patch...")
 
-    with open(args.input, "r") as f:
-        original = json.load(f)
+    original = load_chain_json(args.input)
 
     with open(args.patch, "r") as f:
         review = json.load(f)
@@ -799,7 +1223,7 @@ def handler_revise_partimento(args: Namespace) -> None:
         logger.error(
             Fore.RED + "❌ No suggested_patch found in review file." + Style.RESET_ALL
         )
-        return
+        return False
 
     updated_data = apply_patch(original["data"], patch)
 
@@ -815,12 +1239,19 @@ def handler_revise_partimento(args: Namespace) -> None:
             args.output or f"generated/json/revised_partimento_{timestamp}.json"
         )
 
-    write_chain_json(
-        updated_data, output_path, mode="revise-partimento", source_path=args.input
+    write_chain_revision(
+        updated_data, patch, output_path, "revise-partimento", source_path=args.input
     )
 
     log_step(f"\n✅ Revised partimento saved to {output_path}", color=Fore.YELLOW)
 
+    if getattr(args, "musicxml", None):
+        xml_path = str(Path(output_path).with_suffix(".musicxml"))
+        if patch_musicxml("partimento", args.musicxml, output_path, patch, xml_path):
+            log_step(f"🎼 Patched MusicXML saved to {xml_path}", color=Fore.YELLOW)
+        else:
+            log_step(f"🎼 MusicXML re-exported to {xml_path}", color=Fore.YELLOW)
+
 
 handler_map = {
     # full chains
@@ -832,6 +1263,10 @@ handler_map = {
     # review
     "review-partimento": handle_review_partimento,
     "review-realization": handle_review_realization,
+    "lint-partimento": handle_lint_partimento,
+    "repair-realization": handle_repair_realization,
+    "lint-realization": handle_lint_realization,
+    "lint-corpus": handle_lint_corpus,
     # revise
     "revise-realization": handle_revise_realization,
     "revise-partimento": handler_revise_partimento,
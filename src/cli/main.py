@@ -1,49 +1,116 @@
 import os
 import sys
 
-import argcomplete
-
 # Ensure src/ is in sys.path for imports
 sys.path.insert(
     0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
 )
 import argparse
 import logging
-
-from colorama import Fore, init
-from rich.logging import RichHandler
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
 from .commands import register_commands
-from .handlers import handler_map
+from .daemon import forward
+from .handlers import handler_map, load_handler
 
 # For realize-figured-bass, import call_llm and realize_figured_bass_from_prompt directly
 
-init(autoreset=True)
 
+def configure_logging():
+    from colorama import init
+    from rich.logging import RichHandler
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(message)s",
-    handlers=[RichHandler(rich_tracebacks=True)],
-)
+    init(autoreset=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(message)s",
+        handlers=[RichHandler(rich_tracebacks=True)],
+    )
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Yantra-Gandharva Score Generator")
+@lru_cache(maxsize=1)
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="yantra", description="Yantra-Gandharva Score Generator"
+    )
     subparsers = parser.add_subparsers(dest="command")
     register_commands(subparsers)
+    return parser
+
 
+def run(argv=None):
+    """Parse argv and dispatch to the command's handler in this process."""
+    import argcomplete
+    from colorama import Fore
+
+    parser = build_parser()
     argcomplete.autocomplete(parser)
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.command in handler_map:
-        handler_map[args.command](args)
+        handler = load_handler(args.command, getattr(args, "handler_group", None))
+        if (
+            args.profile
+            or args.profile_output
+            or args.profile_cpu
+            or args.profile_memory
+        ):
+            result = run_profiled(handler, args)
+        else:
+            result = handler(args)
+            drain_background()
+        if result is False:
+            # The handler logged why it failed
+            sys.exit(1)
     else:
         logger.warning(Fore.YELLOW + "Unknown or missing command.\n")
         parser.print_help()
 
 
+def drain_background():
+    """Wait for background work (audio renders) the handler left running."""
+    audio_queue = sys.modules.get("lib.utils.audio_queue")
+    if audio_queue is not None:
+        audio_queue.drain()
+
+
+def run_profiled(handler, args):
+    """
+    Run a handler under the stage profiler and write its reports. Return
+    the handler's result.
+    """
+    from datetime import datetime
+
+    from lib.utils.profiling import Profiler
+
+    profiler = Profiler(args.command, cpu=args.profile_cpu, memory=args.profile_memory)
+    try:
+        with profiler:
+            result = handler(args)
+            drain_background()
+    finally:
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+        output = (
+            args.profile_output or f"generated/profiles/{args.command}_{timestamp}.json"
+        )
+        report, collapsed = profiler.write(output)
+        logger.info(f"⏱️  Profile written to {report} (flamegraph: {collapsed})")
+    return result
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Hand the invocation to a warm `yantra serve` daemon when one is running
+    code = forward(argv)
+    if code is not None:
+        sys.exit(code)
+
+    configure_logging()
+    run(argv)
+
+
 if __name__ == "__main__":
     main()
@@ -2,7 +2,10 @@ import json
 
 from music21 import harmony, key, metadata, meter, note, stream
 
+from lib.utils.profiling import profile_stage, profiled
 
+
+@profiled
 def export_lead_sheet(json_path: str, output_path: str):
     with open(json_path, "r") as f:
         data = json.load(f)
@@ -29,4 +32,5 @@ def export_lead_sheet(json_path: str, output_path: str):
         part.append(m)
 
     score.append(part)
-    score.write("musicxml", fp=output_path)
+    with profile_stage("score.write"):
+        score.write("musicxml", fp=output_path)
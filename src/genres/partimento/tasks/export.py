@@ -1,26 +1,43 @@
-import json
 import logging
 
 from music21 import clef, key, metadata, meter, note, stream
 
+from lib.utils.chain_versions import load_chain_json
+from lib.utils.profiling import profile_stage, profiled
+from lib.utils.score_slice import check_measures
+
 logger = logging.getLogger(__name__)
 
 
-def export_partimento_to_musicxml(json_path: str, output_path: str):
-    with open(json_path, "r") as f:
-        data = json.load(f)["data"]
+VOICES = ("soprano", "alto", "tenor", "bass")
+
+
+def _key_signature(data: dict) -> key.Key:
+    key_str = data.get("key", "C")
+    parts = key_str.split()
+    tonic = parts[0]
+    mode = parts[1] if len(parts) > 1 else "major"
+    return key.Key(tonic, mode)
+
+
+def _check_partimento_voices(voices) -> None:
+    if voices is not None and "bass" not in voices:
+        raise ValueError("a partimento has only the bass voice")
 
+
+def build_partimento_score(data: dict, measures=None) -> stream.Score:
+    """
+    Build the MusicXML score of a partimento: one bass-clef part with the
+    figures as lyrics. measures, if given, limits it to those (1-based)
+    measure numbers; their content is the same as in the full score.
+    """
     score = stream.Score()
     score.metadata = metadata.Metadata()
     score.metadata.title = data.get("title", "Partimento")
 
     part = stream.Part()
     part.insert(0, clef.BassClef())
-    key_str = data.get("key", "C")
-    parts = key_str.split()
-    tonic = parts[0]
-    mode = parts[1] if len(parts) > 1 else "major"
-    part.append(key.Key(tonic, mode))
+    part.append(_key_signature(data))
     part.append(meter.TimeSignature("4/4"))
 
     bassline = data["bassline"]
@@ -31,6 +48,8 @@ def export_partimento_to_musicxml(json_path: str, output_path: str):
         bassline = [[n] for n in bassline]
 
     for i, measure_notes in enumerate(bassline):
+        if measures is not None and i + 1 not in measures:
+            continue
         m = stream.Measure(number=i + 1)
         note_count = len(measure_notes)
         ql = 4.0 / note_count if note_count > 0 else 4.0
@@ -53,18 +72,19 @@ def export_partimento_to_musicxml(json_path: str, output_path: str):
         part.append(m)
 
     score.append(part)
-    score.write("musicxml", fp=output_path)
-
+    return score
 
-def export_realized_partimento_to_musicxml(realized_json_path: str, output_path: str):
-    with open(realized_json_path, "r") as f:
-        data = json.load(f)["data"]
 
+def build_realized_score(data: dict, measures=None, voices=VOICES) -> stream.Score:
+    """
+    Build the MusicXML score of a SATB realization, one part per voice.
+    measures, if given, limits it to those (1-based) measure numbers.
+    """
     score = stream.Score()
     score.metadata = metadata.Metadata()
     score.metadata.title = data.get("title", "Realized Partimento")
 
-    for voice_name in ["soprano", "alto", "tenor", "bass"]:
+    for voice_name in voices:
         voice_notes = data[voice_name]
         part = stream.Part(id=voice_name)
         part.partName = voice_name.capitalize()
@@ -72,6 +92,8 @@ def export_realized_partimento_to_musicxml(realized_json_path: str, output_path:
         part.append(meter.TimeSignature("4/4"))
 
         for i, measure_notes in enumerate(voice_notes):
+            if measures is not None and i + 1 not in measures:
+                continue
             m = stream.Measure(number=i + 1)
             note_count = len(measure_notes)
             ql = 4.0 / note_count if note_count > 0 else 4.0
@@ -91,27 +113,55 @@ def export_realized_partimento_to_musicxml(realized_json_path: str, output_path:
             part.append(m)
 
         score.append(part)
-
-    score.write("musicxml", fp=output_path)
-
-
-def export_realized_partimento_to_midi(realized_json_path: str, output_path: str):
+    return score
+
+
+@profiled
+def export_partimento_to_musicxml(
+    json_path: str, output_path: str, measures=None, voices=None
+):
+    data = load_chain_json(json_path)["data"]
+    _check_partimento_voices(voices)
+    check_measures(measures, len(data["bassline"]))
+    score = build_partimento_score(data, measures=measures)
+    with profile_stage("score.write"):
+        score.write("musicxml", fp=output_path)
+
+
+@profiled
+def export_realized_partimento_to_musicxml(
+    realized_json_path: str, output_path: str, measures=None, voices=None
+):
+    data = load_chain_json(realized_json_path)["data"]
+    check_measures(measures, len(data[VOICES[0]]))
+    score = build_realized_score(data, measures=measures, voices=voices or VOICES)
+    with profile_stage("score.write"):
+        score.write("musicxml", fp=output_path)
+
+
+@profiled
+def export_realized_partimento_to_midi(
+    realized_json_path: str, output_path: str, measures=None, voices=None
+):
     """
-    Export a realized partimento SATB JSON file to a MIDI file.
+    Export a realized partimento SATB JSON file to a MIDI file, optionally
+    only the given (1-based) measures and voices.
     """
-    with open(realized_json_path, "r") as f:
-        data = json.load(f)["data"]
+    data = load_chain_json(realized_json_path)["data"]
+    check_measures(measures, len(data[VOICES[0]]))
 
     score = stream.Score()
     score.metadata = metadata.Metadata()
     score.metadata.title = data.get("title", "Realized Partimento")
 
-    for voice_name in ["soprano", "alto", "tenor", "bass"]:
+    for voice_name in voices or VOICES:
         voice_notes = data[voice_name]
         part = stream.Part(id=voice_name)
         part.partName = voice_name.capitalize()
 
         for i, measure_notes in enumerate(voice_notes):
+            if measures is not None and i + 1 not in measures:
+                continue
             m = stream.Measure(number=i + 1)
             note_count = len(measure_notes)
             ql = 4.0 / note_count if note_count > 0 else 4.0
@@ -132,7 +182,8 @@ def export_realized_partimento_to_midi(realized_json_path: str, output_path: str
 
         score.append(part)
 
-    score.write("midi", fp=output_path)
+    with profile_stage("score.write"):
+        score.write("midi", fp=output_path)
 
 
 def normalize_note_string(note_str: str) -> str:
@@ -144,12 +195,17 @@ def normalize_note_string(note_str: str) -> str:
     )
 
 
-def export_partimento_to_midi(json_path: str, output_path: str):
+@profiled
+def export_partimento_to_midi(
+    json_path: str, output_path: str, measures=None, voices=None
+):
     """
-    Export a partimento JSON file to a MIDI file.
+    Export a partimento JSON file to a MIDI file, optionally only the given
+    (1-based) measures.
     """
-    with open(json_path, "r") as f:
-        data = json.load(f)["data"]
+    data = load_chain_json(json_path)["data"]
+    _check_partimento_voices(voices)
+    check_measures(measures, len(data["bassline"]))
 
     score = stream.Score()
     score.metadata = metadata.Metadata()
@@ -171,6 +227,8 @@ def export_partimento_to_midi(json_path: str, output_path: str):
         bassline = [[n] for n in bassline]
 
     for i, measure_notes in enumerate(bassline):
+        if measures is not None and i + 1 not in measures:
+            continue
         m = stream.Measure(number=i + 1)
         note_count = len(measure_notes)
         ql = 4.0 / note_count if note_count > 0 else 4.0
@@ -189,4 +247,5 @@ def export_partimento_to_midi(json_path: str, output_path: str):
         part.append(m)
 
     score.append(part)
-    score.write("midi", fp=output_path)
+    with profile_stage("score.write"):
+        score.write("midi", fp=output_path)
@@ -0,0 +1,177 @@
+"""
+Incremental MusicXML updates for patched chain versions.
+
+A review patch ({part: {measure index: notes}}, see `apply_patch`) usually
+touches a few measures of one voice, yet a full export rebuilds and writes
+every measure of every part. `patch_musicxml` takes the MusicXML of the
+previous version and replaces only the `<measure>` elements the patch
+changed, in the parts it changed, with measures exported from a score
+holding just those measures. Everything else in the file (part ids,
+attributes, untouched measures) stays byte for byte the same.
+
+Anything the splice cannot express falls back to a full export: a patch
+that changes more than measures (key, time signature, title, ...), a
+previous file that is missing or does not match the new data's shape.
+"""
+
+import logging
+import os
+import re
+
+from genres.partimento.tasks.export import (
+    VOICES,
+    build_partimento_score,
+    build_realized_score,
+    export_partimento_to_musicxml,
+    export_realized_partimento_to_musicxml,
+)
+from lib.utils.blob_store import export_cached
+from lib.utils.chain_versions import load_chain_json
+from lib.utils.profiling import profile_stage, profiled
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["changed_measures", "patch_musicxml"]
+
+# Patch keys per score kind, mapped to the index of the part they live in
+PART_INDEX = {
+    "partimento": {"bassline": 0, "figures": 0},
+    "realized": {voice: i for i, voice in enumerate(VOICES)},
+}
+FULL_EXPORTERS = {
+    "partimento": export_partimento_to_musicxml,
+    "realized": export_realized_partimento_to_musicxml,
+}
+
+_PART = re.compile(r'<part id="[^"]*">(.*?)</part>', re.S)
+_MEASURE = re.compile(r'(<measure\b[^>]*\bnumber="(\d+)"[^>]*>)(.*?)(</measure>)', re.S)
+_ATTRIBUTES = re.compile(r"\s*<attributes>.*?</attributes>", re.S)
+
+
+def _measure_count(kind: str, data: dict) -> int:
+    return len(data["bassline"] if kind == "partimento" else data[VOICES[0]])
+
+
+def changed_measures(kind: str, data: dict, patch: dict) -> dict[int, set[int]] | None:
+    """
+    {part index: 1-based measure numbers} that applying patch to data
+    changes, or None if the patch touches anything but measures.
+    """
+    parts = PART_INDEX[kind]
+    changed: dict[int, set[int]] = {}
+    for name, measures in patch.items():
+        if name not in parts or not isinstance(measures, dict):
+            return None
+        for index in measures:
+            try:
+                number = int(index) + 1
+            except ValueError:
+                continue  # apply_patch ignores it too
+            if 1 <= number <= len(data.get(name, [])):
+                changed.setdefault(parts[name], set()).add(number)
+    return changed
+
+
+def _build(kind: str, data: dict, changed: dict[int, set[int]]):
+    """A score of only the changed parts and measures, parts in order."""
+    measures = set().union(*changed.values())
+    if kind == "partimento":
+        return build_partimento_score(data, measures=measures)
+    voices = [VOICES[i] for i in sorted(changed)]
+    return build_realized_score(data, measures=measures, voices=voices)
+
+
+def _splice(
+    previous: str, fresh: str, changed: dict[int, set[int]], parts: int, count: int
+) -> str | None:
+    """
+    previous with the changed measures of each part replaced by those in
+    fresh, or None unless previous has the expected number of parts, each
+    with measures 1..count. A replaced measure keeps its own opening tag
+    and attributes.
+    """
+    old_parts = list(_PART.finditer(previous))
+    new_parts = list(_PART.finditer(fresh))
+    if len(old_parts) != parts or len(new_parts) != len(changed):
+        return None
+
+    edits = []  # (start, end, replacement) in previous
+    for part_index, new_part in zip(sorted(changed), new_parts):
+        old_part = old_parts[part_index]
+        old_measures = {
+            int(m.group(2)): m for m in _MEASURE.finditer(previous, *old_part.span(1))
+        }
+        if sorted(old_measures) != list(range(1, count + 1)):
+            return None
+        new_measures = {
+            int(m.group(2)): m for m in _MEASURE.finditer(new_part.group(1))
+        }
+        for number in sorted(changed[part_index]):
+            old, new = old_measures.get(number), new_measures.get(number)
+            if old is None or new is None:
+                return None
+            kept = _ATTRIBUTES.match(old.group(3))
+            body = _ATTRIBUTES.sub("", new.group(3), count=1)
+            replacement = (
+                old.group(1) + (kept.group(0) if kept else "") + body + old.group(4)
+            )
+            edits.append((old.start(), old.end(), replacement))
+
+    pieces, position = [], 0
+    for start, end, replacement in sorted(edits):
+        pieces += [previous[position:start], replacement]
+        position = end
+    pieces.append(previous[position:])
+    return "".join(pieces)
+
+
+def _write(text: str, output_path: str) -> None:
+    # The output may be a hardlink into the blob store; never write through it
+    tmp = f"{output_path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, output_path)
+
+
+@profiled
+def patch_musicxml(
+    kind: str, previous_xml: str, json_path: str, patch: dict, output_path: str
+) -> bool:
+    """
+    Bring the MusicXML export of a "partimento" or "realized" score up to
+    date with json_path, the version made by applying patch to the one
+    previous_xml was exported from. Only the measures the patch changed
+    are rebuilt; output_path may be previous_xml.
+
+    Return True if the file was patched in place, False if it needed a
+    full export instead.
+    """
+    from music21.musicxml.m21ToXml import GeneralObjectExporter
+
+    data = load_chain_json(json_path)["data"]
+    changed = changed_measures(kind, data, patch)
+    spliced = None
+    if changed is not None:
+        try:
+            with open(previous_xml, encoding="utf-8") as f:
+                previous = f.read()
+        except (OSError, UnicodeDecodeError):
+            previous = None
+        if previous is not None and not changed:
+            spliced = previous
+        elif previous is not None:
+            with profile_stage("score.build"):
+                score = _build(kind, data, changed)
+            with profile_stage("score.write"):
+                fresh = GeneralObjectExporter(score).parse().decode("utf-8")
+            parts = 1 if kind == "partimento" else len(VOICES)
+            spliced = _splice(
+                previous, fresh, changed, parts, _measure_count(kind, data)
+            )
+
+    if spliced is None:
+        logger.debug(f"Full MusicXML export of {json_path}")
+        export_cached(FULL_EXPORTERS[kind], json_path, output_path)
+        return False
+    _write(spliced, output_path)
+    return True
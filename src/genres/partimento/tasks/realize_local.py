@@ -0,0 +1,173 @@
+"""
+Deterministic, search-based realization of a figured partimento bass.
+
+Each bass note and its figures become a Chord; candidate SATB voicings are
+searched with dynamic programming under voice-leading costs (see
+lib/utils/voicing_utils.py). The output has the same shape as the LLM
+realization, so every exporter and the linter work unchanged.
+"""
+
+import re
+
+from lib.analysis.partimento_linting import normalize_partimento
+from lib.utils.music_utils import midi_to_note, note_to_midi
+from lib.utils.voicing_utils import Chord, best_voicing_path
+
+LETTERS = "CDEFGAB"
+MAJOR_STEPS = (0, 2, 4, 5, 7, 9, 11)
+MINOR_STEPS = (0, 2, 3, 5, 7, 8, 10)
+
+_FIGURE_RE = re.compile(r"^([#♯b♭♮+]?)(\d*)([#♯b♭♮+/]?)$")
+_ALTERATIONS = {"#": 1, "♯": 1, "+": 1, "/": 1, "b": -1, "♭": -1, "♮": 0}
+
+# Figure shorthand → full set of intervals above the bass, plus the interval
+# that carries the dissonance which must resolve down by step.
+_FIGURE_CHORDS = [
+    ({6}, {3, 6}, None),
+    ({6, 3}, {3, 6}, None),
+    ({6, 4}, {4, 6}, None),
+    ({7}, {3, 5, 7}, 7),
+    ({7, 3}, {3, 5, 7}, 7),
+    ({7, 5, 3}, {3, 5, 7}, 7),
+    ({6, 5}, {3, 5, 6}, 5),
+    ({6, 5, 3}, {3, 5, 6}, 5),
+    ({4, 3}, {3, 4, 6}, 3),
+    ({6, 4, 3}, {3, 4, 6}, 3),
+    ({2}, {2, 4, 6}, 1),
+    ({4, 2}, {2, 4, 6}, 1),
+    ({6, 4, 2}, {2, 4, 6}, 1),
+    ({4}, {4, 5}, 4),
+    ({5, 4}, {4, 5}, 4),
+    ({9}, {3, 5, 9}, 9),
+]
+
+
+def parse_figures(figures: list) -> tuple[set[int], dict[int, int], int | None]:
+    """
+    Parse a figure list such as ["6", "#4"] into (intervals, alterations,
+    dissonant interval). A bare accidental alters the third.
+    """
+    numbers, alterations = set(), {}
+    for token in figures or []:
+        match = _FIGURE_RE.match(str(token).strip())
+        if not match:
+            continue
+        before, digits, after = match.groups()
+        accidental = before or after
+        number = int(digits) if digits else 3
+        if digits:
+            numbers.add(number)
+        if accidental:
+            alterations[number] = _ALTERATIONS[accidental]
+
+    numbers -= {1, 8}
+    if not numbers or numbers <= {3, 5}:
+        return {3, 5}, alterations, None
+    for shorthand, intervals, dissonant in _FIGURE_CHORDS:
+        if numbers == shorthand:
+            return set(intervals), alterations, dissonant
+    if not numbers & {2, 4}:
+        numbers.add(3)
+    return numbers, alterations, None
+
+
+def _key_scale(key_str: str | None, fallback_letter: str) -> tuple[str, str, dict]:
+    """Return (tonic letter, mode, {letter: pitch class}) for a key string."""
+    tokens = (key_str or "").split()
+    tonic_name = tokens[0] if tokens else fallback_letter
+    mode = tokens[1].lower() if len(tokens) > 1 else ""
+    if mode not in ("major", "minor"):
+        mode = "minor" if tonic_name[0].islower() else "major"
+    try:
+        tonic_pc = note_to_midi(tonic_name[0].upper() + tonic_name[1:] + "4") % 12
+    except ValueError:
+        tonic_name, tonic_pc, mode = (
+            fallback_letter,
+            note_to_midi(fallback_letter + "4") % 12,
+            "major",
+        )
+    tonic_letter = tonic_name[0].upper()
+    steps = MAJOR_STEPS if mode == "major" else MINOR_STEPS
+    start = LETTERS.index(tonic_letter)
+    scale = {
+        LETTERS[(start + degree) % 7]: (tonic_pc + steps[degree]) % 12
+        for degree in range(7)
+    }
+    return tonic_letter, mode, scale
+
+
+def build_chord(
+    bass_name: str, figures: list, tonic_letter: str, mode: str, scale: dict
+) -> Chord:
+    """Return the Chord for one bass note and its figures in the given key."""
+    bass = note_to_midi(bass_name)
+    bass_letter = bass_name.strip()[0].upper()
+    bass_index = LETTERS.index(bass_letter)
+    degree = (bass_index - LETTERS.index(tonic_letter)) % 7
+    intervals, alterations, dissonant_interval = parse_figures(figures)
+
+    leading_letter = LETTERS[(LETTERS.index(tonic_letter) + 6) % 7]
+    dominant_function = degree in (1, 4, 6) or (degree == 3 and 2 in intervals)
+
+    pcs, letters, dissonant = {bass % 12}, {bass % 12: bass_letter}, set()
+    for interval in intervals:
+        letter = LETTERS[(bass_index + interval - 1) % 7]
+        pc = scale[letter]
+        if interval in alterations:
+            natural = note_to_midi(letter + "4") % 12
+            alteration = alterations[interval]
+            pc = natural if alteration == 0 else (pc + alteration) % 12
+        elif mode == "minor" and letter == leading_letter and dominant_function:
+            pc = (pc + 1) % 12
+        pcs.add(pc)
+        letters[pc] = letter
+        if interval == dissonant_interval:
+            dissonant.add(pc)
+    if dissonant_interval == 1:
+        dissonant.add(bass % 12)
+    return Chord(bass, frozenset(pcs), frozenset(dissonant), letters)
+
+
+def realize_partimento_local(partimento_json: dict, beam: int = 32) -> dict:
+    """
+    Realize a partimento (or wrapped {"data": …}) as SATB without an LLM.
+
+    Return {"title", "key", "soprano", "alto", "tenor", "bass"} with one list
+    of note names per measure, matching the LLM realization format.
+    """
+    data = partimento_json.get("data", partimento_json)
+    bassline, figures = normalize_partimento(data)
+    notes = [
+        (i, j, n) for i, measure in enumerate(bassline) for j, n in enumerate(measure)
+    ]
+    if not notes:
+        raise ValueError("Partimento has no bass notes to realize")
+
+    final_letter = notes[-1][2].strip()[0].upper()
+    tonic_letter, mode, scale = _key_scale(data.get("key"), final_letter)
+    tonic = scale[tonic_letter]
+    leading_tone = (tonic + 11) % 12
+
+    chords = []
+    for i, j, bass_name in notes:
+        figs = figures[i][j] if i < len(figures) and j < len(figures[i]) else []
+        try:
+            chords.append(build_chord(bass_name, figs, tonic_letter, mode, scale))
+        except ValueError as e:
+            raise ValueError(f"m{i + 1}: {e}") from e
+
+    path = best_voicing_path(chords, leading_tone, tonic, limit=beam)
+
+    realization = {
+        "title": data.get("title", "Realized Partimento"),
+        "key": data.get("key"),
+        "soprano": [[] for _ in bassline],
+        "alto": [[] for _ in bassline],
+        "tenor": [[] for _ in bassline],
+        "bass": [list(measure) for measure in bassline],
+    }
+    for (i, _, _), chord, voicing in zip(notes, chords, path):
+        for voice, midi in zip(("soprano", "alto", "tenor"), voicing):
+            letter = chord.letters.get(midi % 12)
+            realization[voice][i].append(midi_to_note(midi, letter))
+    return realization
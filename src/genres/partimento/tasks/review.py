@@ -1,11 +1,11 @@
 import json
 
 from genres.partimento import prompts
+from lib.utils.chain_versions import load_chain_json
 
 
 def review_realized_score(json_path: str, call_llm) -> str:
-    with open(json_path, "r") as f:
-        data = json.load(f)["data"]
+    data = load_chain_json(json_path)["data"]
 
     flat_repr = json.dumps(data, indent=2)
     user_prompt = prompts.REVIEW_SATB_USER_PROMPT_TEMPLATE.replace(
@@ -14,12 +14,16 @@ def review_realized_score(json_path: str, call_llm) -> str:
     return call_llm(prompts.REVIEW_SATB_SYSTEM_PROMPT, user_prompt)
 
 
-def review_partimento(json_path: str, call_llm) -> str:
-    with open(json_path, "r") as f:
-        data = json.load(f)["data"]
+def review_partimento(json_path: str, call_llm, lint_issues: list = None) -> str:
+    data = load_chain_json(json_path)["data"]
 
     flat_repr = json.dumps(data, indent=2)
     user_prompt = prompts.REVIEW_PARTIMENTO_USER_PROMPT_TEMPLATE.replace(
         "{{partimento}}", flat_repr
     )
+    if lint_issues:
+        # Point the reviewer at what the local checker already found
+        user_prompt += "\n\nAutomatic checks found these issues:\n" + "\n".join(
+            f"- {issue}" for issue in lint_issues
+        )
     return call_llm(prompts.REVIEW_PARTIMENTO_SYSTEM_PROMPT, user_prompt)
@@ -0,0 +1,240 @@
+"""
+Batch linting of realized SATB files across a tree of chain directories.
+"""
+
+import csv
+import json
+import os
+import re
+from collections import Counter
+from functools import partial
+from multiprocessing import Pool
+from time import perf_counter
+
+from lib.analysis.linting import lint_satb, select_rules
+from lib.utils.chain_versions import load_chain_json
+
+__all__ = [
+    "discover_realizations",
+    "lint_file",
+    "lint_corpus",
+    "CorpusSummary",
+    "ReportWriter",
+]
+
+_REALIZED_RE = re.compile(r"^realized(?:_(\d+))?\.json$")
+_PARTIMENTO_RE = re.compile(r"^partimento(?:_(\d+))?\.json$")
+
+
+def _version(match) -> int:
+    return int(match.group(1)) if match.group(1) else 0
+
+
+def discover_realizations(root: str, latest_only: bool = False):
+    """
+    Yield (realized JSON path, partimento) pairs under root, directory by
+    directory, where partimento holds the key and style of the chain's latest
+    partimento, read once per directory. With latest_only, yield only the
+    highest realized version per directory.
+    """
+    if os.path.isfile(root):
+        directory = os.path.dirname(os.path.abspath(root))
+        yield root, _chain_partimento(directory, os.listdir(directory))
+        return
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        found = []
+        for name in filenames:
+            match = _REALIZED_RE.match(name)
+            if match:
+                found.append((_version(match), name))
+        if not found:
+            continue
+        found.sort()
+        if latest_only:
+            found = found[-1:]
+        partimento = _chain_partimento(dirpath, filenames)
+        for _, name in found:
+            yield os.path.join(dirpath, name), partimento
+
+
+def _chain_partimento(directory: str, names) -> dict:
+    """Return the key and style of the latest partimento among a chain's files."""
+    candidates = []
+    for name in names:
+        match = _PARTIMENTO_RE.match(name)
+        if match:
+            candidates.append((_version(match), name))
+    if not candidates:
+        return {}
+    try:
+        payload = load_chain_json(os.path.join(directory, max(candidates)[1]))
+    except (OSError, json.JSONDecodeError, KeyError):
+        return {}
+    data = payload.get("data", payload) if isinstance(payload, dict) else {}
+    if not isinstance(data, dict):
+        return {}
+    return {field: data.get(field) for field in ("key", "style")}
+
+
+def lint_file(
+    path: str, rules=None, skip_rules=None, partimento: dict | None = None
+) -> dict:
+    """
+    Lint one realized JSON file and return a flat result row.
+
+    Key and style come from the realization itself or, failing that, from the
+    partimento it was realized from (looked up in the same chain directory
+    unless given).
+    """
+    start = perf_counter()
+    row = {
+        "path": path,
+        "chain": os.path.basename(os.path.dirname(os.path.abspath(path))),
+        "style": None,
+        "measures": 0,
+        "issues": 0,
+        "by_rule": {},
+        "error": None,
+    }
+    try:
+        payload = load_chain_json(path)
+        data = payload.get("data", payload)
+        if partimento is None:
+            directory = os.path.dirname(os.path.abspath(path))
+            partimento = _chain_partimento(directory, os.listdir(directory))
+        row["style"] = data.get("style") or partimento.get("style")
+        report = lint_satb(
+            data,
+            rules=rules,
+            skip_rules=skip_rules,
+            key=data.get("key") or partimento.get("key"),
+        )
+        row["measures"] = report["stats"]["measures"]
+        row["issues"] = len(report["issues"])
+        row["by_rule"] = dict(Counter(f["rule"] for f in report["findings"]))
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["seconds"] = round(perf_counter() - start, 6)
+    return row
+
+
+def _lint_item(item, rules=None, skip_rules=None) -> dict:
+    if isinstance(item, str):
+        return lint_file(item, rules, skip_rules)
+    path, partimento = item
+    return lint_file(path, rules, skip_rules, partimento=partimento)
+
+
+def lint_corpus(paths, rules=None, skip_rules=None, workers=None, chunksize=16):
+    """
+    Lint many realized files (paths or the pairs discover_realizations
+    yields), yielding result rows as they complete.
+
+    With workers=1 the files are linted in-process; otherwise a process pool
+    pulls chunks of `chunksize` paths at a time.
+    """
+    # Fail fast on a bad selection instead of once per file in every worker
+    select_rules(rules, skip_rules)
+    worker = partial(_lint_item, rules=rules, skip_rules=skip_rules)
+    if workers == 1:
+        yield from map(worker, paths)
+        return
+    with Pool(processes=workers) as pool:
+        yield from pool.imap_unordered(worker, paths, chunksize=chunksize)
+
+
+class CorpusSummary:
+    """Aggregate corpus lint rows into histograms by rule and by style."""
+
+    def __init__(self):
+        self.files = 0
+        self.errors = 0
+        self.files_with_issues = 0
+        self.issues = 0
+        self.measures = 0
+        self.by_rule = Counter()
+        self.by_style = {}
+        self.started = perf_counter()
+
+    def add(self, row: dict) -> None:
+        self.files += 1
+        if row["error"]:
+            self.errors += 1
+            return
+        self.measures += row["measures"]
+        self.issues += row["issues"]
+        if row["issues"]:
+            self.files_with_issues += 1
+        self.by_rule.update(row["by_rule"])
+        style = self.by_style.setdefault(
+            row["style"] or "unknown", {"files": 0, "issues": 0}
+        )
+        style["files"] += 1
+        style["issues"] += row["issues"]
+
+    @property
+    def elapsed(self) -> float:
+        return perf_counter() - self.started
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "files": self.files,
+            "errors": self.errors,
+            "files_with_issues": self.files_with_issues,
+            "issues": self.issues,
+            "measures": self.measures,
+            "seconds": round(self.elapsed, 3),
+            "files_per_second": round(self.files_per_second, 2),
+            "by_rule": dict(self.by_rule.most_common()),
+            "by_style": dict(
+                sorted(self.by_style.items(), key=lambda kv: -kv[1]["issues"])
+            ),
+        }
+
+
+class ReportWriter:
+    """Stream corpus lint rows to a JSONL or CSV file."""
+
+    def __init__(self, path: str, fmt: str, rule_names: list[str]):
+        self.fmt = fmt
+        self.rule_names = rule_names
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._file = open(path, "w", newline="")
+        self._csv = None
+        if fmt == "csv":
+            fields = ["path", "chain", "style", "measures", "issues", "seconds"]
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(fields + rule_names + ["error"])
+
+    def write(self, row: dict) -> None:
+        if self._csv:
+            self._csv.writerow(
+                [
+                    row["path"],
+                    row["chain"],
+                    row["style"] or "",
+                    row["measures"],
+                    row["issues"],
+                    row["seconds"],
+                ]
+                + [row["by_rule"].get(name, 0) for name in self.rule_names]
+                + [row["error"] or ""]
+            )
+        else:
+            self._file.write(json.dumps(row) + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
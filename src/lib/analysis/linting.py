@@ -1,64 +1,196 @@
-from music21 import converter, stream, voiceLeading
+import math
+import re
+from dataclasses import asdict
+from time import perf_counter
 
-from lib.utils.music_utils import in_range
-from lib.utils.musicxml_utils import json_to_musicxml
+from lib.analysis.rules import (
+    RULES,
+    SCOPES,
+    VOICES,
+    Finding,
+    LintContext,
+    NoteEvent,
+    Rule,
+    Vertical,
+)
+from lib.utils.music_utils import note_to_midi, parse_key
 
-__all__ = ["lint_satb"]
+__all__ = ["lint_satb", "select_rules"]
 
+_CADENCE_MEASURE_RE = re.compile(r"measure\s+(\d+)", re.IGNORECASE)
+# --rules name selecting every registered rule
+FULL_PROFILE = "full"
 
-def lint_satb(realization_json: dict) -> dict:
+
+def select_rules(rules=None, skip_rules=None) -> list[Rule]:
     """
-    Return a report dict {issues: [...], strengths: [...]}
+    Return the registered rules to run, in registry order: the default
+    rules unless `rules` selects others.
+
+    `rules` and `skip_rules` are iterables of rule names, scope names
+    (e.g. ["range", "vertical"]) or "full" for every rule. Unknown names
+    raise ValueError.
     """
-    sc = json_to_musicxml(realization_json)
-
-    # json_to_musicxml already gives a Score; re-parse only if it isn't
-    if isinstance(sc, stream.Score):
-        score = sc
-    else:
-        score = converter.parse(sc)
-
-    parts = {p.id.lower()[0]: p for p in score.parts}  # 's','a','t','b'
-    issues, strengths = [], []
-
-    # 1. range & spacing
-    for name, part in parts.items():
-        for n in part.recurse().notes:
-            if not in_range(name, n.pitch):
-                issues.append(f"{name.upper()} m{n.measureNumber} out of range")
-
-    # 2. parallel 5ths/8ves (S↔B covers 80 %)
-    vl = voiceLeading.VoiceLeadingQuartet(parts["s"], parts["b"])
-
-    # Handle different music21 versions
-    if hasattr(vl, "getParallelMotion"):
-        parallels = vl.getParallelMotion()
-    elif hasattr(vl, "parallelMotionGenerator"):
-        parallels = list(vl.parallelMotionGenerator())
-    elif hasattr(vl, "parallelMotion"):
-        # In some versions this is a method, in others a cached list
-        pm = vl.parallelMotion
-        if callable(pm):
+
+    def expand(names):
+        selected = set()
+        for name in names:
+            if name == FULL_PROFILE:
+                selected.update(RULES)
+            elif name in RULES:
+                selected.add(name)
+            elif name in SCOPES:
+                selected.update(r.name for r in RULES.values() if r.scope == name)
+            else:
+                raise ValueError(
+                    f"Unknown lint rule '{name}'. Available: {', '.join(RULES)}"
+                )
+        return selected
+
+    enabled = expand(rules) if rules else {r.name for r in RULES.values() if r.default}
+    if skip_rules:
+        enabled -= expand(skip_rules)
+    return [r for r in RULES.values() if r.name in enabled]
+
+
+def _cadence_measures(payload: dict) -> set[int]:
+    measures = set()
+    for cadence in payload.get("cadences", []) or []:
+        match = _CADENCE_MEASURE_RE.search(str(cadence))
+        if match:
+            measures.add(int(match.group(1)))
+    return measures
+
+
+def _parse_voice(voice: str, measures: list) -> list[list[NoteEvent]]:
+    parsed = []
+    for m_idx, measure_notes in enumerate(measures, start=1):
+        if isinstance(measure_notes, str):
+            measure_notes = [measure_notes]
+        events = []
+        for n_idx, name in enumerate(measure_notes):
             try:
-                parallels = pm()
-            except IndexError:
-                parallels = []
-        else:
-            parallels = pm or []
-    else:
-        parallels = []
-
-    for bad in parallels:
-        if getattr(bad, "directedName", "") in ("P5", "P8"):
-            m = bad.firstNote.measureNumber
-            issues.append(f"S/B m{m} parallel {bad.directedName}")
-
-    # 3. doubled leading tone
-    #   iterate chords-of-measure and check pitch class of LT in key
-    #   (simple: last scale degree 7 in key signature)
-    #   …
+                midi = note_to_midi(name)
+            except (ValueError, AttributeError):
+                midi = None
+            events.append(NoteEvent(voice, m_idx, n_idx, name, midi))
+        parsed.append(events)
+    return parsed
+
+
+def _measure_verticals(measure: int, notes: dict[str, list[NoteEvent]]):
+    """Yield the verticals of one measure, one per distinct onset."""
+    counts = {v: len(evs) for v, evs in notes.items() if evs}
+    if not counts:
+        return
+    grid = math.lcm(*counts.values())
+    onsets = sorted({k * grid // n for n in counts.values() for k in range(n)})
+    for onset in onsets:
+        pitches, attacks = {}, set()
+        for voice, n in counts.items():
+            idx = onset * n // grid
+            ev = notes[voice][idx]
+            if ev.midi is not None:
+                pitches[voice] = ev.midi
+            if idx * grid == onset * n:
+                attacks.add(voice)
+        yield Vertical(measure, 4.0 * onset / grid, pitches, frozenset(attacks))
+
+
+class _RuleRunner:
+    """Call one rule, keeping its timing and hit counts."""
+
+    def __init__(self, rule: Rule, ctx: LintContext, findings: list[Finding]):
+        self.rule = rule
+        self.ctx = ctx
+        self.findings = findings
+        self.calls = 0
+        self.hits = 0
+        self.seconds = 0.0
+
+    def __call__(self, *args):
+        start = perf_counter()
+        found = list(self.rule.func(self.ctx, *args) or ())
+        self.seconds += perf_counter() - start
+        self.calls += 1
+        for finding in found:
+            finding.rule = self.rule.name
+        self.hits += len(found)
+        self.findings.extend(found)
+
+    def stats(self) -> dict:
+        return {
+            "scope": self.rule.scope,
+            "calls": self.calls,
+            "hits": self.hits,
+            "seconds": round(self.seconds, 6),
+        }
+
+
+def lint_satb(
+    realization_json: dict, rules=None, skip_rules=None, key: str | None = None
+) -> dict:
+    """
+    Lint an SATB realization (or wrapped {"data": …}) in a single pass.
+
+    Return a report dict {issues: [...], strengths: [...], findings: [...],
+    stats: {...}}. `issues` keeps the short message strings; `findings` adds
+    the rule name, measure and voices of each issue; `stats` holds per-rule
+    call counts, hit counts and execution time.
+    """
+    payload = realization_json.get("data", realization_json)
+    selected = select_rules(rules, skip_rules)
+
+    voices = {v: _parse_voice(v, payload[v]) for v in VOICES if v in payload}
+    n_measures = max((len(m) for m in voices.values()), default=0)
+    ctx = LintContext(key=parse_key(key or payload.get("key")), measures=n_measures)
+    phrase_ends = _cadence_measures(payload)
+
+    findings: list[Finding] = []
+    runners = {r.name: _RuleRunner(r, ctx, findings) for r in selected}
+    by_scope = {scope: [] for scope in SCOPES}
+    for runner in runners.values():
+        by_scope[runner.rule.scope].append(runner)
+
+    start = perf_counter()
+    previous, phrase = None, []
+    for m_idx in range(n_measures):
+        notes = {v: ms[m_idx] if m_idx < len(ms) else [] for v, ms in voices.items()}
+        for run in by_scope["note"]:
+            for events in notes.values():
+                for ev in events:
+                    run(ev)
+
+        for vertical in _measure_verticals(m_idx + 1, notes):
+            for run in by_scope["vertical"]:
+                run(vertical)
+            if previous is not None:
+                for run in by_scope["transition"]:
+                    run(previous, vertical)
+            previous = vertical
+            phrase.append(vertical)
+
+        if m_idx + 1 in phrase_ends and phrase:
+            for run in by_scope["phrase"]:
+                run(phrase)
+            phrase = []
+
+    if phrase:
+        for run in by_scope["phrase"]:
+            run(phrase)
 
+    issues = [f.message for f in findings]
+    strengths = []
     if not issues:
         strengths.append("No obvious voice-leading violations")
 
-    return {"issues": issues, "strengths": strengths}
+    return {
+        "issues": issues,
+        "strengths": strengths,
+        "findings": [asdict(f) for f in findings],
+        "stats": {
+            "seconds": round(perf_counter() - start, 6),
+            "measures": n_measures,
+            "rules": {name: run.stats() for name, run in runners.items()},
+        },
+    }
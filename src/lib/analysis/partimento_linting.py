@@ -0,0 +1,209 @@
+"""
+Deterministic checks for a partimento bass line, run before any LLM review.
+"""
+
+import re
+
+from lib.analysis.rules import Finding
+from lib.utils.music_utils import RANGE_MIDI, note_to_midi, parse_key
+
+__all__ = ["lint_partimento", "normalize_partimento"]
+
+_CADENCE_RE = re.compile(r"measure\s+(\d+)\s*:?\s*(.*)", re.IGNORECASE)
+
+MAX_LEAP = 12
+MIN_STEPWISE_RATIO = 0.5
+# Fewer bass motions than this say nothing about how stepwise a line is
+MIN_MOTIONS_FOR_STEPWISE = 4
+# Partimento basses are written for keyboard, so allow a little below the
+# choral bass range used for SATB realizations.
+BASS_RANGE = (RANGE_MIDI["b"][0] - 4, RANGE_MIDI["b"][1] + 2)
+
+
+def normalize_partimento(data: dict) -> tuple[list[list[str]], list[list[list]]]:
+    """
+    Return (bassline, figures) as per-measure lists, expanding the flat
+    one-note-per-measure form used by older examples.
+    """
+    bassline = data.get("bassline", []) or []
+    figures = data.get("figures", []) or []
+    if all(isinstance(n, str) for n in bassline):
+        bassline = [[n] for n in bassline]
+        if all(
+            isinstance(f, list) and all(isinstance(x, str) for x in f) for f in figures
+        ):
+            figures = [[f] for f in figures]
+    return bassline, figures
+
+
+def _parse_cadence(cadence) -> tuple[int, str] | None:
+    """
+    (measure, kind) from "measure 6: authentic cadence" or
+    {"measure": 6, "type": "authentic"}; None if it cannot be read.
+    """
+    if isinstance(cadence, dict):
+        try:
+            measure = int(cadence.get("measure"))
+        except (TypeError, ValueError):
+            return None
+        kind = cadence.get("type") or cadence.get("kind") or ""
+        return measure, str(kind).strip().lower()
+    match = _CADENCE_RE.search(str(cadence))
+    if not match:
+        return None
+    return int(match.group(1)), match.group(2).strip().lower()
+
+
+def _cadences(data: dict) -> tuple[list[tuple[int, str]], list]:
+    """(parsed cadences, declared entries that could not be parsed)."""
+    found, unparseable = [], []
+    for cadence in data.get("cadences", []) or []:
+        parsed = _parse_cadence(cadence)
+        if parsed is None:
+            unparseable.append(cadence)
+        else:
+            found.append(parsed)
+    return found, unparseable
+
+
+def _is_final(kind: str) -> bool:
+    """A cadence arriving on the tonic."""
+    return "authentic" in kind or "perfect" in kind or "plagal" in kind
+
+
+def _check_shape(bassline, figures):
+    if figures and len(figures) != len(bassline):
+        yield Finding(
+            0,
+            f"figures cover {len(figures)} measures but bassline has {len(bassline)}",
+            rule="figure-shape",
+        )
+    for m_idx, notes in enumerate(bassline, start=1):
+        if not notes:
+            yield Finding(m_idx, f"m{m_idx} has no bass notes", rule="figure-shape")
+        if m_idx <= len(figures):
+            figs = figures[m_idx - 1]
+            if not isinstance(figs, list) or len(figs) != len(notes):
+                yield Finding(
+                    m_idx,
+                    f"m{m_idx} figures do not match {len(notes)} bass notes",
+                    rule="figure-shape",
+                )
+
+
+def _check_motion(notes, max_leap, min_stepwise_ratio):
+    steps = leaps = 0
+    for (m_prev, prev), (m_cur, cur) in zip(notes, notes[1:]):
+        interval = abs(cur - prev)
+        if interval > max_leap:
+            yield Finding(
+                m_cur, f"m{m_cur} bass leap larger than an octave", rule="leap"
+            )
+        if interval <= 2:
+            steps += 1
+        else:
+            leaps += 1
+    if (
+        steps + leaps >= MIN_MOTIONS_FOR_STEPWISE
+        and steps / (steps + leaps) < min_stepwise_ratio
+    ):
+        ratio = steps / (steps + leaps)
+        yield Finding(
+            0, f"only {ratio:.0%} of bass motion is stepwise", rule="stepwise"
+        )
+
+
+def _check_cadences(data, measure_notes, key):
+    cadences, unparseable = _cadences(data)
+    for cadence in unparseable:
+        yield Finding(0, f"unparseable cadence {cadence!r}", rule="cadence")
+    if not cadences and not unparseable:
+        yield Finding(0, "no cadences declared", rule="cadence")
+    for measure, kind in cadences:
+        if not 1 <= measure <= len(measure_notes) or not measure_notes[measure - 1]:
+            yield Finding(
+                measure,
+                f"cadence declared at missing measure {measure}",
+                rule="cadence",
+            )
+            continue
+        if key is None:
+            continue
+        tonic, dominant = key[0], (key[0] + 7) % 12
+        arrival = measure_notes[measure - 1][-1] % 12
+        flat = [n for notes in measure_notes[:measure] for n in notes]
+        approach = flat[-2] % 12 if len(flat) > 1 else None
+        if "half" in kind or "phrygian" in kind:
+            ok = arrival == dominant
+        elif _is_final(kind):
+            ok = arrival == tonic and approach in (dominant, (tonic + 5) % 12)
+        else:
+            ok = True
+        if not ok:
+            yield Finding(
+                measure, f"m{measure} bass does not outline a {kind}", rule="cadence"
+            )
+
+
+def _check_key_range(data, notes, key):
+    if key is None:
+        yield Finding(0, f"unrecognized key '{data.get('key')}'", rule="key-range")
+    low, high = BASS_RANGE
+    for m_idx, midi in notes:
+        if not low <= midi <= high:
+            yield Finding(m_idx, f"m{m_idx} bass out of range", rule="key-range")
+    # Only a piece that closes with a final cadence has to end on the tonic
+    cadences, _ = _cadences(data)
+    closes = bool(cadences) and _is_final(max(cadences, key=lambda c: c[0])[1])
+    if closes and key is not None and notes and notes[-1][1] % 12 != key[0]:
+        yield Finding(
+            notes[-1][0], "final bass note is not the tonic", rule="key-range"
+        )
+
+
+def lint_partimento(
+    partimento_json: dict,
+    max_leap: int = MAX_LEAP,
+    min_stepwise_ratio: float = MIN_STEPWISE_RATIO,
+) -> dict:
+    """
+    Check a partimento (or wrapped {"data": …}) for leaps, stepwise motion,
+    declared cadences, figure/bassline shape and key/range sanity.
+
+    Return a report dict {issues: [...], strengths: [...], findings: [...]}
+    in the same shape as lint_satb.
+    """
+    data = partimento_json.get("data", partimento_json)
+    bassline, figures = normalize_partimento(data)
+    key = parse_key(data.get("key"))
+
+    findings = list(_check_shape(bassline, figures))
+    measure_notes, notes = [], []
+    for m_idx, measure in enumerate(bassline, start=1):
+        parsed = []
+        for name in measure:
+            try:
+                parsed.append(note_to_midi(name))
+            except (ValueError, AttributeError):
+                findings.append(
+                    Finding(m_idx, f"m{m_idx} invalid note '{name}'", rule="syntax")
+                )
+        measure_notes.append(parsed)
+        notes.extend((m_idx, midi) for midi in parsed)
+
+    findings.extend(_check_motion(notes, max_leap, min_stepwise_ratio))
+    findings.extend(_check_cadences(data, measure_notes, key))
+    findings.extend(_check_key_range(data, notes, key))
+
+    issues = [f.message for f in findings]
+    strengths = []
+    if not issues:
+        strengths.append("Bass line passes deterministic partimento checks")
+    return {
+        "issues": issues,
+        "strengths": strengths,
+        "findings": [
+            {"rule": f.rule, "measure": f.measure, "message": f.message}
+            for f in findings
+        ],
+    }
@@ -0,0 +1,210 @@
+"""
+Local voice-leading repair for SATB realizations.
+
+Given a realization and its lint report, try small edits around each issue
+(re-voicing a sonority, octave displacement, swapping alto and tenor) and keep
+the ones that lower a cost made of remaining lint issues plus voice motion.
+The result is a patch in the same format `apply_patch` accepts.
+"""
+
+import re
+from time import perf_counter
+
+from lib.analysis.linting import lint_satb, select_rules
+from lib.analysis.rules import VOICES
+from lib.utils.music_utils import RANGE_MIDI, midi_to_note, note_to_midi, parse_key
+from lib.utils.voicing_utils import Chord, enumerate_voicings
+
+__all__ = ["repair_satb"]
+
+UPPER_VOICES = ("soprano", "alto", "tenor")
+ISSUE_COST = 100.0
+CHANGE_COST = 0.5
+
+_NAME_RE = re.compile(r"^(.*?)(-?\d+)$")
+
+
+def _midi(name: str) -> int | None:
+    try:
+        return note_to_midi(name)
+    except (ValueError, AttributeError):
+        return None
+
+
+def _notes(measure) -> list[str]:
+    """A measure's notes; a single note may be written as a bare string."""
+    return [measure] if isinstance(measure, str) else list(measure)
+
+
+def _pitch_spellings(names: list[str]) -> dict[int, str]:
+    """Map pitch class → spelling (without octave) for the given note names."""
+    spellings = {}
+    for name in names:
+        midi = _midi(name)
+        match = _NAME_RE.match(name.strip())
+        if midi is not None and match:
+            spellings.setdefault(midi % 12, match.group(1))
+    return spellings
+
+
+def _spell(midi: int, spellings: dict[int, str]) -> str:
+    spelling = spellings.get(midi % 12)
+    if spelling is None:
+        return midi_to_note(midi)
+    return midi_to_note(midi, letter=spelling[0])
+
+
+def _target_measures(report: dict) -> set[int]:
+    """0-based measures touched by findings that an upper voice can fix."""
+    targets = set()
+    for finding in report.get("findings", []):
+        if not set(finding.get("voices", ())) & set(UPPER_VOICES):
+            continue
+        measure = finding["measure"] - 1
+        targets.add(measure)
+        if finding["rule"] in ("parallels", "inner-parallels"):
+            targets.add(measure + 1)
+    return targets
+
+
+def _motion_cost(window: dict) -> float:
+    cost = 0.0
+    for voice in UPPER_VOICES:
+        flat = [_midi(n) for measure in window.get(voice, []) for n in measure]
+        flat = [m for m in flat if m is not None]
+        cost += sum(abs(b - a) for a, b in zip(flat, flat[1:]))
+    return cost
+
+
+def _candidates(data: dict, m: int, leading_tone: int | None):
+    """Yield {voice: new measure notes} edits for measure m."""
+    measures = {v: data[v][m] for v in VOICES if v in data and m < len(data[v])}
+
+    # Octave displacement of a single note, kept inside the voice range
+    for voice in UPPER_VOICES:
+        notes = measures.get(voice, [])
+        low, high = RANGE_MIDI[voice[0]]
+        for j, name in enumerate(notes):
+            midi, match = _midi(name), _NAME_RE.match(name.strip())
+            if midi is None or not match:
+                continue
+            for shift in (-12, 12):
+                if low <= midi + shift <= high:
+                    moved = f"{match.group(1)}{int(match.group(2)) + shift // 12}"
+                    yield {voice: notes[:j] + [moved] + notes[j + 1 :]}
+
+    counts = {len(notes) for notes in measures.values()}
+    if len(measures) != 4 or len(counts) != 1:
+        return
+
+    for j in range(counts.pop()):
+        names = [measures[v][j] for v in VOICES]
+        pitches = [_midi(n) for n in names]
+        if None in pitches:
+            continue
+
+        # Swap the inner voices
+        if pitches[2] != pitches[1]:
+            yield {
+                "alto": measures["alto"][:j] + [names[2]] + measures["alto"][j + 1 :],
+                "tenor": measures["tenor"][:j]
+                + [names[1]]
+                + measures["tenor"][j + 1 :],
+            }
+
+        # Re-voice the same pitch classes over the fixed bass
+        chord = Chord(pitches[3], frozenset(p % 12 for p in pitches))
+        voicings, _ = enumerate_voicings(chord, leading_tone, limit=16)
+        spellings = _pitch_spellings(names)
+        for voicing in voicings:
+            if list(voicing[:3]) == pitches[:3]:
+                continue
+            yield {
+                voice: measures[voice][:j]
+                + [_spell(int(voicing[k]), spellings)]
+                + measures[voice][j + 1 :]
+                for k, voice in enumerate(UPPER_VOICES)
+            }
+
+
+def repair_satb(
+    realization_json: dict,
+    lint_report: dict | None = None,
+    key: str | None = None,
+    rules=None,
+    skip_rules=None,
+    max_passes: int = 4,
+) -> dict:
+    """
+    Search small local edits that fix lint issues in an SATB realization.
+
+    Return {"suggested_patch": {...}, "issues_before": [...],
+    "issues_after": [...], "seconds": float}. The patch uses 0-based measure
+    indices and replaces whole measures of upper voices, as `apply_patch`
+    expects; it is empty when nothing could be improved.
+    """
+    start = perf_counter()
+    payload = realization_json.get("data", realization_json)
+    key = key or payload.get("key")
+    if lint_report is None:
+        lint_report = lint_satb(payload, rules=rules, skip_rules=skip_rules, key=key)
+
+    # Phrase rules look at the whole score and only ever blame the bass
+    window_rules = [
+        r.name for r in select_rules(rules, skip_rules) if r.scope != "phrase"
+    ]
+    parsed_key = parse_key(key)
+    leading_tone = (parsed_key[0] + 11) % 12 if parsed_key else None
+
+    data = {v: [_notes(m) for m in payload[v]] for v in VOICES if v in payload}
+    n_measures = max((len(m) for m in data.values()), default=0)
+
+    def window_cost(m: int, edit: dict | None = None) -> float:
+        lo, hi = max(0, m - 1), min(n_measures, m + 2)
+        window = {}
+        for voice, measures in data.items():
+            window[voice] = [
+                (edit[voice] if edit and voice in edit and i == m else measures[i])
+                for i in range(lo, min(hi, len(measures)))
+            ]
+        issues = len(lint_satb(window, rules=window_rules, key=key)["findings"])
+        changed = sum(len(notes) for notes in (edit or {}).values())
+        return ISSUE_COST * issues + _motion_cost(window) + CHANGE_COST * changed
+
+    report = lint_report
+    targets = _target_measures(report) if window_rules else set()
+    for _ in range(max_passes):
+        improved = False
+        for m in sorted(t for t in targets if 0 <= t < n_measures):
+            best_cost, best_edit = window_cost(m), None
+            for edit in _candidates(data, m, leading_tone):
+                cost = window_cost(m, edit)
+                if cost < best_cost - 1e-9:
+                    best_cost, best_edit = cost, edit
+            if best_edit:
+                for voice, notes in best_edit.items():
+                    data[voice][m] = notes
+                improved = True
+        report = lint_satb(data, rules=rules, skip_rules=skip_rules, key=key)
+        targets = _target_measures(report)
+        if not improved or not targets:
+            break
+
+    patch = {}
+    for voice in UPPER_VOICES:
+        if voice not in data:
+            continue
+        for m, notes in enumerate(data[voice]):
+            if notes != _notes(payload[voice][m]):
+                patch.setdefault(voice, {})[str(m)] = notes
+
+    # Only keep the patch if it actually reduces the number of issues
+    if len(report["issues"]) >= len(lint_report["issues"]):
+        patch, report = {}, lint_report
+
+    return {
+        "suggested_patch": patch,
+        "issues_before": lint_report["issues"],
+        "issues_after": report["issues"],
+        "seconds": round(perf_counter() - start, 6),
+    }
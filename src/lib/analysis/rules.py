@@ -0,0 +1,252 @@
+"""
+Voice-leading rules for the SATB linter.
+
+Every rule is a plain function registered under a name and a scope. The
+scope tells the engine in `lib.analysis.linting` what the rule is called with:
+
+- "note":       a single NoteEvent, once per note in every voice
+- "vertical":   a Vertical, the SATB sonority sounding at one onset
+- "transition": two consecutive Verticals
+- "phrase":     the list of Verticals between two cadences
+
+Rules yield Finding objects; the engine fills in the rule name.
+
+Only the rules registered with default=True (range, outer-voice parallels and
+doubled leading tones) run unless others are selected by name, by scope or
+with the "full" profile: chains gate their LLM review passes on lint issues,
+so every default rule costs review calls.
+"""
+
+from dataclasses import dataclass
+from typing import Callable
+
+from lib.utils.music_utils import RANGE_MIDI
+
+SCOPES = ("note", "vertical", "transition", "phrase")
+VOICES = ("soprano", "alto", "tenor", "bass")
+VOICE_PAIRS = [
+    (VOICES[i], VOICES[j]) for i in range(len(VOICES)) for j in range(i + 1, 4)
+]
+
+
+@dataclass
+class NoteEvent:
+    voice: str
+    measure: int
+    index: int
+    name: str
+    midi: int | None
+
+
+@dataclass
+class Vertical:
+    measure: int
+    offset: float
+    pitches: dict[str, int]
+    attacks: frozenset[str] = frozenset()
+
+
+@dataclass
+class Finding:
+    measure: int
+    message: str
+    voices: tuple[str, ...] = ()
+    rule: str = ""
+
+
+@dataclass
+class LintContext:
+    key: tuple[int, str] | None = None
+    measures: int = 0
+
+
+@dataclass
+class Rule:
+    name: str
+    scope: str
+    func: Callable
+    description: str = ""
+    default: bool = True
+
+
+RULES: dict[str, Rule] = {}
+
+
+def register_rule(name: str, scope: str, description: str = "", default: bool = True):
+    """
+    Decorator adding a rule function to the registry. Rules with
+    default=False run only when selected.
+    """
+    if scope not in SCOPES:
+        raise ValueError(f"Unknown rule scope '{scope}'. Expected one of {SCOPES}.")
+
+    def decorator(func):
+        RULES[name] = Rule(
+            name, scope, func, description or (func.__doc__ or ""), default
+        )
+        return func
+
+    return decorator
+
+
+def _abbr(voice: str) -> str:
+    return voice[0].upper()
+
+
+# ============== Note rules ==============
+
+
+@register_rule("note-syntax", "note", "Note names must parse to a pitch", default=False)
+def check_note_syntax(ctx: LintContext, ev: NoteEvent):
+    if ev.midi is None:
+        yield Finding(
+            ev.measure,
+            f"{_abbr(ev.voice)} m{ev.measure} invalid note '{ev.name}'",
+            (ev.voice,),
+        )
+
+
+@register_rule("range", "note", "Each voice stays within its SATB range")
+def check_range(ctx: LintContext, ev: NoteEvent):
+    if ev.midi is None:
+        return
+    low, high = RANGE_MIDI[ev.voice[0]]
+    if not low <= ev.midi <= high:
+        yield Finding(
+            ev.measure, f"{_abbr(ev.voice)} m{ev.measure} out of range", (ev.voice,)
+        )
+
+
+# ============== Vertical rules ==============
+
+
+@register_rule(
+    "voice-crossing", "vertical", "Adjacent voices do not cross", default=False
+)
+def check_voice_crossing(ctx: LintContext, v: Vertical):
+    for upper, lower in zip(VOICES, VOICES[1:]):
+        if upper in v.pitches and lower in v.pitches:
+            if v.pitches[upper] < v.pitches[lower]:
+                yield Finding(
+                    v.measure,
+                    f"{_abbr(upper)}/{_abbr(lower)} m{v.measure} voice crossing",
+                    (upper, lower),
+                )
+
+
+@register_rule(
+    "spacing", "vertical", "Upper adjacent voices within an octave", default=False
+)
+def check_spacing(ctx: LintContext, v: Vertical):
+    for upper, lower in (("soprano", "alto"), ("alto", "tenor")):
+        if upper in v.pitches and lower in v.pitches:
+            if v.pitches[upper] - v.pitches[lower] > 12:
+                yield Finding(
+                    v.measure,
+                    f"{_abbr(upper)}/{_abbr(lower)} m{v.measure} spacing over an octave",
+                    (upper, lower),
+                )
+
+
+@register_rule("doubled-leading-tone", "vertical", "Leading tone is not doubled")
+def check_doubled_leading_tone(ctx: LintContext, v: Vertical):
+    if ctx.key is None:
+        return
+    leading_tone = (ctx.key[0] + 11) % 12
+    doubled = tuple(name for name, p in v.pitches.items() if p % 12 == leading_tone)
+    if len(doubled) > 1:
+        yield Finding(v.measure, f"m{v.measure} doubled leading tone", doubled)
+
+
+# ============== Transition rules ==============
+
+
+def _parallels(prev: Vertical, cur: Vertical, pairs):
+    for upper, lower in pairs:
+        if not all(v in prev.pitches and v in cur.pitches for v in (upper, lower)):
+            continue
+        move_upper = cur.pitches[upper] - prev.pitches[upper]
+        move_lower = cur.pitches[lower] - prev.pitches[lower]
+        if move_upper == 0 or move_lower == 0 or (move_upper > 0) != (move_lower > 0):
+            continue
+        before = (prev.pitches[upper] - prev.pitches[lower]) % 12
+        after = (cur.pitches[upper] - cur.pitches[lower]) % 12
+        if before == after and after in (0, 7):
+            name = "P8" if after == 0 else "P5"
+            yield Finding(
+                prev.measure,
+                f"{_abbr(upper)}/{_abbr(lower)} m{prev.measure} parallel {name}",
+                (upper, lower),
+            )
+
+
+@register_rule("parallels", "transition", "No parallel fifths or octaves in S/B")
+def check_parallels(ctx: LintContext, prev: Vertical, cur: Vertical):
+    yield from _parallels(prev, cur, [("soprano", "bass")])
+
+
+@register_rule(
+    "inner-parallels",
+    "transition",
+    "No parallel fifths or octaves between other voice pairs",
+    default=False,
+)
+def check_inner_parallels(ctx: LintContext, prev: Vertical, cur: Vertical):
+    yield from _parallels(
+        prev, cur, [pair for pair in VOICE_PAIRS if pair != ("soprano", "bass")]
+    )
+
+
+@register_rule(
+    "direct-outer", "transition", "No direct fifths/octaves in S/B", default=False
+)
+def check_direct_outer(ctx: LintContext, prev: Vertical, cur: Vertical):
+    if not all(v in prev.pitches and v in cur.pitches for v in ("soprano", "bass")):
+        return
+    move_s = cur.pitches["soprano"] - prev.pitches["soprano"]
+    move_b = cur.pitches["bass"] - prev.pitches["bass"]
+    if move_s == 0 or move_b == 0 or (move_s > 0) != (move_b > 0) or abs(move_s) <= 2:
+        return
+    before = (prev.pitches["soprano"] - prev.pitches["bass"]) % 12
+    after = (cur.pitches["soprano"] - cur.pitches["bass"]) % 12
+    if after in (0, 7) and before != after:
+        name = "P8" if after == 0 else "P5"
+        yield Finding(
+            cur.measure, f"S/B m{cur.measure} direct {name}", ("soprano", "bass")
+        )
+
+
+@register_rule(
+    "melodic-leap", "transition", "No melodic leaps beyond an octave", default=False
+)
+def check_melodic_leap(ctx: LintContext, prev: Vertical, cur: Vertical):
+    for voice in cur.attacks:
+        if voice in prev.pitches and voice in cur.pitches:
+            if abs(cur.pitches[voice] - prev.pitches[voice]) > 12:
+                yield Finding(
+                    cur.measure,
+                    f"{_abbr(voice)} m{cur.measure} leap larger than an octave",
+                    (voice,),
+                )
+
+
+# ============== Phrase rules ==============
+
+
+@register_rule(
+    "phrase-cadence", "phrase", "Phrases end on tonic or dominant bass", default=False
+)
+def check_phrase_cadence(ctx: LintContext, phrase: list[Vertical]):
+    if ctx.key is None or not phrase:
+        return
+    last = phrase[-1]
+    if "bass" not in last.pitches:
+        return
+    tonic = ctx.key[0]
+    if last.pitches["bass"] % 12 not in (tonic, (tonic + 7) % 12):
+        first = phrase[0].measure
+        yield Finding(
+            last.measure,
+            f"m{first}-{last.measure} phrase ends without a cadence",
+            ("bass",),
+        )
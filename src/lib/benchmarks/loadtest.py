@@ -0,0 +1,435 @@
+"""
+Load test for the chain commands with a modeled LLM.
+
+`chain-realization` and `chain-partimento-only` are run many at a time in
+worker processes (one chain in flight per process, as with queue workers or
+parallel CLI calls), all writing to one shared chain root. Each worker's
+`call_llm` is replaced by `StubLLM`, which sleeps for a latency drawn from a
+configurable distribution and then returns a canned, valid payload for the
+prompt it was given (synthetic partimento, SATB realization or review).
+
+Every chain runs under the stage profiler, so the report breaks latency down
+per stage (llm, exporters, score.write, timidity, json I/O) as well as per
+chain. For each concurrency level `run_load_test` reports throughput, latency
+percentiles, failures and resource usage (CPU time and utilization, peak child
+RSS, peak process count, bytes written).
+"""
+
+import json
+import logging
+import os
+import random
+import resource
+import shutil
+import statistics
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from lib.benchmarks.synthetic import synthetic_partimento, synthetic_satb
+from lib.utils.profiling import profile_stage
+
+__all__ = [
+    "LOAD_TEST_MODES",
+    "StubLLM",
+    "parse_latency",
+    "percentiles",
+    "run_load_test",
+]
+
+LOAD_TEST_MODES = ("chain-realization", "chain-partimento-only")
+PERCENTILES = (50, 90, 95, 99)
+
+
+def parse_latency(spec: str):
+    """
+    Parse a latency distribution into a sampler rng → seconds:
+
+        constant:1.5        always 1.5 s
+        uniform:0.5,3       uniform between 0.5 and 3 s
+        normal:2,0.5        mean 2, standard deviation 0.5 (clipped at 0)
+        lognormal:2,0.6     median 2 s, log-space sigma 0.6 (long tail)
+        exponential:2       mean 2 s
+    """
+    kind, _, params = spec.partition(":")
+    try:
+        values = [float(v) for v in params.split(",") if v.strip()]
+    except ValueError:
+        raise ValueError(f"Invalid latency parameters: {spec!r}") from None
+    samplers = {
+        "constant": (1, lambda rng, v: v[0]),
+        "uniform": (2, lambda rng, v: rng.uniform(v[0], v[1])),
+        "normal": (2, lambda rng, v: max(rng.gauss(v[0], v[1]), 0.0)),
+        "lognormal": (2, lambda rng, v: v[0] * rng.lognormvariate(0, v[1])),
+        "exponential": (1, lambda rng, v: rng.expovariate(1 / v[0])),
+    }
+    if kind not in samplers or len(values) != samplers[kind][0]:
+        raise ValueError(
+            f"Invalid latency {spec!r}; use one of: "
+            "constant:S, uniform:A,B, normal:MU,SD, lognormal:MEDIAN,SIGMA, "
+            "exponential:MEAN"
+        )
+    sampler = samplers[kind][1]
+    return lambda rng: sampler(rng, values)
+
+
+class StubLLM:
+    """
+    Drop-in `call_llm` that answers after a modeled latency with canned
+    payloads. Each generate call returns a new synthetic partimento (and the
+    realize calls after it its realization), so exports are not served from
+    the blob store. Reviews suggest a one-measure patch with probability
+    patch_rate, so the patch/delta/re-export path is exercised too. The
+    synthetic scores pass the linters, so reviews only run when the chains
+    get --always-review (run_load_test passes it when patch_rate > 0).
+    """
+
+    def __init__(
+        self,
+        latency: str = "constant:0",
+        measures: int = 16,
+        patch_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        from genres.partimento import prompts
+
+        self._sample = parse_latency(latency)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.measures = measures
+        self._next_seed = seed
+        self.partimento = self.satb = None
+        self.patch_rate = patch_rate
+        self.calls = []
+        self._kinds = {
+            prompts.PARTIMENTO_REALIZE_SATB_SYSTEM_PROMPT: "realize",
+            prompts.REVIEW_SATB_SYSTEM_PROMPT: "review-realization",
+            prompts.REVIEW_PARTIMENTO_SYSTEM_PROMPT: "review-partimento",
+        }
+
+    def _review(self, kind: str) -> dict:
+        review = {
+            "message": "Stub review: clean voice leading.",
+            "issues": [],
+            "strengths": ["stub"],
+        }
+        with self._lock:
+            patched = self._rng.random() < self.patch_rate
+        if patched:
+            if kind == "review-partimento":
+                review["suggested_patch"] = {
+                    "bassline": {"1": self.partimento["bassline"][1]}
+                }
+            else:
+                review["suggested_patch"] = {"alto": {"1": self.satb["alto"][1]}}
+        return review
+
+    def __call__(self, system_prompt: str, user_prompt: str) -> str:
+        kind = self._kinds.get(system_prompt, "generate")
+        with self._lock:
+            delay = self._sample(self._rng)
+        with profile_stage("llm"):
+            time.sleep(delay)
+        self.calls.append((kind, delay))
+        if kind == "generate" or self.partimento is None:
+            with self._lock:
+                seed, self._next_seed = self._next_seed, self._next_seed + 1
+            self.partimento = synthetic_partimento(self.measures, seed)
+            self.satb = synthetic_satb(self.measures, seed)
+        if kind == "generate":
+            return json.dumps(self.partimento)
+        if kind == "realize":
+            return json.dumps(self.satb)
+        return json.dumps(self._review(kind))
+
+
+def percentiles(values: list[float]) -> dict:
+    """p50/p90/p95/p99, mean and max of a sample (nearest rank)."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    result = {
+        f"p{p}": ordered[
+            min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+        ]
+        for p in PERCENTILES
+    }
+    result["mean"] = statistics.fmean(ordered)
+    result["max"] = ordered[-1]
+    return result
+
+
+# ----------------------------------------------------------------------
+# Worker processes
+# ----------------------------------------------------------------------
+
+_worker_llm = None
+
+
+def _init_worker(llm_options: dict) -> None:
+    global _worker_llm
+    import cli.handlers.partimento as handlers
+
+    logging.disable(logging.CRITICAL)
+    options = dict(llm_options)
+    # Distinct scores per worker; 100000 chains per worker before overlap
+    options["seed"] = options.get("seed", 0) + os.getpid() * 100_000
+    os.environ["YANTRA_CATALOG"] = options.pop("catalog")
+    _worker_llm = StubLLM(**options)
+    handlers.call_llm = _worker_llm
+
+
+def _stage_seconds(stage: dict, totals: dict, inside: frozenset = frozenset()):
+    """
+    Sum the explicit (non log_step) stages of a profile tree by name. A stage
+    nested in one of the same name (a delta read inside a read) is not
+    counted twice.
+    """
+    for child in stage["children"]:
+        name = child["name"]
+        if not child.get("log_step") and name not in inside:
+            totals[name] = totals.get(name, 0.0) + child["seconds"]
+        _stage_seconds(child, totals, inside | {name})
+
+
+def _run_chain(mode: str, output: str, extra_args: list[str]) -> dict:
+    from cli.handlers import load_handler
+    from cli.main import build_parser, drain_background
+    from lib.utils.profiling import Profiler, profile_stage
+
+    if mode == "chain-realization":
+        extra_args = [*extra_args, "--no-play"]
+    args = build_parser().parse_args(
+        [mode, "load test chain", "--output", output, *extra_args]
+    )
+    handler = load_handler(mode)
+    calls_before = len(_worker_llm.calls)
+    started = time.perf_counter()
+    error = None
+    profiler = Profiler(mode)
+    try:
+        with profiler:
+            try:
+                result = handler(args)
+            finally:
+                # Chain latency includes its audio, rendered in the background
+                with profile_stage("audio wait"):
+                    drain_background()
+        if result is False:
+            error = f"{mode} failed (see its log)"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=3)}"
+    seconds = time.perf_counter() - started
+
+    stages = {}
+    _stage_seconds(profiler.report()["stages"], stages)
+    llm_calls = _worker_llm.calls[calls_before:]
+    kinds = {}
+    for kind, _ in llm_calls:
+        kinds[kind] = kinds.get(kind, 0) + 1
+    return {
+        "seconds": seconds,
+        "stages": stages,
+        "llm_calls": kinds,
+        "llm_seconds": sum(delay for _, delay in llm_calls),
+        "error": error,
+    }
+
+
+# ----------------------------------------------------------------------
+# Resource sampling
+# ----------------------------------------------------------------------
+
+
+def _descendants(root_pid: int) -> int:
+    """Number of live descendant processes of root_pid (Linux /proc only)."""
+    parents = {}
+    try:
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+                parents[int(entry)] = int(fields[1])
+            except (OSError, IndexError, ValueError):
+                continue
+    except OSError:
+        return 0
+    count, frontier = 0, {root_pid}
+    while frontier:
+        children = {pid for pid, ppid in parents.items() if ppid in frontier}
+        count += len(children)
+        frontier = children
+    return count
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, interval: float = 0.25):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.peak_processes = 0
+        self.load = []
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.peak_processes = max(self.peak_processes, _descendants(os.getpid()))
+            if hasattr(os, "getloadavg"):
+                self.load.append(os.getloadavg()[0])
+
+
+def _tree_bytes(root: str) -> tuple[int, int]:
+    files = size = 0
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            try:
+                size += os.path.getsize(os.path.join(dirpath, name))
+                files += 1
+            except OSError:
+                continue
+    return files, size
+
+
+# ----------------------------------------------------------------------
+# Driver
+# ----------------------------------------------------------------------
+
+
+def _run_level(
+    concurrency: int,
+    chains: int,
+    modes: list[str],
+    root: str,
+    llm_options: dict,
+    extra_args: list[str],
+) -> dict:
+    os.makedirs(root, exist_ok=True)
+    llm_options = dict(llm_options, catalog=os.path.join(root, "catalog.sqlite"))
+    usage_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    sampler = _Sampler()
+    sampler.start()
+    started = time.perf_counter()
+    runs = []
+    with ProcessPoolExecutor(
+        max_workers=concurrency, initializer=_init_worker, initargs=(llm_options,)
+    ) as pool:
+        futures = {
+            pool.submit(
+                _run_chain,
+                modes[i % len(modes)],
+                os.path.join(root, f"chain_{i:05d}"),
+                extra_args,
+            ): modes[i % len(modes)]
+            for i in range(chains)
+        }
+        for future in as_completed(futures):
+            try:
+                run = future.result()
+            except Exception as e:  # the worker process itself died
+                run = {"seconds": 0.0, "stages": {}, "error": repr(e)}
+            run["mode"] = futures[future]
+            runs.append(run)
+    wall = time.perf_counter() - started
+    sampler.stopped.set()
+    sampler.join()
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    ok = [r for r in runs if not r["error"]]
+    cpu = (usage.ru_utime - usage_before.ru_utime) + (
+        usage.ru_stime - usage_before.ru_stime
+    )
+    files, size = _tree_bytes(root)
+    stage_names = sorted({name for r in ok for name in r["stages"]})
+    return {
+        "concurrency": concurrency,
+        "chains": chains,
+        "completed": len(ok),
+        "failed": len(runs) - len(ok),
+        "errors": sorted({r["error"].splitlines()[0] for r in runs if r["error"]}),
+        "wall_seconds": wall,
+        "throughput_per_minute": len(ok) * 60 / wall if wall else 0.0,
+        "chain_latency": percentiles([r["seconds"] for r in ok]),
+        "llm_latency": percentiles([r["llm_seconds"] for r in ok]),
+        "llm_calls": {
+            kind: sum(r["llm_calls"].get(kind, 0) for r in ok)
+            for kind in sorted({kind for r in ok for kind in r["llm_calls"]})
+        },
+        "stages": {
+            name: percentiles([r["stages"].get(name, 0.0) for r in ok])
+            for name in stage_names
+        },
+        "resources": {
+            "cpu_seconds": cpu,
+            "cpu_utilization": cpu / (wall * (os.cpu_count() or 1)) if wall else 0.0,
+            "max_child_rss_mb": usage.ru_maxrss / 1024,
+            "peak_processes": sampler.peak_processes,
+            "peak_load": max(sampler.load, default=None),
+            "files_written": files,
+            "bytes_written": size,
+        },
+    }
+
+
+def run_load_test(
+    concurrency_levels=(1, 8),
+    chains: int | None = None,
+    modes=LOAD_TEST_MODES,
+    root: str = "generated/loadtest",
+    latency: str = "lognormal:1.0,0.5",
+    measures: int = 16,
+    patch_rate: float = 0.0,
+    always_review: bool = False,
+    keep: bool = False,
+    seed: int = 0,
+    progress=None,
+) -> dict:
+    """
+    Sweep the concurrency levels, running `chains` chains at each (default:
+    twice the level) and return {"config", "levels": [...]}. Chain output
+    goes to <root>/c<level>/ and is deleted afterwards unless keep=True.
+    always_review (implied by patch_rate > 0) runs the partimento and
+    realization reviews of every chain, linter clean or not.
+    """
+    unknown = set(modes) - set(LOAD_TEST_MODES)
+    if unknown:
+        raise ValueError(f"Unknown load test modes: {', '.join(sorted(unknown))}")
+    parse_latency(latency)  # fail before starting any process
+    llm_options = {
+        "latency": latency,
+        "measures": measures,
+        "patch_rate": patch_rate,
+        "seed": seed,
+    }
+    always_review = always_review or patch_rate > 0
+    extra_args = ["--always-review"] if always_review else []
+
+    levels = []
+    for concurrency in concurrency_levels:
+        level_root = os.path.join(root, f"c{concurrency}")
+        if os.path.exists(level_root):
+            shutil.rmtree(level_root)
+        level = _run_level(
+            concurrency,
+            chains or 2 * concurrency,
+            list(modes),
+            level_root,
+            llm_options,
+            extra_args,
+        )
+        if not keep:
+            shutil.rmtree(level_root, ignore_errors=True)
+        levels.append(level)
+        if progress:
+            progress(level)
+    return {
+        "config": dict(
+            llm_options,
+            modes=list(modes),
+            chains=chains,
+            always_review=always_review,
+            cpus=os.cpu_count(),
+        ),
+        "levels": levels,
+    }
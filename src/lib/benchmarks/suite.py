@@ -0,0 +1,310 @@
+"""
+Benchmark suite for the export, lint and conversion hot paths.
+
+Each case times one function on the synthetic scores of `synthetic.py` at
+every requested size. One untraced warm-up run is followed by one run under
+tracemalloc for the peak memory and `repeat` timed runs. Results are plain
+JSON, so a run saved as a baseline can be compared with a later run by
+`compare_results`, which flags cases that got slower (or hungrier) by more
+than a threshold.
+"""
+
+import copy
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable
+
+from lib.benchmarks.synthetic import (
+    BENCHMARK_SIZES,
+    synthetic_partimento,
+    synthetic_satb,
+)
+
+__all__ = [
+    "BENCHMARK_CASES",
+    "compare_results",
+    "load_results",
+    "run_benchmarks",
+    "save_results",
+]
+
+DEFAULT_THRESHOLD = 0.20
+# Differences below these are noise, whatever the ratio
+MIN_SECONDS = 0.002
+MIN_BYTES = 64 * 1024
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    # setup(fixture) → args for run; fixture holds the scores and their paths
+    setup: Callable[[dict], tuple]
+    run: Callable
+    # Called before every run, outside the timing (e.g. to defeat caches)
+    prepare: Callable[[tuple], None] | None = None
+
+
+def _json_to_musicxml(satb):
+    from lib.utils.musicxml_utils import json_to_musicxml
+
+    return json_to_musicxml(satb)
+
+
+def _lint_satb(satb):
+    from lib.analysis.linting import lint_satb
+
+    return lint_satb(satb)
+
+
+def _apply_patch(satb, patch):
+    from lib.utils.json_utils import apply_patch
+
+    return apply_patch(satb, patch)
+
+
+def _load_musicxml(path):
+    from lib.utils.musicxml_utils import load_musicxml
+
+    return load_musicxml(path, cache=False)
+
+
+def _load_musicxml_cached(path):
+    from lib.utils.musicxml_utils import load_musicxml
+
+    return load_musicxml(path)
+
+
+def _exporter(name):
+    def run(json_path, output_path):
+        from genres.partimento.tasks import export
+
+        return getattr(export, name)(json_path, output_path)
+
+    run.__name__ = name
+    return run
+
+
+def _patch_for(satb: dict) -> dict:
+    """Rewrite every eighth measure of the inner voices with itself."""
+    return {
+        voice: {str(i): list(m) for i, m in enumerate(satb[voice]) if i % 8 == 3}
+        for voice in ("alto", "tenor")
+    }
+
+
+def _touch(args) -> None:
+    # A source newer than music21's pickle forces a real parse
+    os.utime(args[0], None)
+
+
+BENCHMARK_CASES = [
+    BenchmarkCase("json_to_musicxml", lambda f: (f["satb"],), _json_to_musicxml),
+    BenchmarkCase(
+        "export_partimento_to_musicxml",
+        lambda f: (f["partimento_path"], f["out"] + ".musicxml"),
+        _exporter("export_partimento_to_musicxml"),
+    ),
+    BenchmarkCase(
+        "export_partimento_to_midi",
+        lambda f: (f["partimento_path"], f["out"] + ".mid"),
+        _exporter("export_partimento_to_midi"),
+    ),
+    BenchmarkCase(
+        "export_realized_partimento_to_musicxml",
+        lambda f: (f["satb_path"], f["out"] + ".musicxml"),
+        _exporter("export_realized_partimento_to_musicxml"),
+    ),
+    BenchmarkCase(
+        "export_realized_partimento_to_midi",
+        lambda f: (f["satb_path"], f["out"] + ".mid"),
+        _exporter("export_realized_partimento_to_midi"),
+    ),
+    BenchmarkCase("lint_satb", lambda f: (f["satb"],), _lint_satb),
+    BenchmarkCase(
+        "apply_patch",
+        lambda f: (copy.deepcopy(f["satb"]), _patch_for(f["satb"])),
+        _apply_patch,
+    ),
+    BenchmarkCase(
+        "load_musicxml",
+        lambda f: (f["musicxml_path"],),
+        _load_musicxml,
+        prepare=_touch,
+    ),
+    BenchmarkCase(
+        "load_musicxml_cached",
+        lambda f: (f["musicxml_path"],),
+        _load_musicxml_cached,
+        prepare=_touch,
+    ),
+]
+
+
+def _fixture(measures: int, seed: int, directory: str) -> dict:
+    partimento = synthetic_partimento(measures, seed)
+    satb = synthetic_satb(measures, seed)
+    fixture = {
+        "partimento": partimento,
+        "satb": satb,
+        "partimento_path": os.path.join(directory, "partimento_01.json"),
+        "satb_path": os.path.join(directory, "realized_01.json"),
+        "musicxml_path": os.path.join(directory, "source.musicxml"),
+        "out": os.path.join(directory, "out"),
+    }
+    for key, data in (("partimento_path", partimento), ("satb_path", satb)):
+        with open(fixture[key], "w") as f:
+            json.dump({"data": data}, f)
+    _exporter("export_realized_partimento_to_musicxml")(
+        fixture["satb_path"], fixture["musicxml_path"]
+    )
+    return fixture
+
+
+def _measure(case: BenchmarkCase, args: tuple, repeat: int) -> dict:
+    if case.prepare:
+        case.prepare(args)
+    case.run(*args)  # warm-up: imports, lazy initialization
+
+    if case.prepare:
+        case.prepare(args)
+    tracemalloc.start()
+    try:
+        case.run(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    runs = []
+    for _ in range(max(repeat, 1)):
+        if case.prepare:
+            case.prepare(args)
+        started = time.perf_counter()
+        case.run(*args)
+        runs.append(time.perf_counter() - started)
+    return {
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.fmean(runs),
+        "runs": runs,
+        "peak_bytes": peak,
+    }
+
+
+def run_benchmarks(
+    sizes=BENCHMARK_SIZES,
+    cases=None,
+    repeat: int = 3,
+    seed: int = 0,
+    progress: Callable[[str, int, dict], None] | None = None,
+) -> dict:
+    """
+    Time every case (or the named ones) at every size. Return a results
+    document {"created_at", "environment", "repeat", "seed", "results"}
+    with one entry per "case[size]".
+    """
+    selected = [c for c in BENCHMARK_CASES if not cases or c.name in cases]
+    unknown = set(cases or []) - {c.name for c in BENCHMARK_CASES}
+    if unknown:
+        raise ValueError(f"Unknown benchmark cases: {', '.join(sorted(unknown))}")
+
+    results = {}
+    for measures in sizes:
+        with tempfile.TemporaryDirectory(prefix="yantra-bench-") as directory:
+            fixture = _fixture(measures, seed, directory)
+            for case in selected:
+                result = _measure(case, case.setup(fixture), repeat)
+                result.update(case=case.name, measures=measures)
+                results[f"{case.name}[{measures}]"] = result
+                if progress:
+                    progress(case.name, measures, result)
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": _environment(),
+        "repeat": repeat,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def _environment() -> dict:
+    import music21
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "music21": music21.__version__,
+    }
+
+
+def save_results(results: dict, path) -> None:
+    directory = os.path.dirname(str(path))
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def compare_results(
+    baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD
+) -> list[dict]:
+    """
+    Compare two results documents case by case on median time and peak
+    memory. Each row's status is "slower", "more-memory", "faster", "ok",
+    "new" or "missing"; the first two are regressions.
+    """
+    before, after = baseline["results"], current["results"]
+    rows = []
+    for name in sorted(set(before) | set(after), key=_sort_key):
+        old, new = before.get(name), after.get(name)
+        row = {"benchmark": name}
+        if old is None or new is None:
+            row["status"] = "new" if old is None else "missing"
+            rows.append(row)
+            continue
+        time_ratio = new["median"] / old["median"] if old["median"] else 1.0
+        memory_ratio = (
+            new["peak_bytes"] / old["peak_bytes"] if old["peak_bytes"] else 1.0
+        )
+        row.update(
+            baseline=old["median"],
+            current=new["median"],
+            ratio=time_ratio,
+            baseline_peak=old["peak_bytes"],
+            current_peak=new["peak_bytes"],
+            memory_ratio=memory_ratio,
+        )
+        if time_ratio > 1 + threshold and new["median"] - old["median"] > MIN_SECONDS:
+            row["status"] = "slower"
+        elif (
+            memory_ratio > 1 + threshold
+            and new["peak_bytes"] - old["peak_bytes"] > MIN_BYTES
+        ):
+            row["status"] = "more-memory"
+        elif (
+            time_ratio < 1 / (1 + threshold)
+            and old["median"] - new["median"] > MIN_SECONDS
+        ):
+            row["status"] = "faster"
+        else:
+            row["status"] = "ok"
+        rows.append(row)
+    return rows
+
+
+def _sort_key(name: str):
+    case, _, size = name.rstrip("]").partition("[")
+    return case, int(size) if size.isdigit() else 0
@@ -0,0 +1,98 @@
+"""
+Deterministic synthetic scores for benchmarks.
+
+`synthetic_partimento(measures, seed)` writes eight-measure phrases of
+stepwise and fourth/fifth bass motion ending in a V–I cadence, with one or
+two figured notes per measure, in a key chosen by the seed. Its
+`synthetic_satb` realization comes from the local voice-leading search, so it
+is shaped like an LLM realization and passes the linter. The same size and seed
+always give the same score.
+"""
+
+import random
+
+from genres.partimento.tasks.realize_local import (
+    LETTERS,
+    MAJOR_STEPS,
+    MINOR_STEPS,
+    realize_partimento_local,
+)
+from lib.utils.music_utils import midi_to_note, note_to_midi
+
+__all__ = ["BENCHMARK_SIZES", "synthetic_partimento", "synthetic_satb"]
+
+BENCHMARK_SIZES = (8, 64, 512, 4096)
+KEYS = ("C major", "G major", "F major", "D minor", "A minor", "E minor")
+PHRASE = 8
+BASS_LOW, BASS_HIGH = note_to_midi("E2"), note_to_midi("C4")
+
+# Scale degree (0 = tonic) → figures, after the rule of the octave
+_DEGREE_FIGURES = {0: [], 1: ["6"], 2: ["6"], 3: [], 4: [], 5: ["6"], 6: ["6"]}
+_MOVES = (-1, 1) * 6 + (2, -2, 3, -3)
+
+
+def _spell(degree: int, key: str, previous: int | None) -> str:
+    """Bass note for a scale degree, in range and close to the previous note."""
+    tonic, mode = key.split()
+    steps = MAJOR_STEPS if mode == "major" else MINOR_STEPS
+    letter = LETTERS[(LETTERS.index(tonic[0]) + degree) % 7]
+    pc = (note_to_midi(f"{tonic}4") + steps[degree]) % 12
+    if mode == "minor" and degree == 6:
+        pc = (pc + 1) % 12  # leading tone
+    candidates = [m for m in range(BASS_LOW, BASS_HIGH + 1) if m % 12 == pc]
+    target = previous if previous is not None else (BASS_LOW + BASS_HIGH) // 2
+    return midi_to_note(min(candidates, key=lambda m: abs(m - target)), letter)
+
+
+def synthetic_partimento(measures: int, seed: int = 0) -> dict:
+    """A valid partimento JSON payload of the given length."""
+    rng = random.Random(f"partimento-{measures}-{seed}")
+    key = rng.choice(KEYS)
+    bassline, figures, cadences = [], [], []
+    previous = None
+    degree = 0
+    for index in range(measures):
+        position = index % PHRASE
+        if position == PHRASE - 2 or index == measures - 2:
+            degrees = [4]  # dominant before the cadence
+        elif position == PHRASE - 1 or index == measures - 1:
+            degrees = [0]
+            cadences.append(f"measure {index + 1}: authentic cadence")
+        elif position == 0:
+            degrees = [0]
+        else:
+            count = rng.choice((1, 1, 2))
+            degrees = []
+            for _ in range(count):
+                degree = (degree + rng.choice(_MOVES)) % 7
+                degrees.append(degree)
+        degree = degrees[-1]
+
+        notes, figs = [], []
+        for d in degrees:
+            name = _spell(d, key, previous)
+            previous = note_to_midi(name)
+            notes.append(name)
+            figs.append(
+                ["7"] if d == 4 and position == PHRASE - 2 else _DEGREE_FIGURES[d]
+            )
+        bassline.append(notes)
+        figures.append(figs)
+
+    return {
+        "title": f"Synthetic Partimento ({measures} measures)",
+        "key": key,
+        "style": "Synthetic",
+        "bassline": bassline,
+        "figures": figures,
+        "cadences": cadences,
+    }
+
+
+def synthetic_satb(measures: int, seed: int = 0) -> dict:
+    """A valid SATB realization of synthetic_partimento(measures, seed)."""
+    partimento = synthetic_partimento(measures, seed)
+    realized = realize_partimento_local(partimento)
+    realized.setdefault("title", partimento["title"])
+    realized.setdefault("key", partimento["key"])
+    return realized
@@ -1,34 +1,44 @@
 import logging
 import os
 from datetime import datetime
+from functools import lru_cache
 
-import firebase_admin
 from colorama import Fore
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 
-from firebase_admin import credentials, firestore, storage
-
 load_dotenv()
 
 COLLECTION_ID = "realizations_v1"
-STORAGE_BUCKET = os.getenv("FIREBASE_STORAGE_BUCKET")
-
-if not STORAGE_BUCKET:
-    raise ValueError("FIREBASE_STORAGE_BUCKET environment variable is not set.")
 
 _service_key_path = os.path.join(
     os.path.dirname(__file__), "../../serviceAccountKey.json"
 )
 
 
-if not firebase_admin._apps:
-    cred = credentials.Certificate(_service_key_path)
-    firebase_admin.initialize_app(cred, {"storageBucket": STORAGE_BUCKET})
+@lru_cache(maxsize=1)
+def get_clients():
+    """
+    Initialize firebase_admin on first use and return (Firestore client,
+    Storage bucket). Importing this module needs no credentials.
+    """
+    import firebase_admin
+    from firebase_admin import credentials, firestore, storage
+
+    storage_bucket = os.getenv("FIREBASE_STORAGE_BUCKET")
+    if not storage_bucket:
+        raise ValueError("FIREBASE_STORAGE_BUCKET environment variable is not set.")
+
+    if not firebase_admin._apps:
+        cred = credentials.Certificate(_service_key_path)
+        firebase_admin.initialize_app(cred, {"storageBucket": storage_bucket})
+    return firestore.client(), storage.bucket()
+
 
-db = firestore.client()
-bucket = storage.bucket()
+def get_bucket():
+    """The Storage bucket, for bulk uploads (see lib.utils.chain_push)."""
+    return get_clients()[1]
 
 
 # Upload a file to Cloud Storage and return its public URL
@@ -38,6 +48,7 @@ def upload_file_to_storage(local_path: str, remote_filename: str) -> str:
             Fore.YELLOW
             + f"📤 Uploading file to Firebase Storage: {local_path} → outputs/{remote_filename}"
         )
+        _, bucket = get_clients()
         blob = bucket.blob(f"outputs/{remote_filename}")
         blob.upload_from_filename(local_path)
         blob.make_public()
@@ -48,11 +59,12 @@ def upload_file_to_storage(local_path: str, remote_filename: str) -> str:
         raise
 
 
-# Save realization metadata to Firestore
-def save_realization_metadata(realization_data: dict) -> str:
+# Save realization metadata to Firestore; a given doc_id is overwritten
+def save_realization_metadata(realization_data: dict, doc_id: str | None = None) -> str:
     try:
         logger.info(Fore.YELLOW + "📝 Saving realization metadata to Firestore...")
-        doc_ref = db.collection(COLLECTION_ID).document()
+        db, _ = get_clients()
+        doc_ref = db.collection(COLLECTION_ID).document(doc_id)
         realization_data["created_at"] = datetime.utcnow().isoformat()
         doc_ref.set(realization_data)
         logger.info(Fore.GREEN + f"✅ Metadata saved. Document ID: {doc_ref.id}")
@@ -66,6 +78,7 @@ def save_realization_metadata(realization_data: dict) -> str:
 def fetch_all_realizations() -> list[dict]:
     try:
         logger.info(Fore.YELLOW + "📥 Fetching all realizations from Firestore...")
+        db, _ = get_clients()
         docs = db.collection(COLLECTION_ID).stream()
         results = []
         for doc in docs:
@@ -0,0 +1,290 @@
+"""
+Background audio rendering for chain exports.
+
+Chains hand their MIDI files to `render_audio` and carry on as soon as the
+JSON, MusicXML and MIDI exist; a bounded pool of worker threads renders the
+audio while the next LLM call is in flight. Each worker takes up to
+`batch_size` queued renders at a time and writes their results into the
+chain's metadata.json ("audio": {file name: "done" | "failed"}) with one
+update per chain directory.
+
+Renders are deduplicated by the sha256 of the MIDI file: a second request
+for identical MIDI (an unchanged review pass, or the final export of the
+last version) waits for the first render and links its output instead of
+rendering again. Across runs the blob store does the same via
+`export_cached`.
+
+The pool size comes from YANTRA_AUDIO_WORKERS (default: up to 4 threads);
+0 renders inline. The CLI waits for outstanding renders before it exits,
+see `drain`.
+"""
+
+import hashlib
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import wait as wait_futures
+from pathlib import Path
+
+from colorama import Fore
+
+from lib.utils.chain_manifest import MANIFEST_NAME
+from lib.utils.chain_utils import record_audio
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["AudioQueue", "default_queue", "drain", "render_audio"]
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_BATCH_SIZE = 8
+DEFAULT_MAX_PENDING = 64
+
+_STOP = object()
+
+
+def default_workers() -> int:
+    """Worker threads from YANTRA_AUDIO_WORKERS, else min(4, CPUs)."""
+    try:
+        return max(int(os.environ["YANTRA_AUDIO_WORKERS"]), 0)
+    except (KeyError, ValueError):
+        return min(DEFAULT_MAX_WORKERS, os.cpu_count() or 1)
+
+
+def _render_one(midi_path: str, audio_path: str) -> None:
+    from lib.utils.blob_store import export_cached
+    from lib.utils.music_utils import export_audio_from_midi
+
+    export_cached(export_audio_from_midi, midi_path, audio_path)
+
+
+def _midi_digest(midi_path: str, audio_path: str) -> str:
+    from lib.utils.music_utils import audio_backend
+
+    digest = hashlib.sha256(Path(midi_path).read_bytes())
+    digest.update(Path(audio_path).suffix.encode())
+    digest.update(audio_backend().encode())
+    return digest.hexdigest()
+
+
+def _link_or_copy(source: str, target: str) -> None:
+    tmp = f"{target}.{os.getpid()}.link"
+    try:
+        os.link(source, tmp)
+    except OSError:
+        shutil.copyfile(source, tmp)
+    os.replace(tmp, target)
+
+
+class AudioQueue:
+    """
+    A bounded pool of audio render workers. submit() blocks once
+    max_pending renders are waiting, so a fast producer cannot queue
+    unbounded work.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        render=_render_one,
+    ):
+        self.workers = default_workers() if workers is None else workers
+        self.batch_size = max(batch_size, 1)
+        self.render = render
+        self._jobs = queue.Queue(maxsize=max_pending)
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._renders: dict[str, Future] = {}  # MIDI digest → first render
+        self._outstanding: set[Future] = set()
+        self.stats = {"submitted": 0, "rendered": 0, "deduplicated": 0, "failed": 0}
+
+    def submit(self, midi_path, audio_path) -> Future:
+        """
+        Queue a render of midi_path to audio_path. The future resolves to
+        {"audio", "status", "seconds"} with status "done" or "failed".
+        """
+        midi_path, audio_path = os.path.abspath(midi_path), os.path.abspath(audio_path)
+        future = Future()
+        try:
+            key = _midi_digest(midi_path, audio_path)
+        except OSError:
+            future.set_result(self._finish(audio_path, "failed", 0.0))
+            return future
+
+        with self._lock:
+            self.stats["submitted"] += 1
+            self._outstanding.add(future)
+            future.add_done_callback(self._forget)
+            first = self._renders.get(key)
+            if first is not None and first.done():
+                # Render again if the earlier output has since been removed
+                if not os.path.exists(first.result()["audio"]):
+                    first = None
+            if first is None:
+                self._renders[key] = future
+            else:
+                self.stats["deduplicated"] += 1
+
+        if first is not None:
+            first.add_done_callback(
+                lambda done: self._copy_render(done, audio_path, future)
+            )
+        elif self.workers == 0:
+            self._run_batch([(midi_path, audio_path, future)])
+        else:
+            self._start()
+            self._jobs.put((midi_path, audio_path, future))
+        return future
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._outstanding)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait for every submitted render. Return False on timeout."""
+        with self._lock:
+            futures = list(self._outstanding)
+        _, not_done = wait_futures(futures, timeout=timeout)
+        return not not_done
+
+    def close(self) -> None:
+        """Finish queued renders and stop the workers."""
+        for _ in self._threads:
+            self._jobs.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _forget(self, future: Future) -> None:
+        with self._lock:
+            self._outstanding.discard(future)
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._worker, name=f"audio-render-{index}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _worker(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is _STOP:
+                return
+            batch = [job]
+            stop = False
+            # Share a backlog between the workers rather than one taking it all
+            limit = min(self.batch_size, self._jobs.qsize() // self.workers + 1)
+            while len(batch) < limit:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    stop = True
+                    break
+                batch.append(job)
+            self._run_batch(batch)
+            if stop:
+                return
+
+    def _run_batch(self, batch) -> None:
+        results = []
+        for midi_path, audio_path, future in batch:
+            start = time.perf_counter()
+            try:
+                self.render(midi_path, audio_path)
+                status = "done" if os.path.exists(audio_path) else "failed"
+            except Exception as e:
+                logger.warning(Fore.YELLOW + f"⚠️  Audio render failed: {e}")
+                status = "failed"
+            results.append(
+                (future, self._result(audio_path, status, time.perf_counter() - start))
+            )
+        self._record([result for _, result in results])
+        for future, result in results:
+            future.set_result(result)
+
+    def _copy_render(self, first: Future, audio_path: str, future: Future) -> None:
+        source = first.result()
+        status = "failed"
+        if source["status"] == "done" and source["audio"] != audio_path:
+            try:
+                _link_or_copy(source["audio"], audio_path)
+                status = "done"
+            except OSError as e:
+                logger.warning(Fore.YELLOW + f"⚠️  Could not link audio: {e}")
+        elif source["status"] == "done" and os.path.exists(audio_path):
+            status = "done"
+        future.set_result(self._finish(audio_path, status, 0.0))
+
+    def _result(self, audio_path: str, status: str, seconds: float) -> dict:
+        with self._lock:
+            self.stats["rendered" if status == "done" else "failed"] += 1
+        return {"audio": audio_path, "status": status, "seconds": seconds}
+
+    def _finish(self, audio_path: str, status: str, seconds: float) -> dict:
+        result = self._result(audio_path, status, seconds)
+        self._record([result])
+        return result
+
+    @staticmethod
+    def _record(results: list[dict]) -> None:
+        """Write results into each chain directory's metadata, once per chain."""
+        by_chain: dict[str, dict[str, str]] = {}
+        for result in results:
+            directory, name = os.path.split(result["audio"])
+            by_chain.setdefault(directory, {})[name] = result["status"]
+        for directory, statuses in by_chain.items():
+            if not (
+                os.path.exists(os.path.join(directory, MANIFEST_NAME))
+                or os.path.exists(os.path.join(directory, "metadata.json"))
+            ):
+                continue  # flat exports have no metadata
+            try:
+                record_audio(directory, statuses)
+            except OSError as e:
+                logger.warning(Fore.YELLOW + f"⚠️  Could not record audio: {e}")
+
+
+_default: AudioQueue | None = None
+_default_lock = threading.Lock()
+
+
+def default_queue() -> AudioQueue:
+    """The process-wide render queue, created on first use."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = AudioQueue()
+        return _default
+
+
+def render_audio(midi_path, audio_path) -> Future:
+    """Render midi_path to audio_path in the background."""
+    return default_queue().submit(midi_path, audio_path)
+
+
+def drain(timeout: float | None = None) -> bool:
+    """Wait for background renders (the CLI calls this before exiting)."""
+    if _default is None:
+        return True
+    pending = _default.pending()
+    if pending:
+        logger.info(
+            Fore.CYAN + f"⏳ Waiting for {pending} background audio render(s)..."
+        )
+    return _default.wait(timeout)
@@ -0,0 +1,276 @@
+"""
+Content-addressed blob store shared by chain directories.
+
+Exports (MusicXML, MIDI, audio) are stored once under `<root>/<aa>/<sha256>`
+and chain directories hold hardlinks to them, so identical exports written by
+different chains or review passes take the space of one file. A blob whose only
+remaining link is the store itself is unreferenced and removed by `gc`.
+
+`export_cached` keys each output blob on the hash of the exported data plus
+the exporter, and relinks the stored output instead of running the exporter
+again when nothing changed.
+
+The store lives next to the chains (`generated/chains/.blobs` for the default
+layout, so hardlinks stay on one filesystem) unless YANTRA_BLOBS points
+elsewhere; YANTRA_BLOBS=off disables it. Chains written with --output outside
+`generated/chains` get a store beside their own parent directory, which
+`gc-blobs` finds through the catalog (`stores_under`) or when given that
+parent as a root.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from lib.utils.chain_manifest import MANIFEST_NAME
+from lib.utils.chain_versions import load_chain_json
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "BlobStore",
+    "store_for",
+    "stores_under",
+    "export_cached",
+    "export_key",
+    "EXPORTER_VERSION",
+]
+
+BLOB_DIR = ".blobs"
+# Bump when exporter output changes so cached exports are not reused.
+EXPORTER_VERSION = "1"
+# Rendered with the backend YANTRA_AUDIO_BACKEND selects, which is part of the key
+AUDIO_SUFFIXES = (".wav", ".ogg", ".flac")
+
+
+def _input_digest(path) -> str:
+    """
+    Hash an export input. For chain JSON only the data block counts, since
+    the wrapper carries a fresh id and timestamp on every write.
+    """
+    if str(path).endswith(".json"):
+        try:
+            payload = load_chain_json(path)
+        except (OSError, json.JSONDecodeError, KeyError, AttributeError):
+            return _sha256_file(path)
+        data = payload.get("data", payload) if isinstance(payload, dict) else payload
+        text = json.dumps(data, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(text.encode()).hexdigest()
+    return _sha256_file(path)
+
+
+def _sha256_file(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BlobStore:
+    """A directory of files named by the sha256 of their contents."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def has(self, digest: str) -> bool:
+        return self.path(digest).exists()
+
+    def put_file(self, path, digest: str | None = None) -> str:
+        """
+        Store a file's contents and replace the file with a hardlink to the
+        blob. Return its digest. If hardlinking fails (another filesystem)
+        the file is left as a plain copy.
+        """
+        path = Path(path)
+        digest = digest or _sha256_file(path)
+        blob = self.path(digest)
+        if not blob.exists():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            tmp = blob.with_name(f".{digest}.{os.getpid()}.tmp")
+            shutil.copyfile(path, tmp)
+            os.chmod(tmp, 0o444)
+            os.replace(tmp, blob)
+        self.link(digest, path)
+        return digest
+
+    def link(self, digest: str, target) -> bool:
+        """Point target at a stored blob. Return False if it had to be copied."""
+        target = Path(target)
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.link")
+        try:
+            os.link(self.path(digest), tmp)
+        except OSError:
+            if not target.exists():
+                shutil.copyfile(self.path(digest), target)
+            return False
+        os.replace(tmp, target)
+        return True
+
+    # ------------------------------------------------------------------
+    # Derived outputs (exports keyed by input hash)
+    # ------------------------------------------------------------------
+
+    def _derived_path(self, key: str) -> Path:
+        return self.root / "derived" / hashlib.sha256(key.encode()).hexdigest()
+
+    def get_derived(self, key: str) -> str | None:
+        try:
+            digest = self._derived_path(key).read_text().strip()
+        except OSError:
+            return None
+        return digest if self.has(digest) else None
+
+    def set_derived(self, key: str, digest: str) -> None:
+        path = self._derived_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(digest)
+        os.replace(tmp, path)
+
+    # ------------------------------------------------------------------
+    # Garbage collection
+    # ------------------------------------------------------------------
+
+    def gc(self, min_age: float = 60.0, dry_run: bool = False) -> dict:
+        """
+        Remove blobs no chain links to any more (link count 1) that are older
+        than min_age seconds, and derived entries pointing at missing blobs.
+        Return {"blobs", "removed", "freed_bytes"}.
+        """
+        stats = {"blobs": 0, "removed": 0, "freed_bytes": 0}
+        now = time.time()
+        if not self.root.is_dir():
+            return stats
+        for shard in self.root.iterdir():
+            if not shard.is_dir() or len(shard.name) != 2:
+                continue
+            for blob in shard.iterdir():
+                if blob.name.startswith("."):
+                    continue
+                stats["blobs"] += 1
+                st = blob.stat()
+                if st.st_nlink > 1 or now - st.st_mtime < min_age:
+                    continue
+                stats["removed"] += 1
+                stats["freed_bytes"] += st.st_size
+                if not dry_run:
+                    blob.unlink()
+        derived = self.root / "derived"
+        if derived.is_dir() and not dry_run:
+            for entry in derived.iterdir():
+                try:
+                    if not self.has(entry.read_text().strip()):
+                        entry.unlink()
+                except OSError:
+                    continue
+        return stats
+
+
+def store_for(path) -> BlobStore | None:
+    """
+    Return the blob store serving the chain directory that contains path, or
+    None if the store is disabled or path is not inside a chain directory.
+    """
+    directory = Path(path).parent
+    setting = os.environ.get("YANTRA_BLOBS")
+    if setting is not None and setting.lower() in ("", "0", "off", "false"):
+        return None
+    if not (directory / MANIFEST_NAME).exists():
+        return None
+    root = Path(setting) if setting else directory.resolve().parent / BLOB_DIR
+    return BlobStore(root)
+
+
+def stores_under(roots, catalog: str | None = None) -> list[BlobStore]:
+    """
+    Blob stores serving the chains under roots and every chain in their
+    catalogs (or the given one), so chains written with --output elsewhere
+    are found as long as they were cataloged there. Empty if the store is
+    disabled.
+    """
+    from lib.utils.chain_catalog import ChainCatalog, default_catalog_path
+
+    setting = os.environ.get("YANTRA_BLOBS")
+    if setting is not None:
+        if setting.lower() in ("", "0", "off", "false"):
+            return []
+        return [BlobStore(setting)]
+    found = set()
+    for root in roots:
+        found.add(Path(root).resolve() / BLOB_DIR)
+        path = catalog or default_catalog_path(root)
+        if os.path.exists(path):
+            with ChainCatalog(path) as db:
+                rows = db.query(limit=-1)
+            found.update(Path(row["dir"]).parent / BLOB_DIR for row in rows)
+    return [BlobStore(root) for root in sorted(found) if root.is_dir()]
+
+
+def export_key(export_fn, input_path, output_path) -> str:
+    """
+    Identity of an export: input data hash, exporter (the function or its
+    dotted name), exporter version and, for audio, the render backend.
+    """
+    if isinstance(export_fn, str):
+        name = export_fn
+    else:
+        name = f"{export_fn.__module__}.{export_fn.__qualname__}"
+    suffix = Path(output_path).suffix
+    key = f"{_input_digest(input_path)}:{name}:{EXPORTER_VERSION}:{suffix}"
+    if suffix in AUDIO_SUFFIXES:
+        from lib.utils.music_utils import audio_backend
+
+        key += f":{audio_backend()}"
+    return key
+
+
+def export_cached(export_fn, input_path, output_path, force: bool = False) -> bool:
+    """
+    Run export_fn(input_path, output_path) unless a blob for the same input
+    and exporter already exists, in which case link it into place. With
+    force=True the exporter always runs and the stored blob is replaced.
+
+    Return True when the export was served from the store. Existing output
+    files are unlinked first so an exporter never writes through a hardlink
+    into a shared blob.
+    """
+    output_path = Path(output_path)
+    if output_path.exists() or output_path.is_symlink():
+        output_path.unlink()
+
+    store = store_for(output_path)
+    if store is None or not os.path.exists(input_path):
+        export_fn(str(input_path), str(output_path))
+        return False
+
+    key = export_key(export_fn, input_path, output_path)
+    digest = None if force else store.get_derived(key)
+    if digest:
+        store.link(digest, output_path)
+        return True
+
+    # Write next to the target, then move into place
+    fd, tmp = tempfile.mkstemp(
+        dir=output_path.parent, prefix=".export-", suffix=output_path.suffix
+    )
+    os.close(fd)
+    os.unlink(tmp)
+    try:
+        export_fn(str(input_path), tmp)
+        if not os.path.exists(tmp):
+            return False  # exporter skipped (e.g. no timidity)
+        os.replace(tmp, output_path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    store.set_derived(key, store.put_file(output_path))
+    return False
@@ -0,0 +1,182 @@
+"""
+Single-file chain archives.
+
+A `.ygchain` archive is a zip file holding every file of a chain directory.
+Its first member, `index.json`, is stored uncompressed and lists each
+member's size, sha256 and version kind together with the chain metadata, so
+describing an archive reads one small member and never inflates the rest.
+JSON, MusicXML and MIDI members are deflated; already-compressed audio is
+stored as is. Any member can be read on its own through the zip central
+directory.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import zipfile
+from pathlib import Path
+
+__all__ = [
+    "ARCHIVE_SUFFIX",
+    "ChainArchive",
+    "is_chain_archive",
+    "pack_chain",
+    "unpack_chain",
+]
+
+ARCHIVE_SUFFIX = ".ygchain"
+INDEX_NAME = "index.json"
+FORMAT_VERSION = 1
+
+_SKIP = {"manifest.lock"}
+_STORED_SUFFIXES = {".ogg", ".flac", ".mp3", ".png", ".jpg"}
+_VERSIONED_RE = re.compile(r"^(?P<kind>.+)_(?P<version>\d+)\.[^.]+$")
+
+
+def is_chain_archive(path) -> bool:
+    """
+    Return True if path is a packed chain archive: a zip file with an
+    index.json member, so .mxl scores and other zips are not mistaken for
+    one. Any file name is accepted, since `pack-chain -o` allows any.
+    """
+    if not os.path.isfile(path) or not zipfile.is_zipfile(path):
+        return False
+    try:
+        with zipfile.ZipFile(path) as archive:
+            archive.getinfo(INDEX_NAME)
+    except (KeyError, zipfile.BadZipFile, OSError):
+        return False
+    return True
+
+
+def _member_entry(name: str, content: bytes) -> dict:
+    match = _VERSIONED_RE.match(name)
+    return {
+        "name": name,
+        "size": len(content),
+        "sha256": hashlib.sha256(content).hexdigest(),
+        "kind": match["kind"] if match else Path(name).stem,
+        "version": int(match["version"]) if match else None,
+    }
+
+
+def pack_chain(directory, archive_path=None, remove: bool = False) -> Path:
+    """
+    Pack a chain directory into one archive (default: <directory>.ygchain).
+    With remove=True the directory is deleted once the archive is written.
+    """
+    directory = Path(directory)
+    if not (directory / "metadata.json").exists():
+        raise FileNotFoundError(f"No metadata.json in {directory}")
+    archive_path = Path(
+        archive_path or directory.parent / f"{directory.name}{ARCHIVE_SUFFIX}"
+    )
+
+    members = {}
+    for name in sorted(os.listdir(directory)):
+        path = directory / name
+        if name in _SKIP or name.startswith(".") or not path.is_file():
+            continue
+        members[name] = path.read_bytes()
+
+    index = {
+        "format": FORMAT_VERSION,
+        "chain": directory.name,
+        "metadata": json.loads(members["metadata.json"]),
+        "members": [_member_entry(n, c) for n, c in members.items()],
+    }
+
+    tmp = archive_path.with_name(f".{archive_path.name}.tmp")
+    with zipfile.ZipFile(tmp, "w") as zf:
+        zf.writestr(
+            INDEX_NAME,
+            json.dumps(index, separators=(",", ":")),
+            compress_type=zipfile.ZIP_STORED,
+        )
+        for name, content in members.items():
+            stored = Path(name).suffix in _STORED_SUFFIXES
+            zf.writestr(
+                name,
+                content,
+                compress_type=zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED,
+            )
+    os.replace(tmp, archive_path)
+
+    if remove:
+        shutil.rmtree(directory)
+    return archive_path
+
+
+def unpack_chain(archive_path, directory=None, verify: bool = True) -> Path:
+    """
+    Restore a chain directory from an archive (default: the archive path
+    without its suffix). Raise ValueError if a member fails its checksum.
+    """
+    archive_path = Path(archive_path)
+    if directory is None:
+        name = archive_path.name.removesuffix(ARCHIVE_SUFFIX)
+        directory = archive_path.parent / name
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    with ChainArchive(archive_path) as archive:
+        for entry in archive.members():
+            if Path(entry["name"]).name != entry["name"]:
+                raise ValueError(f"Refusing to unpack nested member {entry['name']}")
+            content = archive.read(entry["name"])
+            if verify and hashlib.sha256(content).hexdigest() != entry["sha256"]:
+                raise ValueError(f"Checksum mismatch for {entry['name']}")
+            (directory / entry["name"]).write_bytes(content)
+    return directory
+
+
+class ChainArchive:
+    """Random-access reader for a packed chain."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._zip = zipfile.ZipFile(self.path, "r")
+        self._index = None
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def index(self) -> dict:
+        if self._index is None:
+            self._index = json.loads(self._zip.read(INDEX_NAME))
+        return self._index
+
+    @property
+    def metadata(self) -> dict:
+        return self.index.get("metadata", {})
+
+    def members(self) -> list[dict]:
+        return self.index.get("members", [])
+
+    def names(self) -> list[str]:
+        return [m["name"] for m in self.members()]
+
+    def read(self, name: str) -> bytes:
+        return self._zip.read(name)
+
+    def read_json(self, name: str) -> dict:
+        return json.loads(self.read(name))
+
+    def latest(self, kind: str, ext: str = ".json") -> str | None:
+        """Name of the highest version of kind (e.g. "realized"), if any."""
+        versions = [
+            m
+            for m in self.members()
+            if m["kind"] == kind
+            and m["version"] is not None
+            and m["name"].endswith(ext)
+        ]
+        return max(versions, key=lambda m: m["version"])["name"] if versions else None
@@ -0,0 +1,397 @@
+"""
+SQLite catalog of generated chains.
+
+One row per chain directory with its prompt, key, style, mode, creation time,
+lint issue counts and file list, plus an FTS5 index over prompt and title.
+Chains are (re)indexed whenever `write_metadata` runs, and `rescan` only
+re-reads directories whose mtime changed since they were last indexed, so
+listing and searching never have to walk `generated/chains/`.
+
+The catalog lives inside the chains root (`generated/chains/.catalog.sqlite`
+for the default layout, beside the blob store), so a chain is cataloged with
+its siblings whatever the working directory, unless YANTRA_CATALOG points
+elsewhere.
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+from datetime import datetime, timezone
+
+from lib.utils.chain_versions import load_chain_json
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "ChainCatalog",
+    "catalog_for",
+    "default_catalog_path",
+    "index_chain_dir",
+    "latest_versions",
+    "update_catalog",
+]
+
+DEFAULT_ROOT = "generated/chains"
+CATALOG_NAME = ".catalog.sqlite"
+
+_VERSIONED_JSON_RE = re.compile(r"^(?P<kind>.+)_(?P<version>\d+)\.json$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chains (
+    rowid INTEGER PRIMARY KEY,
+    dir TEXT UNIQUE NOT NULL,
+    chain_id TEXT,
+    prompt TEXT,
+    title TEXT,
+    key TEXT,
+    style TEXT,
+    mode TEXT,
+    created_at TEXT,
+    partimento_issues INTEGER,
+    realization_issues INTEGER,
+    files TEXT,
+    mtime_ns INTEGER,
+    indexed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS chains_key ON chains(key);
+CREATE INDEX IF NOT EXISTS chains_style ON chains(style);
+CREATE INDEX IF NOT EXISTS chains_mode ON chains(mode);
+CREATE INDEX IF NOT EXISTS chains_created_at ON chains(created_at);
+CREATE INDEX IF NOT EXISTS chains_issues ON chains(realization_issues);
+CREATE TABLE IF NOT EXISTS chain_files (
+    chain INTEGER NOT NULL REFERENCES chains(rowid) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    PRIMARY KEY (chain, name)
+);
+CREATE INDEX IF NOT EXISTS chain_files_name ON chain_files(name);
+CREATE VIRTUAL TABLE IF NOT EXISTS chains_fts USING fts5(prompt, title);
+"""
+
+_COLUMNS = (
+    "dir",
+    "chain_id",
+    "prompt",
+    "title",
+    "key",
+    "style",
+    "mode",
+    "created_at",
+    "partimento_issues",
+    "realization_issues",
+    "files",
+)
+
+
+def default_catalog_path(root: str = DEFAULT_ROOT) -> str:
+    """Catalog of the chains under root, overridable with YANTRA_CATALOG."""
+    return os.environ.get("YANTRA_CATALOG") or os.path.join(root, CATALOG_NAME)
+
+
+def catalog_for(directory) -> str:
+    """Catalog a chain directory belongs to: the one of its chains root."""
+    return default_catalog_path(os.path.dirname(os.path.abspath(directory)))
+
+
+def _chain_mtime_ns(directory: str) -> int:
+    """Directory mtime, or metadata.json's if it was rewritten in place later."""
+    mtime = os.stat(directory).st_mtime_ns
+    try:
+        mtime = max(
+            mtime, os.stat(os.path.join(directory, "metadata.json")).st_mtime_ns
+        )
+    except FileNotFoundError:
+        pass
+    return mtime
+
+
+def _load_json(path: str) -> dict:
+    try:
+        payload = load_chain_json(path)
+    except (OSError, json.JSONDecodeError, KeyError, AttributeError):
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def latest_versions(names: list[str]) -> dict[str, str]:
+    """Return {kind: file name} of the highest version of each kind."""
+    latest = {}
+    for name in names:
+        match = _VERSIONED_JSON_RE.match(name)
+        if match:
+            version = int(match["version"])
+            if version >= latest.get(match["kind"], (-1, None))[0]:
+                latest[match["kind"]] = (version, name)
+    return {kind: name for kind, (_, name) in latest.items()}
+
+
+def _issue_count(path: str | None, kind: str) -> int | None:
+    if not path:
+        return None
+    payload = _load_json(path)
+    data = payload.get("data", payload)
+    if not data:
+        return None
+    try:
+        if kind == "partimento":
+            from lib.analysis.partimento_linting import lint_partimento
+
+            return len(lint_partimento(data)["issues"])
+        from lib.analysis.linting import lint_satb
+
+        return len(lint_satb(data)["issues"])
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+
+
+def index_chain_dir(directory: str, previous: dict | None = None) -> dict | None:
+    """
+    Read one chain directory into a catalog row, or None if it is not one.
+    Issue counts of a previous row are kept for the versions it already
+    linted; versioned files are never rewritten.
+    """
+    meta = _load_json(os.path.join(directory, "metadata.json"))
+    if not meta:
+        return None
+    names = sorted(os.listdir(directory))
+    latest = latest_versions(names)
+    linted = latest_versions(previous["files"]) if previous else {}
+
+    def latest_path(kind):
+        return os.path.join(directory, latest[kind]) if kind in latest else None
+
+    def issues(kind, column):
+        if kind not in latest:
+            return None
+        if linted.get(kind) == latest[kind]:
+            return previous[column]
+        return _issue_count(latest_path(kind), kind)
+
+    partimento = _load_json(latest_path("partimento")) if "partimento" in latest else {}
+    part_data = partimento.get("data", partimento)
+    realized = _load_json(latest_path("realized")) if "realized" in latest else {}
+    real_data = realized.get("data", realized)
+
+    return {
+        "dir": os.path.abspath(directory),
+        "chain_id": meta.get("id"),
+        "prompt": meta.get("prompt") or partimento.get("user_prompt"),
+        "title": real_data.get("title") or part_data.get("title"),
+        "key": real_data.get("key") or part_data.get("key"),
+        "style": part_data.get("style") or real_data.get("style"),
+        "mode": meta.get("mode"),
+        "created_at": meta.get("created_at"),
+        "partimento_issues": issues("partimento", "partimento_issues"),
+        "realization_issues": issues("realized", "realization_issues"),
+        "files": names,
+    }
+
+
+class ChainCatalog:
+    """Connection wrapper around the chain catalog database."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path or default_catalog_path()
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def upsert(self, row: dict, mtime_ns: int | None = None) -> None:
+        """Insert or replace a chain row together with its files and FTS entry."""
+        values = dict(row, files=json.dumps(row.get("files", [])))
+        indexed_at = (
+            datetime.now(timezone.utc)
+            .isoformat(timespec="seconds")
+            .replace("+00:00", "Z")
+        )
+        with self.conn:
+            existing = self.conn.execute(
+                "SELECT rowid FROM chains WHERE dir = ?", (row["dir"],)
+            ).fetchone()
+            if existing:
+                rowid = existing["rowid"]
+                assignments = ", ".join(f"{c} = ?" for c in _COLUMNS[1:])
+                self.conn.execute(
+                    f"UPDATE chains SET {assignments}, mtime_ns = ?, indexed_at = ? "
+                    "WHERE rowid = ?",
+                    [values[c] for c in _COLUMNS[1:]] + [mtime_ns, indexed_at, rowid],
+                )
+                self.conn.execute("DELETE FROM chains_fts WHERE rowid = ?", (rowid,))
+                self.conn.execute("DELETE FROM chain_files WHERE chain = ?", (rowid,))
+            else:
+                cursor = self.conn.execute(
+                    f"INSERT INTO chains ({', '.join(_COLUMNS)}, mtime_ns, indexed_at) "
+                    f"VALUES ({', '.join('?' * (len(_COLUMNS) + 2))})",
+                    [values[c] for c in _COLUMNS] + [mtime_ns, indexed_at],
+                )
+                rowid = cursor.lastrowid
+            self.conn.execute(
+                "INSERT INTO chains_fts (rowid, prompt, title) VALUES (?, ?, ?)",
+                (rowid, row.get("prompt") or "", row.get("title") or ""),
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO chain_files (chain, name) VALUES (?, ?)",
+                [(rowid, name) for name in row.get("files", [])],
+            )
+
+    def remove(self, directory: str) -> None:
+        with self.conn:
+            found = self.conn.execute(
+                "SELECT rowid FROM chains WHERE dir = ?", (directory,)
+            ).fetchone()
+            if found:
+                self.conn.execute("DELETE FROM chains_fts WHERE rowid = ?", (found[0],))
+                self.conn.execute("DELETE FROM chains WHERE rowid = ?", (found[0],))
+
+    def get(self, directory: str) -> dict | None:
+        """Return the row of a cataloged chain directory, or None."""
+        row = self.conn.execute(
+            "SELECT * FROM chains WHERE dir = ?", (os.path.abspath(directory),)
+        ).fetchone()
+        return self._row(row) if row else None
+
+    def index(self, directory: str) -> bool:
+        """(Re)index one chain directory. Return False if it is not a chain."""
+        mtime_ns = _chain_mtime_ns(directory)
+        row = index_chain_dir(directory, self.get(directory))
+        if row is None:
+            return False
+        self.upsert(row, mtime_ns)
+        return True
+
+    def refresh_files(self, directory: str) -> bool:
+        """
+        Update only the file list of a cataloged chain (after audio renders
+        land), indexing it fully if it is not cataloged yet.
+        """
+        previous = self.get(directory)
+        if previous is None:
+            return self.index(directory)
+        mtime_ns = _chain_mtime_ns(directory)
+        self.upsert(dict(previous, files=sorted(os.listdir(directory))), mtime_ns)
+        return True
+
+    def rescan(self, root: str = DEFAULT_ROOT, full: bool = False) -> dict:
+        """
+        Walk root and reindex chain directories whose mtime changed since the
+        last scan (all of them with full=True). Rows for chains that vanished
+        from under root are dropped. Return counts of what happened.
+        """
+        root = os.path.abspath(root)
+        prefix = root.rstrip(os.sep) + os.sep
+        known = {
+            r["dir"]: r["mtime_ns"]
+            for r in self.conn.execute(
+                "SELECT dir, mtime_ns FROM chains WHERE substr(dir, 1, ?) = ?",
+                (len(prefix), prefix),
+            )
+        }
+        stats = {"seen": 0, "indexed": 0, "unchanged": 0, "removed": 0}
+        seen = set()
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            if "metadata.json" not in filenames:
+                continue
+            dirnames[:] = []  # chains are leaves
+            stats["seen"] += 1
+            seen.add(dirpath)
+            if not full and known.get(dirpath) == _chain_mtime_ns(dirpath):
+                stats["unchanged"] += 1
+                continue
+            if self.index(dirpath):
+                stats["indexed"] += 1
+        for directory in set(known) - seen:
+            self.remove(directory)
+            stats["removed"] += 1
+        return stats
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def query(
+        self,
+        text: str | None = None,
+        key: str | None = None,
+        style: str | None = None,
+        mode: str | None = None,
+        since: str | None = None,
+        max_issues: int | None = None,
+        file: str | None = None,
+        limit: int = 20,
+    ) -> list[dict]:
+        """
+        Return chain rows matching all given filters, newest first, or by
+        relevance when `text` (an FTS5 query over prompt and title) is given.
+        """
+        clauses, params = [], []
+        source = "chains c"
+        order = "c.created_at DESC"
+        if text:
+            source = "chains_fts JOIN chains c ON c.rowid = chains_fts.rowid"
+            clauses.append("chains_fts MATCH ?")
+            params.append(text)
+            order = "bm25(chains_fts)"
+        for column, value in (("key", key), ("style", style), ("mode", mode)):
+            if value:
+                clauses.append(f"c.{column} = ? COLLATE NOCASE")
+                params.append(value)
+        if since:
+            clauses.append("c.created_at >= ?")
+            params.append(since)
+        if max_issues is not None:
+            clauses.append("c.realization_issues <= ?")
+            params.append(max_issues)
+        if file:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM chain_files f WHERE f.chain = c.rowid AND f.name = ?)"
+            )
+            params.append(file)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT c.* FROM {source} {where} ORDER BY {order} LIMIT ?"
+        rows = self.conn.execute(sql, params + [limit]).fetchall()
+        return [self._row(r) for r in rows]
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM chains").fetchone()[0]
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> dict:
+        result = {k: row[k] for k in row.keys() if k not in ("rowid", "mtime_ns")}
+        result["files"] = json.loads(result["files"] or "[]")
+        return result
+
+
+def update_catalog(directory, files_only: bool = False) -> None:
+    """
+    Index a chain after it was written (or just refresh its file list with
+    files_only=True); failures only log a warning.
+    """
+    try:
+        with ChainCatalog(catalog_for(directory)) as catalog:
+            if files_only:
+                catalog.refresh_files(str(directory))
+            else:
+                catalog.index(str(directory))
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"⚠️  Could not update chain catalog: {e}")
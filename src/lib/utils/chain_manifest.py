@@ -0,0 +1,220 @@
+"""
+Per-chain manifest of versioned artifacts.
+
+Every chain directory keeps an append-only `manifest.jsonl`. Version numbers
+are allocated under an exclusive lock on `manifest.lock`, so several
+processes can write into the same chain without racing on file names, and
+each written artifact records its kind, version, parent and content hash.
+
+An in-memory index (kind → latest entry) is kept per directory and refreshed
+by reading only the lines appended since the last look, so "latest version of
+X" is O(1) instead of a glob and regex over the whole directory.
+"""
+
+import hashlib
+import json
+import os
+import re
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+__all__ = ["ChainManifest", "get_manifest", "MANIFEST_NAME"]
+
+MANIFEST_NAME = "manifest.jsonl"
+LOCK_NAME = "manifest.lock"
+
+_VERSIONED_RE = re.compile(r"^(?P<kind>.+)_(?P<version>\d+)(?P<ext>\.[^.]+)$")
+
+
+def _now() -> str:
+    return (
+        datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+    )
+
+
+def file_sha256(path) -> str:
+    """Return the hex sha256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ChainManifest:
+    """Version allocator and artifact log for one chain directory."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.path = self.directory / MANIFEST_NAME
+        self.lock_path = self.directory / LOCK_NAME
+        self._offset = 0
+        # (kind, ext) → highest allocated version (reserved or written)
+        self._allocated: dict[tuple[str, str], int] = {}
+        # (kind, ext) → latest written entry; file name → entry
+        self._latest: dict[tuple[str, str], dict] = {}
+        self._entries: dict[str, dict] = {}
+
+    # ------------------------------------------------------------------
+    # Locking and log replay
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _locked(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                if not self._offset:
+                    self._bootstrap()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        """Apply manifest lines appended since the last refresh."""
+        if not self.path.exists():
+            return
+        with open(self.path, "r") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # partially written line; pick it up next time
+                self._offset += len(line.encode())
+                try:
+                    self._apply(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+
+    def _apply(self, record: dict) -> None:
+        kind, version = record.get("kind"), record.get("version")
+        if kind is None or version is None:
+            return
+        key = (kind, record.get("ext", ".json"))
+        self._allocated[key] = max(self._allocated.get(key, 0), version)
+        if record.get("op") == "write":
+            self._entries[record["file"]] = record
+            latest = self._latest.get(key)
+            if latest is None or version >= latest["version"]:
+                self._latest[key] = record
+
+    def _append(self, record: dict) -> None:
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with open(self.path, "a") as f:
+            f.write(line)
+        self._offset += len(line.encode())
+        self._apply(record)
+
+    def _bootstrap(self) -> None:
+        """Index versioned files of a chain written before the manifest."""
+        if not self.directory.is_dir():
+            return
+        for name in sorted(os.listdir(self.directory)):
+            match = _VERSIONED_RE.match(name)
+            if not match:
+                continue
+            self._append(
+                {
+                    "op": "write",
+                    "kind": match["kind"],
+                    "version": int(match["version"]),
+                    "ext": match["ext"],
+                    "file": name,
+                    "parent": None,
+                    "sha256": file_sha256(self.directory / name),
+                    "created_at": _now(),
+                }
+            )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def allocate(self, kind: str, ext: str = ".json") -> Path:
+        """
+        Reserve the next version of `kind` and return its path, e.g.
+        realized_03.json. Reservations are never handed out twice, even
+        across processes.
+        """
+        with self._locked():
+            version = self._allocated.get((kind, ext), 0) + 1
+            name = f"{kind}_{version:02}{ext}"
+            self._append(
+                {
+                    "op": "allocate",
+                    "kind": kind,
+                    "version": version,
+                    "ext": ext,
+                    "file": name,
+                }
+            )
+        return self.directory / name
+
+    def record(self, path, parent=None, mode=None, sha256=None) -> dict:
+        """
+        Record that a versioned artifact was written and return its entry.
+
+        The kind and version are parsed from the file name; files without a
+        `_NN` suffix are recorded with version 0.
+        """
+        path = Path(path)
+        match = _VERSIONED_RE.match(path.name)
+        kind = match["kind"] if match else path.stem
+        version = int(match["version"]) if match else 0
+        entry = {
+            "op": "write",
+            "kind": kind,
+            "version": version,
+            "ext": path.suffix,
+            "file": path.name,
+            "parent": Path(parent).name if parent else None,
+            "mode": mode,
+            "sha256": sha256 or file_sha256(path),
+            "created_at": _now(),
+        }
+        with self._locked():
+            self._append(entry)
+        return entry
+
+    def latest(self, kind: str, ext: str = ".json") -> dict | None:
+        """Return the manifest entry of the highest written version of kind."""
+        self._refresh()
+        if not self._offset:
+            with self._locked():  # indexes a chain written before the manifest
+                pass
+        return self._latest.get((kind, ext))
+
+    def latest_path(self, kind: str, ext: str = ".json") -> Path | None:
+        entry = self.latest(kind, ext)
+        return self.directory / entry["file"] if entry else None
+
+    def entry(self, name: str) -> dict | None:
+        """Return the latest manifest entry for a file name."""
+        self._refresh()
+        return self._entries.get(Path(name).name)
+
+    def entries(self) -> list[dict]:
+        """Return the written entries, one per file, in version order."""
+        self._refresh()
+        return sorted(self._entries.values(), key=lambda e: (e["kind"], e["version"]))
+
+
+_MANIFESTS: dict[str, ChainManifest] = {}
+
+
+def get_manifest(directory) -> ChainManifest:
+    """Return the shared ChainManifest for a directory in this process."""
+    key = os.path.realpath(directory)
+    manifest = _MANIFESTS.get(key)
+    if manifest is None:
+        manifest = _MANIFESTS[key] = ChainManifest(directory)
+    return manifest
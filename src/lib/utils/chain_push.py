@@ -0,0 +1,177 @@
+"""
+Concurrent upload of chain directories to a storage bucket.
+
+Every artifact of a chain (JSON versions, MusicXML, MIDI, audio,
+metadata) is uploaded to `outputs/<chain name>/<file>` by a pool of
+threads, so pushing many chains overlaps the network round trips instead
+of waiting on each in turn.
+
+Before uploading, each chain's remote files are listed once and their
+MD5 (the base64 `md5_hash` of the blob metadata) is compared with the
+local file: unchanged files are skipped, so pushing again after an
+interruption only sends what is still missing. Uploads are conditional
+on the remote generation seen in that listing, which lets the storage
+client retry a failed transfer without risking a concurrent overwrite,
+and are made public in the same request rather than with a separate
+`make_public()` call.
+
+The bucket is duck-typed on the parts of `google.cloud.storage.Bucket`
+used here (`list_blobs`, `blob`, and a blob's `upload_from_filename`,
+`md5_hash`, `generation`, `public_url`), so tests pass a fake.
+"""
+
+import base64
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["chain_files", "file_md5", "push_chains", "remote_prefix"]
+
+DEFAULT_JOBS = 8
+REMOTE_ROOT = "outputs"
+# Bookkeeping files that are not chain artifacts
+SKIP_SUFFIXES = (".lock", ".tmp", ".link")
+
+
+def file_md5(path) -> str:
+    """Base64 MD5 of a file, as storage reports it in `md5_hash`."""
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return base64.b64encode(digest.digest()).decode("ascii")
+
+
+def chain_files(chain_dir: str) -> list[str]:
+    """Names of the artifacts in a chain directory, in upload order."""
+    return sorted(
+        name
+        for name in os.listdir(chain_dir)
+        if not name.startswith(".")
+        and not name.endswith(SKIP_SUFFIXES)
+        and os.path.isfile(os.path.join(chain_dir, name))
+    )
+
+
+def _check_unique_names(chains: list[str]) -> None:
+    """Raise ValueError if two chain directories share a name (and prefix)."""
+    by_name = {}
+    for chain in chains:
+        by_name.setdefault(os.path.basename(chain), set()).add(chain)
+    clashes = sorted(paths for paths in by_name.values() if len(paths) > 1)
+    if clashes:
+        listed = "; ".join(", ".join(sorted(paths)) for paths in clashes)
+        raise ValueError(
+            f"chains with the same name would overwrite each other: {listed}"
+        )
+
+
+def remote_prefix(chain_dir: str) -> str:
+    return f"{REMOTE_ROOT}/{os.path.basename(os.path.abspath(chain_dir))}/"
+
+
+def _remote_state(bucket, prefix: str) -> dict[str, tuple[str, int]]:
+    """{blob name: (md5_hash, generation)} of the blobs under prefix."""
+    return {
+        blob.name: (blob.md5_hash, blob.generation)
+        for blob in bucket.list_blobs(prefix=prefix)
+    }
+
+
+def _upload(bucket, path: str, name: str, generation: int) -> str:
+    blob = bucket.blob(name)
+    blob.upload_from_filename(
+        path, predefined_acl="publicRead", if_generation_match=generation
+    )
+    return blob.public_url
+
+
+def push_chains(
+    chains, bucket, jobs: int = DEFAULT_JOBS, force: bool = False, progress=None
+) -> list[dict]:
+    """
+    Upload the artifacts of every chain directory, skipping files whose
+    remote MD5 matches (unless force). progress(result) is called as each
+    chain finishes. Return one result per chain: {"chain", "files"}, each
+    file {"name", "status": "uploaded" | "skipped" | "failed", "url"?,
+    "error"?}. Chains are stored under their directory name, so two
+    chains with the same name raise ValueError before anything is sent.
+    """
+    chains = [os.path.abspath(c) for c in chains]
+    _check_unique_names(chains)
+    pool = ThreadPoolExecutor(max_workers=max(jobs, 1))
+    try:
+        # List each chain's remote files concurrently, then queue its uploads
+        listings = {
+            pool.submit(_remote_state, bucket, remote_prefix(chain)): chain
+            for chain in chains
+        }
+        results = {chain: {"chain": chain, "files": []} for chain in chains}
+        remaining = {chain: 0 for chain in chains}
+        uploads = {}
+
+        def finish_file(chain, entry):
+            results[chain]["files"].append(entry)
+            remaining[chain] -= 1
+            if remaining[chain] == 0 and progress:
+                progress(results[chain])
+
+        for listing in as_completed(listings):
+            chain = listings[listing]
+            try:
+                remote = listing.result()
+            except Exception as e:
+                results[chain]["files"].append(
+                    {
+                        "name": remote_prefix(chain),
+                        "status": "failed",
+                        "error": f"{type(e).__name__}: {e}",
+                    }
+                )
+                if progress:
+                    progress(results[chain])
+                continue
+            names = chain_files(chain)
+            remaining[chain] = len(names)
+            if not names and progress:
+                progress(results[chain])
+            for file_name in names:
+                path = os.path.join(chain, file_name)
+                name = remote_prefix(chain) + file_name
+                remote_md5, generation = remote.get(name, (None, 0))
+                if not force and remote_md5 == file_md5(path):
+                    url = bucket.blob(name).public_url
+                    finish_file(
+                        chain, {"name": file_name, "status": "skipped", "url": url}
+                    )
+                    continue
+                future = pool.submit(_upload, bucket, path, name, generation)
+                uploads[future] = (chain, file_name)
+
+        for future in as_completed(uploads):
+            chain, file_name = uploads[future]
+            try:
+                entry = {
+                    "name": file_name,
+                    "status": "uploaded",
+                    "url": future.result(),
+                }
+            except Exception as e:
+                entry = {
+                    "name": file_name,
+                    "status": "failed",
+                    "error": f"{type(e).__name__}: {e}",
+                }
+            finish_file(chain, entry)
+    except BaseException:
+        # Interrupted: drop queued uploads; a later push skips what finished
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+
+    for result in results.values():
+        result["files"].sort(key=lambda entry: entry["name"])
+    return list(results.values())
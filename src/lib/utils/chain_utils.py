@@ -1,14 +1,21 @@
+import fcntl
+import hashlib
 import json
 import logging
 import os
-import re
 import uuid
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 
 from colorama import Fore, Style
 
+from lib.utils.audio_render import audio_suffix
+from lib.utils.chain_catalog import update_catalog
+from lib.utils.chain_manifest import MANIFEST_NAME, get_manifest
+from lib.utils.profiling import mark_stage, profile_stage
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,41 +41,125 @@ def is_likely_directory(path):
 
 def get_next_versioned_filename(directory, base, ext=".json"):
     """
-    Return next available versioned filename in directory, e.g. base_03.json.
+    Reserve and return the next versioned filename in directory, e.g.
+    base_03.json. Versions come from the chain manifest, so concurrent
+    writers never get the same name.
     """
-
-    files = list(Path(directory).glob(f"{base}_*.json"))
-    numbers = [
-        int(re.search(rf"{base}_(\d+)\{ext}", str(f)).group(1))
-        for f in files
-        if re.search(rf"{base}_(\d+)\{ext}", str(f))
-    ]
-    next_num = max(numbers, default=1) + 1
-    return os.path.join(directory, f"{base}_{next_num:02}{ext}")
+    return str(get_manifest(directory).allocate(base, ext))
 
 
-def write_chain_json(data, output_path, mode, source_path=None, prompt=None):
-    """Write a JSON file with standard metadata + data block."""
+def write_chain_json(
+    data, output_path, mode, source_path=None, prompt=None, delta=None
+):
+    """
+    Write a JSON file with standard metadata + data block, or a delta block
+    ({"base", "patch"}, see chain_versions) instead of the data. Files inside
+    a chain directory are recorded in its manifest with their parent and hash.
+    """
     payload = {
         "id": str(uuid.uuid4()),
         "created_at": datetime.now().isoformat() + "Z",
         "mode": mode,
-        "source": source_path or "unknown",
+        "source": str(source_path) if source_path else "unknown",
         "user_prompt": prompt or None,
         "version": "0.1.0",
-        "data": data,
     }
-    with open(output_path, "w") as f:
-        json.dump(payload, f, indent=2)
+    if delta is not None:
+        payload["delta"] = delta
+    else:
+        payload["data"] = data
+    with profile_stage("json write"):
+        text = json.dumps(payload, indent=2)
+        with open(output_path, "w") as f:
+            f.write(text)
+
+    directory = Path(output_path).parent
+    if (directory / MANIFEST_NAME).exists():
+        parent = Path(source_path) if source_path else None
+        if parent and parent.resolve().parent != directory.resolve():
+            parent = None  # only link artifacts within the same chain
+        get_manifest(directory).record(
+            output_path,
+            parent=parent,
+            mode=mode,
+            sha256=hashlib.sha256(text.encode()).hexdigest(),
+        )
+
+
+@contextmanager
+def _metadata_lock(directory):
+    """Serialize metadata.json updates (background audio renders write it too)."""
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def _read_metadata(path) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+# Audio results that finish before the chain writes its metadata.json wait
+# here, so a directory never looks like a chain before it is one
+PENDING_AUDIO_NAME = ".audio_pending.json"
+
+
+def _write_json(path, data) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
 
 
 def write_metadata(directory, data):
-    """Write metadata.json to the given directory."""
-    with open(os.path.join(directory, "metadata.json"), "w") as f:
-        json.dump(data, f, indent=2)
+    """
+    Write metadata.json to the given directory and update the chain catalog.
+    Audio render results already recorded (see record_audio) are kept.
+    """
+    path = os.path.join(directory, "metadata.json")
+    pending_path = os.path.join(directory, PENDING_AUDIO_NAME)
+    with _metadata_lock(directory):
+        audio = {
+            **_read_metadata(pending_path),
+            **_read_metadata(path).get("audio", {}),
+        }
+        if audio:
+            data = {**data, "audio": {**data.get("audio", {}), **audio}}
+        _write_json(path, data)
+        if os.path.exists(pending_path):
+            os.unlink(pending_path)
+    update_catalog(directory)
+
+
+def record_audio(directory, results: dict[str, str]) -> None:
+    """
+    Record finished audio renders ({file name: "done" | "failed"}) under
+    "audio" in a chain's metadata.json. Until the chain has written its
+    metadata they are kept in a hidden sidecar file that write_metadata
+    folds in. Only the catalog's file list is refreshed; nothing it lints
+    changed.
+    """
+    path = os.path.join(directory, "metadata.json")
+    with _metadata_lock(directory):
+        if not os.path.exists(path):
+            pending_path = os.path.join(directory, PENDING_AUDIO_NAME)
+            _write_json(pending_path, {**_read_metadata(pending_path), **results})
+            return
+        meta = _read_metadata(path)
+        meta.setdefault("audio", {}).update(results)
+        _write_json(path, meta)
+    if "files" in meta:
+        update_catalog(directory, files_only=True)
 
 
 def log_step(msg, color=Fore.CYAN):
+    mark_stage(msg)
     logger.info(color + msg + Style.RESET_ALL)
 
 
@@ -83,7 +174,7 @@ def resolve_output(base_name: str, args) -> OutputSpec:
         json_path = chain / f"{base_name}_01.json"
         xml_path = chain / f"{base_name}.musicxml"
         midi_path = chain / f"{base_name}.mid"
-        ogg_path = chain / f"{base_name}.ogg"
+        ogg_path = chain / f"{base_name}{audio_suffix()}"
         return OutputSpec(json_path, xml_path, midi_path, ogg_path, chain, True)
 
     # flat mode
@@ -95,7 +186,7 @@ def resolve_output(base_name: str, args) -> OutputSpec:
         json=stem.with_suffix(".json"),
         xml=stem.with_suffix(".musicxml"),
         midi=stem.with_suffix(".mid"),
-        ogg=stem.with_suffix(".ogg"),
+        ogg=stem.with_suffix(audio_suffix()),
         chain_dir=None,
         is_chain=False,
     )
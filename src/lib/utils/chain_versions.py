@@ -0,0 +1,204 @@
+"""
+Delta-encoded chain versions.
+
+A patched partimento or realization in a chain does not need a full copy of
+the score: it is stored as a reference to the chain's base version plus the
+measure patch that turns the base into it, e.g.
+
+    {"id": ..., "mode": "patched-partimento", ...,
+     "delta": {"base": "realized_01.json", "patch": {"alto": {"2": [...]}}}}
+
+Patches replace whole measures, so successive patches compose by a plain
+dict merge and every delta points straight at a full version: loading any
+version is one read of the base plus one `apply_patch`. `load_chain_json`
+materializes deltas transparently (keeping a small cache of recent
+versions) and is what every reader of chain JSON goes through.
+"""
+
+import copy
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from lib.utils.json_utils import apply_patch
+from lib.utils.profiling import profiled
+
+__all__ = [
+    "load_chain_json",
+    "write_chain_delta",
+    "write_chain_revision",
+    "compose_patches",
+    "measure_hashes",
+    "diff_versions",
+]
+
+CACHE_SIZE = 16
+_cache: OrderedDict = OrderedDict()
+
+
+def _read_raw(path) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def compose_patches(first: dict, second: dict) -> dict:
+    """Return one patch equivalent to applying first and then second."""
+    composed = {part: dict(measures) for part, measures in first.items()}
+    for part, measures in second.items():
+        target = composed.setdefault(part, {})
+        for idx, notes in measures.items():
+            target[str(idx)] = notes
+    return composed
+
+
+@profiled(name="json read")
+def load_chain_json(path) -> dict:
+    """
+    Load a chain JSON file with its "data" block materialized. Delta
+    versions are rebuilt from their base; results are cached by path and
+    mtime, and callers get their own copy to mutate.
+    """
+    path = os.path.realpath(path)
+    key = (path, os.stat(path).st_mtime_ns)
+    if key in _cache:
+        _cache.move_to_end(key)
+        return copy.deepcopy(_cache[key])
+
+    payload = _read_raw(path)
+    delta = payload.get("delta") if isinstance(payload, dict) else None
+    if delta:
+        base_path = os.path.join(os.path.dirname(path), delta["base"])
+        base = load_chain_json(base_path)
+        payload["data"] = apply_patch(base["data"], delta.get("patch", {}))
+
+    _cache[key] = payload
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return copy.deepcopy(payload)
+
+
+def write_chain_revision(
+    data: dict, patch: dict, output_path, mode: str, source_path, prompt=None
+) -> None:
+    """
+    Write a patched version: as a delta on source_path when both live in the
+    same chain directory, otherwise as a full copy of data.
+    """
+    from lib.utils.chain_utils import write_chain_json
+
+    if not write_chain_delta(patch, output_path, mode, source_path, prompt):
+        write_chain_json(
+            data, output_path, mode=mode, source_path=source_path, prompt=prompt
+        )
+
+
+def write_chain_delta(
+    patch: dict, output_path, mode: str, source_path, prompt=None
+) -> bool:
+    """
+    Write output_path as source_path + patch. Return False (writing nothing)
+    when the source is not a version in the same chain directory, in which
+    case the caller should write a full copy instead.
+    """
+    from lib.utils.chain_utils import write_chain_json
+
+    source = Path(source_path)
+    output = Path(output_path)
+    if not source.exists() or source.resolve().parent != output.resolve().parent:
+        return False
+
+    raw = _read_raw(source)
+    if raw.get("delta"):
+        base = raw["delta"]["base"]
+        patch = compose_patches(raw["delta"].get("patch", {}), patch)
+    else:
+        base = source.name
+    write_chain_json(
+        None,
+        output,
+        mode=mode,
+        source_path=str(source_path),
+        prompt=prompt,
+        delta={"base": base, "patch": patch},
+    )
+    return True
+
+
+def _measure_hash(measure) -> str:
+    text = json.dumps(measure, separators=(",", ":"))
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+def measure_hashes(data: dict) -> dict[str, list[str]]:
+    """Return {part: [hash of each measure]} for every list-valued part."""
+    return {
+        part: [_measure_hash(m) for m in measures]
+        for part, measures in data.items()
+        if isinstance(measures, list)
+    }
+
+
+def diff_versions(path_a, path_b) -> list[dict]:
+    """
+    Return the measures that differ between two chain versions as
+    [{"part", "measure" (1-based), "before", "after"}].
+
+    When both are deltas of the same base only the measures named in their
+    patches are compared, so the cost follows the number of changed
+    measures; otherwise per-measure hashes of both scores are compared.
+    """
+    raw_a, raw_b = _read_raw(path_a), _read_raw(path_b)
+    delta_a, delta_b = raw_a.get("delta"), raw_b.get("delta")
+    base_a = delta_a["base"] if delta_a else Path(path_a).name
+    base_b = delta_b["base"] if delta_b else Path(path_b).name
+    same_dir = Path(path_a).resolve().parent == Path(path_b).resolve().parent
+
+    if same_dir and base_a == base_b:
+        base = load_chain_json(Path(path_a).parent / base_a)["data"]
+        patch_a = (delta_a or {}).get("patch", {})
+        patch_b = (delta_b or {}).get("patch", {})
+        candidates = {
+            (part, int(idx))
+            for patch in (patch_a, patch_b)
+            for part, measures in patch.items()
+            for idx in measures
+            if str(idx).isdigit()
+        }
+
+        def lookup(patch, part, idx):
+            if str(idx) in patch.get(part, {}):
+                return patch[part][str(idx)]
+            measures = base.get(part, [])
+            return measures[idx] if 0 <= idx < len(measures) else None
+
+        pairs = (
+            (part, idx, lookup(patch_a, part, idx), lookup(patch_b, part, idx))
+            for part, idx in sorted(candidates)
+        )
+    else:
+        data_a = load_chain_json(path_a)["data"]
+        data_b = load_chain_json(path_b)["data"]
+        hashes_a, hashes_b = measure_hashes(data_a), measure_hashes(data_b)
+        candidates = set()
+        for part in set(hashes_a) | set(hashes_b):
+            a, b = hashes_a.get(part, []), hashes_b.get(part, [])
+            for idx in range(max(len(a), len(b))):
+                if idx >= len(a) or idx >= len(b) or a[idx] != b[idx]:
+                    candidates.add((part, idx))
+
+        def measure(data, part, idx):
+            measures = data.get(part, [])
+            return measures[idx] if 0 <= idx < len(measures) else None
+
+        pairs = (
+            (part, idx, measure(data_a, part, idx), measure(data_b, part, idx))
+            for part, idx in sorted(candidates)
+        )
+
+    return [
+        {"part": part, "measure": idx + 1, "before": before, "after": after}
+        for part, idx, before, after in pairs
+        if before != after
+    ]
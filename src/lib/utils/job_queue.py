@@ -0,0 +1,424 @@
+"""
+Durable SQLite job queue for long generation batches.
+
+Jobs move through
+
+    queued → running → done
+                     ↘ queued (retry after a backoff) … → dead
+
+A worker claims the highest-priority runnable job together with a lease and
+keeps the lease alive with heartbeats while it works. If the worker crashes,
+its lease expires and the job becomes claimable again, so a restart resumes
+the batch instead of losing it. A job that has failed max_attempts times is
+moved to the dead-letter state with its last error, and stays there until it
+is retried by hand.
+
+Workers also record their throughput (jobs done and failed, busy time) in the
+same database, so `queue status` can show how the pool is keeping up.
+"""
+
+import json
+import logging
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "Job",
+    "JobQueue",
+    "JOB_STATES",
+    "default_queue_path",
+    "run_worker",
+]
+
+DEFAULT_QUEUE = "generated/queue.sqlite"
+JOB_STATES = ("queued", "running", "done", "dead")
+DEFAULT_LEASE = 120.0
+MAX_RETRY_DELAY = 3600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    priority INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    retry_delay REAL NOT NULL DEFAULT 30,
+    run_after REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_runnable
+    ON jobs(state, priority DESC, run_after, id);
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    host TEXT,
+    pid INTEGER,
+    kinds TEXT,
+    state TEXT,
+    current_job INTEGER,
+    started_at REAL,
+    heartbeat_at REAL,
+    jobs_done INTEGER NOT NULL DEFAULT 0,
+    jobs_failed INTEGER NOT NULL DEFAULT 0,
+    busy_seconds REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+def default_queue_path() -> str:
+    """Queue location, overridable with YANTRA_QUEUE."""
+    return os.environ.get("YANTRA_QUEUE", DEFAULT_QUEUE)
+
+
+@dataclass
+class Job:
+    id: int
+    kind: str
+    payload: dict
+    priority: int
+    attempts: int
+    max_attempts: int
+
+
+class JobQueue:
+    """Connection wrapper around the job queue database."""
+
+    def __init__(self, path: str | None = None):
+        self.path = os.path.abspath(path or default_queue_path())
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _transaction(self):
+        """BEGIN IMMEDIATE so concurrent claimers serialize on the write lock."""
+        return _Immediate(self.conn)
+
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+
+    def submit(
+        self,
+        kind: str,
+        payload: dict,
+        priority: int = 0,
+        max_attempts: int = 3,
+        retry_delay: float = 30.0,
+    ) -> int:
+        """Queue a job and return its id. Higher priorities run first."""
+        cursor = self.conn.execute(
+            "INSERT INTO jobs (kind, payload, priority, max_attempts, retry_delay, "
+            "created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                kind,
+                json.dumps(payload),
+                priority,
+                max_attempts,
+                retry_delay,
+                time.time(),
+            ),
+        )
+        return cursor.lastrowid
+
+    def retry(self, job_id: int | None = None) -> int:
+        """Requeue a dead job (every dead job if job_id is None)."""
+        sql = (
+            "UPDATE jobs SET state = 'queued', attempts = 0, run_after = 0, "
+            "error = NULL WHERE state = 'dead'"
+        )
+        params = ()
+        if job_id is not None:
+            sql += " AND id = ?"
+            params = (job_id,)
+        return self.conn.execute(sql, params).rowcount
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _expire_leases(self, now: float) -> None:
+        """Requeue running jobs whose worker stopped heartbeating."""
+        self.conn.execute(
+            "UPDATE jobs SET state = CASE WHEN attempts >= max_attempts "
+            "THEN 'dead' ELSE 'queued' END, "
+            "error = COALESCE(error, 'lease expired'), lease_owner = NULL, "
+            "finished_at = CASE WHEN attempts >= max_attempts THEN ? END "
+            "WHERE state = 'running' AND lease_expires < ?",
+            (now, now),
+        )
+
+    def claim(
+        self, worker_id: str, kinds=None, lease: float = DEFAULT_LEASE
+    ) -> Job | None:
+        """Lease the next runnable job of one of kinds, or return None."""
+        now = time.time()
+        with self._transaction():
+            self._expire_leases(now)
+            sql = "SELECT * FROM jobs WHERE state = 'queued' AND run_after <= ?"
+            params = [now]
+            if kinds:
+                sql += f" AND kind IN ({', '.join('?' * len(kinds))})"
+                params.extend(kinds)
+            sql += " ORDER BY priority DESC, id LIMIT 1"
+            row = self.conn.execute(sql, params).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE jobs SET state = 'running', attempts = attempts + 1, "
+                "lease_owner = ?, lease_expires = ?, "
+                "started_at = COALESCE(started_at, ?) WHERE id = ?",
+                (worker_id, now + lease, now, row["id"]),
+            )
+        return Job(
+            id=row["id"],
+            kind=row["kind"],
+            payload=json.loads(row["payload"]),
+            priority=row["priority"],
+            attempts=row["attempts"] + 1,
+            max_attempts=row["max_attempts"],
+        )
+
+    def heartbeat(self, job_id: int, worker_id: str, lease: float) -> bool:
+        """Extend a lease. Return False if the worker no longer holds it."""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ? "
+            "AND state = 'running'",
+            (time.time() + lease, job_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, result=None) -> bool:
+        cursor = self.conn.execute(
+            "UPDATE jobs SET state = 'done', result = ?, error = NULL, "
+            "lease_owner = NULL, finished_at = ? "
+            "WHERE id = ? AND lease_owner = ? AND state = 'running'",
+            (json.dumps(result), time.time(), job_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> str | None:
+        """
+        Record a failed attempt. The job is requeued after an exponential
+        backoff (with jitter) or dead-lettered once it is out of attempts.
+        Return the new state, or None if the lease was lost.
+        """
+        now = time.time()
+        with self._transaction():
+            row = self.conn.execute(
+                "SELECT attempts, max_attempts, retry_delay FROM jobs "
+                "WHERE id = ? AND lease_owner = ? AND state = 'running'",
+                (job_id, worker_id),
+            ).fetchone()
+            if row is None:
+                return None
+            if row["attempts"] >= row["max_attempts"]:
+                state, run_after, finished = "dead", 0, now
+            else:
+                delay = min(
+                    row["retry_delay"] * 2 ** (row["attempts"] - 1), MAX_RETRY_DELAY
+                )
+                state, finished = "queued", None
+                run_after = now + delay * random.uniform(0.8, 1.2)
+            self.conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, run_after = ?, "
+                "lease_owner = NULL, finished_at = ? WHERE id = ?",
+                (state, error, run_after, finished, job_id),
+            )
+        return state
+
+    def register_worker(self, worker_id: str, kinds=None) -> None:
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO workers (id, host, pid, kinds, state, "
+            "started_at, heartbeat_at) VALUES (?, ?, ?, ?, 'idle', ?, ?)",
+            (
+                worker_id,
+                socket.gethostname(),
+                os.getpid(),
+                ",".join(kinds or []),
+                now,
+                now,
+            ),
+        )
+
+    def update_worker(self, worker_id: str, **fields) -> None:
+        """Set worker columns; done/failed/busy are added to the counters."""
+        assignments, params = ["heartbeat_at = ?"], [time.time()]
+        for column in ("state", "current_job"):
+            if column in fields:
+                assignments.append(f"{column} = ?")
+                params.append(fields[column])
+        for column in ("jobs_done", "jobs_failed", "busy_seconds"):
+            if fields.get(column):
+                assignments.append(f"{column} = {column} + ?")
+                params.append(fields[column])
+        self.conn.execute(
+            f"UPDATE workers SET {', '.join(assignments)} WHERE id = ?",
+            params + [worker_id],
+        )
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def counts(self) -> dict[str, int]:
+        counts = dict.fromkeys(JOB_STATES, 0)
+        for row in self.conn.execute(
+            "SELECT state, COUNT(*) AS n FROM jobs GROUP BY state"
+        ):
+            counts[row["state"]] = row["n"]
+        return counts
+
+    def jobs(self, state: str | None = None, limit: int = 20) -> list[dict]:
+        sql = "SELECT * FROM jobs"
+        params = []
+        if state:
+            sql += " WHERE state = ?"
+            params.append(state)
+        sql += " ORDER BY id DESC LIMIT ?"
+        rows = self.conn.execute(sql, params + [limit]).fetchall()
+        return [
+            dict(row, payload=json.loads(row["payload"]), result=_loads(row["result"]))
+            for row in rows
+        ]
+
+    def workers(self) -> list[dict]:
+        """Worker rows with uptime, throughput (jobs/hour) and utilization."""
+        rows = []
+        for row in self.conn.execute("SELECT * FROM workers ORDER BY started_at"):
+            worker = dict(row)
+            uptime = max(worker["heartbeat_at"] - worker["started_at"], 1e-9)
+            worker["uptime"] = uptime
+            worker["jobs_per_hour"] = worker["jobs_done"] * 3600 / uptime
+            worker["utilization"] = min(worker["busy_seconds"] / uptime, 1.0)
+            rows.append(worker)
+        return rows
+
+
+class _Immediate:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, *exc):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def _loads(text):
+    return json.loads(text) if text else None
+
+
+class _Heartbeat(threading.Thread):
+    """Keeps a job's lease alive while the worker's main thread runs it."""
+
+    def __init__(self, path: str, job_id: int, worker_id: str, lease: float):
+        super().__init__(daemon=True)
+        self.path = path
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease = lease
+        self.stopped = threading.Event()
+        self.lost = False
+
+    def run(self):
+        with JobQueue(self.path) as queue:
+            while not self.stopped.wait(self.lease / 3):
+                if not queue.heartbeat(self.job_id, self.worker_id, self.lease):
+                    self.lost = True
+                    logger.warning(f"⚠️  Lost lease on job {self.job_id}")
+                    return
+                queue.update_worker(self.worker_id)
+
+
+def run_worker(
+    executor,
+    path: str | None = None,
+    kinds=None,
+    lease: float = DEFAULT_LEASE,
+    poll: float = 1.0,
+    drain: bool = False,
+    worker_id: str | None = None,
+    should_stop=None,
+) -> dict:
+    """
+    Claim and run jobs until should_stop() returns True (or, with drain=True,
+    until no runnable job is left). executor(job) returns a JSON-serializable
+    result or raises to fail the attempt. Return this worker's counters.
+    """
+    worker_id = (
+        worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    )
+    stats = {"done": 0, "failed": 0}
+    with JobQueue(path) as queue:
+        queue.register_worker(worker_id, kinds)
+        while not (should_stop and should_stop()):
+            job = queue.claim(worker_id, kinds, lease)
+            if job is None:
+                if drain:
+                    break
+                queue.update_worker(worker_id, state="idle", current_job=None)
+                time.sleep(poll)
+                continue
+
+            queue.update_worker(worker_id, state="busy", current_job=job.id)
+            heartbeat = _Heartbeat(queue.path, job.id, worker_id, lease)
+            heartbeat.start()
+            started = time.perf_counter()
+            try:
+                result = executor(job)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=5)}"
+                outcome = queue.fail(job.id, worker_id, error)
+                logger.warning(
+                    f"⚠️  Job {job.id} ({job.kind}) failed attempt "
+                    f"{job.attempts}/{job.max_attempts}: {e} → {outcome}"
+                )
+                ok = False
+            else:
+                ok = queue.complete(job.id, worker_id, result)
+                if not ok:
+                    logger.warning(f"⚠️  Job {job.id} finished after losing its lease")
+            finally:
+                heartbeat.stopped.set()
+                heartbeat.join()
+            stats["done" if ok else "failed"] += 1
+            queue.update_worker(
+                worker_id,
+                state="idle",
+                current_job=None,
+                jobs_done=int(ok),
+                jobs_failed=int(not ok),
+                busy_seconds=time.perf_counter() - started,
+            )
+        queue.update_worker(worker_id, state="stopped", current_job=None)
+    return stats
@@ -1,13 +1,23 @@
 import os
+from functools import lru_cache
 
-import openai
+from lib.utils.profiling import profiled
 
 
+@lru_cache(maxsize=1)
+def get_client():
+    """Create the OpenAI client on first use and reuse its connection pool."""
+    import openai
+
+    return openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+@profiled(name="llm")
 def call_llm(system_prompt: str, user_prompt: str) -> str:
     """
     Call OpenAI Chat API and return JSON
     """
-    client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    client = get_client()
     response = client.chat.completions.create(
         model="gpt-4o",
         messages=[
@@ -1,10 +1,14 @@
 import logging
 import os
+import re
 import subprocess
+from functools import lru_cache
 
 from colorama import Fore, Style
 from music21 import note, pitch
 
+from lib.utils.profiling import profile_stage
+
 logger = logging.getLogger(__name__)
 
 RANGE = {
@@ -15,6 +19,83 @@ RANGE = {
 }
 
 
+# Same limits as plain MIDI numbers, for hot paths that avoid music21 objects
+RANGE_MIDI = {name: (low.midi, high.midi) for name, (low, high) in RANGE.items()}
+
+_STEP_SEMITONES = {"C": 0, "D": 2, "E": 4, "F": 5, "G": 7, "A": 9, "B": 11}
+_ACCIDENTAL_SEMITONES = {
+    "#": 1,
+    "♯": 1,
+    "𝄪": 2,
+    "b": -1,
+    "-": -1,
+    "♭": -1,
+    "𝄫": -2,
+    "♮": 0,
+}
+_SHARP_NAMES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+_FLAT_NAMES = ["C", "Db", "D", "Eb", "E", "F", "Gb", "G", "Ab", "A", "Bb", "B"]
+_NOTE_RE = re.compile(r"^([A-Ga-g])([#♯𝄪b\-♭𝄫♮]*)(-?\d+)$")
+
+
+@lru_cache(maxsize=None)
+def note_to_midi(note_str: str) -> int:
+    """
+    Return the MIDI number of a note name such as "C4", "F#3" or "B♭2".
+
+    Raises ValueError for strings that are not a pitch with an octave.
+    """
+    match = _NOTE_RE.match(note_str.strip())
+    if not match:
+        raise ValueError(f"Invalid note name: {note_str!r}")
+    step, accidentals, octave = match.groups()
+    semitones = _STEP_SEMITONES[step.upper()]
+    semitones += sum(_ACCIDENTAL_SEMITONES[a] for a in accidentals)
+    return (int(octave) + 1) * 12 + semitones
+
+
+def midi_to_note(midi: int, letter: str | None = None, prefer_flats: bool = False):
+    """
+    Return a note name such as "F#4" for a MIDI number.
+
+    If `letter` is given the pitch is spelled on that letter (e.g. 61 on "D"
+    gives "Db4"); otherwise black keys use sharps, or flats with prefer_flats.
+    """
+    pc = midi % 12
+    if letter is None:
+        names = _FLAT_NAMES if prefer_flats else _SHARP_NAMES
+        name = names[pc]
+        letter, accidental = name[0], name[1:]
+    else:
+        letter = letter.upper()
+        offset = (pc - _STEP_SEMITONES[letter] + 6) % 12 - 6
+        if abs(offset) > 2:
+            raise ValueError(f"Cannot spell MIDI {midi} on letter {letter}")
+        accidental = "#" * offset if offset > 0 else "b" * -offset
+    alteration = len(accidental) * (1 if accidental.startswith("#") else -1)
+    octave = (midi - alteration) // 12 - 1
+    return f"{letter}{accidental}{octave}"
+
+
+def parse_key(key_str: str | None) -> tuple[int, str] | None:
+    """
+    Parse a key string such as "C major", "F# minor" or "Bb" into
+    (tonic pitch class, mode). Returns None when the key is missing or invalid.
+    """
+    if not key_str:
+        return None
+    tokens = key_str.split()
+    tonic = tokens[0]
+    mode = tokens[1].lower() if len(tokens) > 1 else ""
+    if mode not in ("major", "minor"):
+        mode = "minor" if tonic[0].islower() else "major"
+    try:
+        tonic_pc = note_to_midi(tonic[0].upper() + tonic[1:] + "4") % 12
+    except ValueError:
+        return None
+    return tonic_pc, mode
+
+
 def in_range(part_name: str, p: pitch.Pitch) -> bool:
     low, high = RANGE[part_name]
     return low <= p <= high
@@ -24,18 +105,75 @@ def interval_name(n1: note.Note, n2: note.Note) -> str:
     return n1.pitch.intervalClassString(n2.pitch)
 
 
-def export_ogg_from_midi(midi_path, ogg_path):
-    """Convert a MIDI file to OGG using Timidity and log progress."""
-    if os.path.exists(midi_path):
-        try:
-            subprocess.run(
-                ["timidity", midi_path, "-Ow", "-o", ogg_path],
+AUDIO_BACKENDS = ("builtin", "timidity")
+
+
+def audio_backend() -> str:
+    """Renderer chosen by YANTRA_AUDIO_BACKEND (builtin unless "timidity")."""
+    backend = os.environ.get("YANTRA_AUDIO_BACKEND", "builtin").lower()
+    return backend if backend in AUDIO_BACKENDS else "builtin"
+
+
+def _timidity_render(midi_path, sample_rate: int):
+    """
+    Render with timidity as raw 16-bit mono PCM on a pipe, so the encoder
+    reads samples directly instead of a temporary WAV. None if timidity is
+    not installed.
+    """
+    import numpy as np
+
+    try:
+        with profile_stage("timidity"):
+            rendered = subprocess.run(
+                [
+                    "timidity",
+                    "-Or",
+                    "--output-mono",
+                    "--output-16bit",
+                    "--output-signed",
+                    "-s",
+                    str(sample_rate),
+                    "-o",
+                    "-",
+                    str(midi_path),
+                ],
                 check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
             )
-            logger.info(Fore.YELLOW + f"🎧 OGG audio saved to {ogg_path}")
-        except FileNotFoundError:
-            logger.warning(
-                Fore.YELLOW + "⚠️  Timidity not found. Skipping OGG audio export."
-            )
-    else:
-        logger.error(Fore.RED + "❌ MIDI file not found. Cannot convert to OGG.")
+    except FileNotFoundError:
+        logger.warning(
+            Fore.YELLOW + "⚠️  Timidity not found. Using the built-in renderer."
+        )
+        return None
+    return np.frombuffer(rendered.stdout, dtype=np.int16).astype(np.float32) / 32768
+
+
+def export_audio_from_midi(midi_path, audio_path, backend: str | None = None):
+    """
+    Render a MIDI file to WAV, FLAC or OGG (by audio_path's extension) with
+    the built-in synthesizer, or with timidity when that backend is chosen.
+    """
+    from lib.utils.audio_render import (
+        DEFAULT_SAMPLE_RATE,
+        read_midi_events,
+        render,
+        write_audio,
+    )
+
+    if not os.path.exists(midi_path):
+        logger.error(Fore.RED + "❌ MIDI file not found. Cannot render audio.")
+        return
+    samples = None
+    if (backend or audio_backend()) == "timidity":
+        samples = _timidity_render(midi_path, DEFAULT_SAMPLE_RATE)
+    if samples is None:
+        with profile_stage("audio render"):
+            samples = render(read_midi_events(midi_path))
+    try:
+        with profile_stage("audio encode"):
+            write_audio(str(audio_path), samples, DEFAULT_SAMPLE_RATE)
+    except ValueError as e:
+        logger.warning(Fore.YELLOW + f"⚠️  {e}. Skipping audio export.")
+        return
+    logger.info(Fore.YELLOW + f"🎧 Audio saved to {audio_path}")
@@ -0,0 +1,242 @@
+"""
+Streaming MusicXML summaries without music21.
+
+`scan_musicxml` walks a MusicXML (or compressed .mxl) file with
+`ElementTree.iterparse` and pulls out what `inspect-musicxml` prints: title,
+composer, parts, measure count, key, time signature and instruments. Each
+<measure> is dropped from the tree as soon as it has been read, so memory
+stays flat however long the score is, and nothing is imported from music21.
+Use `musicxml_utils.score_summary` on a parsed score when deeper analysis is
+needed.
+
+`inspect_files` scans many files in a process pool and returns one summary
+(or error) per file, handing anything that is not partwise MusicXML to
+music21.
+"""
+
+import glob
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+
+__all__ = [
+    "MUSICXML_EXTENSIONS",
+    "expand_inputs",
+    "inspect_files",
+    "key_name",
+    "open_musicxml",
+    "print_summary",
+    "scan_musicxml",
+]
+
+MUSICXML_EXTENSIONS = (".musicxml", ".xml", ".mxl")
+
+# Tonic of each key signature, indexed by fifths + 7
+_MAJOR_TONICS = "Cb Gb Db Ab Eb Bb F C G D A E B F# C#".split()
+_MINOR_TONICS = "Ab Eb Bb F C G D A E B F# C# G# D# A#".split()
+
+
+def key_name(fifths: int, mode: str | None = None) -> str | None:
+    """'D minor' for (-1, 'minor'); None for modes other than major/minor."""
+    if not -7 <= fifths <= 7:
+        return None
+    if mode in (None, "", "major"):
+        return f"{_MAJOR_TONICS[fifths + 7]} major"
+    if mode == "minor":
+        return f"{_MINOR_TONICS[fifths + 7]} minor"
+    return None
+
+
+def open_musicxml(source):
+    """Return a binary file object for a path, .mxl archive or bytes."""
+    if isinstance(source, (bytes, bytearray)):
+        import io
+
+        return io.BytesIO(source)
+    if zipfile.is_zipfile(source):
+        archive = zipfile.ZipFile(source)
+        member = _mxl_rootfile(archive)
+        return archive.open(member)
+    return open(source, "rb")
+
+
+def _mxl_rootfile(archive: zipfile.ZipFile) -> str:
+    """The score member of a compressed MusicXML archive."""
+    try:
+        container = ElementTree.fromstring(archive.read("META-INF/container.xml"))
+        rootfile = container.find(".//{*}rootfile")
+        if rootfile is not None and rootfile.get("full-path"):
+            return rootfile.get("full-path")
+    except KeyError:
+        pass
+    for name in archive.namelist():
+        if not name.startswith("META-INF/") and name.endswith((".xml", ".musicxml")):
+            return name
+    raise ValueError("no MusicXML score in archive")
+
+
+def _text(element, path: str) -> str | None:
+    found = element.find(path)
+    if found is None or found.text is None:
+        return None
+    return found.text.strip() or None
+
+
+def scan_musicxml(source) -> dict:
+    """
+    Summarize a partwise MusicXML score from a path, .mxl path or bytes in
+    one streaming pass. Raises ValueError for timewise or non-MusicXML input
+    and ElementTree.ParseError for malformed XML.
+    """
+    summary = {
+        "title": None,
+        "composer": None,
+        "parts": 0,
+        "measures": 0,
+        "key": None,
+        "fifths": None,
+        "mode": None,
+        "time": None,
+        "instruments": [],
+    }
+    movement_title = None
+    part_names = {}
+    instruments = {}
+    part_index = 0
+    stack = []
+
+    with open_musicxml(source) as f:
+        for event, element in ElementTree.iterparse(f, events=("start", "end")):
+            tag = element.tag.rpartition("}")[2]
+            if event == "start":
+                if not stack and tag != "score-partwise":
+                    raise ValueError(f"not a partwise MusicXML score (<{tag}>)")
+                if tag == "part":
+                    part_index += 1
+                stack.append(element)
+                continue
+
+            stack.pop()
+            parent = stack[-1] if stack else None
+            if tag == "work-title":
+                summary["title"] = summary["title"] or (element.text or "").strip()
+            elif tag == "movement-title":
+                movement_title = (element.text or "").strip() or None
+            elif tag == "creator" and element.get("type") == "composer":
+                summary["composer"] = summary["composer"] or (
+                    (element.text or "").strip() or None
+                )
+            elif tag == "score-part":
+                part_id = element.get("id")
+                summary["parts"] += 1
+                part_names[part_id] = _text(element, "{*}part-name")
+                instruments[part_id] = [
+                    (i.text or "").strip()
+                    for i in element.iterfind("{*}score-instrument/{*}instrument-name")
+                    if (i.text or "").strip()
+                ]
+            elif tag == "key" and summary["fifths"] is None and part_index == 1:
+                fifths = _text(element, "{*}fifths")
+                if fifths is not None:
+                    summary["fifths"] = int(fifths)
+                    summary["mode"] = _text(element, "{*}mode")
+                    summary["key"] = key_name(summary["fifths"], summary["mode"])
+            elif tag == "time" and summary["time"] is None and part_index == 1:
+                beats = _text(element, "{*}beats")
+                beat_type = _text(element, "{*}beat-type")
+                if beats and beat_type:
+                    summary["time"] = f"{beats}/{beat_type}"
+            elif tag == "measure":
+                if part_index == 1:
+                    summary["measures"] += 1
+                # Constant memory: forget each measure once it has been read
+                if parent is not None:
+                    parent.remove(element)
+            elif tag == "part" and parent is not None:
+                parent.remove(element)
+
+    summary["title"] = summary["title"] or movement_title
+    summary["instruments"] = [
+        name
+        for part_id, part_name in part_names.items()
+        for name in (instruments[part_id] or [part_name or "Unnamed"])
+    ]
+    return summary
+
+
+def expand_inputs(inputs, extensions=MUSICXML_EXTENSIONS) -> list[str]:
+    """Files, directories (searched recursively) and globs → score paths."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for directory, _, files in os.walk(item):
+                paths.extend(
+                    os.path.join(directory, name)
+                    for name in sorted(files)
+                    if name.lower().endswith(tuple(extensions))
+                )
+        elif glob.has_magic(item):
+            paths.extend(sorted(glob.glob(item, recursive=True)))
+        else:
+            paths.append(item)
+    # Keep first occurrence order, drop duplicates
+    return list(dict.fromkeys(paths))
+
+
+def _deep_summary(path: str) -> dict:
+    from lib.utils.musicxml_utils import load_musicxml, score_summary
+
+    return dict(score_summary(load_musicxml(path)), parser="music21")
+
+
+def _inspect(path: str, deep: bool = False) -> dict:
+    try:
+        if deep or not path.lower().endswith(MUSICXML_EXTENSIONS):
+            summary = _deep_summary(path)
+        else:
+            try:
+                summary = dict(scan_musicxml(path), parser="stream")
+            except ValueError:
+                # Timewise or otherwise unusual scores: let music21 handle them
+                summary = _deep_summary(path)
+    except Exception as e:
+        return {"path": path, "error": f"{type(e).__name__}: {e}"}
+    return {"path": path, **summary}
+
+
+def inspect_files(paths, deep: bool = False, jobs: int | None = None) -> list[dict]:
+    """
+    Summarize every path, in parallel when there is more than one. Failures
+    are reported per file as {"path", "error"} rather than raised.
+    """
+    paths = list(paths)
+    jobs = jobs or os.cpu_count() or 1
+    if len(paths) <= 1 or jobs == 1:
+        return [_inspect(path, deep) for path in paths]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+        return list(
+            pool.map(_inspect, paths, [deep] * len(paths), chunksize=4 if deep else 16)
+        )
+
+
+def print_summary(summary: dict) -> None:
+    """Print a human-readable summary as returned by scan_musicxml."""
+    print("Title:", summary["title"] or "Unknown")
+    print("Composer:", summary["composer"] or "Unknown")
+    print("Parts:", summary["parts"])
+    print("Measures:", summary["measures"])
+    if summary["fifths"] is not None:
+        print("Key Signature:", summary["key"] or summary["fifths"])
+    else:
+        print("Key Signature: not found")
+    print("Time Signature:", summary["time"] or "not found")
+    if summary["instruments"]:
+        print("Instruments:", ", ".join(summary["instruments"]))
+    else:
+        print("Instruments: not specified")
+
+    if summary["measures"] == 0:
+        print("⚠️  Warning: no measures found.")
+    if summary["parts"] == 0:
+        print("⚠️  Warning: no parts found.")
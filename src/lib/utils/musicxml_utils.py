@@ -1,5 +1,11 @@
+import os
+
 from music21 import converter, metadata, note, stream
 
+from lib.utils.musicxml_scan import key_name, print_summary
+from lib.utils.profiling import profile_stage, profiled
+from lib.utils.score_cache import cached_parse
+
 
 def _normalize_note(note_str: str) -> str:
     return (
@@ -10,14 +16,39 @@ def _normalize_note(note_str: str) -> str:
     )
 
 
-def load_musicxml(path: str):
-    """Load a MusicXML file into a music21 stream.Score."""
-    return converter.parse(path)
+@profiled(name="musicxml parse")
+def load_musicxml(path: str, cache: bool = True):
+    """
+    Load a MusicXML file into a music21 stream.Score, reusing the parsed
+    score from the on-disk score cache when the file's contents were parsed
+    before.
+    """
+    if not cache:
+        return converter.parse(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    fmt = os.path.splitext(str(path))[1].lower()
+    return cached_parse(data, lambda: converter.parse(path), fmt)
+
+
+@profiled(name="musicxml parse")
+def load_musicxml_data(data: bytes | str, cache: bool = True):
+    """Load MusicXML content (e.g. an archive member) into a music21 Score."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if not cache:
+        return converter.parseData(data.decode("utf-8"), format="musicxml")
+    return cached_parse(
+        data,
+        lambda: converter.parseData(data.decode("utf-8"), format="musicxml"),
+        ".musicxml",
+    )
 
 
 def save_musicxml(score, path: str):
     """Save a music21 score to MusicXML."""
-    score.write("musicxml", fp=path)
+    with profile_stage("score.write"):
+        score.write("musicxml", fp=path)
 
 
 def get_metadata(score):
@@ -43,44 +74,44 @@ def is_four_part(score):
     )
 
 
+def score_summary(score) -> dict:
+    """
+    Summarize a parsed score in the same shape as musicxml_scan.scan_musicxml
+    (title, composer, parts, measures, key, fifths, mode, time, instruments).
+    """
+    summary = dict(
+        get_metadata(score),
+        key=None,
+        fifths=None,
+        mode=None,
+        time=None,
+        instruments=[],
+    )
+    if not score.parts:
+        return summary
+
+    # The first signatures of the first part, wherever they sit
+    first_part = score.parts[0].recurse()
+    key_signature = first_part.getElementsByClass("KeySignature").first()
+    if key_signature is not None:
+        summary["fifths"] = key_signature.sharps
+        summary["mode"] = getattr(key_signature, "mode", None)
+        summary["key"] = key_name(key_signature.sharps, summary["mode"])
+    time_signature = first_part.getElementsByClass("TimeSignature").first()
+    if time_signature is not None:
+        summary["time"] = time_signature.ratioString
+
+    for part in score.parts:
+        summary["instruments"].extend(
+            instr.partName or instr.instrumentName or "Unnamed"
+            for instr in part.getInstruments(returnDefault=True)
+        )
+    return summary
+
+
 def print_score_summary(score):
     """Print a human-readable summary of a score."""
-    meta = get_metadata(score)
-    print("Title:", meta["title"] or "Unknown")
-    print("Composer:", meta["composer"] or "Unknown")
-    print("Parts:", meta["parts"])
-    print("Measures:", meta["measures"])
-
-    if score.parts:
-        first_part = score.parts[0]
-        first_measure = first_part.measure(1)
-
-        key_signature = first_measure.getContextByClass("KeySignature")
-        if key_signature:
-            print("Key Signature:", key_signature.sharps)
-        else:
-            print("Key Signature: not found")
-
-        time_signature = first_measure.getContextByClass("TimeSignature")
-        if time_signature:
-            print("Time Signature:", time_signature.ratioString)
-        else:
-            print("Time Signature: not found")
-
-        instruments = first_part.getInstruments(returnDefault=True)
-        if instruments:
-            names = [
-                instr.partName or instr.instrumentName or "Unnamed"
-                for instr in instruments
-            ]
-            print("Instruments:", ", ".join(names))
-        else:
-            print("Instruments: not specified")
-
-    if meta["measures"] == 0:
-        print("⚠️  Warning: no measures found.")
-    if meta["parts"] == 0:
-        print("⚠️  Warning: no parts found.")
+    print_summary(score_summary(score))
 
 
 def json_to_musicxml(json_data: dict):
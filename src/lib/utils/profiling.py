@@ -0,0 +1,344 @@
+"""
+Stage profiling for CLI runs (`--profile`).
+
+While a profile is active, every `log_step` message opens a new stage that
+lasts until the next `log_step` at the same level, and `profile_stage` /
+`profiled` mark the expensive operations inside a stage (LLM calls, music21
+score building, `score.write`, timidity, chain JSON I/O). Together they form
+a timing tree such as
+
+    chain-realization
+    ├─ 🔗 1. Generating Partimento...
+    │  ├─ llm
+    │  └─ json write
+    └─ 🎼 Exporting...
+       └─ export_realized_partimento_to_musicxml
+          ├─ json read
+          └─ score.write
+
+Stages with the same name under one parent are merged and counted. With
+cpu=True each stage also gets its own cProfile (own time only, children
+excluded); with memory=True tracemalloc records each stage's peak and its
+largest allocation sites. The result is written as a JSON report plus a
+collapsed-stack file (`a;b;c <microseconds>` lines) for flamegraph tools.
+
+When no profile is active the hooks cost one global lookup. The stage
+stack belongs to the thread that started the profile; hooks called from
+other threads (background audio renders) are not recorded.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+__all__ = [
+    "Profiler",
+    "active_profiler",
+    "mark_stage",
+    "profile_stage",
+    "profiled",
+]
+
+TOP_FUNCTIONS = 15
+TOP_ALLOCATIONS = 5
+
+_active = None
+
+
+class _Stage:
+    def __init__(self, name: str, marker: bool = False):
+        self.name = name
+        self.marker = marker
+        self.children: dict[str, "_Stage"] = {}
+        self.calls = 0
+        self.seconds = 0.0
+        self.started = None
+        self.cpu = None
+        self.peak_bytes = 0
+        self.allocated_bytes = 0
+        self.top_allocations = []
+        self._traced_at_start = 0
+
+    def child(self, name: str, marker: bool) -> "_Stage":
+        if name not in self.children:
+            self.children[name] = _Stage(name, marker)
+        return self.children[name]
+
+    def self_seconds(self) -> float:
+        return max(self.seconds - sum(c.seconds for c in self.children.values()), 0)
+
+
+class Profiler:
+    """Collects the stage tree of one command run."""
+
+    def __init__(self, name: str, cpu: bool = False, memory: bool = False):
+        self.cpu = cpu
+        self.memory = memory
+        self.root = _Stage(name)
+        self._stack = [self.root]
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> "Profiler":
+        global _active
+        if self.memory:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+        self._enter(self.root)
+        self._thread = threading.get_ident()
+        _active = self
+        return self
+
+    def stop(self) -> "Profiler":
+        global _active
+        while len(self._stack) > 1:
+            self._pop()
+        self._exit(self.root)
+        _active = None
+        if self.memory:
+            import tracemalloc
+
+            tracemalloc.stop()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Stage bookkeeping
+    # ------------------------------------------------------------------
+
+    def _enter(self, stage: _Stage) -> None:
+        parent = self._stack[-1] if stage is not self.root else None
+        if self.cpu:
+            import cProfile
+
+            if parent is not None and parent.cpu is not None:
+                parent.cpu.disable()
+            stage.cpu = stage.cpu or cProfile.Profile()
+            stage.cpu.enable()
+        if self.memory:
+            import tracemalloc
+
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                parent.peak_bytes = max(parent.peak_bytes, peak)
+            tracemalloc.reset_peak()
+            stage._traced_at_start = current
+        stage.calls += 1
+        stage.started = time.perf_counter()
+
+    def _exit(self, stage: _Stage) -> None:
+        stage.seconds += time.perf_counter() - stage.started
+        if self.cpu:
+            stage.cpu.disable()
+        if self.memory:
+            import tracemalloc
+
+            current, peak = tracemalloc.get_traced_memory()
+            if (stage.marker or stage is self.root) and peak >= stage.peak_bytes:
+                stats = tracemalloc.take_snapshot().statistics("lineno")
+                stage.top_allocations = [
+                    {"site": str(s.traceback), "bytes": s.size}
+                    for s in stats[:TOP_ALLOCATIONS]
+                ]
+            stage.peak_bytes = max(stage.peak_bytes, peak)
+            stage.allocated_bytes += current - stage._traced_at_start
+        parent = self._stack[-1] if stage is not self.root else None
+        if parent is not None:
+            if self.memory:
+                import tracemalloc
+
+                parent.peak_bytes = max(parent.peak_bytes, stage.peak_bytes)
+                tracemalloc.reset_peak()
+            if self.cpu and parent.cpu is not None:
+                parent.cpu.enable()
+
+    def _push(self, name: str, marker: bool = False) -> _Stage:
+        stage = self._stack[-1].child(name, marker)
+        self._enter(stage)
+        self._stack.append(stage)
+        return stage
+
+    def _pop(self) -> None:
+        stage = self._stack.pop()
+        self._exit(stage)
+
+    def mark(self, name: str) -> None:
+        """Start a `log_step` stage, ending the previous one at this level."""
+        if len(self._stack) > 1 and self._stack[-1].marker:
+            self._pop()
+        self._push(name, marker=True)
+
+    @contextmanager
+    def stage(self, name: str):
+        depth = len(self._stack)
+        self._push(name)
+        try:
+            yield
+        finally:
+            # Close log_step stages opened inside this one, then this one
+            while len(self._stack) > depth:
+                self._pop()
+
+    # ------------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------------
+
+    def _stage_report(self, stage: _Stage) -> dict:
+        report = {
+            "name": stage.name,
+            "calls": stage.calls,
+            "seconds": round(stage.seconds, 6),
+            "self_seconds": round(stage.self_seconds(), 6),
+        }
+        if stage.marker:
+            report["log_step"] = True
+        if self.memory:
+            report["peak_bytes"] = stage.peak_bytes
+            report["allocated_bytes"] = stage.allocated_bytes
+            report["top_allocations"] = stage.top_allocations
+        if self.cpu and stage.cpu is not None:
+            report["top_functions"] = _top_functions(stage.cpu)
+        report["children"] = [self._stage_report(c) for c in stage.children.values()]
+        return report
+
+    def report(self) -> dict:
+        return {
+            "command": self.root.name,
+            "cpu": self.cpu,
+            "memory": self.memory,
+            "stages": self._stage_report(self.root),
+        }
+
+    def collapsed(self) -> list[str]:
+        """Collapsed stacks of self time in microseconds, one line per frame."""
+        lines = []
+
+        def walk(stage: _Stage, prefix: list[str]):
+            path = prefix + [_frame(stage.name)]
+            own = stage.self_seconds()
+            if self.cpu and stage.cpu is not None:
+                functions = _function_times(stage.cpu)
+                for function, seconds in functions:
+                    lines.append(
+                        f"{';'.join(path + [_frame(function)])} {int(seconds * 1e6)}"
+                    )
+                own -= sum(s for _, s in functions)
+            if own > 0:
+                lines.append(f"{';'.join(path)} {int(own * 1e6)}")
+            for child in stage.children.values():
+                walk(child, path)
+
+        walk(self.root, [])
+        return [line for line in lines if not line.endswith(" 0")]
+
+    def write(self, path) -> tuple[str, str]:
+        """Write <path> (JSON report) and <path stem>.collapsed; return both."""
+        path = str(path)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        collapsed_path = os.path.splitext(path)[0] + ".collapsed"
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        with open(collapsed_path, "w") as f:
+            f.write("\n".join(self.collapsed()) + "\n")
+        return path, collapsed_path
+
+
+def _frame(name: str) -> str:
+    """Stage names as flamegraph frames: one line, no separators."""
+    return " ".join(name.split()).replace(";", ",") or "?"
+
+
+def _function_name(key) -> str:
+    filename, line, function = key
+    if filename == "~":
+        return function
+    return f"{os.path.basename(filename)}:{line}({function})"
+
+
+def _function_times(profile) -> list[tuple[str, float]]:
+    import pstats
+
+    stats = pstats.Stats(profile).stats
+    return [
+        (_function_name(key), tottime)
+        for key, (_, _, tottime, _, _) in stats.items()
+        if tottime > 0
+    ]
+
+
+def _top_functions(profile) -> list[dict]:
+    import pstats
+
+    stats = pstats.Stats(profile).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)
+    return [
+        {
+            "function": _function_name(key),
+            "calls": ncalls,
+            "tottime": round(tottime, 6),
+            "cumtime": round(cumtime, 6),
+        }
+        for key, (_, ncalls, tottime, cumtime, _) in rows[:TOP_FUNCTIONS]
+    ]
+
+
+def active_profiler() -> Profiler | None:
+    return _active
+
+
+def _profiler_here() -> Profiler | None:
+    """The active profiler, if this is the thread that started it."""
+    profiler = _active
+    if profiler is None or profiler._thread != threading.get_ident():
+        return None
+    return profiler
+
+
+def mark_stage(name: str) -> None:
+    """Called by `log_step`: begin a new stage if a profile is running."""
+    profiler = _profiler_here()
+    if profiler is not None:
+        profiler.mark(" ".join(name.split()))
+
+
+@contextmanager
+def profile_stage(name: str):
+    """Time the enclosed block as a child stage of the current stage."""
+    profiler = _profiler_here()
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name):
+        yield
+
+
+def profiled(func=None, *, name: str | None = None):
+    """Decorator form of profile_stage, named after the function by default."""
+    if func is None:
+        return functools.partial(profiled, name=name)
+    stage_name = name or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = _profiler_here()
+        if profiler is None:
+            return func(*args, **kwargs)
+        with profiler.stage(stage_name):
+            return func(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,390 @@
+"""
+Bulk regeneration of chain exports after an exporter changes.
+
+`find_chains` collects chain directories from paths, globs or the chain
+catalog. `final_versions` reads each chain's metadata.json to find the
+final partimento and realization JSON. `reexport` then rebuilds
+`<kind>.musicxml`, `<kind>.mid` and the audio preview for each of them
+in a process pool.
+
+An artifact is skipped when the journal shows it was already written for
+the same export key (input data hash, exporter and EXPORTER_VERSION, see
+`blob_store.export_key`) and the file has not been touched since. Each
+finished chain is appended to the journal right away, so an interrupted
+run resumes where it stopped. Bump EXPORTER_VERSION, or pass force=True,
+to rebuild everything.
+"""
+
+import glob
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from lib.utils.chain_catalog import latest_versions
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "FORMATS",
+    "ReexportJournal",
+    "final_versions",
+    "find_chains",
+    "reexport",
+]
+
+DEFAULT_JOURNAL = "generated/.reexport_journal.jsonl"
+FORMATS = ("musicxml", "midi", "audio")
+KINDS = ("partimento", "realized")
+
+
+# ----------------------------------------------------------------------
+# Finding chains and their final versions
+# ----------------------------------------------------------------------
+
+
+def _chain_dirs_under(root: str) -> list[str]:
+    found = []
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        if "metadata.json" in filenames:
+            found.append(directory)
+            dirnames[:] = []  # chains are leaves
+    return found
+
+
+def find_chains(inputs=None, catalog: str | None = None, **filters) -> list[str]:
+    """
+    Chain directories from paths and globs (searched recursively for
+    metadata.json), or every cataloged chain matching filters (key, style,
+    mode, since; see ChainCatalog.query) when no inputs are given.
+    """
+    if not inputs:
+        from lib.utils.chain_catalog import ChainCatalog
+
+        with ChainCatalog(catalog) as db:
+            rows = db.query(limit=-1, **filters)
+        return sorted(row["dir"] for row in rows if os.path.isdir(row["dir"]))
+
+    chains = []
+    for item in inputs:
+        matches = (
+            sorted(glob.glob(item, recursive=True)) if glob.has_magic(item) else [item]
+        )
+        for match in matches:
+            if os.path.isdir(match):
+                chains.extend(_chain_dirs_under(match))
+    return list(dict.fromkeys(os.path.abspath(c) for c in chains))
+
+
+def _last(value):
+    if isinstance(value, list):
+        return value[-1] if value else None
+    return value
+
+
+def final_versions(chain_dir: str) -> dict[str, str]:
+    """
+    {"partimento": path, "realized": path} of a chain's final JSON versions,
+    as recorded in metadata.json; the highest versioned file on disk stands
+    in for a kind the metadata does not name.
+    """
+    try:
+        with open(os.path.join(chain_dir, "metadata.json")) as f:
+            meta = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    files = meta.get("files") or {}
+    named = {
+        "partimento": _last(files.get("partimento_versions"))
+        or files.get("partimento")
+        or meta.get("partimento_file"),
+        "realized": _last(files.get("realization_versions"))
+        or files.get("realized")
+        or meta.get("realized_file"),
+    }
+    latest = latest_versions(sorted(os.listdir(chain_dir)))
+    found = {}
+    for kind in KINDS:
+        for name in (named[kind], latest.get(kind)):
+            if name and os.path.isfile(os.path.join(chain_dir, name)):
+                found[kind] = os.path.join(chain_dir, name)
+                break
+    return found
+
+
+# ----------------------------------------------------------------------
+# Journal
+# ----------------------------------------------------------------------
+
+
+class ReexportJournal:
+    """
+    Append-only JSON lines of {"output", "key", "mtime_ns"}, one per written
+    artifact; the last line for an output wins.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOURNAL):
+        self.path = path
+        self.entries: dict[str, dict] = {}  # output → entry
+        self._by_chain: dict[str, dict[str, dict]] = {}
+        try:
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # a line cut short by an interruption
+                    self._add(entry)
+        except FileNotFoundError:
+            pass
+
+    def _add(self, entry: dict) -> None:
+        self.entries[entry["output"]] = entry
+        chain = os.path.dirname(entry["output"])
+        self._by_chain.setdefault(chain, {})[entry["output"]] = entry
+
+    def for_chain(self, chain_dir: str) -> dict[str, dict]:
+        return dict(self._by_chain.get(os.path.abspath(chain_dir), {}))
+
+    def record(self, entries: list[dict]) -> None:
+        if not entries:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+                self._add(entry)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def compact(self) -> None:
+        """Rewrite the journal with one line per output."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp, self.path)
+
+
+# ----------------------------------------------------------------------
+# Exporting
+# ----------------------------------------------------------------------
+
+
+_EXPORT_MODULE = "genres.partimento.tasks.export"
+# Exporters by (kind, format), as dotted names so the parent process can
+# check export keys without importing music21
+EXPORTERS = {
+    ("partimento", "musicxml"): f"{_EXPORT_MODULE}.export_partimento_to_musicxml",
+    ("partimento", "midi"): f"{_EXPORT_MODULE}.export_partimento_to_midi",
+    (
+        "realized",
+        "musicxml",
+    ): f"{_EXPORT_MODULE}.export_realized_partimento_to_musicxml",
+    ("realized", "midi"): f"{_EXPORT_MODULE}.export_realized_partimento_to_midi",
+}
+AUDIO_EXPORTER = "lib.utils.music_utils.export_audio_from_midi"
+
+
+def _resolve(name: str):
+    module, _, attr = name.rpartition(".")
+    return getattr(importlib.import_module(module), attr)
+
+
+def _plan(chain_dir: str, formats) -> list[tuple[str, str, str, str]]:
+    """(format, exporter name, input, output) for every artifact to rebuild."""
+    from lib.utils.audio_render import audio_suffix
+
+    steps = []
+    for kind, source in final_versions(chain_dir).items():
+        midi = os.path.join(chain_dir, f"{kind}.mid")
+        outputs = {
+            "musicxml": (source, os.path.join(chain_dir, f"{kind}.musicxml")),
+            "midi": (source, midi),
+            "audio": (midi, os.path.join(chain_dir, f"{kind}{audio_suffix()}")),
+        }
+        for fmt in FORMATS:
+            if fmt in formats:
+                exporter = EXPORTERS.get((kind, fmt), AUDIO_EXPORTER)
+                steps.append((fmt, exporter, *outputs[fmt]))
+    return steps
+
+
+def _unchanged(entry: dict | None, exporter: str, input_path: str, output: str):
+    """True if the journal entry shows output is current for this export."""
+    from lib.utils.blob_store import export_key
+
+    if not entry or not os.path.exists(input_path):
+        return False
+    try:
+        return (
+            entry["key"] == export_key(exporter, input_path, output)
+            and os.stat(output).st_mtime_ns == entry["mtime_ns"]
+        )
+    except (OSError, ValueError):
+        return False
+
+
+def _reexport_chain(
+    chain_dir: str, formats, known: dict[str, dict], force: bool
+) -> dict:
+    """
+    Worker: rebuild one chain's exports. Return {"chain", "artifacts"},
+    each artifact {"output", "status", "key"?, "mtime_ns"?, "error"?}.
+    """
+    from lib.utils.blob_store import export_cached, export_key
+    from lib.utils.chain_utils import record_audio
+
+    artifacts = []
+    audio_results = {}
+    for fmt, exporter, input_path, output in _plan(chain_dir, formats):
+        if not force and _unchanged(known.get(output), exporter, input_path, output):
+            artifacts.append({"output": output, "status": "skipped"})
+            continue
+        try:
+            if not os.path.exists(input_path):
+                raise FileNotFoundError(f"missing input {input_path}")
+            export_cached(_resolve(exporter), input_path, output, force=force)
+            if not os.path.exists(output):
+                raise RuntimeError("exporter wrote nothing")
+        except Exception as e:
+            artifacts.append(
+                {
+                    "output": output,
+                    "status": "failed",
+                    "error": f"{type(e).__name__}: {e}",
+                }
+            )
+            if fmt == "audio":
+                audio_results[os.path.basename(output)] = "failed"
+            continue
+        artifacts.append(
+            {
+                "output": output,
+                "status": "exported",
+                "key": export_key(exporter, input_path, output),
+                "mtime_ns": os.stat(output).st_mtime_ns,
+            }
+        )
+        if fmt == "audio":
+            audio_results[os.path.basename(output)] = "done"
+    if audio_results:
+        record_audio(chain_dir, audio_results)
+    return {"chain": chain_dir, "artifacts": artifacts}
+
+
+def _all_unchanged(chain_dir: str, formats, known: dict[str, dict]) -> dict | None:
+    """A result of all-skipped artifacts if nothing in the chain needs work."""
+    steps = _plan(chain_dir, formats)
+    if not steps or not all(
+        _unchanged(known.get(output), exporter, input_path, output)
+        for _, exporter, input_path, output in steps
+    ):
+        return None
+    return {
+        "chain": chain_dir,
+        "artifacts": [{"output": output, "status": "skipped"} for *_, output in steps],
+    }
+
+
+def reexport(
+    chains,
+    formats=FORMATS,
+    jobs: int | None = None,
+    journal: ReexportJournal | None = None,
+    force: bool = False,
+    progress=None,
+) -> dict:
+    """
+    Rebuild the exports of every chain directory, skipping artifacts the
+    journal shows are current. progress(result) is called as each chain
+    finishes. Return counts of exported, skipped and failed artifacts plus
+    the elapsed seconds and exported files per second.
+    """
+    chains = [os.path.abspath(c) for c in chains]
+    journal = journal or ReexportJournal()
+    formats = tuple(formats)
+    stats = {"chains": len(chains), "exported": 0, "skipped": 0, "failed": 0}
+    start = time.perf_counter()
+
+    def finish(result):
+        journal.record(
+            [
+                {k: a[k] for k in ("output", "key", "mtime_ns")}
+                for a in result["artifacts"]
+                if a["status"] == "exported"
+            ]
+        )
+        for artifact in result["artifacts"]:
+            stats[artifact["status"]] += 1
+        if progress:
+            progress(result)
+
+    # Chains whose artifacts are all current never reach a worker
+    pending = []
+    for chain in chains:
+        result = (
+            None if force else _all_unchanged(chain, formats, journal.for_chain(chain))
+        )
+        if result:
+            finish(result)
+        else:
+            pending.append(chain)
+
+    jobs = min(jobs or os.cpu_count() or 1, max(len(pending), 1))
+    if jobs == 1:
+        for chain in pending:
+            finish(_reexport_chain(chain, formats, journal.for_chain(chain), force))
+    else:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=jobs, mp_context=context, max_tasks_per_child=100
+        ) as pool:
+            queue = iter(pending)
+            in_flight = {}
+            try:
+                while True:
+                    while len(in_flight) < 2 * jobs:
+                        chain = next(queue, None)
+                        if chain is None:
+                            break
+                        future = pool.submit(
+                            _reexport_chain,
+                            chain,
+                            formats,
+                            journal.for_chain(chain),
+                            force,
+                        )
+                        in_flight[future] = chain
+                    if not in_flight:
+                        break
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        chain = in_flight.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:  # the worker died
+                            result = {
+                                "chain": chain,
+                                "artifacts": [
+                                    {
+                                        "output": chain,
+                                        "status": "failed",
+                                        "error": f"{type(e).__name__}: {e}",
+                                    }
+                                ],
+                            }
+                        finish(result)
+            except BaseException:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    journal.compact()
+    stats["seconds"] = time.perf_counter() - start
+    stats["files_per_second"] = stats["exported"] / max(stats["seconds"], 1e-9)
+    return stats
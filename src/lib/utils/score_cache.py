@@ -0,0 +1,209 @@
+"""
+On-disk cache of parsed music21 scores.
+
+`load_musicxml` parses through `cached_parse`, which keys each score on the
+sha256 of the source bytes plus the music21 version and stores the parsed
+Score pickled under `<root>/<aa>/<key>.pickle`. music21 streams pickle
+directly (sites, spanners and derivations survive), which thaws several
+times faster than `freezeThaw` and far faster than re-parsing. A changed
+file or a music21 upgrade simply misses; an unreadable entry is dropped and
+re-parsed.
+
+The cache is bounded by size: after each write the least recently used
+entries (by mtime, refreshed on every hit) are removed until the total fits.
+Hits, misses, writes and evictions are counted in `<root>/stats.json`.
+
+The cache lives in generated/.score_cache unless YANTRA_SCORE_CACHE points
+elsewhere; YANTRA_SCORE_CACHE=off disables it. YANTRA_SCORE_CACHE_MB sets the
+size bound (default 512).
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+
+from lib.utils.profiling import profile_stage
+
+__all__ = ["ScoreCache", "cached_parse", "default_cache"]
+
+DEFAULT_SCORE_CACHE = "generated/.score_cache"
+DEFAULT_MAX_MB = 512
+# Bump when the stored format changes so old entries are not reused.
+CACHE_FORMAT = "1"
+STATS_FILE = "stats.json"
+_COUNTERS = ("hits", "misses", "writes", "evictions")
+
+
+def _music21_version() -> str:
+    import music21
+
+    return music21.__version__
+
+
+class ScoreCache:
+    """A size-bounded directory of pickled scores keyed by source hash."""
+
+    def __init__(self, root, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    def key(self, data: bytes, fmt: str = "") -> str:
+        digest = hashlib.sha256(data)
+        digest.update(f"\0{fmt}\0{_music21_version()}\0{CACHE_FORMAT}".encode())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.pickle"
+
+    def get(self, key: str):
+        """Return the cached score for key, or None."""
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                score = pickle.load(f)
+        except FileNotFoundError:
+            self._count(misses=1)
+            return None
+        except Exception:
+            # Truncated or written by an incompatible interpreter
+            path.unlink(missing_ok=True)
+            self._count(misses=1)
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        self._count(hits=1)
+        return score
+
+    def put(self, key: str, score) -> bool:
+        """Store a score. Return False if it could not be pickled."""
+        try:
+            data = pickle.dumps(score, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+        if len(data) > self.max_bytes:
+            return False
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        evicted = self.evict()
+        self._count(writes=1, evictions=evicted)
+        return True
+
+    def entries(self) -> list[tuple[Path, int, float]]:
+        """(path, size, mtime) of every entry, least recently used first."""
+        found = []
+        if not self.root.is_dir():
+            return found
+        for shard in self.root.iterdir():
+            if not shard.is_dir() or len(shard.name) != 2:
+                continue
+            for entry in shard.iterdir():
+                if entry.name.startswith(".") or entry.suffix != ".pickle":
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                found.append((entry, st.st_size, st.st_mtime))
+        found.sort(key=lambda item: item[2])
+        return found
+
+    def evict(self, max_bytes: int | None = None) -> int:
+        """Remove least recently used entries until the cache fits."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in entries:
+            if total <= limit:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        removed = self.evict(max_bytes=0)
+        (self.root / STATS_FILE).unlink(missing_ok=True)
+        return removed
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def _count(self, **increments) -> None:
+        if not any(increments.values()):
+            return
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.root / STATS_FILE, "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                f.seek(0)
+                try:
+                    stats = json.loads(f.read() or "{}")
+                except json.JSONDecodeError:
+                    stats = {}
+                for name, value in increments.items():
+                    stats[name] = stats.get(name, 0) + value
+                f.seek(0)
+                f.truncate()
+                json.dump(stats, f)
+        except OSError:
+            pass
+
+    def stats(self) -> dict:
+        """Entry count, size and the lifetime hit/miss/write/eviction counts."""
+        try:
+            counters = json.loads((self.root / STATS_FILE).read_text())
+        except (OSError, json.JSONDecodeError):
+            counters = {}
+        stats = {name: counters.get(name, 0) for name in _COUNTERS}
+        lookups = stats["hits"] + stats["misses"]
+        entries = self.entries()
+        stats.update(
+            entries=len(entries),
+            bytes=sum(size for _, size, _ in entries),
+            max_bytes=self.max_bytes,
+            hit_rate=stats["hits"] / lookups if lookups else 0.0,
+        )
+        return stats
+
+
+def default_cache() -> ScoreCache | None:
+    """The cache configured by YANTRA_SCORE_CACHE, or None if disabled."""
+    setting = os.environ.get("YANTRA_SCORE_CACHE")
+    if setting is not None and setting.lower() in ("", "0", "off", "false"):
+        return None
+    try:
+        max_mb = float(os.environ.get("YANTRA_SCORE_CACHE_MB", DEFAULT_MAX_MB))
+    except ValueError:
+        max_mb = DEFAULT_MAX_MB
+    return ScoreCache(setting or DEFAULT_SCORE_CACHE, int(max_mb * 1024 * 1024))
+
+
+def cached_parse(data: bytes, parse, fmt: str = "", cache: ScoreCache | None = None):
+    """
+    Return parse() for the source bytes `data` (in format fmt, e.g. the file
+    extension), served from the cache when the same bytes were parsed before
+    under the same music21 version.
+    """
+    cache = cache or default_cache()
+    if cache is None:
+        return parse()
+    key = cache.key(data, fmt)
+    with profile_stage("score cache"):
+        score = cache.get(key)
+    if score is not None:
+        return score
+    score = parse()
+    if score is not None:
+        with profile_stage("score cache"):
+            cache.put(key, score)
+    return score
@@ -0,0 +1,440 @@
+"""
+Import MusicXML and MIDI scores into the partimento and SATB JSON schemas.
+
+MusicXML is read in one streaming `iterparse` pass, dropping each measure
+once it has been read as `musicxml_scan` does; MIDI goes through music21.
+Either way the score is reduced to lines (one per part and voice) of
+per-measure note events, then shaped as
+
+- SATB ({"soprano", "alto", "tenor", "bass"}) when there are exactly four
+  lines, matched by part name or else by register, or
+- a partimento ({"bassline", "figures"}) from the bass line otherwise, with
+  figures taken from <figured-bass> elements or from figure-like lyrics
+  ("6", "6 4", "#", "b7"), which is how the exporters write them.
+
+The JSON schema has no durations, so rests, grace notes and tied
+continuations are dropped and chords keep their outer note. `import_files`
+converts a corpus in a process pool, keeping only a few files in flight and
+recycling workers, writes one chain JSON per file and reports failures per
+file instead of stopping.
+"""
+
+import multiprocessing
+import os
+import re
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from xml.etree import ElementTree
+
+from lib.utils.musicxml_scan import MUSICXML_EXTENSIONS, key_name, open_musicxml
+
+__all__ = [
+    "IMPORT_EXTENSIONS",
+    "IMPORT_KINDS",
+    "import_files",
+    "import_score",
+    "parse_figures",
+    "read_midi",
+    "read_musicxml",
+    "score_to_json",
+]
+
+MIDI_EXTENSIONS = (".mid", ".midi")
+IMPORT_EXTENSIONS = MUSICXML_EXTENSIONS + MIDI_EXTENSIONS
+IMPORT_KINDS = ("auto", "partimento", "satb")
+VOICES = ("soprano", "alto", "tenor", "bass")
+BASS_NAMES = ("bass", "basso", "continuo", "b.c.", "bc")
+
+_STEP_SEMITONES = {"C": 0, "D": 2, "E": 4, "F": 5, "G": 7, "A": 9, "B": 11}
+_ALTER_NAMES = {-2: "bb", -1: "b", 0: "", 1: "#", 2: "##"}
+_FIGURE_ACCIDENTALS = {
+    "sharp": "#",
+    "flat": "b",
+    "natural": "♮",
+    "double-sharp": "##",
+    "sharp-sharp": "##",
+    "flat-flat": "bb",
+    "cross": "+",
+    "slash": "+",
+    "backslash": "+",
+}
+_FIGURE_RE = re.compile(r"^[#b♯♭♮n+]{0,2}\d{0,2}[#b♯♭♮+]?$")
+
+
+def parse_figures(text: str | None) -> list[str] | None:
+    """Figures from a lyric such as "6 4", "6/4" or "#6"; None if not figures."""
+    if not text:
+        return None
+    tokens = [t for t in re.split(r"[\s/,]+", text.strip()) if t]
+    if not tokens or not all(_FIGURE_RE.match(t) for t in tokens):
+        return None
+    return tokens
+
+
+def _pitch(step: str, alter: float, octave: int) -> tuple[int, str]:
+    alter = int(round(alter))
+    midi = (octave + 1) * 12 + _STEP_SEMITONES[step] + alter
+    return midi, f"{step}{_ALTER_NAMES.get(alter, '')}{octave}"
+
+
+def _text(element, path: str) -> str | None:
+    found = element.find(path)
+    if found is None or found.text is None:
+        return None
+    return found.text.strip() or None
+
+
+def _figured_bass(element) -> list[str]:
+    figures = []
+    for figure in element.iterfind("{*}figure"):
+        prefix = _FIGURE_ACCIDENTALS.get(_text(figure, "{*}prefix") or "", "")
+        number = _text(figure, "{*}figure-number") or ""
+        suffix = _FIGURE_ACCIDENTALS.get(_text(figure, "{*}suffix") or "", "")
+        if prefix or number or suffix:
+            figures.append(f"{prefix}{number}{suffix}")
+    return figures
+
+
+class _Line:
+    """One part/voice of an imported score: note events per measure index."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.measures: dict[int, list[dict]] = {}
+        # Inside a tied continuation, whose chord notes are skipped too
+        self.skipping = False
+
+    def events(self, index: int) -> list[dict]:
+        return self.measures.setdefault(index, [])
+
+
+def read_musicxml(source) -> dict:
+    """
+    Read a partwise MusicXML path, .mxl path or bytes into
+    {"title", "composer", "key", "measures", "lines": [{"name", "measures"}]}.
+    """
+    title = movement_title = composer = key = None
+    part_names = {}
+    lines: dict[tuple, _Line] = {}
+    measure_count = 0
+    part_id = None
+    measure_index = -1
+    pending_figures = None
+    stack = []
+
+    with open_musicxml(source) as f:
+        for event, element in ElementTree.iterparse(f, events=("start", "end")):
+            tag = element.tag.rpartition("}")[2]
+            if event == "start":
+                if not stack and tag != "score-partwise":
+                    raise ValueError(f"not a partwise MusicXML score (<{tag}>)")
+                if tag == "part":
+                    part_id = element.get("id")
+                    measure_index = -1
+                    pending_figures = None
+                elif tag == "measure":
+                    measure_index += 1
+                stack.append(element)
+                continue
+
+            stack.pop()
+            parent = stack[-1] if stack else None
+            if tag == "work-title":
+                title = title or (element.text or "").strip() or None
+            elif tag == "movement-title":
+                movement_title = (element.text or "").strip() or None
+            elif tag == "creator" and element.get("type") == "composer":
+                composer = composer or (element.text or "").strip() or None
+            elif tag == "score-part":
+                part_names[element.get("id")] = _text(element, "{*}part-name")
+            elif tag == "key" and key is None:
+                fifths = _text(element, "{*}fifths")
+                if fifths is not None:
+                    key = key_name(int(fifths), _text(element, "{*}mode"))
+            elif tag == "figured-bass":
+                pending_figures = _figured_bass(element)
+            elif tag == "note":
+                pending_figures = _read_note(
+                    element, part_id, measure_index, lines, pending_figures
+                )
+            elif tag == "measure":
+                measure_count = max(measure_count, measure_index + 1)
+                if parent is not None:
+                    parent.remove(element)
+            elif tag == "part" and parent is not None:
+                parent.remove(element)
+
+    voices_per_part = {}
+    for part, _ in lines:
+        voices_per_part[part] = voices_per_part.get(part, 0) + 1
+    ordered = []
+    for (part, voice), line in lines.items():
+        name = part_names.get(part) or part or "Part"
+        line.name = name if voices_per_part[part] == 1 else f"{name} {voice}"
+        ordered.append(line)
+    return {
+        "title": title or movement_title,
+        "composer": composer,
+        "key": key,
+        "measures": measure_count,
+        "lines": [_line_dict(line, measure_count) for line in ordered],
+    }
+
+
+def _read_note(element, part_id, measure_index, lines, pending_figures):
+    """Add one <note> to its line; return the figures still waiting for a note."""
+    if element.find("{*}grace") is not None or element.find("{*}cue") is not None:
+        return pending_figures
+    pitch = element.find("{*}pitch")
+    if pitch is None:
+        return None  # a rest: figures over it are dropped with it
+    midi_name = _pitch(
+        _text(pitch, "{*}step"),
+        float(_text(pitch, "{*}alter") or 0),
+        int(_text(pitch, "{*}octave")),
+    )
+    voice = _text(element, "{*}voice") or "1"
+    line = lines.get((part_id, voice))
+    if line is None:
+        line = lines[(part_id, voice)] = _Line(voice)
+    events = line.events(measure_index)
+
+    if element.find("{*}chord") is not None:
+        if events and not line.skipping:
+            events[-1]["pitches"].append(midi_name)
+        return pending_figures
+    ties = {tie.get("type") for tie in element.iterfind("{*}tie")}
+    line.skipping = "stop" in ties
+    if line.skipping:
+        return pending_figures
+
+    lyrics = [
+        (lyric_text.text or "").strip()
+        for lyric_text in element.iterfind("{*}lyric/{*}text")
+    ]
+    figures = pending_figures or parse_figures(" ".join(lyrics))
+    events.append({"pitches": [midi_name], "figures": figures})
+    return None
+
+
+def _line_dict(line: _Line, measure_count: int) -> dict:
+    return {
+        "name": line.name,
+        "measures": [line.measures.get(i, []) for i in range(measure_count)],
+    }
+
+
+def read_midi(path) -> dict:
+    """Read a MIDI file through music21 into the shape of read_musicxml."""
+    from music21 import converter
+
+    score = converter.parse(path)
+    signature = score.recurse().getElementsByClass("KeySignature").first()
+    if signature is None:
+        signature = score.analyze("key")
+    key = key_name(signature.sharps, getattr(signature, "mode", None))
+
+    lines = []
+    for index, part in enumerate(score.parts):
+        measures = []
+        for measure in part.getElementsByClass("Measure"):
+            events = []
+            for n in measure.flatten().notes:
+                if n.duration.isGrace:
+                    continue
+                if n.tie is not None and n.tie.type in ("stop", "continue"):
+                    continue
+                pitches = [
+                    _pitch(p.step, p.alter, p.octave if p.octave is not None else 4)
+                    for p in n.pitches
+                ]
+                events.append({"pitches": pitches, "figures": parse_figures(n.lyric)})
+            measures.append(events)
+        lines.append(
+            {"name": part.partName or f"Part {index + 1}", "measures": measures}
+        )
+
+    measure_count = max((len(line["measures"]) for line in lines), default=0)
+    for line in lines:
+        line["measures"] += [[] for _ in range(measure_count - len(line["measures"]))]
+    title = score.metadata.title if score.metadata else None
+    return {
+        "title": title or os.path.splitext(os.path.basename(str(path)))[0],
+        "composer": score.metadata.composer if score.metadata else None,
+        "key": key,
+        "measures": measure_count,
+        "lines": lines,
+    }
+
+
+def _register(line: dict) -> float:
+    pitches = [
+        midi
+        for events in line["measures"]
+        for event in events
+        for midi, _ in event["pitches"]
+    ]
+    return sum(pitches) / len(pitches) if pitches else 0.0
+
+
+def _notes(line: dict, lowest: bool) -> list[list[str]]:
+    pick = min if lowest else max
+    return [
+        [pick(event["pitches"])[1] for event in events] for events in line["measures"]
+    ]
+
+
+def _match_voices(lines: list[dict]) -> list[dict]:
+    """Order four lines soprano → bass, by part name when every name matches."""
+    named = {}
+    for line in lines:
+        name = line["name"].strip().lower()
+        for voice in VOICES:
+            if name.startswith(voice) or name == voice[0]:
+                named.setdefault(voice, line)
+    if len(named) == 4 and len({id(line) for line in named.values()}) == 4:
+        return [named[voice] for voice in VOICES]
+    return sorted(lines, key=_register, reverse=True)
+
+
+def score_to_json(score: dict, kind: str = "auto") -> tuple[str, dict]:
+    """
+    Shape a score from read_musicxml/read_midi as ("satb", data) or
+    ("partimento", data). kind="auto" picks SATB for exactly four lines.
+    """
+    if kind not in IMPORT_KINDS:
+        raise ValueError(f"Unknown import kind: {kind}")
+    lines = [
+        line for line in score["lines"] if any(events for events in line["measures"])
+    ]
+    if not lines:
+        raise ValueError("no notes found")
+    if kind == "auto":
+        kind = "satb" if len(lines) == 4 else "partimento"
+    title = score["title"] or "Imported Score"
+    key = score["key"] or "C major"
+
+    if kind == "satb":
+        if len(lines) != 4:
+            raise ValueError(
+                f"SATB import needs four parts or voices, not {len(lines)}"
+            )
+        data = {"title": title, "key": key}
+        for voice, line in zip(VOICES, _match_voices(lines)):
+            data[voice] = _notes(line, lowest=voice == "bass")
+        return kind, data
+
+    basses = [line for line in lines if line["name"].strip().lower() in BASS_NAMES]
+    bass = basses[0] if basses else min(lines, key=_register)
+    return kind, {
+        "title": title,
+        "key": key,
+        "style": score["composer"] or "Imported",
+        "bassline": _notes(bass, lowest=True),
+        "figures": [
+            [event["figures"] or [] for event in events] for events in bass["measures"]
+        ],
+        "cadences": [],
+        "modulations": [],
+    }
+
+
+def import_score(path, kind: str = "auto") -> tuple[str, dict]:
+    """Read a MusicXML or MIDI file and shape it as partimento or SATB JSON."""
+    if str(path).lower().endswith(MIDI_EXTENSIONS):
+        score = read_midi(path)
+    else:
+        score = read_musicxml(path)
+    return score_to_json(score, kind)
+
+
+def _import_one(path: str, output_stem: str, kind: str) -> dict:
+    from lib.utils.chain_utils import write_chain_json
+
+    try:
+        kind, data = import_score(path, kind)
+        output = f"{output_stem}.{kind}.json"
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        write_chain_json(data, output, mode=f"import-{kind}", source_path=path)
+    except Exception as e:
+        return {"path": path, "error": f"{type(e).__name__}: {e}"}
+    measures = data["soprano"] if kind == "satb" else data["bassline"]
+    return {"path": path, "output": output, "kind": kind, "measures": len(measures)}
+
+
+def _output_stems(paths: list[str], output_dir: str) -> list[str]:
+    """
+    Mirror the inputs' layout below their common directory in output_dir.
+    Inputs that differ only by extension (x.musicxml, x.mid) keep it: x_mid.
+    """
+    directories = [os.path.dirname(os.path.abspath(p)) for p in paths]
+    base = os.path.commonpath(directories) if directories else ""
+    relative = [os.path.relpath(os.path.abspath(p), base) for p in paths]
+    stems = [os.path.splitext(r)[0] for r in relative]
+    counts = Counter(stems)
+    stems = [
+        stem if counts[stem] == 1 else f"{stem}_{os.path.splitext(r)[1][1:]}"
+        for stem, r in zip(stems, relative)
+    ]
+    return [os.path.join(output_dir, stem) for stem in stems]
+
+
+def import_files(
+    paths,
+    output_dir: str,
+    kind: str = "auto",
+    jobs: int | None = None,
+    max_tasks_per_child: int = 100,
+    progress=None,
+) -> list[dict]:
+    """
+    Import every file to <output_dir>/<relative stem>.<kind>.json and return
+    one {"path", "output", "kind", "measures"} or {"path", "error"} per input,
+    in input order. With more than one job the files go through a process
+    pool that holds at most two files per worker in flight and replaces each
+    worker after max_tasks_per_child files, so memory stays bounded however
+    large the corpus is. progress(result) is called as each file finishes.
+    """
+    paths = [str(p) for p in paths]
+    tasks = list(zip(paths, _output_stems(paths, output_dir)))
+    jobs = min(jobs or os.cpu_count() or 1, max(len(tasks), 1))
+    results = [None] * len(tasks)
+
+    def record(index, result):
+        results[index] = result
+        if progress:
+            progress(result)
+
+    if jobs == 1:
+        for index, (path, stem) in enumerate(tasks):
+            record(index, _import_one(path, stem, kind))
+        return results
+
+    # max_tasks_per_child needs spawned workers
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=jobs, mp_context=context, max_tasks_per_child=max_tasks_per_child
+    ) as pool:
+        queue = iter(enumerate(tasks))
+        in_flight = {}
+        while True:
+            while len(in_flight) < 2 * jobs:
+                task = next(queue, None)
+                if task is None:
+                    break
+                index, (path, stem) = task
+                in_flight[pool.submit(_import_one, path, stem, kind)] = index
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:  # the worker died (e.g. out of memory)
+                    result = {
+                        "path": tasks[index][0],
+                        "error": f"{type(e).__name__}: {e}",
+                    }
+                record(index, result)
+    return results
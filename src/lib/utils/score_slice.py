@@ -0,0 +1,83 @@
+"""
+Measure ranges and voice subsets for partial exports and previews.
+
+`--measures 17-24 --voices s,b` on the export commands builds only that
+slice of a score: the MusicXML keeps the original measure numbers, MIDI
+and audio start at the first selected measure.
+"""
+
+VOICES = ("soprano", "alto", "tenor", "bass")
+
+__all__ = [
+    "check_measures",
+    "parse_measures",
+    "parse_slice",
+    "parse_voices",
+    "slice_suffix",
+]
+
+
+def parse_measures(spec: str) -> range:
+    """
+    1-based measure numbers from "17-24" (inclusive) or "17". Raises
+    ValueError for anything else.
+    """
+    first, _, last = spec.strip().partition("-")
+    try:
+        first_number = int(first)
+        last_number = int(last) if last else first_number
+    except ValueError:
+        raise ValueError(f"invalid measure range {spec!r}, expected e.g. 17-24")
+    if first_number < 1 or last_number < first_number:
+        raise ValueError(f"invalid measure range {spec!r}, expected e.g. 17-24")
+    return range(first_number, last_number + 1)
+
+
+def check_measures(measures, count: int) -> None:
+    """Raise ValueError if measures reach past a score of count measures."""
+    if measures is not None and max(measures) > count:
+        raise ValueError(
+            f"measures {min(measures)}-{max(measures)} are past the end of the "
+            f"score ({count} measures)"
+        )
+
+
+def parse_voices(spec: str) -> tuple[str, ...]:
+    """
+    Voice names, in score order, from a comma-separated list of names or
+    initials ("s,b", "soprano,bass", "satb"). Raises ValueError for an
+    unknown voice.
+    """
+    items = [item.strip().lower() for item in spec.split(",") if item.strip()]
+    if len(items) == 1 and items[0] not in VOICES and set(items[0]) <= set("satb"):
+        items = list(items[0])
+    chosen = set()
+    for item in items:
+        matches = [v for v in VOICES if v == item or v[0] == item]
+        if not matches:
+            raise ValueError(f"unknown voice {item!r}, expected one of s,a,t,b")
+        chosen.update(matches)
+    if not chosen:
+        raise ValueError("no voices selected")
+    return tuple(v for v in VOICES if v in chosen)
+
+
+def slice_suffix(measures=None, voices=None) -> str:
+    """File name tag of a slice, e.g. ".m17-24.sb"; "" for the full score."""
+    tag = ""
+    if measures is not None:
+        tag += f".m{measures[0]}-{measures[-1]}"
+    if voices is not None and tuple(voices) != VOICES:
+        tag += "." + "".join(v[0] for v in voices)
+    return tag
+
+
+def parse_slice(measures: str | None = None, voices: str | None = None):
+    """
+    (measure range or None, voice names or None) from the --measures and
+    --voices options. Raises ValueError for a malformed value.
+    """
+    return (
+        parse_measures(measures) if measures else None,
+        parse_voices(voices) if voices else None,
+    )
@@ -0,0 +1,190 @@
+"""
+Voicing search for four-part textures over a fixed bass.
+
+A Chord describes the pitch classes to voice above one bass note. Candidate
+voicings are numpy rows [soprano, alto, tenor, bass] of MIDI numbers, and
+voice-leading costs between two candidate sets are computed as one matrix so
+the dynamic programme in `best_voicing_path` stays fast on long scores.
+"""
+
+from dataclasses import dataclass, field
+from itertools import product
+
+import numpy as np
+
+from lib.utils.music_utils import RANGE_MIDI
+
+UPPER_VOICES = ("soprano", "alto", "tenor")
+VOICE_COLUMNS = {"soprano": 0, "alto": 1, "tenor": 2, "bass": 3}
+_PAIRS = [(i, j) for i in range(4) for j in range(i + 1, 4)]
+
+# Voice-leading cost weights
+PARALLEL_COST = 1000.0
+CONTRARY_PARALLEL_COST = 100.0
+DIRECT_OUTER_COST = 50.0
+OVERLAP_COST = 20.0
+LEADING_TONE_COST = 15.0
+DISSONANCE_COST = 10.0
+LEAP_COST = 2.0
+LARGE_LEAP_COST = 10.0
+DOUBLING_COST = 1.0
+
+
+@dataclass
+class Chord:
+    """Pitch classes to voice above a bass note."""
+
+    bass: int
+    pcs: frozenset[int]
+    dissonant: frozenset[int] = frozenset()
+    letters: dict[int, str] = field(default_factory=dict)
+
+
+def enumerate_voicings(
+    chord: Chord, leading_tone: int | None = None, limit: int = 32
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return (voicings, costs) for a chord: up to `limit` rows of
+    [soprano, alto, tenor, bass] within the SATB ranges, cheapest first.
+
+    Every chord tone appears above the bass, voices do not cross, upper
+    voices stay within an octave of each other and the leading tone is never
+    doubled. Returns empty arrays when nothing fits.
+    """
+    options = []
+    for voice in UPPER_VOICES:
+        low, high = RANGE_MIDI[voice[0]]
+        options.append([m for m in range(low, high + 1) if m % 12 in chord.pcs])
+
+    required = set(chord.pcs) - {chord.bass % 12}
+    rows, costs = [], []
+    for s, a, t in product(*options):
+        if not (s > a > t > chord.bass) or s - a > 12 or a - t > 12:
+            continue
+        upper_pcs = [s % 12, a % 12, t % 12]
+        if not required.issubset(upper_pcs):
+            continue
+        all_pcs = upper_pcs + [chord.bass % 12]
+        if leading_tone is not None and all_pcs.count(leading_tone) > 1:
+            continue
+        # Prefer doubling the bass; keep the soprano in a singable middle
+        doubled = len(all_pcs) - len(set(all_pcs))
+        cost = 0.0
+        if doubled and all_pcs.count(chord.bass % 12) < 2:
+            cost += DOUBLING_COST
+        cost += 0.1 * abs(s - 70) + 0.05 * (a - t)
+        rows.append((s, a, t, chord.bass))
+        costs.append(cost)
+
+    if not rows:
+        return np.empty((0, 4), dtype=int), np.empty(0)
+    order = np.argsort(costs, kind="stable")[:limit]
+    return np.array(rows, dtype=int)[order], np.array(costs)[order]
+
+
+def transition_costs(
+    prev: np.ndarray,
+    cur: np.ndarray,
+    prev_chord: Chord | None = None,
+    cur_chord: Chord | None = None,
+    leading_tone: int | None = None,
+    tonic: int | None = None,
+) -> np.ndarray:
+    """
+    Return a (len(prev), len(cur)) matrix of voice-leading costs between two
+    sets of voicings: motion, leaps, parallel and direct fifths/octaves,
+    overlaps, leading-tone and dissonance resolution.
+    """
+    motion = cur[None, :, :] - prev[:, None, :]
+    upper = np.abs(motion[:, :, :3])
+    cost = upper.sum(axis=2) + 0.5 * upper[:, :, 0]
+    cost += LEAP_COST * np.maximum(upper - 5, 0).sum(axis=2)
+    cost += LARGE_LEAP_COST * (upper > 7).sum(axis=2)
+
+    direction = np.sign(motion)
+    for i, j in _PAIRS:
+        before = ((prev[:, i] - prev[:, j]) % 12)[:, None]
+        after = ((cur[:, i] - cur[:, j]) % 12)[None, :]
+        perfect = (before == after) & ((after == 0) | (after == 7))
+        moving = (direction[:, :, i] != 0) & (direction[:, :, j] != 0)
+        same = direction[:, :, i] == direction[:, :, j]
+        cost += PARALLEL_COST * (perfect & moving & same)
+        cost += CONTRARY_PARALLEL_COST * (perfect & moving & ~same)
+
+    # Direct fifths/octaves between the outer voices with a leaping soprano
+    outer_before = ((prev[:, 0] - prev[:, 3]) % 12)[:, None]
+    outer_after = ((cur[:, 0] - cur[:, 3]) % 12)[None, :]
+    direct = (
+        ((outer_after == 0) | (outer_after == 7))
+        & (outer_before != outer_after)
+        & (direction[:, :, 0] == direction[:, :, 3])
+        & (direction[:, :, 0] != 0)
+        & (upper[:, :, 0] > 2)
+    )
+    cost += DIRECT_OUTER_COST * direct
+
+    # Adjacent voices must not overlap the previous position of their neighbour
+    for i in range(3):
+        cost += OVERLAP_COST * (cur[None, :, i + 1] > prev[:, None, i])
+        cost += OVERLAP_COST * (cur[None, :, i] < prev[:, None, i + 1])
+
+    if leading_tone is not None and tonic is not None and cur_chord is not None:
+        if tonic in cur_chord.pcs:
+            for i in range(3):
+                holds = (prev[:, i] % 12 == leading_tone)[:, None]
+                resolves = motion[:, :, i] == 1
+                weight = LEADING_TONE_COST if i == 0 else LEADING_TONE_COST / 3
+                cost += weight * (holds & ~resolves)
+
+    if prev_chord is not None and prev_chord.dissonant:
+        dissonant = np.isin(prev[:, :3] % 12, list(prev_chord.dissonant))
+        steps_down = (motion[:, :, :3] == -1) | (motion[:, :, :3] == -2)
+        cost += DISSONANCE_COST * (dissonant[:, None, :] & ~steps_down).sum(axis=2)
+
+    return cost
+
+
+def best_voicing_path(
+    chords: list[Chord],
+    leading_tone: int | None = None,
+    tonic: int | None = None,
+    limit: int = 32,
+) -> list[tuple[int, int, int, int]]:
+    """
+    Pick one voicing per chord minimising total state plus transition cost
+    (Viterbi over the candidate sets). Raises ValueError if a chord has no
+    valid voicing.
+    """
+    candidates = []
+    for idx, chord in enumerate(chords):
+        voicings, costs = enumerate_voicings(chord, leading_tone, limit)
+        if not len(voicings):
+            raise ValueError(f"No SATB voicing fits chord {idx + 1} over the bass")
+        candidates.append((voicings, costs))
+
+    if not candidates:
+        return []
+
+    totals = candidates[0][1].copy()
+    backpointers = []
+    for idx in range(1, len(chords)):
+        prev_voicings, _ = candidates[idx - 1]
+        voicings, costs = candidates[idx]
+        step = transition_costs(
+            prev_voicings,
+            voicings,
+            chords[idx - 1],
+            chords[idx],
+            leading_tone,
+            tonic,
+        )
+        step += totals[:, None]
+        best_prev = step.argmin(axis=0)
+        totals = step[best_prev, np.arange(len(voicings))] + costs
+        backpointers.append(best_prev)
+
+    path = [int(totals.argmin())]
+    for pointers in reversed(backpointers):
+        path.append(int(pointers[path[-1]]))
+    path.reverse()
+    return [tuple(int(x) for x in candidates[i][0][k]) for i, k in enumerate(path)]
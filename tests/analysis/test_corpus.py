@@ -0,0 +1,88 @@
+import json
+from pathlib import Path
+
+from lib.analysis.corpus import (
+    CorpusSummary,
+    ReportWriter,
+    discover_realizations,
+    lint_corpus,
+)
+
+PARALLEL_FIFTHS = {
+    "soprano": [["G4"], ["A4"]],
+    "alto": [["E4"], ["F4"]],
+    "tenor": [["C4"], ["D4"]],
+    "bass": [["C3"], ["D3"]],
+}
+
+
+def _write_chain(chain_dir: Path, versions: int, style: str = "Furno"):
+    chain_dir.mkdir(parents=True)
+    partimento = {"data": {"key": "C major", "style": style, "bassline": []}}
+    (chain_dir / "partimento_01.json").write_text(json.dumps(partimento))
+    for v in range(1, versions + 1):
+        path = chain_dir / f"realized_{v:02}.json"
+        path.write_text(json.dumps({"data": PARALLEL_FIFTHS}))
+
+
+def test_discover_realizations_latest_only(tmp_path: Path):
+    _write_chain(tmp_path / "chain_a", versions=3)
+    _write_chain(tmp_path / "chain_b", versions=1)
+
+    all_paths = list(discover_realizations(str(tmp_path)))
+    latest = list(discover_realizations(str(tmp_path), latest_only=True))
+
+    assert len(all_paths) == 4
+    assert [Path(p).name for p, _ in latest] == [
+        "realized_03.json",
+        "realized_01.json",
+    ]
+    assert latest[0][1] == {"key": "C major", "style": "Furno"}
+
+
+def test_lint_corpus_in_process_summary(tmp_path: Path):
+    _write_chain(tmp_path / "chain_a", versions=2, style="Furno")
+    (tmp_path / "broken").mkdir()
+    (tmp_path / "broken" / "realized_01.json").write_text("{not json")
+
+    summary = CorpusSummary()
+    rows = list(lint_corpus(discover_realizations(str(tmp_path)), workers=1))
+    for row in rows:
+        summary.add(row)
+    report = summary.to_dict()
+
+    assert report["files"] == 3
+    assert report["errors"] == 1
+    assert report["by_rule"]["parallels"] > 0
+    assert report["by_style"]["Furno"]["files"] == 2
+
+
+def test_report_writer_csv(tmp_path: Path):
+    _write_chain(tmp_path / "chain_a", versions=1)
+    rows = list(lint_corpus(discover_realizations(str(tmp_path)), workers=1))
+    out = tmp_path / "reports" / "report.csv"
+    with ReportWriter(str(out), "csv", ["parallels"]) as writer:
+        for row in rows:
+            writer.write(row)
+
+    header, line = out.read_text().splitlines()
+    assert header.split(",")[-2:] == ["parallels", "error"]
+    assert line.split(",")[2] == "Furno"
+
+
+def test_partimento_is_read_once_per_chain(tmp_path: Path, monkeypatch):
+    import lib.analysis.corpus as corpus
+
+    _write_chain(tmp_path / "chain_a", versions=3, style="Fenaroli")
+    reads = []
+    load = corpus.load_chain_json
+
+    def counting_load(path):
+        reads.append(Path(path).name)
+        return load(path)
+
+    monkeypatch.setattr(corpus, "load_chain_json", counting_load)
+    rows = list(lint_corpus(discover_realizations(str(tmp_path)), workers=1))
+
+    assert reads.count("partimento_01.json") == 1
+    assert {row["style"] for row in rows} == {"Fenaroli"}
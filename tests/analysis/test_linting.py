@@ -0,0 +1,125 @@
+import pytest
+
+from lib.analysis.linting import lint_satb, select_rules
+from lib.analysis.rules import RULES
+from lib.utils.music_utils import note_to_midi
+
+# ------------------------------------------------------------------
+# note_to_midi
+# ------------------------------------------------------------------
+
+
+def test_note_to_midi_handles_accidentals():
+    assert note_to_midi("C4") == 60
+    assert note_to_midi("F#3") == 54
+    assert note_to_midi("B♭2") == 46
+    assert note_to_midi("E-2") == 39
+
+
+def test_note_to_midi_rejects_invalid_names():
+    with pytest.raises(ValueError):
+        note_to_midi("H4")
+
+
+# ------------------------------------------------------------------
+# select_rules
+# ------------------------------------------------------------------
+
+
+def test_select_rules_by_name_and_scope():
+    names = [r.name for r in select_rules(["range", "vertical"])]
+    assert "range" in names
+    assert "spacing" in names
+    assert "parallels" not in names
+
+
+def test_select_rules_skip():
+    names = [r.name for r in select_rules(skip_rules=["parallels"])]
+    assert names == ["range", "doubled-leading-tone"]
+    names = [r.name for r in select_rules(["full"], skip_rules=["parallels"])]
+    assert len(names) == len(RULES) - 1
+
+
+def test_select_rules_default_set():
+    assert [r.name for r in select_rules()] == [
+        "range",
+        "doubled-leading-tone",
+        "parallels",
+    ]
+    assert [r.name for r in select_rules(["full"])] == list(RULES)
+
+
+def test_select_rules_unknown_raises():
+    with pytest.raises(ValueError):
+        select_rules(["no-such-rule"])
+
+
+# ------------------------------------------------------------------
+# lint_satb
+# ------------------------------------------------------------------
+
+GOOD = {
+    "soprano": [["E4"], ["D4"]],
+    "alto": [["C4"], ["B3"]],
+    "tenor": [["G3"], ["G3"]],
+    "bass": [["C3"], ["G2"]],
+}
+
+PARALLEL_FIFTHS = {
+    "soprano": [["G4"], ["A4"]],
+    "alto": [["E4"], ["F4"]],
+    "tenor": [["C4"], ["D4"]],
+    "bass": [["C3"], ["D3"]],
+}
+
+
+def test_lint_clean_realization():
+    report = lint_satb(GOOD)
+    assert report["issues"] == []
+    assert report["strengths"]
+
+
+def test_lint_detects_parallels_with_rule_attribution():
+    report = lint_satb({"data": PARALLEL_FIFTHS})
+    assert "S/B m1 parallel P5" in report["issues"]
+    rules = {f["rule"] for f in report["findings"]}
+    assert rules == {"parallels"}
+    assert report["stats"]["rules"]["parallels"]["hits"] == len(report["issues"])
+
+
+def test_lint_detects_range_and_subdivided_measures():
+    data = {
+        "soprano": [["B5", "G5"]],
+        "alto": [["E4"]],
+        "tenor": [["G3"]],
+        "bass": [["C3"]],
+    }
+    report = lint_satb(data, rules=["range"])
+    assert report["issues"] == ["S m1 out of range"]
+    assert report["stats"]["rules"]["range"]["calls"] == 5
+
+
+def test_lint_doubled_leading_tone_needs_key():
+    data = {
+        "soprano": [["B4"]],
+        "alto": [["B3"]],
+        "tenor": [["G3"]],
+        "bass": [["G2"]],
+    }
+    assert lint_satb(data, rules=["doubled-leading-tone"])["issues"] == []
+    report = lint_satb(data, rules=["doubled-leading-tone"], key="C major")
+    assert report["issues"] == ["m1 doubled leading tone"]
+
+
+def test_inner_parallels_are_opt_in():
+    inner = dict(PARALLEL_FIFTHS, soprano=[["G4"], ["G4"]])
+    assert lint_satb(inner)["issues"] == []
+    report = lint_satb(inner, rules=["full"])
+    assert "T/B m1 parallel P8" in report["issues"]
+    assert "inner-parallels" in {f["rule"] for f in report["findings"]}
+
+
+def test_lint_skip_rules_removes_stats():
+    report = lint_satb(PARALLEL_FIFTHS, skip_rules=["transition"])
+    assert report["issues"] == []
+    assert "parallels" not in report["stats"]["rules"]
@@ -0,0 +1,95 @@
+from lib.analysis.partimento_linting import lint_partimento, normalize_partimento
+
+CLEAN = {
+    "title": "Partimento in C",
+    "key": "C major",
+    "bassline": [
+        ["C3", "D3"],
+        ["E3", "F3"],
+        ["G3"],
+        ["F3", "E3"],
+        ["D3", "G2"],
+        ["C3"],
+    ],
+    "figures": [[[], ["6"]], [["6"], []], [[]], [["6"], ["6"]], [["6"], []], [[]]],
+    "cadences": ["measure 3: half cadence", "measure 6: authentic cadence"],
+}
+
+
+def _rules(report):
+    return {f["rule"] for f in report["findings"]}
+
+
+def test_clean_partimento_passes():
+    report = lint_partimento({"data": CLEAN})
+    assert report["issues"] == []
+    assert report["strengths"]
+
+
+def test_leaps_and_stepwise_ratio():
+    data = dict(CLEAN, bassline=[["C2", "C4"], ["G2", "D3"], ["G2"], ["C3", "G2"]])
+    data["figures"] = [[[], []], [[], []], [[]], [[], []]]
+    data["cadences"] = ["measure 4: authentic cadence"]
+    rules = _rules(lint_partimento(data))
+    assert "leap" in rules
+    assert "stepwise" in rules
+
+
+def test_cadence_checks():
+    missing = dict(CLEAN, cadences=[])
+    assert "no cadences declared" in lint_partimento(missing)["issues"]
+
+    wrong = dict(CLEAN, cadences=["measure 2: half cadence", "measure 9: authentic"])
+    issues = lint_partimento(wrong)["issues"]
+    assert "m2 bass does not outline a half cadence" in issues
+    assert "cadence declared at missing measure 9" in issues
+
+
+def test_figure_shape_and_key():
+    data = dict(CLEAN, key="H major", figures=CLEAN["figures"][:-1])
+    rules = _rules(lint_partimento(data))
+    assert "figure-shape" in rules
+    assert "key-range" in rules
+
+
+def test_normalize_flat_bassline():
+    bassline, figures = normalize_partimento(
+        {"bassline": ["C2", "E2"], "figures": [["5", "3"], ["6"]]}
+    )
+    assert bassline == [["C2"], ["E2"]]
+    assert figures == [[["5", "3"]], [["6"]]]
+
+
+def test_prompt_good_example_passes():
+    # The GOOD few-shot example of the generation prompt: two notes, half cadence
+    good = {
+        "key": "C major",
+        "bassline": [["C2"], ["G2"]],
+        "figures": [[[]], [["6"]]],
+        "cadences": ["measure 2: half cadence"],
+    }
+    assert lint_partimento(good)["issues"] == []
+
+    # Closing with an authentic cadence still has to end on the tonic
+    closing = dict(good, cadences=["measure 2: authentic cadence"])
+    assert "final bass note is not the tonic" in lint_partimento(closing)["issues"]
+
+
+def test_dict_and_unparseable_cadences():
+    as_dicts = dict(
+        CLEAN,
+        cadences=[
+            {"measure": 3, "type": "half cadence"},
+            {"measure": 6, "type": "authentic"},
+        ],
+    )
+    assert lint_partimento(as_dicts)["issues"] == []
+
+    wrong = dict(CLEAN, cadences=[{"measure": 2, "type": "half"}])
+    assert "m2 bass does not outline a half" in lint_partimento(wrong)["issues"]
+
+    unreadable = dict(CLEAN, cadences=["at the end", {"type": "authentic"}])
+    issues = lint_partimento(unreadable)["issues"]
+    assert "no cadences declared" not in issues
+    assert "unparseable cadence 'at the end'" in issues
+    assert "unparseable cadence {'type': 'authentic'}" in issues
@@ -0,0 +1,60 @@
+import copy
+
+from lib.analysis.linting import lint_satb
+from lib.analysis.repair import repair_satb
+from lib.utils.json_utils import apply_patch
+
+PARALLELS = {
+    "soprano": [["E5"], ["F5"], ["G5", "E5"]],
+    "alto": [["C4"], ["D4"], ["D4", "C4"]],
+    "tenor": [["G3"], ["A3"], ["B3", "G3"]],
+    "bass": [["C3"], ["D3"], ["G2", "C3"]],
+}
+
+
+def test_repair_patch_applies_and_reduces_issues():
+    result = repair_satb({"data": PARALLELS}, key="C major", rules=["full"])
+    assert result["issues_before"]
+    assert len(result["issues_after"]) < len(result["issues_before"])
+
+    patched = apply_patch(copy.deepcopy(PARALLELS), result["suggested_patch"])
+    report = lint_satb(patched, key="C major", rules=["full"])
+    assert report["issues"] == result["issues_after"]
+    # The bass is fixed and patch indices are 0-based measure strings
+    assert "bass" not in result["suggested_patch"]
+    for measures in result["suggested_patch"].values():
+        assert all(idx.isdigit() for idx in measures)
+
+
+def test_repair_clean_realization_is_noop():
+    clean = {
+        "soprano": [["E4"], ["D4"]],
+        "alto": [["C4"], ["B3"]],
+        "tenor": [["G3"], ["G3"]],
+        "bass": [["C3"], ["G2"]],
+    }
+    result = repair_satb(clean)
+    assert result["suggested_patch"] == {}
+    assert result["issues_after"] == []
+
+
+def test_repair_octave_displacement_into_range():
+    data = {
+        "soprano": [["E4"], ["D4"]],
+        "alto": [["C4"], ["B3"]],
+        "tenor": [["G3"], ["G2"]],
+        "bass": [["C3"], ["G2"]],
+    }
+    result = repair_satb(data, rules=["range"])
+    assert result["issues_after"] == []
+    assert result["suggested_patch"]["tenor"]["1"] == ["G3"]
+
+
+def test_repair_accepts_single_note_measures_as_strings():
+    strings = {v: [m[0] if len(m) == 1 else m for m in PARALLELS[v]] for v in PARALLELS}
+    assert strings["bass"][0] == "C3"
+    result = repair_satb({"data": strings}, key="C major", rules=["full"])
+    expected = repair_satb({"data": PARALLELS}, key="C major", rules=["full"])
+    # "C3" is not split into "C" and "3", and unchanged measures stay out
+    assert result["suggested_patch"] == expected["suggested_patch"]
+    assert result["issues_after"] == expected["issues_after"]
@@ -0,0 +1,82 @@
+import json
+import random
+
+import pytest
+
+from genres.partimento import prompts
+from lib.benchmarks.loadtest import (
+    StubLLM,
+    parse_latency,
+    percentiles,
+    run_load_test,
+)
+
+
+def test_parse_latency_specs():
+    rng = random.Random(0)
+    assert parse_latency("constant:0.5")(rng) == 0.5
+    assert all(1 <= parse_latency("uniform:1,2")(rng) <= 2 for _ in range(20))
+    assert all(parse_latency("normal:0,1")(rng) >= 0 for _ in range(20))
+    assert parse_latency("lognormal:1.0,0.5")(rng) > 0
+    for spec in ("gamma:1", "uniform:1", "constant:x", "constant"):
+        with pytest.raises(ValueError):
+            parse_latency(spec)
+
+
+def test_percentiles():
+    stats = percentiles([float(i) for i in range(1, 101)])
+    assert stats["p50"] == 50
+    assert stats["p99"] == 99
+    assert stats["max"] == 100
+    assert percentiles([]) == {}
+
+
+def test_stub_llm_answers_by_prompt():
+    llm = StubLLM(measures=8, patch_rate=1.0)
+    partimento = json.loads(llm("generate", "anything"))
+    assert len(partimento["bassline"]) == 8
+    satb = json.loads(llm(prompts.PARTIMENTO_REALIZE_SATB_SYSTEM_PROMPT, "x"))
+    assert satb["bass"] and len(satb["soprano"]) == 8
+    review = json.loads(llm(prompts.REVIEW_SATB_SYSTEM_PROMPT, "x"))
+    assert "alto" in review["suggested_patch"]
+    assert [kind for kind, _ in llm.calls] == [
+        "generate",
+        "realize",
+        "review-realization",
+    ]
+
+
+def test_run_load_test_small_sweep(tmp_path):
+    report = run_load_test(
+        concurrency_levels=[2],
+        chains=2,
+        latency="constant:0",
+        measures=8,
+        root=str(tmp_path / "loadtest"),
+    )
+    (level,) = report["levels"]
+    assert level["completed"] == 2 and level["failed"] == 0
+    assert "llm" in level["stages"]
+    assert level["throughput_per_minute"] > 0
+    assert not (tmp_path / "loadtest" / "c2").exists()
+
+
+def test_patch_rate_reaches_the_realization_review(tmp_path):
+    report = run_load_test(
+        concurrency_levels=[1],
+        chains=1,
+        modes=["chain-realization"],
+        latency="constant:0",
+        measures=8,
+        patch_rate=1.0,
+        root=str(tmp_path / "loadtest"),
+        keep=True,
+    )
+    (level,) = report["levels"]
+    assert level["failed"] == 0, level["errors"]
+    assert level["llm_calls"]["review-realization"] == 1
+    assert report["config"]["always_review"]
+    # The review patch became a new realization version with its own MIDI
+    chain = tmp_path / "loadtest" / "c1" / "chain_00000"
+    assert (chain / "realized_02.json").exists()
+    assert (chain / "realized_02.mid").exists()
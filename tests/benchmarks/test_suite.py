@@ -0,0 +1,80 @@
+import copy
+import json
+
+import pytest
+
+from lib.analysis.linting import lint_satb
+from lib.analysis.partimento_linting import lint_partimento
+from lib.benchmarks.suite import compare_results, run_benchmarks
+from lib.benchmarks.synthetic import synthetic_partimento, synthetic_satb
+
+
+def test_synthetic_scores_are_deterministic_and_valid():
+    partimento = synthetic_partimento(64)
+    assert partimento == synthetic_partimento(64)
+    assert partimento != synthetic_partimento(64, seed=1)
+    assert len(partimento["bassline"]) == len(partimento["figures"]) == 64
+    assert lint_partimento(partimento)["issues"] == []
+
+    satb = synthetic_satb(16)
+    assert all(len(satb[v]) == 16 for v in ("soprano", "alto", "tenor", "bass"))
+    assert lint_satb(satb)["issues"] == []
+
+
+def test_run_benchmarks_records_time_and_memory():
+    results = run_benchmarks(
+        sizes=[8], cases=["lint_satb", "apply_patch", "json_to_musicxml"], repeat=2
+    )
+    assert set(results["results"]) == {
+        "lint_satb[8]",
+        "apply_patch[8]",
+        "json_to_musicxml[8]",
+    }
+    lint = results["results"]["lint_satb[8]"]
+    assert len(lint["runs"]) == 2 and lint["median"] > 0
+    assert results["results"]["json_to_musicxml[8]"]["peak_bytes"] > 0
+    assert results["environment"]["music21"]
+
+
+def _results(**medians):
+    return {
+        "results": {
+            name: {"median": seconds, "peak_bytes": 1_000_000}
+            for name, seconds in medians.items()
+        }
+    }
+
+
+def test_compare_flags_slowdowns_beyond_threshold():
+    baseline = _results(**{"a[8]": 0.100, "b[8]": 0.100, "c[8]": 0.100, "d[8]": 0.1})
+    current = copy.deepcopy(
+        _results(**{"a[8]": 0.150, "b[8]": 0.110, "c[8]": 0.050, "e[8]": 0.1})
+    )
+    current["results"]["b[8]"]["peak_bytes"] = 2_000_000
+    status = {
+        row["benchmark"]: row["status"]
+        for row in compare_results(baseline, current, threshold=0.2)
+    }
+    assert status == {
+        "a[8]": "slower",
+        "b[8]": "more-memory",
+        "c[8]": "faster",
+        "d[8]": "missing",
+        "e[8]": "new",
+    }
+    # Tiny absolute differences are noise even when the ratio is large
+    tiny = compare_results(_results(x=0.0001), _results(x=0.0009))
+    assert tiny[0]["status"] == "ok"
+
+
+def test_compare_command_fails_on_regression(tmp_path):
+    from cli.main import run
+
+    (tmp_path / "base.json").write_text(json.dumps(_results(x=0.100)))
+    (tmp_path / "slow.json").write_text(json.dumps(_results(x=0.300)))
+    base, slow = str(tmp_path / "base.json"), str(tmp_path / "slow.json")
+    run(["compare-benchmarks", base, base])
+    for extra in ([], ["--json"]):
+        with pytest.raises(SystemExit) as exit_info:
+            run(["compare-benchmarks", base, slow, *extra])
+        assert exit_info.value.code == 1
@@ -0,0 +1,15 @@
+from concurrent.futures import Future
+
+from cli.handlers.partimento import _report_audio
+
+
+def test_summary_does_not_wait_for_audio_unless_playing(caplog):
+    caplog.set_level("INFO")
+    pending = Future()
+    assert _report_audio(pending, "realized.ogg") is False
+    assert "rendering in the background: realized.ogg" in caplog.text
+
+    done = Future()
+    done.set_result({"audio": "realized.ogg", "status": "done", "seconds": 0.1})
+    assert _report_audio(done, "realized.ogg", wait=True) is True
+    assert "Audio preview: realized.ogg" in caplog.text
@@ -0,0 +1,67 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from cli.daemon import forward, request, warm
+from lib.utils.llm_utils import get_client
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "..", "src")
+
+
+def _start_daemon(socket_path: Path):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "cli.main", "serve", "--no-warm"],
+        cwd=SRC,
+        env=dict(os.environ, YANTRA_SOCKET=str(socket_path)),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 20
+    while request("status", str(socket_path)) is None:
+        assert proc.poll() is None, "daemon exited during startup"
+        assert time.monotonic() < deadline, "daemon did not start"
+        time.sleep(0.05)
+    return proc
+
+
+def test_forward_without_daemon_runs_locally(tmp_path: Path):
+    assert forward(["describe-chain", "x"], str(tmp_path / "none.sock")) is None
+    assert forward(["serve"], str(tmp_path / "none.sock")) is None
+
+
+def test_forward_runs_in_daemon(tmp_path: Path, capfd, monkeypatch):
+    socket_path = tmp_path / "yantra.sock"
+    chain = tmp_path / "chain"
+    chain.mkdir()
+    (chain / "metadata.json").write_text(
+        json.dumps({"id": "warm-chain", "mode": "chain-partimento", "files": {}})
+    )
+    monkeypatch.chdir(tmp_path)
+    proc = _start_daemon(socket_path)
+    try:
+        assert forward(["describe-chain", "chain"], str(socket_path)) == 0
+        assert "warm-chain" in capfd.readouterr().out
+        assert forward(["no-such-command"], str(socket_path)) == 2
+
+        status = request("status", str(socket_path))
+        assert status["pid"] == proc.pid
+        assert status["served"] == 2
+
+        assert request("stop", str(socket_path)) == {"stopping": True}
+        assert proc.wait(timeout=10) == 0
+        assert not socket_path.exists()
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+
+
+def test_warm_does_not_cache_a_client(monkeypatch):
+    # Forked commands must build their client from their own API key
+    monkeypatch.setenv("OPENAI_API_KEY", "daemon-key")
+    get_client.cache_clear()
+    warm()
+    assert "openai" in sys.modules
+    assert get_client.cache_info().currsize == 0
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from cli.main import run
+from lib.benchmarks.synthetic import synthetic_partimento
+
+
+def test_unknown_lint_rule_stops_the_chain(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit) as exit_info:
+        run(["chain-realization", "x", "--rules", "nosuchrule", "--no-play"])
+    assert exit_info.value.code == 1
+    assert not (tmp_path / "generated").exists()
+
+
+def test_export_slice_past_the_end_fails(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "p.json").write_text(json.dumps({"data": synthetic_partimento(8)}))
+    with pytest.raises(SystemExit) as exit_info:
+        run(["export-partimento", "p.json", "--measures", "20-24"])
+    assert exit_info.value.code == 1
+    assert not list(tmp_path.glob("p.m20-24.*"))
+
+
+def test_failed_local_realization_keeps_the_chain(tmp_path, monkeypatch):
+    from cli.handlers import partimento
+
+    def unrealizable(data):
+        raise ValueError("No SATB voicing fits chord")
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        partimento.generate_partimento,
+        "generate_partimento",
+        lambda prompt, llm: synthetic_partimento(4),
+    )
+    monkeypatch.setattr(partimento, "realize_partimento_local", unrealizable)
+    with pytest.raises(SystemExit) as exit_info:
+        run(
+            [
+                "chain-realization",
+                "x",
+                "--engine",
+                "local",
+                "--no-play",
+                "--output",
+                "chain",
+            ]
+        )
+    assert exit_info.value.code == 1
+    metadata = json.loads((tmp_path / "chain" / "metadata.json").read_text())
+    assert metadata["files"]["partimento_versions"] == ["partimento_01.json"]
+    assert "No SATB voicing" in metadata["error"]
@@ -0,0 +1,43 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from cli.handlers.core import _run_queued_command, _set_aside_partial_output
+from lib.benchmarks.synthetic import synthetic_partimento
+
+
+def _job(tmp_path, *argv, attempts=1):
+    return SimpleNamespace(
+        payload={"cwd": str(tmp_path), "argv": list(argv)}, attempts=attempts
+    )
+
+
+def test_job_finishes_after_its_audio(tmp_path, monkeypatch):
+    monkeypatch.setenv("YANTRA_AUDIO_WORKERS", "2")
+    monkeypatch.chdir(tmp_path)  # the executor changes into the job's cwd
+    (tmp_path / "p.json").write_text(json.dumps({"data": synthetic_partimento(8)}))
+    _run_queued_command(_job(tmp_path, "export-partimento", "p.json"))
+    assert (tmp_path / "p.wav").exists() or (tmp_path / "p.ogg").exists()
+
+
+def test_failing_handler_fails_the_job(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "p.json").write_text(json.dumps({"data": synthetic_partimento(8)}))
+    with pytest.raises(RuntimeError, match="export-partimento failed"):
+        _run_queued_command(
+            _job(tmp_path, "export-partimento", "p.json", "--measures", "x")
+        )
+
+
+def test_retry_starts_from_an_empty_chain_directory(tmp_path):
+    output = tmp_path / "chain"
+    output.mkdir()
+    (output / "manifest.json").write_text("{}")
+    (tmp_path / "chain.attempt1").mkdir()  # left by an earlier retry
+    _set_aside_partial_output(str(output), 1)
+    assert not output.exists()
+    assert (tmp_path / "chain.attempt2" / "manifest.json").exists()
+
+    _set_aside_partial_output(str(output), 1)  # nothing to move
+    assert not (tmp_path / "chain.attempt3").exists()
@@ -0,0 +1,53 @@
+"""
+Import-time guard for CLI startup (`python -X importtime`).
+
+Building the parser and resolving a light command must not import music21,
+openai or Firebase; those load only when a handler that needs them runs.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "..", "src")
+HEAVY_MODULES = {"music21", "numpy", "openai", "firebase_admin"}
+
+
+def _importtime(code: str) -> dict[str, int]:
+    """Run code under -X importtime and return {module: cumulative µs}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SRC,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_startup_imports_nothing_heavy():
+    times = _importtime(
+        "import cli.main\n"
+        "from cli.handlers import handler_map, load_handler\n"
+        "assert 'describe-chain' in handler_map\n"
+        "load_handler('describe-chain')\n"
+    )
+    assert "cli.main" in times
+    assert not HEAVY_MODULES & set(times)
+
+
+def test_every_command_has_a_handler():
+    pytest.importorskip("music21")
+    from cli.handlers import command_groups, load_handler
+
+    for command, group in command_groups().items():
+        assert callable(load_handler(command, group)), command
@@ -0,0 +1,13 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_score_cache(tmp_path, monkeypatch):
+    """Keep parsed-score cache entries out of the working tree."""
+    monkeypatch.setenv("YANTRA_SCORE_CACHE", str(tmp_path / "score_cache"))
+
+
+@pytest.fixture(autouse=True)
+def isolated_catalog(tmp_path, monkeypatch):
+    """Chains written by tests are cataloged in a throwaway database."""
+    monkeypatch.setenv("YANTRA_CATALOG", str(tmp_path / "catalog.sqlite"))
@@ -0,0 +1,69 @@
+import json
+import re
+
+import pytest
+
+from genres.partimento.tasks import export
+from lib.benchmarks.synthetic import synthetic_partimento, synthetic_satb
+
+
+def _measures(path) -> list[str]:
+    text = path.read_text()
+    return [
+        re.sub(r"\s*<attributes>.*?</attributes>", "", m, flags=re.S)
+        for m in re.findall(r"<measure\b.*?</measure>", text, re.S)
+    ]
+
+
+def test_realization_slice_keeps_measure_numbers(tmp_path):
+    (tmp_path / "s.json").write_text(json.dumps({"data": synthetic_satb(12, seed=5)}))
+    full, part = tmp_path / "full.musicxml", tmp_path / "part.musicxml"
+    export.export_realized_partimento_to_musicxml(str(tmp_path / "s.json"), str(full))
+    export.export_realized_partimento_to_musicxml(
+        str(tmp_path / "s.json"),
+        str(part),
+        measures=range(5, 9),
+        voices=("soprano", "bass"),
+    )
+
+    text = part.read_text()
+    assert "<part-name>Soprano</part-name>" in text
+    assert "<part-name>Bass</part-name>" in text
+    assert "<part-name>Alto</part-name>" not in text
+    # The sliced measures are the soprano's and bass's measures 5-8
+    full_measures = _measures(full)
+    assert _measures(part) == full_measures[4:8] + full_measures[40:44]
+
+
+def test_midi_slice(tmp_path):
+    (tmp_path / "s.json").write_text(json.dumps({"data": synthetic_satb(12, seed=5)}))
+    (tmp_path / "p.json").write_text(
+        json.dumps({"data": synthetic_partimento(12, seed=5)})
+    )
+    export.export_realized_partimento_to_midi(
+        str(tmp_path / "s.json"), str(tmp_path / "s.mid"), measures=range(1, 3)
+    )
+    export.export_realized_partimento_to_midi(
+        str(tmp_path / "s.json"), str(tmp_path / "full.mid")
+    )
+    assert (tmp_path / "s.mid").stat().st_size < (tmp_path / "full.mid").stat().st_size
+
+    with pytest.raises(ValueError):
+        export.export_partimento_to_midi(
+            str(tmp_path / "p.json"), str(tmp_path / "p.mid"), voices=("alto",)
+        )
+
+
+def test_slice_past_the_last_measure_is_rejected(tmp_path):
+    (tmp_path / "p.json").write_text(
+        json.dumps({"data": synthetic_partimento(8, seed=5)})
+    )
+    for exporter, output in (
+        (export.export_partimento_to_musicxml, "p.musicxml"),
+        (export.export_partimento_to_midi, "p.mid"),
+    ):
+        with pytest.raises(ValueError, match="past the end of the score"):
+            exporter(
+                str(tmp_path / "p.json"), str(tmp_path / output), measures=range(20, 25)
+            )
+        assert not (tmp_path / output).exists()
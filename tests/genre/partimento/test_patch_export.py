@@ -0,0 +1,100 @@
+import copy
+import json
+import re
+
+from genres.partimento.tasks import export
+from genres.partimento.tasks.patch_export import changed_measures, patch_musicxml
+from lib.benchmarks.synthetic import synthetic_partimento, synthetic_satb
+from lib.utils.json_utils import apply_patch
+
+
+def _normalized(path) -> str:
+    """MusicXML text without the per-export part ids and encoding date."""
+    text = path.read_text()
+    text = re.sub(r"<encoding-date>.*?</encoding-date>", "", text)
+    return re.sub(r'"P[0-9a-f]+"', '"P"', text)
+
+
+def _measures(path) -> list[str]:
+    return re.findall(r"<measure\b.*?</measure>", path.read_text(), re.S)
+
+
+def _revise(tmp_path, data, patch, exporter):
+    """Export data, apply patch, and return (previous xml, revised json)."""
+    (tmp_path / "v1.json").write_text(json.dumps({"data": data}))
+    exporter(str(tmp_path / "v1.json"), str(tmp_path / "v1.musicxml"))
+    revised = apply_patch(copy.deepcopy(data), patch)
+    (tmp_path / "v2.json").write_text(json.dumps({"data": revised}))
+    return tmp_path / "v1.musicxml", tmp_path / "v2.json"
+
+
+def test_patched_realization_matches_full_export(tmp_path):
+    patch = {
+        "alto": {"0": ["C4", "D4"], "5": ["E4"]},
+        "bass": {"11": ["C3", "G2", "C3", "E3"]},
+    }
+    previous, revised = _revise(
+        tmp_path,
+        synthetic_satb(12, seed=1),
+        patch,
+        export.export_realized_partimento_to_musicxml,
+    )
+    before = _measures(previous)
+    output = tmp_path / "v2.musicxml"
+    assert patch_musicxml("realized", str(previous), str(revised), patch, str(output))
+
+    full = tmp_path / "full.musicxml"
+    export.export_realized_partimento_to_musicxml(str(revised), str(full))
+    assert _normalized(output) == _normalized(full)
+
+    # Only the patched measures were rewritten: alto 1 and 6, bass 12
+    after = _measures(output)
+    changed = [i for i, (a, b) in enumerate(zip(before, after)) if a != b]
+    assert changed == [12, 17, 47]
+
+
+def test_patched_partimento_matches_full_export(tmp_path):
+    patch = {
+        "bassline": {"0": ["D3", "E3"]},
+        "figures": {"0": [["6"], ["6", "4"]], "4": [["7"]]},
+    }
+    previous, revised = _revise(
+        tmp_path,
+        synthetic_partimento(8, seed=2),
+        patch,
+        export.export_partimento_to_musicxml,
+    )
+    # Patched in place; measure 1 keeps its clef, key and time attributes
+    assert patch_musicxml(
+        "partimento", str(previous), str(revised), patch, str(previous)
+    )
+    full = tmp_path / "full.musicxml"
+    export.export_partimento_to_musicxml(str(revised), str(full))
+    assert _normalized(previous) == _normalized(full)
+
+
+def test_falls_back_to_full_export(tmp_path):
+    data = synthetic_partimento(4, seed=3)
+    previous, revised = _revise(
+        tmp_path, data, {}, export.export_partimento_to_musicxml
+    )
+    # A key change is not a measure patch
+    patch = {"key": "D minor"}
+    revised.write_text(json.dumps({"data": {**data, "key": "D minor"}}))
+    assert changed_measures("partimento", data, patch) is None
+
+    output = tmp_path / "v2.musicxml"
+    assert not patch_musicxml(
+        "partimento", str(previous), str(revised), patch, str(output)
+    )
+    assert "<fifths>-1</fifths>" in output.read_text()
+
+    # A missing previous export is rebuilt in full too
+    patch = {"bassline": {"0": ["D3"]}}
+    assert not patch_musicxml(
+        "partimento",
+        str(tmp_path / "missing.musicxml"),
+        str(revised),
+        patch,
+        str(output),
+    )
@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+
+from genres.partimento.tasks.export import export_realized_partimento_to_musicxml
+from genres.partimento.tasks.realize_local import (
+    parse_figures,
+    realize_partimento_local,
+)
+from lib.analysis.linting import lint_satb
+from lib.utils.music_utils import RANGE_MIDI, note_to_midi
+
+PARTIMENTO = {
+    "title": "Partimento in A minor",
+    "key": "A minor",
+    "bassline": [["A2"], ["E2"], ["A2", "G#2"], ["A2"], ["D3", "E3"], ["A2"]],
+    "figures": [[[]], [["#"]], [[], ["6"]], [[]], [["6"], ["7", "#"]], [[]]],
+    "cadences": ["measure 6: authentic cadence"],
+}
+
+
+def test_parse_figures_expands_shorthand():
+    assert parse_figures([])[0] == {3, 5}
+    assert parse_figures(["6"])[0] == {3, 6}
+    assert parse_figures(["6", "5"]) == ({3, 5, 6}, {}, 5)
+    assert parse_figures(["4", "2"])[0] == {2, 4, 6}
+    assert parse_figures(["#"])[1] == {3: 1}
+
+
+def test_realization_matches_satb_shape():
+    realized = realize_partimento_local({"data": PARTIMENTO})
+    for voice in ("soprano", "alto", "tenor", "bass"):
+        assert len(realized[voice]) == len(PARTIMENTO["bassline"])
+        for measure, bass_measure in zip(realized[voice], PARTIMENTO["bassline"]):
+            assert len(measure) == len(bass_measure)
+    assert realized["bass"] == PARTIMENTO["bassline"]
+
+
+def test_realization_is_in_range_and_lint_clean():
+    realized = realize_partimento_local(PARTIMENTO)
+    for voice in ("soprano", "alto", "tenor"):
+        low, high = RANGE_MIDI[voice[0]]
+        for measure in realized[voice]:
+            assert all(low <= note_to_midi(n) <= high for n in measure)
+    assert lint_satb(realized)["issues"] == []
+
+
+def test_minor_dominant_raises_leading_tone():
+    realized = realize_partimento_local(PARTIMENTO)
+    upper_m2 = [realized[v][1][0][:-1] for v in ("soprano", "alto", "tenor")]
+    assert "G#" in upper_m2
+
+
+def test_realization_exports_to_musicxml():
+    realized = realize_partimento_local(PARTIMENTO)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_path = os.path.join(tmpdir, "realized_01.json")
+        xml_path = os.path.join(tmpdir, "realized.musicxml")
+        with open(json_path, "w") as f:
+            json.dump({"data": realized}, f)
+        export_realized_partimento_to_musicxml(json_path, xml_path)
+        assert os.path.getsize(xml_path) > 0
@@ -0,0 +1,110 @@
+import json
+import threading
+
+from genres.partimento.tasks import export
+from lib.benchmarks.synthetic import synthetic_partimento
+from lib.utils.audio_queue import AudioQueue
+from lib.utils.chain_utils import write_metadata
+
+
+class FakeRenderer:
+    """Writes the MIDI bytes to the audio path, optionally held by a gate."""
+
+    def __init__(self, gate: threading.Event | None = None):
+        self.gate = gate
+        self.calls = []
+
+    def __call__(self, midi_path, audio_path):
+        if self.gate:
+            self.gate.wait(5)
+        self.calls.append(midi_path)
+        with open(midi_path, "rb") as f, open(audio_path, "wb") as out:
+            out.write(f.read())
+
+
+def _chain(tmp_path, midis: dict[str, bytes]):
+    chain = tmp_path / "chain"
+    chain.mkdir()
+    (chain / "metadata.json").write_text(json.dumps({"files": {}}))
+    for name, data in midis.items():
+        (chain / name).write_bytes(data)
+    return chain
+
+
+def test_deduplicates_identical_midi(tmp_path):
+    chain = _chain(tmp_path, {"a.mid": b"same", "b.mid": b"same", "c.mid": b"other"})
+    renderer = FakeRenderer(threading.Event())
+    audio = AudioQueue(workers=2, render=renderer)
+
+    futures = [audio.submit(chain / f"{n}.mid", chain / f"{n}.wav") for n in "abc"]
+    renderer.gate.set()
+    assert audio.wait(5)
+    audio.close()
+
+    assert [f.result()["status"] for f in futures] == ["done"] * 3
+    assert len(renderer.calls) == 2
+    assert audio.stats["deduplicated"] == 1
+    assert (chain / "b.wav").read_bytes() == b"same"
+
+
+def test_records_results_in_metadata(tmp_path):
+    chain = _chain(tmp_path, {"a.mid": b"a", "b.mid": b"b"})
+
+    def render(midi_path, audio_path):
+        if midi_path.endswith("a.mid"):
+            FakeRenderer()(midi_path, audio_path)
+
+    audio = AudioQueue(workers=1, render=render)
+    audio.submit(chain / "a.mid", chain / "a.wav")
+    audio.submit(chain / "b.mid", chain / "b.wav")
+    assert audio.wait(5)
+
+    meta = json.loads((chain / "metadata.json").read_text())
+    assert meta["audio"] == {"a.wav": "done", "b.wav": "failed"}
+
+    # A later metadata rewrite by the chain keeps the render results
+    write_metadata(chain, {"files": {"midi": "a.mid"}})
+    meta = json.loads((chain / "metadata.json").read_text())
+    assert meta["files"] == {"midi": "a.mid"}
+    assert meta["audio"]["a.wav"] == "done"
+
+
+def test_inline_mode_and_flat_outputs(tmp_path):
+    (tmp_path / "x.mid").write_bytes(b"x")
+    renderer = FakeRenderer()
+    audio = AudioQueue(workers=0, render=renderer)
+    future = audio.submit(tmp_path / "x.mid", tmp_path / "x.wav")
+    assert future.done() and future.result()["status"] == "done"
+    assert not (tmp_path / "metadata.json").exists()
+
+
+def test_renders_real_midi(tmp_path):
+    (tmp_path / "p.json").write_text(json.dumps({"data": synthetic_partimento(8)}))
+    export.export_partimento_to_midi(str(tmp_path / "p.json"), str(tmp_path / "p.mid"))
+
+    audio = AudioQueue(workers=2)
+    result = audio.submit(tmp_path / "p.mid", tmp_path / "p.wav").result(30)
+    audio.close()
+    assert result["status"] == "done"
+    assert (tmp_path / "p.wav").read_bytes()[:4] == b"RIFF"
+
+
+def test_results_wait_for_the_chain_metadata(tmp_path):
+    from lib.utils.chain_manifest import MANIFEST_NAME
+    from lib.utils.reexport import find_chains
+
+    chain = tmp_path / "chain"
+    chain.mkdir()
+    (chain / MANIFEST_NAME).write_text("")
+    (chain / "a.mid").write_bytes(b"a")
+    audio = AudioQueue(workers=1, render=FakeRenderer())
+    assert audio.submit(chain / "a.mid", chain / "a.wav").result(5)["status"] == "done"
+
+    # Not a chain until the chain itself writes metadata.json
+    assert not (chain / "metadata.json").exists()
+    assert find_chains([str(tmp_path)]) == []
+
+    write_metadata(chain, {"files": {"midi": "a.mid"}})
+    meta = json.loads((chain / "metadata.json").read_text())
+    assert meta["audio"] == {"a.wav": "done"}
+    assert [p.name for p in chain.iterdir() if p.name.startswith(".")] == []
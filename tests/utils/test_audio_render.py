@@ -0,0 +1,90 @@
+import json
+import time
+import wave
+
+import numpy as np
+import pytest
+
+from genres.partimento.tasks import export
+from lib.benchmarks.synthetic import synthetic_satb
+from lib.utils import audio_render
+from lib.utils.audio_render import (
+    audio_suffix,
+    events_from_json,
+    read_midi_events,
+    render,
+    write_audio,
+)
+
+
+def test_midi_events_match_json_timing(tmp_path):
+    satb = synthetic_satb(8, seed=1)
+    (tmp_path / "s.json").write_text(json.dumps({"data": satb}))
+    export.export_realized_partimento_to_midi(
+        str(tmp_path / "s.json"), str(tmp_path / "s.mid")
+    )
+
+    from_midi = read_midi_events(tmp_path / "s.mid")
+    from_json = events_from_json(satb)
+    assert len(from_midi) == len(from_json)
+    assert sorted(e[2] for e in from_midi) == sorted(e[2] for e in from_json)
+    assert from_midi[-1][1] == pytest.approx(from_json[-1][1], abs=1e-3)
+
+
+def test_read_midi_events_rejects_other_files():
+    with pytest.raises(ValueError):
+        read_midi_events(b"RIFF....WAVE")
+
+
+def test_events_from_partimento_bassline():
+    events = events_from_json({"bassline": ["D3", "A2"]}, bpm=60)
+    assert [(e[0], e[1], e[2]) for e in events] == [(0, 4, 50), (4, 8, 45)]
+
+
+def test_render_length_and_peak():
+    samples = render([(0.0, 1.0, 60, 127, 0), (0.0, 1.0, 64, 127, 1)], 8000)
+    assert samples.dtype == np.float32
+    assert 8000 < samples.size < 8000 * 1.1
+    assert 0 < np.abs(samples).max() <= audio_render.PEAK + 1e-6
+    assert render([]).size == 0
+
+
+def test_write_wav(tmp_path):
+    target = tmp_path / "out.wav"
+    write_audio(target, render([(0.0, 0.5, 69, 100, 0)], 8000), 8000)
+    with wave.open(str(target)) as f:
+        assert (f.getnchannels(), f.getsampwidth(), f.getframerate()) == (1, 2, 8000)
+        assert f.getnframes() > 4000
+
+
+def test_ogg_needs_an_encoder(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio_render, "_soundfile", lambda: None)
+    monkeypatch.setenv("PATH", str(tmp_path))
+    assert audio_suffix() == ".wav"
+    with pytest.raises(ValueError, match="soundfile"):
+        write_audio(tmp_path / "out.ogg", np.zeros(10, dtype=np.float32))
+
+
+def test_ogg_pipes_pcm_into_oggenc(tmp_path, monkeypatch):
+    # A stand-in oggenc that stores what it reads from stdin at its -o path
+    encoder = tmp_path / "oggenc"
+    encoder.write_text(
+        '#!/bin/sh\nwhile [ "$1" != "-o" ]; do shift; done\ncat > "$2"\n'
+    )
+    encoder.chmod(0o755)
+    monkeypatch.setattr(audio_render, "_soundfile", lambda: None)
+    monkeypatch.setenv("PATH", f"{tmp_path}:/bin:/usr/bin")
+    assert audio_suffix() == ".ogg"
+
+    samples = np.linspace(-0.5, 0.5, 100, dtype=np.float32)
+    write_audio(tmp_path / "out.ogg", samples, 8000)
+    assert (tmp_path / "out.ogg").read_bytes() == audio_render._pcm16(samples).tobytes()
+    assert not list(tmp_path.glob("*.wav"))
+
+
+def test_renders_long_scores_quickly():
+    events = events_from_json(synthetic_satb(128, seed=3))
+    start = time.perf_counter()
+    samples = render(events)
+    assert time.perf_counter() - start < 2.0
+    assert samples.size >= 128 * 2 * audio_render.DEFAULT_SAMPLE_RATE
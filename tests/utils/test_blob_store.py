@@ -0,0 +1,110 @@
+import json
+import os
+from pathlib import Path
+
+from lib.utils.blob_store import (
+    BLOB_DIR,
+    BlobStore,
+    export_cached,
+    export_key,
+    stores_under,
+)
+from lib.utils.chain_manifest import MANIFEST_NAME
+
+calls = []
+
+
+def fake_export(input_path, output_path):
+    calls.append(input_path)
+    with open(input_path) as f:
+        data = json.load(f)["data"]
+    Path(output_path).write_text(f"<score>{data['title']}</score>")
+
+
+def _chain(root: Path, name: str, created_at: str) -> Path:
+    chain = root / name
+    chain.mkdir(parents=True)
+    (chain / MANIFEST_NAME).write_text("")
+    (chain / "realized_01.json").write_text(
+        json.dumps({"created_at": created_at, "data": {"title": "T"}})
+    )
+    return chain
+
+
+def test_export_is_stored_once_and_reused(tmp_path: Path, monkeypatch):
+    monkeypatch.delenv("YANTRA_BLOBS", raising=False)
+    calls.clear()
+    a = _chain(tmp_path, "a", "2025-01-01")
+    b = _chain(tmp_path, "b", "2025-02-02")
+
+    assert export_cached(fake_export, a / "realized_01.json", a / "out.xml") is False
+    assert export_cached(fake_export, b / "realized_01.json", b / "out.xml") is True
+    assert len(calls) == 1
+    assert (b / "out.xml").read_text() == "<score>T</score>"
+    assert os.stat(a / "out.xml").st_ino == os.stat(b / "out.xml").st_ino
+
+    # Re-exporting replaces the link instead of writing through it
+    export_cached(fake_export, a / "realized_01.json", a / "out.xml")
+    assert (b / "out.xml").read_text() == "<score>T</score>"
+
+
+def test_gc_removes_unreferenced_blobs(tmp_path: Path, monkeypatch):
+    monkeypatch.delenv("YANTRA_BLOBS", raising=False)
+    a = _chain(tmp_path, "a", "2025-01-01")
+    export_cached(fake_export, a / "realized_01.json", a / "out.xml")
+    store = BlobStore(tmp_path / BLOB_DIR)
+
+    assert store.gc(min_age=0)["removed"] == 0
+    (a / "out.xml").unlink()
+    stats = store.gc(min_age=0)
+    assert stats == {"blobs": 1, "removed": 1, "freed_bytes": 16}
+    assert export_cached(fake_export, a / "realized_01.json", a / "out.xml") is False
+
+
+def test_disabled_store_exports_directly(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("YANTRA_BLOBS", "off")
+    a = _chain(tmp_path, "a", "2025-01-01")
+    assert export_cached(fake_export, a / "realized_01.json", a / "out.xml") is False
+    assert not (tmp_path / BLOB_DIR).exists()
+
+
+def test_audio_exports_are_keyed_on_the_backend(tmp_path: Path, monkeypatch):
+    monkeypatch.delenv("YANTRA_BLOBS", raising=False)
+    calls.clear()
+    a = _chain(tmp_path, "a", "2025-01-01")
+    source = a / "realized_01.json"
+
+    monkeypatch.setenv("YANTRA_AUDIO_BACKEND", "builtin")
+    musicxml = export_key(fake_export, source, a / "out.xml")
+    builtin = export_key(fake_export, source, a / "out.wav")
+    assert export_cached(fake_export, source, a / "out.wav") is False
+
+    monkeypatch.setenv("YANTRA_AUDIO_BACKEND", "timidity")
+    assert export_key(fake_export, source, a / "out.wav") != builtin
+    assert export_key(fake_export, source, a / "out.xml") == musicxml
+    assert export_cached(fake_export, source, a / "out.wav") is False
+    assert len(calls) == 2
+
+
+def test_stores_under_finds_cataloged_chains_elsewhere(tmp_path: Path, monkeypatch):
+    from lib.utils.chain_catalog import ChainCatalog
+
+    monkeypatch.delenv("YANTRA_BLOBS", raising=False)
+    root, elsewhere = tmp_path / "chains", tmp_path / "elsewhere"
+    root.mkdir()
+    a = _chain(root, "a", "2025-01-01")
+    b = _chain(elsewhere, "b", "2025-01-01")
+    for chain in (a, b):
+        export_cached(fake_export, chain / "realized_01.json", chain / "out.xml")
+        (chain / "metadata.json").write_text(json.dumps({"id": chain.name}))
+
+    assert [s.root for s in stores_under([root])] == [root / BLOB_DIR]
+    with ChainCatalog() as catalog:  # a catalog shared through YANTRA_CATALOG
+        catalog.index(str(a))
+        catalog.index(str(b))
+    assert [s.root for s in stores_under([root])] == [
+        root / BLOB_DIR,
+        elsewhere / BLOB_DIR,
+    ]
+    monkeypatch.setenv("YANTRA_BLOBS", "off")
+    assert stores_under([root]) == []
@@ -0,0 +1,72 @@
+import json
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from lib.utils.chain_archive import (
+    ChainArchive,
+    is_chain_archive,
+    pack_chain,
+    unpack_chain,
+)
+
+
+def _chain(tmp_path: Path) -> Path:
+    chain = tmp_path / "partimento_2025-01-01_120000"
+    chain.mkdir()
+    (chain / "metadata.json").write_text(
+        json.dumps(
+            {"id": "x", "prompt": "p", "files": {"musicxml": "realized.musicxml"}}
+        )
+    )
+    for version in (1, 2):
+        (chain / f"realized_{version:02}.json").write_text(
+            json.dumps(
+                {"data": {"soprano": [["C5"]] * 32, "version": version}}, indent=2
+            )
+        )
+    (chain / "realized.musicxml").write_text("<score-partwise/>")
+    (chain / "manifest.lock").write_text("")
+    return chain
+
+
+def test_pack_and_unpack_round_trip(tmp_path: Path):
+    chain = _chain(tmp_path)
+    archive_path = pack_chain(chain)
+    assert archive_path.name == "partimento_2025-01-01_120000.ygchain"
+
+    with ChainArchive(archive_path) as archive:
+        assert archive.metadata["id"] == "x"
+        assert "manifest.lock" not in archive.names()
+        assert archive.latest("realized") == "realized_02.json"
+        assert archive.read_json("realized_01.json")["data"]["version"] == 1
+
+    restored = unpack_chain(archive_path, tmp_path / "restored")
+    for name in ("metadata.json", "realized_01.json", "realized.musicxml"):
+        assert (restored / name).read_bytes() == (chain / name).read_bytes()
+
+
+def test_pack_remove_and_missing_metadata(tmp_path: Path):
+    chain = _chain(tmp_path)
+    pack_chain(chain, remove=True)
+    assert not chain.exists()
+    assert unpack_chain(tmp_path / f"{chain.name}.ygchain") == chain
+
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    with pytest.raises(FileNotFoundError):
+        pack_chain(empty)
+
+
+def test_only_chain_archives_are_recognized(tmp_path: Path):
+    archive_path = pack_chain(_chain(tmp_path), tmp_path / "renamed.zip")
+    assert is_chain_archive(archive_path)
+
+    score = tmp_path / "score.mxl"
+    with zipfile.ZipFile(score, "w") as mxl:
+        mxl.writestr("META-INF/container.xml", "<container/>")
+        mxl.writestr("score.musicxml", "<score-partwise/>")
+    assert not is_chain_archive(score)
+    assert not is_chain_archive(tmp_path / "renamed.zip.missing")
+    assert not is_chain_archive(tmp_path)
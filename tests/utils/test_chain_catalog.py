@@ -0,0 +1,111 @@
+import json
+import os
+from pathlib import Path
+
+from lib.utils.chain_catalog import ChainCatalog
+from lib.utils.chain_utils import record_audio, write_metadata
+
+PARTIMENTO = {
+    "title": "Furno Study",
+    "key": "D minor",
+    "style": "Furno",
+    "bassline": [["D3"], ["A2"], ["D3"]],
+    "figures": [[[]], [[]], [[]]],
+    "cadences": ["measure 3: authentic cadence"],
+}
+
+
+def _make_chain(root: Path, name: str, prompt: str, style="Furno") -> Path:
+    chain = root / name
+    chain.mkdir(parents=True)
+    data = dict(PARTIMENTO, style=style)
+    (chain / "partimento_01.json").write_text(json.dumps({"data": data}))
+    (chain / "metadata.json").write_text(
+        json.dumps(
+            {
+                "id": name,
+                "created_at": f"2025-01-0{len(list(root.iterdir()))}T00:00:00Z",
+                "mode": "chain-partimento",
+                "prompt": prompt,
+                "files": {},
+            }
+        )
+    )
+    return chain
+
+
+def test_rescan_indexes_and_searches(tmp_path: Path):
+    root = tmp_path / "chains"
+    _make_chain(root, "a", "a gentle minuet in D minor")
+    _make_chain(root, "b", "stormy toccata", style="Fenaroli")
+
+    with ChainCatalog(str(tmp_path / "catalog.sqlite")) as catalog:
+        assert catalog.rescan(str(root))["indexed"] == 2
+        assert catalog.rescan(str(root))["unchanged"] == 2
+
+        hits = catalog.query(text="minuet")
+        assert [h["chain_id"] for h in hits] == ["a"]
+        assert hits[0]["key"] == "D minor"
+        assert hits[0]["partimento_issues"] is not None
+        assert "partimento_01.json" in hits[0]["files"]
+
+        assert [h["chain_id"] for h in catalog.query(style="fenaroli")] == ["b"]
+        assert [h["chain_id"] for h in catalog.query()] == ["b", "a"]
+        assert len(catalog.query(file="partimento_01.json")) == 2
+
+
+def test_rescan_drops_removed_chains(tmp_path: Path):
+    root = tmp_path / "chains"
+    chain = _make_chain(root, "a", "minuet")
+    with ChainCatalog(str(tmp_path / "catalog.sqlite")) as catalog:
+        catalog.rescan(str(root))
+        for name in os.listdir(chain):
+            os.remove(chain / name)
+        chain.rmdir()
+        assert catalog.rescan(str(root))["removed"] == 1
+        assert catalog.count() == 0
+
+
+def test_write_metadata_updates_catalog(tmp_path: Path, monkeypatch):
+    db = tmp_path / "catalog.sqlite"
+    monkeypatch.setenv("YANTRA_CATALOG", str(db))
+    chain = tmp_path / "chain"
+    chain.mkdir()
+    write_metadata(chain, {"id": "x", "prompt": "ground bass", "files": {}})
+    with ChainCatalog(str(db)) as catalog:
+        assert [h["chain_id"] for h in catalog.query(text="ground")] == ["x"]
+
+
+def test_catalog_lives_in_the_chains_root(tmp_path: Path, monkeypatch):
+    monkeypatch.delenv("YANTRA_CATALOG")
+    monkeypatch.chdir(tmp_path)
+    chain = tmp_path / "elsewhere" / "chain"
+    chain.mkdir(parents=True)
+    write_metadata(chain, {"id": "x", "prompt": "ground bass", "files": {}})
+    monkeypatch.chdir(chain)  # queue workers run jobs from other directories
+    write_metadata(chain, {"id": "x", "prompt": "ground bass", "files": {}})
+    assert not (tmp_path / "generated").exists()
+    with ChainCatalog(str(tmp_path / "elsewhere" / ".catalog.sqlite")) as catalog:
+        assert [h["chain_id"] for h in catalog.query()] == ["x"]
+
+
+def test_unchanged_versions_are_not_relinted(tmp_path: Path, monkeypatch):
+    import lib.utils.chain_catalog as chain_catalog
+
+    chain = _make_chain(tmp_path / "chains", "a", "minuet")
+    write_metadata(chain, {"id": "a", "prompt": "minuet", "files": {}})
+
+    def no_lint(path, kind):
+        raise AssertionError(f"relinted {path}")
+
+    monkeypatch.setattr(chain_catalog, "_issue_count", no_lint)
+    write_metadata(chain, {"id": "a", "prompt": "minuet", "files": {}})
+    (chain / "partimento.ogg").write_bytes(b"OggS")
+    record_audio(chain, {"partimento.ogg": "done"})
+
+    with ChainCatalog() as catalog:
+        [row] = catalog.query(file="partimento.ogg")
+        assert row["partimento_issues"] is not None
+    assert json.loads((chain / "metadata.json").read_text())["audio"] == {
+        "partimento.ogg": "done"
+    }
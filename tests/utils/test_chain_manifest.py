@@ -0,0 +1,58 @@
+import json
+from multiprocessing import Pool
+from pathlib import Path
+
+from lib.utils.chain_manifest import MANIFEST_NAME, ChainManifest
+from lib.utils.chain_utils import get_next_versioned_filename, write_chain_json
+
+
+def _allocate(directory):
+    return Path(ChainManifest(directory).allocate("realized")).name
+
+
+def test_allocate_starts_at_01_and_respects_ext(tmp_path: Path):
+    assert Path(get_next_versioned_filename(tmp_path, "realized")).name == (
+        "realized_01.json"
+    )
+    assert Path(get_next_versioned_filename(tmp_path, "realized")).name == (
+        "realized_02.json"
+    )
+    assert Path(get_next_versioned_filename(tmp_path, "realized", ".mid")).name == (
+        "realized_01.mid"
+    )
+
+
+def test_bootstrap_indexes_existing_chain(tmp_path: Path):
+    for name in ("partimento_01.json", "partimento_03.json", "realized.mid"):
+        (tmp_path / name).write_text("{}")
+    manifest = ChainManifest(tmp_path)
+    assert manifest.latest("partimento")["file"] == "partimento_03.json"
+    assert manifest.allocate("partimento").name == "partimento_04.json"
+
+
+def test_write_chain_json_records_parent_and_hash(tmp_path: Path):
+    first = get_next_versioned_filename(tmp_path, "partimento")
+    write_chain_json({"a": 1}, first, mode="generate-partimento")
+    second = get_next_versioned_filename(tmp_path, "partimento")
+    write_chain_json({"a": 2}, second, mode="patched-partimento", source_path=first)
+
+    latest = ChainManifest(tmp_path).latest("partimento")
+    assert latest["file"] == "partimento_02.json"
+    assert latest["parent"] == "partimento_01.json"
+    assert latest["mode"] == "patched-partimento"
+    assert len(latest["sha256"]) == 64
+
+    lines = (tmp_path / MANIFEST_NAME).read_text().splitlines()
+    assert [json.loads(line)["op"] for line in lines] == [
+        "allocate",
+        "write",
+        "allocate",
+        "write",
+    ]
+
+
+def test_parallel_allocation_never_repeats(tmp_path: Path):
+    with Pool(4) as pool:
+        names = pool.map(_allocate, [tmp_path] * 40)
+    assert len(set(names)) == 40
+    assert max(names) == "realized_40.json"
@@ -0,0 +1,154 @@
+import base64
+import hashlib
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from lib.utils.chain_push import chain_files, file_md5, push_chains
+from lib.utils.reexport import find_chains
+
+
+class FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.md5_hash, self.generation = bucket.objects.get(name, (None, None, 0))[1:]
+
+    @property
+    def public_url(self):
+        return f"https://storage.example/{self.name}"
+
+    def upload_from_filename(self, path, predefined_acl=None, if_generation_match=None):
+        self.bucket.upload(self.name, path, predefined_acl, if_generation_match)
+
+
+class FakeBucket:
+    """In-memory stand-in for a google.cloud.storage bucket."""
+
+    def __init__(self, fail=()):
+        self.objects = {}  # name → (bytes, md5_hash, generation)
+        self.public = set()
+        self.uploads = []
+        self.fail = set(fail)
+        self.lock = threading.Lock()
+        self.active = self.max_active = 0
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+    def list_blobs(self, prefix=""):
+        return [self.blob(n) for n in sorted(self.objects) if n.startswith(prefix)]
+
+    def upload(self, name, path, acl, if_generation_match):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            threading.Event().wait(0.01)
+            if name.rsplit("/", 1)[-1] in self.fail:
+                raise ConnectionError("connection reset")
+            with open(path, "rb") as f:
+                data = f.read()
+            with self.lock:
+                generation = self.objects.get(name, (None, None, 0))[2]
+                assert if_generation_match == generation, "stale precondition"
+                md5 = base64.b64encode(hashlib.md5(data).digest()).decode()
+                self.objects[name] = (data, md5, generation + 1)
+                self.uploads.append(name)
+                if acl == "publicRead":
+                    self.public.add(name)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def _make_chain(root, name, files=4):
+    chain = root / name
+    chain.mkdir(parents=True)
+    (chain / "metadata.json").write_text(json.dumps({"files": {}}))
+    for i in range(files):
+        (chain / f"realized_{i:02d}.json").write_text(json.dumps({"i": i, "c": name}))
+    (chain / "manifest.lock").write_text("")
+    return chain
+
+
+def _statuses(results):
+    return sorted(entry["status"] for r in results for entry in r["files"])
+
+
+def test_file_md5_matches_storage_format(tmp_path):
+    (tmp_path / "x").write_bytes(b"hello")
+    assert file_md5(tmp_path / "x") == "XUFAKrxLKna5cZ2REBfFkg=="
+
+
+def test_uploads_all_chains_concurrently(tmp_path):
+    for i in range(3):
+        _make_chain(tmp_path / "chains", f"c{i}")
+    chains = find_chains([str(tmp_path / "chains" / "c*")])
+    bucket = FakeBucket()
+    finished = []
+
+    results = push_chains(chains, bucket, jobs=4, progress=finished.append)
+    assert _statuses(results) == ["uploaded"] * 15
+    assert len(finished) == 3
+    assert "manifest.lock" not in chain_files(chains[0])
+    assert "outputs/c1/realized_02.json" in bucket.public
+    assert bucket.max_active > 1
+    url = results[0]["files"][0]["url"]
+    assert url == "https://storage.example/outputs/c0/metadata.json"
+
+
+def test_skips_unchanged_and_resumes(tmp_path):
+    chain = _make_chain(tmp_path, "c")
+    bucket = FakeBucket(fail={"realized_01.json"})
+    results = push_chains([chain], bucket, jobs=2)
+    assert _statuses(results) == ["failed"] + ["uploaded"] * 4
+
+    # The next push sends only what failed or changed since
+    bucket.fail.clear()
+    bucket.uploads.clear()
+    (chain / "realized_03.json").write_text("changed")
+    results = push_chains([chain], bucket, jobs=2)
+    assert sorted(bucket.uploads) == [
+        "outputs/c/realized_01.json",
+        "outputs/c/realized_03.json",
+    ]
+    assert _statuses(results) == ["skipped"] * 3 + ["uploaded"] * 2
+
+    bucket.uploads.clear()
+    push_chains([chain], bucket, force=True)
+    assert len(bucket.uploads) == 5
+
+
+def test_rejects_chains_with_the_same_name(tmp_path):
+    first = _make_chain(tmp_path / "c1", "chain_00000")
+    second = _make_chain(tmp_path / "c8", "chain_00000")
+    bucket = FakeBucket()
+    with pytest.raises(ValueError, match="same name"):
+        push_chains([first, second], bucket)
+    assert bucket.uploads == []
+
+
+def test_firestore_failure_fails_only_its_chain(tmp_path, monkeypatch):
+    import lib.firebase_utils
+    from cli.handlers import firebase
+
+    for name in ("a", "b"):
+        _make_chain(tmp_path, name)
+    bucket = FakeBucket()
+    saved = []
+
+    def save(metadata, doc_id):
+        if doc_id == "a":
+            raise RuntimeError("deadline exceeded")
+        saved.append(doc_id)
+        return doc_id
+
+    monkeypatch.setattr(lib.firebase_utils, "get_bucket", lambda: bucket)
+    monkeypatch.setattr(firebase, "save_realization_metadata", save)
+    args = SimpleNamespace(input=[str(tmp_path / "*")], jobs=2, force=False)
+    assert firebase.handle_push_chain(args) is False
+    assert saved == ["b"]
+    assert len(bucket.uploads) == 10
@@ -3,6 +3,7 @@ from types import SimpleNamespace
 
 import pytest
 
+from lib.utils.audio_render import audio_suffix
 from lib.utils.chain_utils import build_meta, is_likely_directory, resolve_output
 
 # ------------------------------------------------------------------
@@ -62,7 +63,7 @@ def test_resolve_output_chain_dir(tmp_path: Path):
     assert spec.json == out_dir / "partimento_01.json"
     assert spec.xml == out_dir / "partimento.musicxml"
     assert spec.midi == out_dir / "partimento.mid"
-    assert spec.ogg == out_dir / "partimento.ogg"
+    assert spec.ogg == out_dir / f"partimento{audio_suffix()}"
 
 
 def test_resolve_output_flat_file(tmp_path: Path):
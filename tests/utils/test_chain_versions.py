@@ -0,0 +1,76 @@
+import json
+from pathlib import Path
+
+from lib.utils.chain_utils import write_chain_json
+from lib.utils.chain_versions import (
+    compose_patches,
+    diff_versions,
+    load_chain_json,
+    write_chain_revision,
+)
+
+BASE = {
+    "soprano": [["E4"], ["F4"], ["G4"], ["C5"]],
+    "alto": [["C4"], ["C4"], ["B3"], ["G4"]],
+}
+
+
+def _versions(chain: Path):
+    chain.mkdir()
+    write_chain_json(BASE, chain / "realized_01.json", mode="realize-partimento")
+    first = {"alto": {"1": ["A3"]}}
+    second = {"soprano": {"3": ["E5"]}, "alto": {"1": ["D4"]}}
+    write_chain_revision(
+        None, first, chain / "realized_02.json", "pass-1", chain / "realized_01.json"
+    )
+    write_chain_revision(
+        None, second, chain / "realized_03.json", "pass-2", chain / "realized_02.json"
+    )
+
+
+def test_revisions_are_stored_as_deltas_on_the_base(tmp_path: Path):
+    chain = tmp_path / "chain"
+    _versions(chain)
+
+    raw = json.loads((chain / "realized_03.json").read_text())
+    assert "data" not in raw
+    assert raw["delta"]["base"] == "realized_01.json"
+    assert raw["delta"]["patch"] == {"alto": {"1": ["D4"]}, "soprano": {"3": ["E5"]}}
+
+    data = load_chain_json(chain / "realized_03.json")["data"]
+    assert data["alto"][1] == ["D4"]
+    assert data["soprano"][3] == ["E5"]
+    # callers get their own copy
+    data["alto"][0] = ["X"]
+    assert load_chain_json(chain / "realized_03.json")["data"]["alto"][0] == ["C4"]
+
+
+def test_revision_outside_chain_is_written_in_full(tmp_path: Path):
+    write_chain_json(BASE, tmp_path / "base.json", mode="realize-partimento")
+    out = tmp_path / "other" / "revised.json"
+    out.parent.mkdir()
+    write_chain_revision(
+        BASE, {"alto": {"0": ["D4"]}}, out, "revise", tmp_path / "base.json"
+    )
+    assert json.loads(out.read_text())["data"] == BASE
+
+
+def test_diff_versions(tmp_path: Path):
+    chain = tmp_path / "chain"
+    _versions(chain)
+    changes = diff_versions(chain / "realized_02.json", chain / "realized_03.json")
+    assert [(c["part"], c["measure"]) for c in changes] == [("alto", 2), ("soprano", 4)]
+    assert changes[0]["before"] == ["A3"] and changes[0]["after"] == ["D4"]
+
+    # Full files are compared measure by measure
+    full = tmp_path / "full.json"
+    write_chain_json(load_chain_json(chain / "realized_03.json")["data"], full, "x")
+    changes = diff_versions(chain / "realized_01.json", full)
+    assert [(c["part"], c["measure"]) for c in changes] == [("alto", 2), ("soprano", 4)]
+
+
+def test_compose_patches():
+    assert compose_patches({"a": {"1": [1]}}, {"a": {1: [2]}, "b": {"0": [3]}}) == {
+        "a": {"1": [2]},
+        "b": {"0": [3]},
+    }
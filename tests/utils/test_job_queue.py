@@ -0,0 +1,71 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from lib.utils.job_queue import JobQueue, run_worker
+
+
+@pytest.fixture
+def queue(tmp_path: Path):
+    with JobQueue(str(tmp_path / "queue.sqlite")) as queue:
+        yield queue
+
+
+def test_claim_by_priority_and_kind(queue):
+    low = queue.submit("export", {"n": 1})
+    high = queue.submit("export", {"n": 2}, priority=5)
+    other = queue.submit("generate", {"n": 3}, priority=9)
+
+    assert queue.claim("w1", ["export"]).id == high
+    assert queue.claim("w1", ["export"]).id == low
+    assert queue.claim("w1", ["export"]) is None
+    job = queue.claim("w2")
+    assert (job.id, job.payload, job.attempts) == (other, {"n": 3}, 1)
+    assert queue.counts()["running"] == 3
+
+
+def test_expired_lease_is_reclaimed(queue):
+    job_id = queue.submit("generate", {})
+    assert queue.claim("crashed", lease=0.01).id == job_id
+    time.sleep(0.02)
+    job = queue.claim("w2")
+    assert job.id == job_id and job.attempts == 2
+    assert not queue.heartbeat(job_id, "crashed", 60)
+    assert not queue.complete(job_id, "crashed")
+    assert queue.heartbeat(job_id, "w2", 60)
+    assert queue.complete(job_id, "w2", {"ok": True})
+    assert queue.jobs("done")[0]["result"] == {"ok": True}
+
+
+def test_failures_back_off_then_dead_letter(queue):
+    job_id = queue.submit("realize", {}, max_attempts=2, retry_delay=0)
+    queue.claim("w")
+    assert queue.fail(job_id, "w", "rate limited") == "queued"
+    queue.claim("w")
+    assert queue.fail(job_id, "w", "rate limited again") == "dead"
+    assert queue.claim("w") is None
+    dead = queue.jobs("dead")
+    assert dead[0]["error"] == "rate limited again"
+
+    assert queue.retry() == 1
+    assert queue.claim("w").attempts == 1
+
+
+def test_run_worker_records_throughput(queue):
+    for n in range(3):
+        queue.submit("export", {"n": n})
+    queue.submit("export", {"n": -1}, max_attempts=1)
+
+    def executor(job):
+        if job.payload["n"] < 0:
+            raise RuntimeError("boom")
+        return {"double": job.payload["n"] * 2}
+
+    stats = run_worker(executor, queue.path, drain=True, worker_id="w1")
+    assert stats == {"done": 3, "failed": 1}
+    assert queue.counts() == {"queued": 0, "running": 0, "done": 3, "dead": 1}
+    assert "boom" in queue.jobs("dead")[0]["error"]
+    (worker,) = queue.workers()
+    assert worker["jobs_done"] == 3 and worker["jobs_failed"] == 1
+    assert worker["state"] == "stopped" and worker["jobs_per_hour"] > 0
@@ -0,0 +1,110 @@
+import os
+import tracemalloc
+import zipfile
+
+from music21 import key, meter
+
+from lib.benchmarks.synthetic import synthetic_satb
+from lib.utils import musicxml_utils
+from lib.utils.musicxml_scan import (
+    expand_inputs,
+    inspect_files,
+    key_name,
+    scan_musicxml,
+)
+
+
+def write_score(path, measures=8):
+    score = musicxml_utils.json_to_musicxml(synthetic_satb(measures))
+    score.metadata.composer = "Fenaroli"
+    score.parts[0].measure(1).insert(0, key.Key("d"))
+    score.parts[0].measure(1).insert(0, meter.TimeSignature("2/2"))
+    musicxml_utils.save_musicxml(score, str(path))
+    return score
+
+
+def test_scan_matches_music21_summary(tmp_path):
+    path = tmp_path / "score.musicxml"
+    write_score(path)
+    scanned = scan_musicxml(str(path))
+    parsed = musicxml_utils.score_summary(musicxml_utils.load_musicxml(str(path)))
+
+    assert scanned["title"] == "Synthetic Partimento (8 measures)"
+    for field in ("composer", "parts", "measures", "key", "fifths", "time"):
+        assert scanned[field] == parsed[field]
+    assert scanned["key"] == "D minor"
+    assert scanned["time"] == "2/2"
+    assert scanned["instruments"] == ["Soprano", "Alto", "Tenor", "Bass"]
+
+
+def test_scan_reads_bytes_and_mxl(tmp_path):
+    path = tmp_path / "score.musicxml"
+    write_score(path)
+    data = path.read_bytes()
+    assert scan_musicxml(data)["measures"] == 8
+
+    mxl = tmp_path / "score.mxl"
+    with zipfile.ZipFile(mxl, "w") as archive:
+        archive.writestr(
+            "META-INF/container.xml",
+            '<container><rootfiles><rootfile full-path="score.xml"/>'
+            "</rootfiles></container>",
+        )
+        archive.writestr("score.xml", data)
+    assert scan_musicxml(str(mxl))["parts"] == 4
+
+
+def raw_musicxml(measures):
+    measure = (
+        '<measure number="{}"><note><pitch><step>C</step><octave>4</octave>'
+        "</pitch><duration>4</duration><type>whole</type></note></measure>"
+    )
+    return (
+        '<score-partwise version="4.0"><part-list><score-part id="P1">'
+        '<part-name>Bass</part-name></score-part></part-list><part id="P1">'
+        + "".join(measure.format(i + 1) for i in range(measures))
+        + "</part></score-partwise>"
+    )
+
+
+def test_scan_memory_does_not_grow_with_length(tmp_path):
+    peaks = []
+    for measures in (100, 20000):
+        path = tmp_path / f"score_{measures}.musicxml"
+        path.write_text(raw_musicxml(measures))
+        tracemalloc.start()
+        try:
+            assert scan_musicxml(str(path))["measures"] == measures
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+    assert peaks[1] < peaks[0] * 2
+
+
+def test_inspect_files_in_parallel_with_errors(tmp_path):
+    for name in ("a", "b"):
+        write_score(tmp_path / f"{name}.musicxml")
+    (tmp_path / "broken.musicxml").write_text("<score-partwise><part>")
+    (tmp_path / "notes.txt").write_text("not a score")
+
+    paths = expand_inputs([str(tmp_path)])
+    assert [os.path.basename(p) for p in paths] == [
+        "a.musicxml",
+        "b.musicxml",
+        "broken.musicxml",
+    ]
+    assert expand_inputs([str(tmp_path / "*.musicxml")]) == paths
+
+    results = inspect_files(paths, jobs=2)
+    assert [r["measures"] for r in results[:2]] == [8, 8]
+    assert results[0]["parser"] == "stream"
+    assert "ParseError" in results[2]["error"]
+
+    (deep,) = inspect_files(paths[:1], deep=True)
+    assert deep["parser"] == "music21" and deep["key"] == "D minor"
+
+
+def test_key_name():
+    assert key_name(-1, "minor") == "D minor"
+    assert key_name(2) == "D major"
+    assert key_name(0, "dorian") is None
@@ -0,0 +1,78 @@
+import json
+from pathlib import Path
+
+from lib.utils.chain_utils import log_step
+from lib.utils.profiling import Profiler, active_profiler, profile_stage, profiled
+
+
+@profiled
+def build(n):
+    with profile_stage("write"):
+        return [0] * n
+
+
+def test_log_steps_form_stage_tree():
+    with Profiler("chain") as profiler:
+        log_step("\n🔗 1. Generating...")
+        build(10)
+        build(10)
+        log_step("🔍 Reviewing...")
+        with profile_stage("llm"):
+            log_step("nested step")
+    assert active_profiler() is None
+
+    root = profiler.report()["stages"]
+    assert [c["name"] for c in root["children"]] == [
+        "🔗 1. Generating...",
+        "🔍 Reviewing...",
+    ]
+    generating, reviewing = root["children"]
+    (built,) = generating["children"]
+    assert (built["name"], built["calls"]) == ("build", 2)
+    assert built["children"][0]["name"] == "write"
+    llm = reviewing["children"][0]
+    assert llm["children"][0]["name"] == "nested step"
+    assert root["seconds"] >= generating["seconds"] + reviewing["seconds"]
+
+
+def test_cpu_memory_and_reports(tmp_path: Path):
+    with Profiler("export", cpu=True, memory=True) as profiler:
+        log_step("allocating")
+        with profile_stage("bytes"):
+            blob = bytearray(4_000_000)
+        del blob
+
+    report_path, collapsed_path = profiler.write(tmp_path / "p" / "report.json")
+    report = json.loads(Path(report_path).read_text())
+    allocating = report["stages"]["children"][0]
+    assert allocating["peak_bytes"] >= 4_000_000
+    assert allocating["children"][0]["peak_bytes"] >= 4_000_000
+    assert "top_functions" in allocating
+
+    lines = Path(collapsed_path).read_text().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any(line.startswith("export;allocating;bytes") for line in lines)
+
+
+def test_other_threads_do_not_touch_the_stage_tree():
+    import threading
+
+    started, release = threading.Event(), threading.Event()
+
+    def render():
+        with profile_stage("audio render"):
+            started.set()
+            release.wait(5)
+
+    with Profiler("chain", cpu=True) as profiler:
+        thread = threading.Thread(target=render)
+        thread.start()
+        started.wait(5)
+        log_step("🔍 Reviewing...")
+        build(10)
+        release.set()
+        thread.join()
+
+    root = profiler.report()["stages"]
+    assert [c["name"] for c in root["children"]] == ["🔍 Reviewing..."]
+    assert root["children"][0]["children"][0]["name"] == "build"
@@ -0,0 +1,115 @@
+import json
+
+import pytest
+
+from lib.benchmarks.synthetic import synthetic_partimento, synthetic_satb
+from lib.utils.chain_catalog import ChainCatalog
+from lib.utils.reexport import ReexportJournal, final_versions, find_chains, reexport
+
+FORMATS = ("musicxml", "midi")
+
+
+def _make_chain(root, name, seed=0):
+    chain = root / name
+    chain.mkdir(parents=True)
+    for file_name, data in (
+        ("partimento_01.json", synthetic_partimento(8, seed=seed)),
+        ("realized_01.json", synthetic_satb(8, seed=seed + 100)),
+        ("realized_02.json", synthetic_satb(8, seed=seed)),
+    ):
+        (chain / file_name).write_text(json.dumps({"data": data}))
+    (chain / "metadata.json").write_text(
+        json.dumps(
+            {
+                "mode": "chain-partimento",
+                "created_at": "2025-01-01T00:00:00Z",
+                "files": {
+                    "partimento_versions": ["partimento_01.json"],
+                    "realization_versions": ["realized_01.json", "realized_02.json"],
+                },
+            }
+        )
+    )
+    return chain
+
+
+def test_final_versions_follow_metadata(tmp_path):
+    chain = _make_chain(tmp_path, "c")
+    assert final_versions(str(chain)) == {
+        "partimento": str(chain / "partimento_01.json"),
+        "realized": str(chain / "realized_02.json"),
+    }
+
+    # Without a named version the highest one on disk is used
+    (chain / "metadata.json").write_text(json.dumps({"mode": "realize-partimento"}))
+    (chain / "realized_03.json").write_text((chain / "realized_01.json").read_text())
+    assert final_versions(str(chain))["realized"] == str(chain / "realized_03.json")
+
+
+def test_find_chains_from_globs_and_catalog(tmp_path):
+    root = tmp_path / "chains"
+    a = _make_chain(root, "a")
+    b = _make_chain(root / "nested", "b")
+    assert find_chains([str(root)]) == [str(a), str(b)]
+    assert find_chains([str(root / "n*" / "*")]) == [str(b)]
+
+    with ChainCatalog() as catalog:
+        catalog.rescan(str(root))
+    assert find_chains() == sorted([str(a), str(b)])
+    assert find_chains(mode="other") == []
+
+
+def test_skips_unchanged_and_rebuilds_changed(tmp_path):
+    root = tmp_path / "chains"
+    chains = [_make_chain(root, f"c{i}", seed=i) for i in range(3)]
+    journal_path = str(tmp_path / "journal.jsonl")
+
+    stats = reexport(chains, FORMATS, jobs=1, journal=ReexportJournal(journal_path))
+    assert (stats["exported"], stats["skipped"], stats["failed"]) == (12, 0, 0)
+    assert (chains[0] / "realized.musicxml").exists()
+    assert (chains[0] / "partimento.mid").exists()
+    assert stats["files_per_second"] > 0
+
+    stats = reexport(chains, FORMATS, jobs=1, journal=ReexportJournal(journal_path))
+    assert (stats["exported"], stats["skipped"]) == (0, 12)
+
+    # Changing a final version rebuilds only what derives from it
+    final = chains[1] / "realized_02.json"
+    final.write_text(json.dumps({"data": synthetic_satb(8, seed=7)}))
+    stats = reexport(chains, FORMATS, jobs=1, journal=ReexportJournal(journal_path))
+    assert (stats["exported"], stats["skipped"]) == (2, 10)
+
+    stats = reexport(
+        chains, FORMATS, jobs=1, journal=ReexportJournal(journal_path), force=True
+    )
+    assert stats["exported"] == 12
+
+
+def test_resumes_after_interruption(tmp_path):
+    chains = [_make_chain(tmp_path / "chains", f"c{i}", seed=i) for i in range(3)]
+    journal_path = str(tmp_path / "journal.jsonl")
+
+    def interrupt(result):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        reexport(
+            chains,
+            FORMATS,
+            jobs=1,
+            journal=ReexportJournal(journal_path),
+            progress=interrupt,
+        )
+
+    stats = reexport(chains, FORMATS, jobs=1, journal=ReexportJournal(journal_path))
+    assert (stats["exported"], stats["skipped"]) == (8, 4)
+
+
+def test_parallel_reexport_with_audio(tmp_path):
+    chains = [_make_chain(tmp_path / "chains", f"c{i}", seed=i) for i in range(2)]
+    stats = reexport(
+        chains, jobs=2, journal=ReexportJournal(str(tmp_path / "journal.jsonl"))
+    )
+    assert (stats["exported"], stats["failed"]) == (12, 0)
+    meta = json.loads((chains[0] / "metadata.json").read_text())
+    assert set(meta["audio"].values()) == {"done"}
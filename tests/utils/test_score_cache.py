@@ -0,0 +1,74 @@
+import os
+
+from music21 import stream
+
+from lib.benchmarks.synthetic import synthetic_satb
+from lib.utils import musicxml_utils
+from lib.utils.score_cache import ScoreCache, cached_parse, default_cache
+
+
+def write_score(path, measures=8):
+    score = musicxml_utils.json_to_musicxml(synthetic_satb(measures))
+    musicxml_utils.save_musicxml(score, str(path))
+
+
+def test_load_musicxml_hits_cache_on_same_content(tmp_path):
+    path = tmp_path / "score.musicxml"
+    write_score(path)
+    first = musicxml_utils.load_musicxml(str(path))
+    second = musicxml_utils.load_musicxml(str(path))
+
+    assert isinstance(second, stream.Score)
+    assert second is not first
+    assert len(second.parts) == 4
+    assert [n.nameWithOctave for n in second.parts[0].recurse().notes] == [
+        n.nameWithOctave for n in first.parts[0].recurse().notes
+    ]
+    stats = default_cache().stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+    # Same bytes under another name hit; changed bytes miss
+    copy = tmp_path / "copy.musicxml"
+    copy.write_bytes(path.read_bytes())
+    musicxml_utils.load_musicxml(str(copy))
+    write_score(path, measures=16)
+    assert len(musicxml_utils.load_musicxml(str(path)).parts[0]) >= 16
+    stats = default_cache().stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 2)
+
+
+def test_cache_can_be_disabled(tmp_path, monkeypatch):
+    monkeypatch.setenv("YANTRA_SCORE_CACHE", "off")
+    assert default_cache() is None
+    path = tmp_path / "score.musicxml"
+    write_score(path)
+    assert musicxml_utils.load_musicxml(str(path)).parts
+
+
+def test_eviction_keeps_recently_used_within_bound(tmp_path):
+    cache = ScoreCache(tmp_path / "cache", max_bytes=10**9)
+    for n in range(3):
+        cached_parse(
+            f"score {n}".encode(), lambda: {"n": list(range(1000))}, cache=cache
+        )
+        entry = cache.path(cache.key(f"score {n}".encode()))
+        os.utime(entry, (n, n))
+    # Touch the oldest entry so it counts as recently used
+    assert cache.get(cache.key(b"score 0")) is not None
+
+    size = cache.entries()[0][1]
+    assert cache.evict(max_bytes=2 * size) == 1
+    assert cache.get(cache.key(b"score 1")) is None
+    assert cache.get(cache.key(b"score 0")) is not None
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert (stats["hits"], stats["misses"], stats["writes"]) == (2, 4, 3)
+
+
+def test_corrupt_entry_is_reparsed(tmp_path):
+    cache = ScoreCache(tmp_path / "cache")
+    key = cache.key(b"data")
+    cache.path(key).parent.mkdir(parents=True)
+    cache.path(key).write_bytes(b"not a pickle")
+    assert cached_parse(b"data", lambda: "parsed", cache=cache) == "parsed"
+    assert cached_parse(b"data", lambda: "reparsed", cache=cache) == "parsed"
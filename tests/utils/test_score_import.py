@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from genres.partimento.tasks import export
+from lib.benchmarks.synthetic import synthetic_partimento, synthetic_satb
+from lib.utils.score_import import (
+    import_files,
+    import_score,
+    parse_figures,
+    read_musicxml,
+    score_to_json,
+)
+
+FIGURED_BASS = """<?xml version="1.0"?>
+<score-partwise version="4.0">
+  <work><work-title>Regola</work-title></work>
+  <part-list><score-part id="P1"><part-name>Basso</part-name></score-part></part-list>
+  <part id="P1">
+    <measure number="1">
+      <attributes><key><fifths>-1</fifths><mode>minor</mode></key></attributes>
+      <note><pitch><step>D</step><octave>3</octave></pitch><voice>1</voice></note>
+      <figured-bass><figure><figure-number>6</figure-number></figure></figured-bass>
+      <note><pitch><step>F</step><octave>3</octave></pitch><voice>1</voice></note>
+    </measure>
+    <measure number="2">
+      <figured-bass>
+        <figure><prefix>sharp</prefix></figure>
+      </figured-bass>
+      <note><pitch><step>A</step><octave>2</octave></pitch><voice>1</voice>
+        <tie type="start"/></note>
+    </measure>
+    <measure number="3">
+      <note><pitch><step>A</step><octave>2</octave></pitch><voice>1</voice>
+        <tie type="stop"/></note>
+      <note><rest/><voice>1</voice></note>
+      <note><pitch><step>B</step><alter>-1</alter><octave>2</octave></pitch>
+        <voice>1</voice><lyric><text>6</text></lyric><lyric><text>4</text></lyric>
+      </note>
+      <note><chord/><pitch><step>D</step><octave>4</octave></pitch><voice>1</voice>
+      </note>
+    </measure>
+  </part>
+</score-partwise>
+"""
+
+
+def test_parse_figures():
+    assert parse_figures("6 4") == ["6", "4"]
+    assert parse_figures("6/4") == ["6", "4"]
+    assert parse_figures("#6") == ["#6"]
+    assert parse_figures("b7") == ["b7"]
+    assert parse_figures("Kyrie") is None
+    assert parse_figures("") is None
+
+
+def test_musicxml_figured_bass_ties_rests_and_chords():
+    kind, data = score_to_json(read_musicxml(FIGURED_BASS.encode()))
+    assert kind == "partimento"
+    assert data["title"] == "Regola"
+    assert data["key"] == "D minor"
+    assert data["bassline"] == [["D3", "F3"], ["A2"], ["Bb2"]]
+    assert data["figures"] == [[[], ["6"]], [["#"]], [["6", "4"]]]
+
+
+@pytest.mark.parametrize("extension", ["musicxml", "mid"])
+def test_round_trips_exporter_output(tmp_path, extension):
+    partimento = synthetic_partimento(16, seed=2)
+    satb = synthetic_satb(16, seed=2)
+    (tmp_path / "p.json").write_text(json.dumps({"data": partimento}))
+    (tmp_path / "s.json").write_text(json.dumps({"data": satb}))
+    to = "midi" if extension == "mid" else "musicxml"
+    getattr(export, f"export_partimento_to_{to}")(
+        str(tmp_path / "p.json"), str(tmp_path / f"p.{extension}")
+    )
+    getattr(export, f"export_realized_partimento_to_{to}")(
+        str(tmp_path / "s.json"), str(tmp_path / f"s.{extension}")
+    )
+
+    kind, data = import_score(tmp_path / f"p.{extension}")
+    assert kind == "partimento"
+    assert data["bassline"] == partimento["bassline"]
+    assert data["figures"] == partimento["figures"]
+    assert data["key"] == partimento["key"]
+
+    kind, data = import_score(tmp_path / f"s.{extension}")
+    assert kind == "satb"
+    for voice in ("soprano", "alto", "tenor", "bass"):
+        assert data[voice] == satb[voice]
+
+
+def test_import_files_reports_errors_per_file(tmp_path):
+    source = tmp_path / "corpus" / "book1"
+    source.mkdir(parents=True)
+    for n in range(3):
+        (source / f"regola_{n}.musicxml").write_text(FIGURED_BASS)
+    (source / "broken.musicxml").write_text("<score-partwise><part>")
+    paths = sorted(str(p) for p in source.iterdir())
+
+    seen = []
+    results = import_files(
+        paths,
+        str(tmp_path / "out"),
+        jobs=2,
+        max_tasks_per_child=1,
+        progress=seen.append,
+    )
+    assert [r["path"] for r in results] == paths
+    assert len(seen) == 4
+    assert "ParseError" in results[0]["error"]
+    imported = results[1]
+    assert imported["kind"] == "partimento" and imported["measures"] == 3
+    payload = json.loads(open(imported["output"]).read())
+    assert payload["mode"] == "import-partimento"
+    assert payload["data"]["bassline"][0] == ["D3", "F3"]
+    assert imported["output"] == str(tmp_path / "out" / "regola_0.partimento.json")
+
+    with pytest.raises(ValueError):
+        score_to_json(read_musicxml(FIGURED_BASS.encode()), kind="satb")
@@ -0,0 +1,53 @@
+import pytest
+
+from lib.benchmarks.synthetic import synthetic_satb
+from lib.utils.audio_render import events_from_json
+from lib.utils.score_slice import (
+    check_measures,
+    parse_slice,
+    parse_voices,
+    slice_suffix,
+)
+
+
+def test_parse_slice():
+    assert parse_slice("17-24", "s,b") == (range(17, 25), ("soprano", "bass"))
+    assert parse_slice("3") == (range(3, 4), None)
+    assert parse_slice() == (None, None)
+    assert parse_voices("bass,Soprano") == ("soprano", "bass")
+    assert parse_voices("atb") == ("alto", "tenor", "bass")
+    for measures, voices in (("24-17", None), ("0-4", None), ("x", None), (None, "q")):
+        with pytest.raises(ValueError):
+            parse_slice(measures, voices)
+
+
+def test_slice_suffix():
+    assert slice_suffix() == ""
+    assert slice_suffix(range(17, 25), ("soprano", "bass")) == ".m17-24.sb"
+    assert slice_suffix(None, ("soprano", "alto", "tenor", "bass")) == ""
+
+
+def test_check_measures():
+    check_measures(None, 8)
+    check_measures(range(5, 9), 8)
+    with pytest.raises(ValueError, match="measures 20-24 are past the end"):
+        check_measures(range(20, 25), 8)
+
+
+def test_events_from_json_slice():
+    satb = synthetic_satb(8, seed=4)
+    full = events_from_json(satb)
+    sliced = events_from_json(satb, measures=range(3, 5), voices=("bass",))
+
+    # Bass (track 3) of measures 3-4, shifted to start at 0
+    expected = [
+        (start - 4.0, end - 4.0, *rest)
+        for start, end, *rest in full
+        if rest[-1] == 3 and 4.0 <= start < 8.0
+    ]
+    assert sliced == pytest.approx(expected)
+
+    with pytest.raises(ValueError):
+        events_from_json({"bassline": ["C3"]}, voices=("soprano",))
+    with pytest.raises(ValueError):
+        events_from_json(satb, measures=range(20, 25))